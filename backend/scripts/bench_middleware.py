@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Per-request overhead of the middleware stack in front of the routers.
+
+Calls a small FastAPI app directly through ASGI (no sockets, no HTTP parsing)
+with a quote-style endpoint and compares:
+
+    bare    — no middleware
+    legacy  — the former BaseHTTPMiddleware stack (IP ban, request tracker,
+              security headers), reproduced here
+    current — RequestTrackerMiddleware (single pure-ASGI layer)
+
+Usage:
+    python scripts/bench_middleware.py [--requests 5000] [--repeat 3]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from src.middleware import request_tracker
+from src.middleware.ip_ban import is_banned
+from src.middleware.request_metrics import finish_request, route_template, start_request
+from src.middleware.request_tracker import (
+    ActiveRequest,
+    RequestRecord,
+    RequestTrackerMiddleware,
+    _client_ip,
+)
+
+SECURITY_HEADERS = {
+    "X-Frame-Options": "DENY",
+    "X-Content-Type-Options": "nosniff",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Strict-Transport-Security": "max-age=63072000; includeSubDomains",
+    "Permissions-Policy": "camera=(), microphone=(), geolocation=()",
+    "Content-Security-Policy": "default-src 'none'; frame-ancestors 'none'",
+}
+
+
+# ── Former stack ─────────────────────────────────────────────────────────────
+
+class LegacyIpBan(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        if is_banned(_client_ip(request)):
+            return JSONResponse(status_code=403, content={"detail": "Access denied"})
+        return await call_next(request)
+
+
+class LegacyTracker(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = uuid.uuid4().hex[:12]
+        ip = _client_ip(request)
+        method, path = request.method, request.url.path
+        request_tracker._active_requests[request_id] = ActiveRequest(
+            request_id, method, path, ip, time.time(), asyncio.current_task(),
+        )
+        route = route_template(request.scope)
+        metrics = start_request(method, route)
+        start = time.time()
+        status_code = 500
+        response_bytes = None
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            response_bytes = int(response.headers.get("content-length", 0))
+            return response
+        finally:
+            duration = time.time() - start
+            request_tracker._active_requests.pop(request_id, None)
+            finish_request(metrics, status_code, duration, 0, response_bytes)
+            request_tracker._recent_requests.appendleft(RequestRecord(
+                request_id, method, path, route, status_code, round(duration * 1000, 2), ip, start,
+            ))
+
+
+async def legacy_security_headers(request, call_next):
+    response = await call_next(request)
+    for name, value in SECURITY_HEADERS.items():
+        response.headers[name] = value
+    return response
+
+
+# ── Benchmark ────────────────────────────────────────────────────────────────
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/quotes/{ticker}")
+    async def quote(ticker: str):
+        return {"ticker": ticker, "last": 271.35, "bid": 271.3, "ask": 271.4}
+
+    if variant == "legacy":
+        app.middleware("http")(legacy_security_headers)
+        app.add_middleware(LegacyTracker)
+        app.add_middleware(LegacyIpBan)
+    elif variant == "current":
+        app.add_middleware(RequestTrackerMiddleware, response_headers=SECURITY_HEADERS)
+    return app
+
+
+async def run(app: FastAPI, n_requests: int) -> float:
+    """Seconds per request."""
+    headers = [(b"host", b"bench"), (b"x-forwarded-for", b"203.0.113.7")]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope():
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/api/quotes/SBER", "raw_path": b"/api/quotes/SBER",
+            "root_path": "", "query_string": b"", "headers": headers,
+            "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        }
+
+    for _ in range(200):  # warm-up: builds the middleware stack, fills caches
+        await app(scope(), receive, send)
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        await app(scope(), receive, send)
+    return (time.perf_counter() - start) / n_requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    for variant in ("bare", "legacy", "current"):
+        app = build_app(variant)
+        results[variant] = min(asyncio.run(run(app, args.requests)) for _ in range(args.repeat))
+
+    bare = results["bare"]
+    print(f"{'variant':<10}{'µs/request':>12}{'overhead µs':>14}")
+    for variant, seconds in results.items():
+        print(f"{variant:<10}{seconds * 1e6:>12.1f}{(seconds - bare) * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
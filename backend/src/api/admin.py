@@ -10,7 +10,7 @@ import time
 from datetime import UTC, datetime
 
 import aiohttp
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel, field_validator
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -19,6 +19,7 @@ from src.database.client import engine, get_session
 from src.database.sa_models import IpBan, RefreshToken, User
 from src.middleware.admin import require_admin
 from src.middleware.ip_ban import add_banned_ip, remove_banned_ip
+from src.middleware.request_metrics import prometheus_text, route_metrics
 from src.middleware.request_tracker import (
     cancel_request,
     get_active_requests,
@@ -26,6 +27,11 @@ from src.middleware.request_tracker import (
     get_recent_requests,
     get_uptime_seconds,
 )
+from src.services import job_service
+from src.services.cache_service import cache_clear, cache_stats
+from src.services.result_cache import get_store
+from src.utils.compute_pool import pool_stats
+from src.utils.loop_monitor import loop_stats
 
 logger = logging.getLogger(__name__)
 
@@ -368,6 +374,18 @@ async def list_requests(
     return get_recent_requests(limit=limit, status_code=status_code, path_contains=path_contains)
 
 
+@router.get("/requests/metrics", dependencies=_admin_dep)
+async def list_route_metrics():
+    """Per-route counts, errors and p50/p95/p99 latency."""
+    return route_metrics()
+
+
+@router.get("/metrics", dependencies=_admin_dep)
+async def prometheus_metrics():
+    """Route metrics in the Prometheus text format (scrape with the admin credentials)."""
+    return Response(content=prometheus_text(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @router.get("/requests/active", dependencies=_admin_dep)
 async def list_active_requests():
     return get_active_requests()
@@ -388,6 +406,62 @@ async def list_errors(limit: int = Query(50, ge=1, le=200)):
     return get_recent_errors(limit=limit)
 
 
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+
+@router.get("/cache", dependencies=_admin_dep)
+async def get_cache_stats():
+    return cache_stats()
+
+
+@router.delete("/cache", dependencies=_admin_dep)
+async def clear_cache(namespace: str | None = Query(None)):
+    cache_clear(namespace)
+    return {"cleared": True, "namespace": namespace}
+
+
+@router.get("/result-cache", dependencies=_admin_dep)
+async def get_result_cache_stats():
+    return await asyncio.to_thread(get_store().stats)
+
+
+@router.delete("/result-cache", dependencies=_admin_dep)
+async def clear_result_cache(endpoint: str | None = Query(None)):
+    await asyncio.to_thread(get_store().clear, endpoint)
+    return {"cleared": True, "endpoint": endpoint}
+
+
+# ── Compute ──────────────────────────────────────────────────────────────────
+
+
+@router.get("/compute-pool", dependencies=_admin_dep)
+async def get_compute_pool_stats():
+    return pool_stats()
+
+
+@router.get("/event-loop", dependencies=_admin_dep)
+async def get_event_loop_stats():
+    """Loop lag percentiles and the routes that blocked the loop."""
+    return loop_stats()
+
+
+# Pending jobs are also listed in /requests/active and cancellable there
+@router.get("/jobs", dependencies=_admin_dep)
+async def list_all_jobs():
+    return {
+        **job_service.stats(),
+        "items": [{**job.to_dict(), "user_id": job.user_id} for job in job_service.list_jobs()],
+    }
+
+
+@router.delete("/jobs/{job_id}", dependencies=_admin_dep)
+async def cancel_any_job(job_id: str):
+    job = job_service.get_job(job_id)
+    if job is None or not job_service.cancel_job(job):
+        raise HTTPException(status_code=404, detail="Active job not found")
+    return job.to_dict()
+
+
 # ── System ───────────────────────────────────────────────────────────────────
 
 
@@ -416,6 +490,7 @@ async def system_info():
         "uptime_seconds": get_uptime_seconds(),
         "db_pool": pool_status,
         "memory_mb": memory_mb,
+        "event_loop_lag_ms": loop_stats()["lag_ms"],
     }
 
 
@@ -8,6 +8,8 @@ from pydantic import Field
 
 from src.middleware.rate_limit import limiter
 from src.services.adversarial_stress_service import run_adversarial_stress
+from src.utils.array_response import array_response
+from src.utils.compute_pool import offload
 from src.utils.error_handler import service_endpoint
 from src.utils.financial_validation import FinancialBaseModel
 
@@ -53,7 +55,8 @@ async def generate_adversarial_stress(request: Request, body: AdversarialStressR
             f"Ковариационная матрица должна быть {n}×{n}"
         )
 
-    result = run_adversarial_stress(
+    result = await offload(
+        run_adversarial_stress,
         cov_matrix=body.cov_matrix,
         mu=body.mu,
         weights=body.weights,
@@ -66,4 +69,4 @@ async def generate_adversarial_stress(request: Request, body: AdversarialStressR
         asset_names=body.asset_names,
         seed=body.seed,
     )
-    return result
+    return array_response(request, result)
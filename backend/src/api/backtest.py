@@ -2,22 +2,43 @@
 API endpoints для бэктестинга портфеля.
 """
 import asyncio
-from typing import Any, Literal
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Request
-from pydantic import Field
+import numpy as np
+from fastapi import APIRouter, Depends, Request
+from pydantic import Field, model_validator
 
 from src.middleware.rate_limit import limiter
 from src.services.backtest_service import (
     run_backtest,
+    run_backtest_sweep,
     run_historical_backtest,
     walk_forward_optimization,
 )
+from src.services.result_cache import result_cache
+from src.utils.array_payload import array_body, array_body_openapi
+from src.utils.array_response import array_response
+from src.utils.compute_pool import offload
 from src.utils.error_handler import service_endpoint
-from src.utils.financial_validation import MAX_ASSETS, MAX_CAPITAL, MAX_DATA_POINTS, FinancialBaseModel
+from src.utils.financial_validation import (
+    MAX_ASSETS,
+    MAX_CAPITAL,
+    MAX_DATA_POINTS,
+    FinancialBaseModel,
+    FloatArray,
+)
 
 router = APIRouter()
 
+# Максимальное число комбинаций параметров в одном sweep-запросе
+MAX_SWEEP_COMBINATIONS = 500
+
+RebalanceFrequency = Literal["daily", "weekly", "monthly", "quarterly"]
+StrategyType = Literal["equal_weight", "min_variance", "risk_parity", "max_sharpe", "custom"]
+
+# T x N цены: JSON-список списков или бинарное тело (см. src.utils.array_payload)
+PriceMatrix = Annotated[np.ndarray, FloatArray(2, max_shape=(MAX_DATA_POINTS, MAX_ASSETS))]
+
 
 class BacktestRequest(FinancialBaseModel):
     """Запрос на бэктестинг портфеля."""
@@ -35,14 +56,12 @@ class BacktestRequest(FinancialBaseModel):
 
 class HistoricalBacktestRequest(FinancialBaseModel):
     """Запрос на исторический бэктест."""
-    historical_prices: list[list[float]] = Field(
-        ..., max_length=MAX_DATA_POINTS, description="T x N матрица дневных цен"
-    )
+    historical_prices: PriceMatrix = Field(..., description="T x N матрица дневных цен")
     asset_names: list[str] | None = Field(None, max_length=MAX_ASSETS, description="Названия активов")
-    rebalance_frequency: Literal["daily", "weekly", "monthly", "quarterly"] = Field(
+    rebalance_frequency: RebalanceFrequency = Field(
         "monthly", description="Частота ребалансировки"
     )
-    strategy_type: Literal["equal_weight", "min_variance", "risk_parity", "max_sharpe", "custom"] = Field(
+    strategy_type: StrategyType = Field(
         "equal_weight", description="Тип стратегии"
     )
     initial_weights: list[float] | None = Field(None, max_length=MAX_ASSETS, description="Начальные веса")
@@ -52,11 +71,44 @@ class HistoricalBacktestRequest(FinancialBaseModel):
     initial_capital: float = Field(1_000_000, gt=0, le=MAX_CAPITAL, description="Начальный капитал")
 
 
+class BacktestSweepRequest(FinancialBaseModel):
+    """Запрос на перебор сетки параметров исторического бэктеста."""
+    historical_prices: PriceMatrix = Field(..., description="T x N матрица дневных цен")
+    strategies: list[StrategyType] = Field(
+        ["equal_weight"], min_length=1, max_length=5, description="Типы стратегий"
+    )
+    rebalance_frequencies: list[RebalanceFrequency] = Field(
+        ["monthly"], min_length=1, max_length=4, description="Частоты ребалансировки"
+    )
+    lookback_windows: list[int] = Field(
+        [60], min_length=1, max_length=20, description="Окна для оптимизации (дней)"
+    )
+    transaction_costs_bps: list[float] = Field(
+        [10.0], min_length=1, max_length=20, description="Транзакционные издержки (bps)"
+    )
+    initial_weights: list[float] | None = Field(None, max_length=MAX_ASSETS, description="Начальные веса")
+    risk_free_rate: float = Field(0.05, ge=-1, le=1, description="Безрисковая ставка (годовая)")
+    initial_capital: float = Field(1_000_000, gt=0, le=MAX_CAPITAL, description="Начальный капитал")
+    include_equity_curves: bool = Field(False, description="Возвращать equity curve для каждой комбинации")
+
+    @model_validator(mode="after")
+    def check_grid(self) -> "BacktestSweepRequest":
+        if any(not 10 <= w <= 504 for w in self.lookback_windows):
+            raise ValueError("lookback_windows must be within [10, 504]")
+        if any(not 0 <= c <= 100 for c in self.transaction_costs_bps):
+            raise ValueError("transaction_costs_bps must be within [0, 100]")
+        n_combinations = (
+            len(self.strategies) * len(self.rebalance_frequencies)
+            * len(self.lookback_windows) * len(self.transaction_costs_bps)
+        )
+        if n_combinations > MAX_SWEEP_COMBINATIONS:
+            raise ValueError(f"Too many combinations: {n_combinations} > {MAX_SWEEP_COMBINATIONS}")
+        return self
+
+
 class WalkForwardRequest(FinancialBaseModel):
     """Запрос на walk-forward оптимизацию."""
-    historical_prices: list[list[float]] = Field(
-        ..., max_length=MAX_DATA_POINTS, description="T x N матрица дневных цен"
-    )
+    historical_prices: PriceMatrix = Field(..., description="T x N матрица дневных цен")
     asset_names: list[str] | None = Field(None, max_length=MAX_ASSETS, description="Названия активов")
     in_sample_window: int = Field(252, ge=30, le=1260, description="IS окно (дней)")
     out_of_sample_window: int = Field(63, ge=5, le=252, description="OOS окно (дней)")
@@ -72,11 +124,13 @@ class WalkForwardRequest(FinancialBaseModel):
 @router.post("/run", response_model=dict[str, Any])
 @limiter.limit("10/minute")
 @service_endpoint("Backtest")
+@result_cache("backtest.run", seed_field="seed")
 async def run_portfolio_backtest(request: Request, body: BacktestRequest):
     """
     Выполняет бэктест портфеля (Монте-Карло).
     """
-    return run_backtest(
+    result = await offload(
+        run_backtest,
         mu=body.mu,
         cov_matrix=body.cov_matrix,
         initial_capital=body.initial_capital,
@@ -88,14 +142,22 @@ async def run_portfolio_backtest(request: Request, body: BacktestRequest):
         n_paths=body.n_paths,
         seed=body.seed
     )
+    return array_response(request, result)
 
 
-@router.post("/historical", response_model=dict[str, Any])
+@router.post(
+    "/historical", response_model=dict[str, Any],
+    openapi_extra=array_body_openapi(HistoricalBacktestRequest, "historical_prices"),
+)
 @limiter.limit("5/minute")
 @service_endpoint("Historical Backtest")
-async def run_historical_backtest_endpoint(request: Request, body: HistoricalBacktestRequest):
+@result_cache("backtest.historical")
+async def run_historical_backtest_endpoint(
+    request: Request,
+    body: HistoricalBacktestRequest = Depends(array_body(HistoricalBacktestRequest, "historical_prices")),
+):
     """Выполняет исторический бэктест на реальных ценах."""
-    return await asyncio.to_thread(
+    result = await offload(
         run_historical_backtest,
         historical_prices=body.historical_prices,
         asset_names=body.asset_names,
@@ -107,14 +169,49 @@ async def run_historical_backtest_endpoint(request: Request, body: HistoricalBac
         risk_free_rate=body.risk_free_rate,
         initial_capital=body.initial_capital,
     )
+    return array_response(request, result)
 
 
-@router.post("/walk-forward", response_model=dict[str, Any])
+@router.post(
+    "/sweep", response_model=dict[str, Any],
+    openapi_extra=array_body_openapi(BacktestSweepRequest, "historical_prices"),
+)
+@limiter.limit("3/minute")
+@service_endpoint("Backtest Sweep")
+@result_cache("backtest.sweep")
+async def run_backtest_sweep_endpoint(
+    request: Request,
+    body: BacktestSweepRequest = Depends(array_body(BacktestSweepRequest, "historical_prices")),
+):
+    """Перебирает сетку (стратегия, частота, окно, издержки) на одной матрице цен."""
+    result = await offload(
+        run_backtest_sweep,
+        historical_prices=body.historical_prices,
+        strategies=body.strategies,
+        rebalance_frequencies=body.rebalance_frequencies,
+        lookback_windows=body.lookback_windows,
+        transaction_costs_bps=body.transaction_costs_bps,
+        initial_weights=body.initial_weights,
+        risk_free_rate=body.risk_free_rate,
+        initial_capital=body.initial_capital,
+        include_equity_curves=body.include_equity_curves,
+    )
+    return array_response(request, result)
+
+
+@router.post(
+    "/walk-forward", response_model=dict[str, Any],
+    openapi_extra=array_body_openapi(WalkForwardRequest, "historical_prices"),
+)
 @limiter.limit("3/minute")
 @service_endpoint("Walk-Forward Optimization")
-async def run_walk_forward_endpoint(request: Request, body: WalkForwardRequest):
+@result_cache("backtest.walk_forward")
+async def run_walk_forward_endpoint(
+    request: Request,
+    body: WalkForwardRequest = Depends(array_body(WalkForwardRequest, "historical_prices")),
+):
     """Выполняет walk-forward оптимизацию."""
-    return await asyncio.to_thread(
+    result = await asyncio.to_thread(
         walk_forward_optimization,
         historical_prices=body.historical_prices,
         asset_names=body.asset_names,
@@ -126,3 +223,4 @@ async def run_walk_forward_endpoint(request: Request, body: WalkForwardRequest):
         risk_free_rate=body.risk_free_rate,
         initial_capital=body.initial_capital,
     )
+    return array_response(request, result)
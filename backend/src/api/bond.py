@@ -1,14 +1,13 @@
 """
 API endpoints для оценки облигаций (DCF).
 """
-import asyncio
 from typing import Any
 
 from fastapi import APIRouter, Query, Request
 from pydantic import Field
 
 from src.middleware.rate_limit import limiter
-from src.services.bond_service import calculate_bond_valuation, get_market_yield_from_moex
+from src.services.bond_service import calculate_bond_valuation_async, get_market_yield_from_moex_async
 from src.utils.error_handler import service_endpoint
 from src.utils.financial_validation import MAX_RATE_PCT, FinancialBaseModel
 
@@ -30,8 +29,7 @@ class BondValuationRequest(FinancialBaseModel):
 @service_endpoint("Bond valuation")
 async def valuate_bond(request: Request, body: BondValuationRequest):
     """Выполняет оценку облигации для двух сценариев доходности."""
-    return await asyncio.to_thread(
-        calculate_bond_valuation,
+    return await calculate_bond_valuation_async(
         secid=body.secid,
         valuation_date=body.valuationDate,
         discount_yield1=body.discountYield1,
@@ -49,5 +47,5 @@ async def get_market_yield(request: Request,
     date: str = Query(..., description="Дата оценки (YYYY-MM-DD)")
 ):
     """Получает рыночную доходность облигации из MOEX API."""
-    yield_value = await asyncio.to_thread(get_market_yield_from_moex, secid, date)
+    yield_value = await get_market_yield_from_moex_async(secid, date)
     return {"secid": secid, "date": date, "yield": yield_value}
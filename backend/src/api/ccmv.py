@@ -11,6 +11,7 @@ from pydantic import BaseModel, Field
 
 from src.middleware.rate_limit import limiter
 from src.services.ccmv_service import optimize_ccmv
+from src.services.result_cache import result_cache
 from src.utils.error_handler import service_endpoint
 from src.utils.financial_validation import MAX_ASSETS, MeanVarianceBase
 
@@ -52,6 +53,7 @@ class CCMVResponse(BaseModel):
 @router.post("/optimize", response_model=CCMVResponse)
 @limiter.limit("5/minute")
 @service_endpoint("CCMV optimization")
+@result_cache("ccmv.optimize")
 async def optimize_ccmv_portfolio(request: Request, body: CCMVRequest):
     """Выполняет CCMV оптимизацию портфеля."""
     R = np.array(body.R)
@@ -60,7 +60,8 @@ async def calculate_garch(request: Request, body: GARCHRequest):
     Returns:
         Результаты GARCH моделирования
     """
-    result = compute_service.calculate_garch(
+    result = await asyncio.to_thread(
+        compute_service.calculate_garch,
         returns=body.returns,
         omega=body.omega,
         alpha=body.alpha,
@@ -3,15 +3,19 @@ API endpoints для Convex Portfolio Construction.
 """
 import asyncio
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException, Request
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
 
+from src.middleware.auth import require_auth
 from src.middleware.rate_limit import limiter
-from src.services.convex_portfolio_service import compute_convex_portfolio
+from src.services.convex_portfolio_service import compute_convex_portfolio, problem_cache_stats
+from src.utils.array_payload import array_body, array_body_openapi
 from src.utils.error_handler import service_endpoint
-from src.utils.financial_validation import FinancialBaseModel
+from src.utils.financial_validation import FinancialBaseModel, FloatArray
+from src.utils.jwt_utils import TokenPayload
 
 router = APIRouter()
 
@@ -19,7 +23,7 @@ VALID_OBJECTIVES = {"min_variance", "max_sharpe", "mean_variance", "cvar", "risk
 
 
 class ConvexPortfolioRequest(FinancialBaseModel):
-    returns: list[list[float]] = Field(
+    returns: Annotated[np.ndarray, FloatArray(2)] = Field(
         ..., description="Матрица T × N доходностей (строки=периоды, столбцы=активы)"
     )
     asset_names: list[str] | None = Field(None, description="Названия N активов")
@@ -58,10 +62,16 @@ class ConvexPortfolioResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
-@router.post("/optimize", response_model=ConvexPortfolioResponse)
+@router.post(
+    "/optimize", response_model=ConvexPortfolioResponse,
+    openapi_extra=array_body_openapi(ConvexPortfolioRequest, "returns"),
+)
 @limiter.limit("5/minute")
 @service_endpoint("Convex portfolio optimization")
-async def optimize(request: Request, body: ConvexPortfolioRequest):
+async def optimize(
+    request: Request,
+    body: ConvexPortfolioRequest = Depends(array_body(ConvexPortfolioRequest, "returns")),
+):
     """
     Convex Portfolio Optimization.
 
@@ -100,6 +110,12 @@ async def optimize(request: Request, body: ConvexPortfolioRequest):
     return ConvexPortfolioResponse(result=result)
 
 
+@router.get("/cache-stats")
+async def cache_stats(_payload: TokenPayload = Depends(require_auth)):
+    """Статистика кэша скомпилированных задач (попадания/промахи, размер)."""
+    return problem_cache_stats()
+
+
 @router.get("/health")
 async def health():
     return {"status": "healthy", "service": "convex_portfolio"}
@@ -2,16 +2,21 @@
 API endpoints для анализа Eigenportfolios (PCA).
 """
 import asyncio
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException, Request
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
 from pydantic import BaseModel, Field
 
+from src.middleware.auth import require_auth
 from src.middleware.rate_limit import limiter
-from src.services.eigenportfolio_service import compute_eigenportfolios
+from src.services.eigenportfolio_service import CovarianceStream, compute_eigenportfolios
+from src.services.result_cache import result_cache
 from src.utils.error_handler import service_endpoint
-from src.utils.financial_validation import FinancialBaseModel
+from src.utils.financial_validation import MAX_ASSETS, MAX_DATA_POINTS, FinancialBaseModel, FloatArray
+from src.utils.jwt_utils import TokenPayload
 
 router = APIRouter()
 
@@ -44,6 +49,7 @@ class EigenportfolioResponse(BaseModel):
 @router.post("/decompose", response_model=EigenportfolioResponse)
 @limiter.limit("10/minute")
 @service_endpoint("Eigenportfolio decomposition")
+@result_cache("eigenportfolio.decompose")
 async def decompose(request: Request, body: EigenportfolioRequest):
     """
     PCA декомпозиция ковариационной матрицы.
@@ -76,6 +82,107 @@ async def decompose(request: Request, body: EigenportfolioRequest):
     return EigenportfolioResponse(result=result)
 
 
+# ── Потоковый режим: новые строки доходностей по вселенной активов ───────────
+
+# Состояние потоков в памяти процесса (scoped по user_id, LRU-eviction)
+_MAX_STREAMS = 200
+_streams: OrderedDict[str, CovarianceStream] = OrderedDict()
+
+_UNIVERSE_PATTERN = r"^[A-Za-z0-9._:-]{1,32}$"
+
+
+def _stream_key(user_id: int, universe: str) -> str:
+    return f"u{user_id}_{universe.upper()}"
+
+
+def _get_stream(user_id: int, universe: str) -> CovarianceStream:
+    key = _stream_key(user_id, universe)
+    if key not in _streams:
+        raise HTTPException(status_code=404, detail=f"Поток {universe} не найден. Сначала отправьте доходности")
+    _streams.move_to_end(key)
+    return _streams[key]
+
+
+class CovarianceChunkRequest(FinancialBaseModel):
+    returns: Annotated[np.ndarray, FloatArray(2, min_shape=(1, 2), max_shape=(MAX_DATA_POINTS, MAX_ASSETS))] = Field(
+        ..., description="Новые строки доходностей k × N (хронологический порядок)"
+    )
+    reset: bool = Field(False, description="Начать новый поток (сбросить накопленную историю)")
+    halflife: float | None = Field(
+        None, gt=0, le=10_000, description="Halflife экспоненциальных весов в строках (None = равные веса); только для нового потока"
+    )
+    use_shrinkage: bool = Field(True, description="Применять Ledoit-Wolf shrinkage")
+    n_components: int | None = Field(None, ge=1, description="Число возвращаемых PC")
+
+
+@router.post("/stream/{universe}", response_model=EigenportfolioResponse)
+@limiter.limit("300/minute")
+@service_endpoint("Stream Eigenportfolio covariance")
+async def stream_covariance(
+    request: Request,
+    body: CovarianceChunkRequest,
+    universe: str = Path(..., pattern=_UNIVERSE_PATTERN),
+    user: TokenPayload = Depends(require_auth),
+):
+    """
+    Добавляет новые строки доходностей в инкрементальную ковариацию вселенной
+    и возвращает обновлённый спектр с Marchenko-Pastur фильтрацией.
+
+    Состояние O(N²) на вселенную: прошлые доходности повторно присылать не нужно.
+    """
+    n_assets = body.returns.shape[1]
+    key = _stream_key(user.sub, universe)
+    if body.reset or key not in _streams:
+        _streams[key] = CovarianceStream(n_assets, halflife=body.halflife)
+    _streams.move_to_end(key)
+    if len(_streams) > _MAX_STREAMS:
+        _streams.popitem(last=False)
+    stream = _streams[key]
+    if stream.n_assets != n_assets:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Поток {universe} ведётся по {stream.n_assets} активам, получено {n_assets}. Используйте reset",
+        )
+
+    n_obs = await asyncio.to_thread(stream.update, body.returns)
+    if n_obs < 2:
+        return EigenportfolioResponse(result={"universe": universe, "n_obs": n_obs})
+    result = await asyncio.to_thread(stream.estimates, body.use_shrinkage, body.n_components)
+    return EigenportfolioResponse(result={"universe": universe, **result})
+
+
+@router.get("/stream/{universe}", response_model=EigenportfolioResponse)
+@limiter.limit("120/minute")
+@service_endpoint("Get Eigenportfolio covariance stream")
+async def get_covariance_stream(
+    request: Request,
+    universe: str = Path(..., pattern=_UNIVERSE_PATTERN),
+    use_shrinkage: bool = Query(True),
+    n_components: int | None = Query(None, ge=1),
+    user: TokenPayload = Depends(require_auth),
+):
+    """Текущий спектр потока без добавления строк."""
+    stream = _get_stream(user.sub, universe)
+    if stream.n_obs < 2:
+        raise HTTPException(status_code=400, detail="В потоке меньше 2 наблюдений")
+    result = await asyncio.to_thread(stream.estimates, use_shrinkage, n_components)
+    return EigenportfolioResponse(result={"universe": universe, **result})
+
+
+@router.delete("/stream/{universe}")
+@limiter.limit("60/minute")
+@service_endpoint("Reset Eigenportfolio covariance stream")
+async def reset_covariance_stream(
+    request: Request,
+    universe: str = Path(..., pattern=_UNIVERSE_PATTERN),
+    user: TokenPayload = Depends(require_auth),
+):
+    """Удаляет состояние потока вселенной."""
+    _get_stream(user.sub, universe)
+    del _streams[_stream_key(user.sub, universe)]
+    return {"universe": universe, "deleted": True}
+
+
 @router.get("/health")
 async def health():
     return {"status": "healthy", "service": "eigenportfolio"}
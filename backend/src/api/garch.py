@@ -1,15 +1,18 @@
 """
 API endpoints for GARCH volatility modeling.
 """
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Request
+import numpy as np
+from fastapi import APIRouter, Depends, Request
 from pydantic import Field
 
 from src.middleware.rate_limit import limiter
 from src.services.garch import GarchService
+from src.utils.array_payload import array_body, array_body_openapi
+from src.utils.array_response import array_response
 from src.utils.error_handler import service_endpoint
-from src.utils.financial_validation import MAX_ASSETS, MAX_DATA_POINTS, FinancialBaseModel
+from src.utils.financial_validation import MAX_ASSETS, MAX_DATA_POINTS, FinancialBaseModel, FloatArray
 
 router = APIRouter()
 
@@ -33,15 +36,18 @@ class GarchForecastRequest(FinancialBaseModel):
 
 class DCCRequest(FinancialBaseModel):
     """Request to fit DCC-GARCH on multivariate returns."""
-    returns_matrix: list[list[float]] = Field(
-        ..., min_length=20, max_length=MAX_DATA_POINTS,
-        description="T x N returns matrix (rows=time, cols=assets)"
-    )
+    returns_matrix: Annotated[
+        np.ndarray, FloatArray(2, min_shape=(20, 2), max_shape=(MAX_DATA_POINTS, MAX_ASSETS))
+    ] = Field(..., description="T x N returns matrix (rows=time, cols=assets)")
     univariate_model: str = Field("garch_11", description="Univariate model for each asset")
     univariate_params: list[dict[str, float]] | None = Field(
         None, max_length=MAX_ASSETS, description="Pre-fitted params per asset"
     )
     dcc_params: dict[str, float] | None = Field(None, description="DCC params {a, b}")
+    dcc_method: str = Field(
+        "auto", pattern=r"^(auto|full|composite)$",
+        description="DCC likelihood: full, pairwise composite, or auto (composite for large N)"
+    )
     n_steps: int = Field(22, ge=1, le=252, description="Forecast horizon")
 
 
@@ -77,18 +83,20 @@ async def forecast_garch(request: Request, body: GarchForecastRequest):
     )
 
 
-@router.post("/dcc", response_model=dict[str, Any])
+@router.post("/dcc", response_model=dict[str, Any], openapi_extra=array_body_openapi(DCCRequest, "returns_matrix"))
 @limiter.limit("5/minute")
 @service_endpoint("DCC-GARCH")
-async def fit_dcc(request: Request, body: DCCRequest):
+async def fit_dcc(request: Request, body: DCCRequest = Depends(array_body(DCCRequest, "returns_matrix"))):
     """Fit DCC-GARCH model on multivariate returns."""
-    return await GarchService.fit_dcc(
+    result = await GarchService.fit_dcc(
         returns_matrix=body.returns_matrix,
         univariate_model=body.univariate_model,
         univariate_params=body.univariate_params,
         dcc_params=body.dcc_params,
+        dcc_method=body.dcc_method,
         n_steps=body.n_steps,
     )
+    return array_response(request, result)
 
 
 @router.post("/diagnostics", response_model=dict[str, Any])
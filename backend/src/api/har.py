@@ -1,17 +1,18 @@
 """
 API endpoints для HAR модели прогнозирования волатильности.
 """
-import asyncio
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any
 
+import numpy as np
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 
 from src.middleware.rate_limit import limiter
-from src.services.har_service import fit_har_model
+from src.services.har_service import fit_har_model, fit_har_panel, fit_har_recursive
+from src.utils.compute_pool import offload
 from src.utils.error_handler import service_endpoint
-from src.utils.financial_validation import FinancialBaseModel
+from src.utils.financial_validation import MAX_DATA_POINTS, FinancialBaseModel, FloatArray
 
 router = APIRouter()
 
@@ -35,6 +36,27 @@ class HARRequest(FinancialBaseModel):
     }
 
 
+class HARRecursiveRequest(FinancialBaseModel):
+    rv: list[float] = Field(..., max_length=MAX_DATA_POINTS, description="Ряд ежедневных реализованных дисперсий (RV)")
+    log_transform: bool = Field(False, description="Применять log(RV) как зависимую переменную")
+    train_ratio: float = Field(0.8, ge=0.2, le=0.95, description="Доля выборки до первого прогноза")
+    window: int | None = Field(None, ge=22, description="Скользящее окно оценки в днях (None = расширяющееся)")
+
+
+MAX_PANEL_TICKERS = 1000
+
+
+class HARPanelRequest(FinancialBaseModel):
+    rv: Annotated[np.ndarray, FloatArray(2, min_shape=(50, 1), max_shape=(MAX_DATA_POINTS, MAX_PANEL_TICKERS))] = Field(
+        ..., description="T x N матрица ежедневных RV (столбец — инструмент)"
+    )
+    tickers: list[str] | None = Field(None, max_length=MAX_PANEL_TICKERS, description="Названия инструментов")
+    log_transform: bool = Field(False, description="Применять log(RV) как зависимую переменную")
+    forecast_horizons: list[int] = Field([1, 5, 22], description="Горизонты прогноза в днях")
+    train_ratio: float = Field(0.8, ge=0.5, le=0.95, description="Доля обучающей выборки")
+    window: int | None = Field(None, ge=22, description="Окно рекурсивной переоценки (None = расширяющееся)")
+
+
 class HARResponse(BaseModel):
     result: dict[str, Any]
     timestamp: datetime = Field(default_factory=datetime.now)
@@ -61,11 +83,60 @@ async def fit_har(request: Request, body: HARRequest):
         if h < 1 or h > 252:
             raise HTTPException(status_code=400, detail="Горизонт прогноза должен быть от 1 до 252 дней")
 
-    result = await asyncio.to_thread(lambda: fit_har_model(
+    result = await offload(
+        fit_har_model,
         rv=body.rv,
         bv=body.bv,
         log_transform=body.log_transform,
         forecast_horizons=body.forecast_horizons,
         train_ratio=body.train_ratio,
-    ))
+    )
+    return HARResponse(result=result)
+
+
+@router.post("/recursive", response_model=HARResponse)
+@limiter.limit("10/minute")
+@service_endpoint("Fit Har Recursive")
+async def fit_har_recursive_path(request: Request, body: HARRecursiveRequest):
+    """
+    Out-of-sample путь однодневных прогнозов с ежедневной переоценкой β
+    (расширяющееся или скользящее окно) рекурсивным МНК.
+    """
+    result = await offload(
+        fit_har_recursive,
+        rv=body.rv,
+        log_transform=body.log_transform,
+        train_ratio=body.train_ratio,
+        window=body.window,
+    )
+    return HARResponse(result=result)
+
+
+@router.post("/panel", response_model=HARResponse)
+@limiter.limit("10/minute")
+@service_endpoint("Fit Har Panel")
+async def fit_har_panel_batch(request: Request, body: HARPanelRequest):
+    """
+    HAR-RV для панели инструментов одним вызовом: коэффициенты с HAC SE,
+    IS/OOS метрики (фиксированные и рекурсивно переоцениваемые β) и прогнозы
+    для каждого тикера.
+    """
+    if body.tickers is not None and len(body.tickers) != body.rv.shape[1]:
+        raise HTTPException(status_code=400, detail="Количество тикеров должно совпадать с числом столбцов rv")
+    if len(set(body.tickers or [])) != len(body.tickers or []):
+        raise HTTPException(status_code=400, detail="Тикеры должны быть уникальными")
+
+    for h in body.forecast_horizons:
+        if h < 1 or h > 252:
+            raise HTTPException(status_code=400, detail="Горизонт прогноза должен быть от 1 до 252 дней")
+
+    result = await offload(
+        fit_har_panel,
+        rv=body.rv,
+        tickers=body.tickers,
+        log_transform=body.log_transform,
+        forecast_horizons=body.forecast_horizons,
+        train_ratio=body.train_ratio,
+        window=body.window,
+    )
     return HARResponse(result=result)
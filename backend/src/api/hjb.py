@@ -10,6 +10,7 @@ from pydantic import BaseModel, Field
 
 from src.middleware.rate_limit import limiter
 from src.services.hjb_service import optimize_hjb
+from src.utils.array_response import array_response
 from src.utils.error_handler import service_endpoint
 from src.utils.financial_validation import (
     MAX_CAPITAL,
@@ -78,7 +79,9 @@ async def optimize_hjb_portfolio(request: Request, body: HJBRequest):
         gamma=body.gamma, asset_names=body.asset_names, monte_carlo_params=mc_params
     ))
 
-    return HJBResponse(portfolio_stats=result['portfolio_stats'], monte_carlo=result.get('monte_carlo'))
+    return array_response(
+        request, HJBResponse(portfolio_stats=result['portfolio_stats'], monte_carlo=result.get('monte_carlo'))
+    )
 
 
 @router.get("/health")
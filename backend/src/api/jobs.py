@@ -0,0 +1,255 @@
+"""
+API endpoints for background jobs (long computations past HTTP/proxy timeouts).
+
+    POST   /api/jobs/{kind}            → 202 {job_id, status_url, result_url}
+    GET    /api/jobs/{job_id}          → status, progress_percent, message
+    GET    /api/jobs/{job_id}/result   → result (JSON / Arrow / MessagePack by Accept)
+    DELETE /api/jobs/{job_id}          → cancel a pending job, forget a finished one
+
+Request bodies are those of the synchronous endpoints; kinds whose model has
+one large array also accept it as a binary body (src.utils.array_payload).
+"""
+from typing import Annotated, Any
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import Field, ValidationError
+
+from src.api.backtest import WalkForwardRequest
+from src.api.garch import DCCRequest
+from src.api.pbo import PBORequest
+from src.api.spectral_regime import SpectralAnalysisRequest
+from src.middleware.auth import require_auth
+from src.middleware.rate_limit import limiter
+from src.middleware.request_tracker import client_ip
+from src.services import job_service
+from src.utils.array_payload import array_body
+from src.utils.array_response import array_response
+from src.utils.compute_pool import cpu_bound
+from src.utils.financial_validation import MAX_ASSETS, MAX_DATA_POINTS, FinancialBaseModel, FloatArray
+from src.utils.jwt_utils import TokenPayload
+from src.utils.progress import ProgressCallback
+
+router = APIRouter()
+
+
+class HMMRegimeSearchRequest(FinancialBaseModel):
+    """Запрос на подбор числа режимов многомерной HMM."""
+    data: Annotated[np.ndarray, FloatArray(2, min_shape=(10, 1), max_shape=(MAX_DATA_POINTS, MAX_ASSETS))] = Field(
+        ..., description="(T, K) массив доходностей"
+    )
+    asset_names: list[str] | None = Field(None, max_length=MAX_ASSETS, description="Названия активов")
+    min_regimes: int = Field(2, ge=2, le=8, description="Минимальное число режимов")
+    max_regimes: int = Field(5, ge=2, le=8, description="Максимальное число режимов")
+    criterion: str = Field('aicc', pattern=r"^(aic|bic|aicc)$", description="Критерий: 'aic', 'bic' или 'aicc'")
+    max_iterations: int = Field(50, ge=10, le=200, description="Максимальное число итераций EM")
+    tol: float = Field(1e-6, ge=1e-10, le=1e-3, description="Tolerance для сходимости")
+    random_state: int = Field(42, description="Random seed")
+
+
+# ── Runners: (body, progress) → result, executed in the compute pool ────────
+
+@cpu_bound
+def _run_hmm_regimes(body: HMMRegimeSearchRequest, progress: ProgressCallback) -> dict[str, Any]:
+    from src.services.multivariate_hmm_service import MultivariateHMMRegimeAnalyzer
+
+    y = body.data
+    if body.max_regimes < body.min_regimes:
+        raise ValueError("max_regimes должно быть не меньше min_regimes")
+    asset_names = body.asset_names or [f"Asset_{i + 1}" for i in range(y.shape[1])]
+    if len(asset_names) != y.shape[1]:
+        raise ValueError(f"asset_names должен содержать {y.shape[1]} элементов, получено {len(asset_names)}")
+
+    model = MultivariateHMMRegimeAnalyzer(n_regimes=body.min_regimes, random_state=body.random_state)
+    n_regimes, criterion_value = model.find_optimal_n_regimes(
+        y=y,
+        asset_names=asset_names,
+        min_regimes=body.min_regimes,
+        max_regimes=body.max_regimes,
+        criterion=body.criterion,
+        max_iterations=body.max_iterations,
+        tol=body.tol,
+        progress=progress,
+    )
+    return {
+        "n_regimes": n_regimes,
+        "criterion": body.criterion,
+        "criterion_value": float(criterion_value),
+        "asset_names": asset_names,
+        "mu": model.mu,
+        "sigma": model.sigma,
+        "transition_matrix": model.transition_matrix,
+        "pi": model.pi,
+        "log_likelihood_history": model.log_likelihood_history,
+    }
+
+
+@cpu_bound
+def _run_spectral_regime(body: SpectralAnalysisRequest, progress: ProgressCallback) -> dict[str, Any]:
+    from src.services.spectral_regime_service import run_spectral_regime_analysis
+
+    if len(body.returns) < 50:
+        raise ValueError("Минимальная длина временного ряда - 50 наблюдений")
+    if not np.all(np.isfinite(body.returns)):
+        raise ValueError("Временной ряд содержит NaN или Inf значения")
+    result = run_spectral_regime_analysis(
+        returns=body.returns,
+        n_poles=body.n_poles,
+        window_size=body.window_size,
+        max_lag=body.max_lag,
+        auto_optimize=body.auto_optimize or (body.n_poles is None or body.window_size is None),
+        criterion=body.criterion,
+        progress=progress,
+    )
+    return {"success": True, **result}
+
+
+@cpu_bound
+def _run_pbo(body: PBORequest, progress: ProgressCallback) -> dict[str, Any]:
+    from src.services.pbo_service import compute_pbo
+
+    return {"result": compute_pbo(
+        strategy_returns=body.strategy_returns,
+        n_splits=body.n_splits,
+        annualize=body.annualize,
+        sr_benchmark=body.sr_benchmark,
+        progress=progress,
+    )}
+
+
+@cpu_bound
+def _run_walk_forward(body: WalkForwardRequest, progress: ProgressCallback) -> dict[str, Any]:
+    from src.services.backtest_service import walk_forward_optimization
+
+    return walk_forward_optimization(
+        historical_prices=body.historical_prices,
+        asset_names=body.asset_names,
+        in_sample_window=body.in_sample_window,
+        out_of_sample_window=body.out_of_sample_window,
+        optimization_method=body.optimization_method,
+        step_size=body.step_size,
+        transaction_cost_bps=body.transaction_cost_bps,
+        risk_free_rate=body.risk_free_rate,
+        initial_capital=body.initial_capital,
+        progress=progress,
+    )
+
+
+@cpu_bound
+def _run_dcc(body: DCCRequest, progress: ProgressCallback) -> dict[str, Any]:
+    from src.services.garch.forecasting import forecast_dcc
+    from src.services.garch.multivariate import dcc_garch
+
+    dcc_result = dcc_garch(
+        body.returns_matrix,
+        univariate_model=body.univariate_model,
+        univariate_params=body.univariate_params,
+        dcc_params=body.dcc_params,
+        dcc_method=body.dcc_method,
+        progress=progress,
+    )
+    return {"dcc": dcc_result, "forecast": forecast_dcc(dcc_result, n_steps=body.n_steps)}
+
+
+job_service.register_job_kind(
+    "hmm-regimes", HMMRegimeSearchRequest, _run_hmm_regimes,
+    "Подбор числа режимов многомерной HMM по AIC/BIC/AICc", array_field="data",
+)
+job_service.register_job_kind(
+    "spectral-regime", SpectralAnalysisRequest, _run_spectral_regime,
+    "Спектральный анализ режимов с подбором n_poles и window_size",
+)
+job_service.register_job_kind(
+    "pbo", PBORequest, _run_pbo, "PBO (CSCV), DSR и MinBTL", array_field="strategy_returns",
+)
+job_service.register_job_kind(
+    "walk-forward", WalkForwardRequest, _run_walk_forward,
+    "Walk-forward оптимизация", array_field="historical_prices",
+)
+job_service.register_job_kind(
+    "dcc", DCCRequest, _run_dcc, "DCC-GARCH и прогноз ковариаций", array_field="returns_matrix",
+)
+
+
+# ── Endpoints ────────────────────────────────────────────────────────────────
+
+def _job_or_404(job_id: str, user: TokenPayload) -> job_service.Job:
+    job = job_service.get_job(job_id, user_id=user.sub)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/kinds")
+async def list_kinds():
+    """Available job kinds with their request schemas."""
+    return [
+        {**kind, "schema": job_service.get_job_kind(kind["kind"]).model.model_json_schema()}
+        for kind in job_service.list_job_kinds()
+    ]
+
+
+@router.post("/{kind}", status_code=202)
+@limiter.limit("10/minute")
+async def submit_job(request: Request, kind: str, user: TokenPayload = Depends(require_auth)):
+    """Validate the body for `kind` and queue the computation."""
+    spec = job_service.get_job_kind(kind)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job kind: {kind}")
+
+    if spec.array_field:
+        body = await array_body(spec.model, spec.array_field)(request)
+    else:
+        try:
+            body = spec.model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                e.errors(include_url=False, include_context=False, include_input=False)
+            ) from e
+
+    try:
+        job = await job_service.submit_job(kind, body, user_id=user.sub, client_ip=client_ip(request))
+    except job_service.JobLimitExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            **job.to_dict(),
+            "status_url": f"/api/jobs/{job.job_id}",
+            "result_url": f"/api/jobs/{job.job_id}/result",
+        },
+        headers={"Location": f"/api/jobs/{job.job_id}"},
+    )
+
+
+@router.get("")
+async def list_jobs(user: TokenPayload = Depends(require_auth)):
+    return [job.to_dict() for job in job_service.list_jobs(user_id=user.sub)]
+
+
+@router.get("/{job_id}")
+@limiter.limit("120/minute")
+async def get_job_status(request: Request, job_id: str, user: TokenPayload = Depends(require_auth)):
+    return _job_or_404(job_id, user).to_dict()
+
+
+@router.get("/{job_id}/result")
+@limiter.limit("30/minute")
+async def get_job_result(request: Request, job_id: str, user: TokenPayload = Depends(require_auth)):
+    job = _job_or_404(job_id, user)
+    if job.status != job_service.SUCCEEDED:
+        detail = job.error if job.status == job_service.FAILED else f"Job is {job.status}"
+        raise HTTPException(status_code=409, detail=detail)
+    return array_response(request, job.result)
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str, user: TokenPayload = Depends(require_auth)):
+    job = _job_or_404(job_id, user)
+    if job_service.cancel_job(job):
+        return job.to_dict()
+    job_service.forget_job(job)
+    return {"job_id": job_id, "deleted": True}
@@ -1,7 +1,6 @@
 """
 API endpoints для Meta-Labeling (Signal Quality Control).
 """
-import asyncio
 from datetime import datetime
 from typing import Any
 
@@ -10,6 +9,7 @@ from pydantic import BaseModel, Field
 
 from src.middleware.rate_limit import limiter
 from src.services.meta_labeling_service import compute_meta_labeling
+from src.utils.compute_pool import offload
 from src.utils.error_handler import service_endpoint
 from src.utils.financial_validation import FinancialBaseModel
 
@@ -62,7 +62,8 @@ async def analyze(request: Request, body: MetaLabelingRequest):
     - Precision-recall curve (threshold sweep)
     - Feature importances мета-модели
     """
-    result = await asyncio.to_thread(lambda: compute_meta_labeling(
+    result = await offload(
+        compute_meta_labeling,
         prices=body.prices,
         pt_multiplier=body.pt_multiplier,
         sl_multiplier=body.sl_multiplier,
@@ -71,6 +72,6 @@ async def analyze(request: Request, body: MetaLabelingRequest):
         train_ratio=body.train_ratio,
         regularization=body.regularization,
         meta_threshold=body.meta_threshold,
-    ))
+    )
     return MetaLabelingResponse(result=result)
     return {"status": "healthy", "service": "meta_labeling"}
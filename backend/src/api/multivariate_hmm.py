@@ -20,6 +20,8 @@ from pydantic import BaseModel, Field
 
 from src.middleware.auth import require_auth
 from src.middleware.rate_limit import limiter
+from src.utils.array_response import array_response
+from src.utils.compute_pool import offload
 from src.utils.error_handler import service_endpoint
 from src.utils.financial_validation import FinancialBaseModel
 from src.utils.jwt_utils import TokenPayload
@@ -144,7 +146,7 @@ async def fit_model(request: Request, body: FitRequest = Body(...), user: TokenP
 
     import yfinance as yf
 
-    from src.services.multivariate_hmm_service import MultivariateHMMRegimeAnalyzer
+    from src.services.multivariate_hmm_service import fit_regime_model
 
     # Если данные не предоставлены, загружаем портфель банка
     if body.data is None:
@@ -239,36 +241,22 @@ async def fit_model(request: Request, body: FitRequest = Body(...), user: TokenP
 
     T, K = y.shape
 
-    # Создаем модель
-    model = MultivariateHMMRegimeAnalyzer(
-        n_regimes=body.n_regimes or 2,  # Временное значение, будет переопределено при auto_optimize
-        random_state=body.random_state
+    # Обучение в пуле процессов; автоматическое определение количества режимов
+    # или использование заданного
+    model, n_regimes_used = await offload(
+        fit_regime_model,
+        y=y,
+        asset_names=asset_names,
+        n_regimes=body.n_regimes or 2,
+        random_state=body.random_state,
+        max_iterations=body.max_iterations,
+        tol=body.tol,
+        auto_optimize=body.auto_optimize and body.n_regimes is None,
+        criterion=body.criterion,
+        min_regimes=2,
+        max_regimes=5,
     )
 
-    # Автоматическое определение количества режимов или использование заданного
-    if body.auto_optimize and body.n_regimes is None:
-        optimal_n_regimes, _best_criterion_value = await asyncio.to_thread(
-            lambda: model.find_optimal_n_regimes(
-                y=y,
-                asset_names=asset_names,
-                min_regimes=2,
-                max_regimes=5,
-                criterion=body.criterion,
-                max_iterations=body.max_iterations,
-                tol=body.tol
-            )
-        )
-        n_regimes_used = optimal_n_regimes
-    else:
-        n_regimes_used = body.n_regimes or 2
-        model.n_regimes = n_regimes_used
-        await asyncio.to_thread(lambda: model.fit(
-            y=y,
-            asset_names=asset_names,
-            max_iterations=body.max_iterations,
-            tol=body.tol
-        ))
-
     # Сохраняем модель (с LRU-eviction, scoped по user)
     model_key = _get_model_key(asset_names, n_regimes_used, user.sub)
     _trained_models[model_key] = model
@@ -288,7 +276,9 @@ async def fit_model(request: Request, body: FitRequest = Body(...), user: TokenP
 
 @router.post("/predict", response_model=PredictResponse)
 @service_endpoint("Predict States")
-async def predict_states(request: PredictRequest = Body(...), user: TokenPayload = Depends(require_auth)):
+async def predict_states(
+    request: Request, body: PredictRequest = Body(...), user: TokenPayload = Depends(require_auth),
+):
     """
     Предсказать наиболее вероятные состояния.
     
@@ -310,18 +300,18 @@ async def predict_states(request: PredictRequest = Body(...), user: TokenPayload
             gamma, _ = model.forward_backward_posterior(
                 (y - model.y_mean) / model.y_std, alpha, beta
             )
-            return s, gamma.tolist()
+            return s, gamma
 
         states, probabilities = await asyncio.to_thread(_predict_with_data)
     else:
         states = await asyncio.to_thread(model.predict_states)
-        probabilities = model.gamma.tolist()
+        probabilities = model.gamma
 
-    return PredictResponse(
-        states=states.tolist(),
-        probabilities=probabilities,
-        time_indices=list(range(len(states)))
-    )
+    return array_response(request, {
+        "states": states,
+        "probabilities": probabilities,
+        "time_indices": np.arange(len(states)),
+    })
 
 @router.get("/statistics", response_model=RegimeStatisticsResponse)
 @service_endpoint("Get Regime Statistics")
@@ -359,7 +349,9 @@ async def get_regime_at_time(
 
 @router.post("/simulate", response_model=SimulateResponse)
 @service_endpoint("Simulate Trajectories")
-async def simulate_trajectories(request: SimulateRequest = Body(...), user: TokenPayload = Depends(require_auth)):
+async def simulate_trajectories(
+    request: Request, body: SimulateRequest = Body(...), user: TokenPayload = Depends(require_auth),
+):
     """
     Симулировать будущие траектории.
 
@@ -372,11 +364,11 @@ async def simulate_trajectories(request: SimulateRequest = Body(...), user: Toke
     model = _get_user_model(user.sub)
     trajectories = await asyncio.to_thread(model.simulate, body.n_steps)
 
-    return SimulateResponse(
-        trajectories=trajectories.tolist(),
-        n_steps=body.n_steps,
-        n_assets=model.n_assets
-    )
+    return array_response(request, {
+        "trajectories": trajectories,
+        "n_steps": body.n_steps,
+        "n_assets": model.n_assets,
+    })
 
 @router.get("/export")
 @service_endpoint("Export To Dataframe")
@@ -425,7 +417,7 @@ async def get_chart_data(user: TokenPayload = Depends(require_auth)):
     model = _get_user_model(user.sub)
 
     # Получаем предсказанные состояния
-    states = model.predict_states()
+    states = await asyncio.to_thread(model.predict_states)
 
     # Восстанавливаем исходные данные (для визуализации цены)
     y_original = model.y_normalized * model.y_std + model.y_mean
@@ -1,23 +1,26 @@
 """
 API endpoints для PBO (Probability of Backtest Overfitting) и DSR.
 """
-import asyncio
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Request
+import numpy as np
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel, Field
 
 from src.middleware.rate_limit import limiter
 from src.services.pbo_service import compute_pbo
+from src.services.result_cache import result_cache
+from src.utils.array_payload import array_body, array_body_openapi
+from src.utils.compute_pool import offload
 from src.utils.error_handler import service_endpoint
-from src.utils.financial_validation import FinancialBaseModel
+from src.utils.financial_validation import FinancialBaseModel, FloatArray
 
 router = APIRouter()
 
 
 class PBORequest(FinancialBaseModel):
-    strategy_returns: list[list[float]] = Field(
+    strategy_returns: Annotated[np.ndarray, FloatArray(2)] = Field(
         ..., description="Матрица доходностей T × N (строки=периоды, столбцы=стратегии)"
     )
     n_splits: int = Field(16, ge=4, le=64, description="Число подмножеств S для CSCV (чётное)")
@@ -41,10 +44,11 @@ class PBOResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
-@router.post("/analyze", response_model=PBOResponse)
+@router.post("/analyze", response_model=PBOResponse, openapi_extra=array_body_openapi(PBORequest, "strategy_returns"))
 @limiter.limit("10/minute")
 @service_endpoint("PBO analysis")
-async def analyze_pbo(request: Request, body: PBORequest):
+@result_cache("pbo.analyze")
+async def analyze_pbo(request: Request, body: PBORequest = Depends(array_body(PBORequest, "strategy_returns"))):
     """
     Полный анализ переобучения бэктеста.
 
@@ -56,12 +60,13 @@ async def analyze_pbo(request: Request, body: PBORequest):
     - Логит-гистограмма OOS ранга
     - Статистика по каждой стратегии (SR, PSR)
     """
-    result = await asyncio.to_thread(lambda: compute_pbo(
+    result = await offload(
+        compute_pbo,
         strategy_returns=body.strategy_returns,
         n_splits=body.n_splits,
         annualize=body.annualize,
         sr_benchmark=body.sr_benchmark,
-    ))
+    )
     return PBOResponse(result=result)
 
 
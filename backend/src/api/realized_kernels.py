@@ -2,16 +2,21 @@
 API endpoints для оценщиков реализованной волатильности.
 """
 import asyncio
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException, Request
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
 from pydantic import BaseModel, Field
 
+from src.middleware.auth import require_auth
 from src.middleware.rate_limit import limiter
-from src.services.realized_kernels_service import compute_realized_kernels
+from src.services.realized_kernels_service import RealizedStream, compute_realized_kernels
+from src.utils.compute_pool import offload
 from src.utils.error_handler import service_endpoint
-from src.utils.financial_validation import FinancialBaseModel
+from src.utils.financial_validation import MAX_DATA_POINTS, FinancialBaseModel, FloatArray
+from src.utils.jwt_utils import TokenPayload
 
 router = APIRouter()
 
@@ -58,13 +63,121 @@ async def estimate_realized_kernels(request: Request, body: RealizedKernelsReque
     if body.kernel not in ("parzen", "tukey-hanning", "bartlett"):
         raise HTTPException(status_code=400, detail="kernel должен быть 'parzen', 'tukey-hanning' или 'bartlett'")
 
-    result = await asyncio.to_thread(lambda: compute_realized_kernels(
+    result = await offload(
+        compute_realized_kernels,
         prices=body.prices,
         kernel=body.kernel,
         bandwidth=body.bandwidth,
         tsrv_scales=body.tsrv_scales,
         annualize=body.annualize,
         periods_per_day=body.periods_per_day,
-    ))
+    )
     return RealizedKernelsResponse(result=result)
     return {"status": "healthy", "service": "realized-kernels"}
+
+
+# ── Потоковый режим: чанки тиков по инструменту ───────────────────────────────
+
+# Состояние потоков в памяти процесса (scoped по user_id, LRU-eviction)
+_MAX_STREAMS = 200
+_streams: OrderedDict[str, RealizedStream] = OrderedDict()
+
+_KERNELS = ("parzen", "tukey-hanning", "bartlett")
+_INSTRUMENT_PATTERN = r"^[A-Za-z0-9._:-]{1,32}$"
+
+
+def _stream_key(user_id: int, instrument: str) -> str:
+    return f"u{user_id}_{instrument.upper()}"
+
+
+def _get_stream(user_id: int, instrument: str) -> RealizedStream:
+    key = _stream_key(user_id, instrument)
+    if key not in _streams:
+        raise HTTPException(status_code=404, detail=f"Поток {instrument} не найден. Сначала отправьте цены")
+    _streams.move_to_end(key)
+    return _streams[key]
+
+
+class StreamChunkRequest(FinancialBaseModel):
+    prices: Annotated[np.ndarray, FloatArray(1, min_shape=(1,), max_shape=(MAX_DATA_POINTS,))] = Field(
+        ..., description="Следующий чанк цен инструмента (хронологический порядок)"
+    )
+    reset: bool = Field(False, description="Начать новый поток (например, новый торговый день)")
+    kernel: str = Field("parzen", description="Ядро для RK: 'parzen', 'tukey-hanning', 'bartlett'")
+    bandwidth: int | None = Field(None, ge=1, description="Bandwidth H для RK (None = n^(3/5))")
+    annualize: bool = Field(True, description="Приводить к годовой волатильности")
+    periods_per_day: int = Field(390, ge=1, le=100_000, description="Наблюдений в торговом дне")
+
+
+@router.post("/stream/{instrument}", response_model=RealizedKernelsResponse)
+@limiter.limit("300/minute")
+@service_endpoint("Stream Realized Kernels")
+async def stream_realized_kernels(
+    request: Request,
+    body: StreamChunkRequest,
+    instrument: str = Path(..., pattern=_INSTRUMENT_PATTERN),
+    user: TokenPayload = Depends(require_auth),
+):
+    """
+    Принимает очередной чанк внутридневных цен и возвращает нарастающие
+    RV, BV, RK и тест на скачки по всем ценам потока.
+
+    Состояние O(max_lag) на инструмент: повторно присылать прошлые цены не нужно.
+    """
+    if body.kernel not in _KERNELS:
+        raise HTTPException(status_code=400, detail="kernel должен быть 'parzen', 'tukey-hanning' или 'bartlett'")
+    if np.any(body.prices <= 0):
+        raise HTTPException(status_code=400, detail="Все цены должны быть положительными")
+
+    key = _stream_key(user.sub, instrument)
+    if body.reset or key not in _streams:
+        _streams[key] = RealizedStream()
+    _streams.move_to_end(key)
+    if len(_streams) > _MAX_STREAMS:
+        _streams.popitem(last=False)
+    stream = _streams[key]
+
+    n_prices = await asyncio.to_thread(stream.update, body.prices)
+    if n_prices < 2:
+        return RealizedKernelsResponse(result={"instrument": instrument, "n_prices": n_prices})
+    result = stream.estimates(
+        kernel=body.kernel,
+        bandwidth=body.bandwidth,
+        annualize=body.annualize,
+        periods_per_day=body.periods_per_day,
+    )
+    return RealizedKernelsResponse(result={"instrument": instrument, "n_prices": n_prices, **result})
+
+
+@router.get("/stream/{instrument}", response_model=RealizedKernelsResponse)
+@limiter.limit("120/minute")
+@service_endpoint("Get Realized Kernels Stream")
+async def get_realized_kernels_stream(
+    request: Request,
+    instrument: str = Path(..., pattern=_INSTRUMENT_PATTERN),
+    kernel: str = Query("parzen", pattern=r"^(parzen|tukey-hanning|bartlett)$"),
+    bandwidth: int | None = Query(None, ge=1),
+    annualize: bool = Query(True),
+    periods_per_day: int = Query(390, ge=1, le=100_000),
+    user: TokenPayload = Depends(require_auth),
+):
+    """Текущие оценки потока без добавления цен (ядро и bandwidth можно менять)."""
+    stream = _get_stream(user.sub, instrument)
+    if stream.n_prices < 2:
+        raise HTTPException(status_code=400, detail="В потоке меньше 2 цен")
+    result = stream.estimates(kernel=kernel, bandwidth=bandwidth, annualize=annualize, periods_per_day=periods_per_day)
+    return RealizedKernelsResponse(result={"instrument": instrument, "n_prices": stream.n_prices, **result})
+
+
+@router.delete("/stream/{instrument}")
+@limiter.limit("60/minute")
+@service_endpoint("Reset Realized Kernels Stream")
+async def reset_realized_kernels_stream(
+    request: Request,
+    instrument: str = Path(..., pattern=_INSTRUMENT_PATTERN),
+    user: TokenPayload = Depends(require_auth),
+):
+    """Удаляет состояние потока инструмента."""
+    _get_stream(user.sub, instrument)
+    del _streams[_stream_key(user.sub, instrument)]
+    return {"instrument": instrument, "deleted": True}
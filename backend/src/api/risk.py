@@ -10,6 +10,7 @@ from fastapi import APIRouter, Request
 from pydantic import Field
 
 from src.middleware.rate_limit import limiter
+from src.services.result_cache import result_cache
 from src.services.risk_service import RiskService
 from src.utils.error_handler import service_endpoint
 from src.utils.financial_validation import (
@@ -65,6 +66,7 @@ class RiskReportRequest(FinancialBaseModel):
         None, max_length=MAX_ASSETS,
         description="Portfolio weights for component VaR",
     )
+    seed: int | None = Field(None, description="Monte Carlo seed (reproducible, cacheable report)")
 
 
 @router.post("/var", response_model=dict[str, Any])
@@ -87,6 +89,7 @@ async def calculate_var(request: Request, body: VaRRequest):
 @router.post("/report", response_model=dict[str, Any])
 @limiter.limit("5/minute")
 @service_endpoint("Risk report")
+@result_cache("risk.report", seed_field="seed")
 async def risk_report(request: Request, body: RiskReportRequest):
     """Generate full risk report with all 3 VaR methods + optional component VaR."""
     return await RiskService.full_risk_report(
@@ -99,4 +102,5 @@ async def risk_report(request: Request, body: RiskReportRequest):
         garch_model=body.garch_model,
         returns_matrix=body.returns_matrix,
         weights=body.weights,
+        seed=body.seed,
     )
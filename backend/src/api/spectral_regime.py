@@ -7,7 +7,6 @@ Endpoints:
 - POST /fetch-data - Загрузка данных актива и расчёт доходностей
 """
 
-import asyncio
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -16,6 +15,8 @@ from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 
 from src.middleware.rate_limit import limiter
+from src.services.result_cache import result_cache
+from src.utils.compute_pool import offload
 from src.utils.error_handler import service_endpoint
 from src.utils.financial_validation import FinancialBaseModel
 
@@ -200,6 +201,7 @@ async def fetch_asset_data(request: AssetDataRequest):
 @router.post("/analyze", response_model=SpectralAnalysisResponse)
 @limiter.limit("10/minute")
 @service_endpoint("Analyze Spectral Regimes")
+@result_cache("spectral_regime.analyze")
 async def analyze_spectral_regimes(request: Request, body: SpectralAnalysisRequest):
     """
     Запустить комплексный анализ скрытых рыночных режимов.
@@ -243,14 +245,15 @@ async def analyze_spectral_regimes(request: Request, body: SpectralAnalysisReque
         )
 
     # Запуск анализа
-    result = await asyncio.to_thread(lambda: run_spectral_regime_analysis(
+    result = await offload(
+        run_spectral_regime_analysis,
         returns=returns,
         n_poles=body.n_poles,
         window_size=body.window_size,
         max_lag=body.max_lag,
         auto_optimize=body.auto_optimize or (body.n_poles is None or body.window_size is None),
         criterion=body.criterion
-    ))
+    )
 
     return SpectralAnalysisResponse(
         success=True,
@@ -8,7 +8,10 @@ from pydantic import Field
 
 from src.middleware.rate_limit import limiter
 from src.services.historical_scenarios import get_all_scenarios
+from src.services.result_cache import result_cache
 from src.services.stress_service import run_stress_test
+from src.utils.array_response import array_response
+from src.utils.compute_pool import offload
 from src.utils.error_handler import service_endpoint
 from src.utils.financial_validation import (
     MAX_ASSETS,
@@ -57,6 +60,7 @@ async def list_historical_scenarios(request: Request):
 @router.post("/test", response_model=dict[str, Any])
 @limiter.limit("10/minute")
 @service_endpoint("Stress test")
+@result_cache("stress.test", seed_field="seed")
 async def run_stress_tests(request: Request, body: StressTestRequest):
     """
     Выполняет стресс-тестирование портфеля для списка сценариев.
@@ -64,7 +68,8 @@ async def run_stress_tests(request: Request, body: StressTestRequest):
     # Конвертируем сценарии в словари
     scenarios_dict = [scenario.dict() for scenario in body.scenarios]
 
-    return run_stress_test(
+    result = await offload(
+        run_stress_test,
         mu=body.mu,
         cov_matrix=body.cov_matrix,
         initial_capital=body.initial_capital,
@@ -75,3 +80,4 @@ async def run_stress_tests(request: Request, body: StressTestRequest):
         n_paths=body.n_paths,
         seed=body.seed
     )
+    return array_response(request, result)
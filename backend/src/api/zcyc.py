@@ -95,7 +95,7 @@ async def get_zcyc(
     Returns:
         Данные кривой бескупонных доходностей
     """
-    from src.services.zcyc_service import fetch_zcyc_from_moex
+    from src.services.zcyc_service import fetch_zcyc_from_moex_async
 
     # Валидация даты
     if date:
@@ -107,7 +107,7 @@ async def get_zcyc(
                 detail="Неверный формат даты. Используйте YYYY-MM-DD"
             ) from None
 
-    result = await asyncio.to_thread(fetch_zcyc_from_moex, date=date)
+    result = await fetch_zcyc_from_moex_async(date=date)
 
     if result['status'] == 'error':
         raise HTTPException(
@@ -141,10 +141,10 @@ async def interpolate_zcyc_rate(
     Returns:
         Интерполированная доходность
     """
-    from src.services.zcyc_service import fetch_zcyc_from_moex, interpolate_zcyc_rate
+    from src.services.zcyc_service import fetch_zcyc_from_moex_async, interpolate_zcyc_rate
 
     # Получаем кривую
-    zcyc_result = await asyncio.to_thread(fetch_zcyc_from_moex, date=date)
+    zcyc_result = await fetch_zcyc_from_moex_async(date=date)
 
     if zcyc_result['status'] == 'error':
         raise HTTPException(
@@ -196,9 +196,9 @@ async def get_available_dates(request: Request):
     Returns:
         Список дат в формате YYYY-MM-DD
     """
-    from src.services.zcyc_service import get_available_zcyc_dates
+    from src.services.zcyc_service import get_available_zcyc_dates_async
 
-    dates = await asyncio.to_thread(get_available_zcyc_dates)
+    dates = await get_available_zcyc_dates_async()
     return {
         "success": True,
         "dates": dates,
@@ -218,9 +218,9 @@ async def get_maxdates_endpoint(
     Returns:
         DataFrame с колонками: tradedate, maxdate, months
     """
-    from src.services.zcyc_service import get_maxdates
+    from src.services.zcyc_service import get_maxdates_async
 
-    df = await asyncio.to_thread(get_maxdates, engine=engine)
+    df = await get_maxdates_async(engine=engine)
     return {
         "success": True,
         "data": df.to_dict(orient="records"),
@@ -241,7 +241,7 @@ async def get_yearyields_endpoint(
     Returns:
         DataFrame с колонками: tradedate, tradetime, period, value
     """
-    from src.services.zcyc_service import get_yearyields
+    from src.services.zcyc_service import get_yearyields_async
 
     # Валидация даты
     if date:
@@ -253,7 +253,7 @@ async def get_yearyields_endpoint(
                 detail="Неверный формат даты. Используйте YYYY-MM-DD"
             ) from None
 
-    df = await asyncio.to_thread(get_yearyields, date=date, engine=engine)
+    df = await get_yearyields_async(date=date, engine=engine)
     return {
         "success": True,
         "data": df.to_dict(orient="records"),
@@ -275,9 +275,9 @@ async def get_yearyields_dates_endpoint(
     Returns:
         DataFrame с колонками: from, till
     """
-    from src.services.zcyc_service import get_yearyields_dates
+    from src.services.zcyc_service import get_yearyields_dates_async
 
-    df = await asyncio.to_thread(get_yearyields_dates, date=date, engine=engine)
+    df = await get_yearyields_dates_async(date=date, engine=engine)
     return {
         "success": True,
         "data": df.to_dict(orient="records"),
@@ -297,9 +297,9 @@ async def get_latest_curve_endpoint(
     Returns:
         DataFrame с кривой доходностей для последней доступной даты
     """
-    from src.services.zcyc_service import get_latest_curve
+    from src.services.zcyc_service import get_latest_curve_async
 
-    df = await asyncio.to_thread(get_latest_curve, engine=engine)
+    df = await get_latest_curve_async(engine=engine)
     return {
         "success": True,
         "data": df.to_dict(orient="records"),
@@ -46,6 +46,7 @@ from src.api import (
     gemini,
     har,
     hjb,
+    jobs,
     macro_data,
     market_data,
     market_feeds,
@@ -100,8 +101,13 @@ async def lifespan(app: FastAPI):
     await load_banned_ips()
     # Cleanup expired/revoked refresh tokens
     await _cleanup_expired_tokens()
+    from src.utils.loop_monitor import start_loop_monitor, stop_loop_monitor
+    start_loop_monitor(app)
     yield
+    await stop_loop_monitor()
     await close_session()
+    from src.utils.compute_pool import shutdown_compute_pool
+    shutdown_compute_pool()
 
 
 async def _migrate_user_profile_columns() -> None:
@@ -260,28 +266,21 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization", "X-API-Key", "X-Username"],
 )
 
-# Security headers middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains"
-    response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
-    response.headers["Content-Security-Policy"] = "default-src 'none'; frame-ancestors 'none'"
-    return response
-
-# Request tracking middleware (after CORS so preflight is not tracked)
+# Security headers (added to every response by RequestTrackerMiddleware)
+SECURITY_HEADERS = {
+    "X-Frame-Options": "DENY",
+    "X-Content-Type-Options": "nosniff",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Strict-Transport-Security": "max-age=63072000; includeSubDomains",
+    "Permissions-Policy": "camera=(), microphone=(), geolocation=()",
+    "Content-Security-Policy": "default-src 'none'; frame-ancestors 'none'",
+}
+
+# Single pure-ASGI layer in front of CORS: IP-ban check (banned IPs get 403
+# before anything else runs), request tracking and security headers
 from src.middleware.request_tracker import RequestTrackerMiddleware
 
-app.add_middleware(RequestTrackerMiddleware)
-
-# IP ban middleware (added after RequestTracker — middleware executes in reverse order,
-# so IpBan runs before RequestTracker, blocking banned IPs early)
-from src.middleware.ip_ban import IpBanMiddleware
-
-app.add_middleware(IpBanMiddleware)
+app.add_middleware(RequestTrackerMiddleware, response_headers=SECURITY_HEADERS)
 
 # Подключаем все роутеры (с обязательной аутентификацией)
 _auth = [Depends(require_api_key)]
@@ -338,6 +337,7 @@ app.include_router(alpaca.router, prefix="/api/alpaca", tags=["Alpaca"], depende
 app.include_router(massive.router, prefix="/api/massive", tags=["Massive"], dependencies=_auth)
 app.include_router(repo.router, prefix="/api/repo", tags=["REPO"], dependencies=_auth)
 app.include_router(risk.router, prefix="/api/risk", tags=["Risk Engine"], dependencies=_auth)
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"], dependencies=_auth)
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"], dependencies=[Depends(require_api_key), Depends(require_admin)])
 
 
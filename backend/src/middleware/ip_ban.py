@@ -1,45 +1,17 @@
 """
-IP Ban middleware: blocks requests from banned IP addresses.
-Maintains an in-memory cache, loaded from DB at startup.
+IP bans: in-memory cache of banned IP addresses, loaded from DB at startup.
+Requests from banned IPs are rejected by RequestTrackerMiddleware.
 """
 import logging
-from typing import Any
-
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse
 
 logger = logging.getLogger(__name__)
 
 _banned_ips: set[str] = set()
 
 
-def _client_ip(request: Request) -> str:
-    """Extract client IP from the rightmost (trusted) X-Forwarded-For entry.
-
-    Render sits behind a single proxy that appends the real client IP.
-    Taking the *rightmost* entry is safer: a client can prepend arbitrary
-    values to X-Forwarded-For, but only the trusted proxy appends the last one.
-    """
-    forwarded = request.headers.get("x-forwarded-for")
-    if forwarded:
-        parts = [p.strip() for p in forwarded.split(",")]
-        # Rightmost entry = set by the nearest trusted proxy (Render)
-        return parts[-1]
-    if request.client:
-        return request.client.host
-    return "unknown"
-
-
-class IpBanMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Any):
-        ip = _client_ip(request)
-        if ip in _banned_ips:
-            return JSONResponse(
-                status_code=403,
-                content={"detail": "Access denied"},
-            )
-        return await call_next(request)
+def is_banned(ip: str) -> bool:
+    """Checked for every request by RequestTrackerMiddleware."""
+    return ip in _banned_ips
 
 
 async def load_banned_ips() -> None:
@@ -16,7 +16,7 @@ from starlette.requests import Request
 def _trusted_client_ip(request: Request) -> str:
     """Extract client IP from the rightmost X-Forwarded-For entry.
 
-    Consistent with ip_ban.py's _client_ip — the rightmost entry is the one
+    Consistent with request_tracker.py's client_ip — the rightmost entry is the one
     appended by the nearest trusted proxy (Render). A client can prepend
     arbitrary values, but cannot control the rightmost entry.
     """
@@ -0,0 +1,257 @@
+"""
+Per-route request metrics with fixed-memory latency histograms.
+
+RequestTrackerMiddleware resolves each request to its route template
+("/api/jobs/{job_id}", not the raw path) and records here the duration,
+request/response body sizes, status and in-flight count. Every route keeps
+log-bucketed histograms (HDR-style: BUCKETS_PER_OCTAVE buckets per doubling,
+so quantiles are within ~9% of the true value) whose memory does not grow
+with traffic, unlike the bounded deque of recent requests.
+
+Paths that match no route are counted under "unmatched" and non-standard
+HTTP methods under "OTHER", so scans of random URLs or verbs do not create
+new series.
+
+route_metrics() feeds the admin API; prometheus_text() renders the same data
+in the Prometheus text exposition format (histograms with power-of-two
+buckets, counters and in-flight gauges).
+"""
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from starlette.routing import Match
+
+BUCKETS_PER_OCTAVE = 8
+UNMATCHED_ROUTE = "unmatched"
+OTHER_METHOD = "OTHER"
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+MAX_TEMPLATE_CACHE = 4096
+
+
+class LogHistogram:
+    """Histogram with logarithmic buckets between min_value and max_value.
+
+    Bucket i holds values in (min·2^((i-1)/k), min·2^(i/k)], bucket 0 values
+    up to min_value and the last one everything above max_value.
+    """
+
+    __slots__ = ("count", "counts", "max_seen", "min_value", "per_octave", "total")
+
+    def __init__(self, min_value: float, max_value: float, per_octave: int = BUCKETS_PER_OCTAVE):
+        self.min_value = min_value
+        self.per_octave = per_octave
+        n_buckets = math.ceil(math.log2(max_value / min_value) * per_octave) + 2
+        self.counts = [0] * n_buckets
+        self.count = 0
+        self.total = 0.0
+        self.max_seen = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        i = math.ceil(math.log2(value / self.min_value) * self.per_octave)
+        return min(i, len(self.counts) - 1)
+
+    def upper_bound(self, index: int) -> float:
+        if index >= len(self.counts) - 1:
+            return math.inf
+        return self.min_value * 2.0 ** (index / self.per_octave)
+
+    def record(self, value: float) -> None:
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max_seen:
+            self.max_seen = value
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (capped by the maximum)."""
+        if self.count == 0:
+            return None
+        rank = max(math.ceil(q * self.count), 1)
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.upper_bound(i), self.max_seen)
+        return self.max_seen
+
+    def cumulative_buckets(self, octave_step: int = 1) -> Iterable[tuple[float, int]]:
+        """(le, cumulative count) at every octave_step-th power-of-two boundary, then +Inf."""
+        step = self.per_octave * octave_step
+        seen = 0
+        for i, c in enumerate(self.counts[:-1]):
+            seen += c
+            if i % step == 0:
+                yield self.upper_bound(i), seen
+        yield math.inf, self.count
+
+
+def _duration_histogram() -> LogHistogram:
+    # 0.1 ms … ~2 min
+    return LogHistogram(1e-4, 120.0)
+
+
+def _size_histogram() -> LogHistogram:
+    # 64 B … 1 GiB; 4 buckets per octave is plenty for sizes
+    return LogHistogram(64.0, float(1 << 30), per_octave=4)
+
+
+@dataclass
+class RouteMetrics:
+    method: str
+    route: str
+    duration: LogHistogram = field(default_factory=_duration_histogram)
+    request_bytes: LogHistogram = field(default_factory=_size_histogram)
+    response_bytes: LogHistogram = field(default_factory=_size_histogram)
+    statuses: dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+    in_flight: int = 0
+
+
+_routes: dict[tuple[str, str], RouteMetrics] = {}
+_template_cache: dict[tuple[str, str], str] = {}
+
+
+def route_template(scope: dict[str, Any]) -> str:
+    """Path template of the route that will serve this request."""
+    key = (scope.get("method", ""), scope.get("path", ""))
+    template = _template_cache.get(key)
+    if template is not None:
+        return template
+
+    app = scope.get("app")
+    template = UNMATCHED_ROUTE
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            template = route.path
+            break
+        if match == Match.PARTIAL and template == UNMATCHED_ROUTE:
+            template = route.path  # path matches, method does not (405)
+
+    if len(_template_cache) >= MAX_TEMPLATE_CACHE:
+        _template_cache.clear()
+    _template_cache[key] = template
+    return template
+
+
+def start_request(method: str, route: str) -> RouteMetrics:
+    if method not in KNOWN_METHODS:
+        method = OTHER_METHOD
+    metrics = _routes.get((method, route))
+    if metrics is None:
+        metrics = _routes[(method, route)] = RouteMetrics(method, route)
+    metrics.in_flight += 1
+    return metrics
+
+
+def finish_request(
+    metrics: RouteMetrics,
+    status_code: int,
+    duration_s: float,
+    request_bytes: int | None,
+    response_bytes: int | None,
+) -> None:
+    metrics.in_flight -= 1
+    metrics.duration.record(duration_s)
+    status_class = f"{status_code // 100}xx"
+    metrics.statuses[status_class] = metrics.statuses.get(status_class, 0) + 1
+    if status_code >= 500:
+        metrics.errors += 1
+    if request_bytes is not None:
+        metrics.request_bytes.record(request_bytes)
+    if response_bytes is not None:
+        metrics.response_bytes.record(response_bytes)
+
+
+def _ms(value: float | None) -> float | None:
+    return None if value is None else round(value * 1000, 2)
+
+
+def route_metrics() -> list[dict[str, Any]]:
+    """Per-route counts and latency percentiles, busiest routes first."""
+    rows = []
+    for m in sorted(_routes.values(), key=lambda m: -m.duration.count):
+        d = m.duration
+        rows.append({
+            "method": m.method,
+            "route": m.route,
+            "count": d.count,
+            "errors": m.errors,
+            "in_flight": m.in_flight,
+            "statuses": dict(m.statuses),
+            "latency_ms": {
+                "p50": _ms(d.quantile(0.50)),
+                "p95": _ms(d.quantile(0.95)),
+                "p99": _ms(d.quantile(0.99)),
+                "max": _ms(d.max_seen if d.count else None),
+                "mean": _ms(d.total / d.count if d.count else None),
+            },
+            "request_bytes": {"total": int(m.request_bytes.total), "p95": m.request_bytes.quantile(0.95)},
+            "response_bytes": {"total": int(m.response_bytes.total), "p95": m.response_bytes.quantile(0.95)},
+        })
+    return rows
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _le(value: float) -> str:
+    return "+Inf" if math.isinf(value) else repr(float(value))
+
+
+def _histogram_lines(name: str, labels: str, hist: LogHistogram, octave_step: int) -> list[str]:
+    lines = [
+        f'{name}_bucket{{{labels},le="{_le(le)}"}} {count}'
+        for le, count in hist.cumulative_buckets(octave_step)
+    ]
+    lines.append(f"{name}_sum{{{labels}}} {hist.total!r}")
+    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+    return lines
+
+
+def prometheus_text() -> str:
+    """All route metrics in the Prometheus text exposition format (0.0.4)."""
+    routes = sorted(_routes.values(), key=lambda m: (m.route, m.method))
+    labels = {id(m): f'method="{_label_value(m.method)}",route="{_label_value(m.route)}"' for m in routes}
+    out: list[str] = []
+
+    out += [
+        "# HELP http_requests_total Requests by route and status class.",
+        "# TYPE http_requests_total counter",
+    ]
+    for m in routes:
+        for status, count in sorted(m.statuses.items()):
+            out.append(f'http_requests_total{{{labels[id(m)]},status="{status}"}} {count}')
+
+    out += [
+        "# HELP http_request_errors_total Requests that ended in a 5xx or an exception.",
+        "# TYPE http_request_errors_total counter",
+    ]
+    out += [f"http_request_errors_total{{{labels[id(m)]}}} {m.errors}" for m in routes]
+
+    out += [
+        "# HELP http_requests_in_flight Requests currently being served.",
+        "# TYPE http_requests_in_flight gauge",
+    ]
+    out += [f"http_requests_in_flight{{{labels[id(m)]}}} {m.in_flight}" for m in routes]
+
+    for name, attr, unit_help, step in (
+        ("http_request_duration_seconds", "duration", "Request duration in seconds.", 1),
+        ("http_request_size_bytes", "request_bytes", "Request body size in bytes.", 2),
+        ("http_response_size_bytes", "response_bytes", "Response body size in bytes.", 2),
+    ):
+        out += [f"# HELP {name} {unit_help}", f"# TYPE {name} histogram"]
+        for m in routes:
+            out += _histogram_lines(name, labels[id(m)], getattr(m, attr), step)
+
+    return "\n".join(out) + "\n"
+
+
+def reset_metrics() -> None:
+    _routes.clear()
+    _template_cache.clear()
@@ -3,36 +3,57 @@ ASGI middleware for tracking requests, errors, and active tasks.
 
 Stores recent requests/errors in ring buffers (in-memory).
 Exposes helpers for the admin API to query.
+
+RequestTrackerMiddleware is the only middleware in front of CORS: it also
+does the IP-ban check and adds the security headers, as plain ASGI
+(no BaseHTTPMiddleware tasks and streams per request).
+
+Background jobs (src.services.job_service) register themselves in the same
+active-task table, so the admin API lists and cancels them like requests.
+
+Per-route latency histograms and counters are kept in
+src.middleware.request_metrics.
 """
 import asyncio
+import itertools
+import os
 import time
-import uuid
 from collections import deque
 from dataclasses import dataclass, field
 from typing import Any
 
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.middleware.ip_ban import is_banned
+from src.middleware.request_metrics import finish_request, route_template, start_request
 
 _START_TIME = time.time()
 
 MAX_REQUESTS = 500
 MAX_ERRORS = 200
 
+# Request ids: random per-process prefix + counter (unique within the process)
+_ID_PREFIX = os.urandom(3).hex()
+_request_ids = itertools.count(1)
+
+_FORBIDDEN = JSONResponse(status_code=403, content={"detail": "Access denied"})
+
 
-@dataclass
+@dataclass(slots=True)
 class RequestRecord:
     request_id: str
     method: str
     path: str
+    route: str
     status_code: int
     duration_ms: float
     client_ip: str
     timestamp: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorRecord:
     request_id: str
     method: str
@@ -44,7 +65,7 @@ class ErrorRecord:
     timestamp: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ActiveRequest:
     request_id: str
     method: str
@@ -52,6 +73,8 @@ class ActiveRequest:
     client_ip: str
     started_at: float
     task: asyncio.Task[Any] | None = field(default=None, repr=False)
+    kind: str = "request"
+    progress: float | None = None
 
 
 _recent_requests: deque[RequestRecord] = deque(maxlen=MAX_REQUESTS)
@@ -59,60 +82,109 @@ _recent_errors: deque[ErrorRecord] = deque(maxlen=MAX_ERRORS)
 _active_requests: dict[str, ActiveRequest] = {}
 
 
-def _client_ip(request: Request) -> str:
-    forwarded = request.headers.get("x-forwarded-for")
-    if forwarded:
-        # Rightmost entry = set by the nearest trusted proxy (Render)
-        parts = [p.strip() for p in forwarded.split(",")]
-        return parts[-1]
-    if request.client:
-        return request.client.host
+def _scope_client_ip(scope: Scope) -> str:
+    """Client IP from the rightmost (trusted) X-Forwarded-For entry.
+
+    Render sits behind a single proxy that appends the real client IP; a
+    client can prepend arbitrary values but cannot control the last one.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-for":
+            # Rightmost entry = set by the nearest trusted proxy (Render)
+            return value.decode("latin-1").rsplit(",", 1)[-1].strip()
+    client = scope.get("client")
+    if client:
+        return client[0]
     return "unknown"
 
 
-class RequestTrackerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Any) -> Response:
-        request_id = uuid.uuid4().hex[:12]
-        ip = _client_ip(request)
-        method = request.method
-        path = request.url.path
-
-        active = ActiveRequest(
-            request_id=request_id,
-            method=method,
-            path=path,
-            client_ip=ip,
-            started_at=time.time(),
-            task=asyncio.current_task(),
+def client_ip(request: Request) -> str:
+    """Client IP of a request, honouring the trusted proxy's X-Forwarded-For."""
+    return _scope_client_ip(request.scope)
+
+
+def _new_request_id() -> str:
+    return f"{_ID_PREFIX}{next(_request_ids):06x}"
+
+
+class RequestTrackerMiddleware:
+    """Pure-ASGI front middleware: IP ban check, request tracking, response headers.
+
+    Replaces the BaseHTTPMiddleware stack (IP ban, tracker, security headers),
+    which ran every request through extra tasks and memory streams. Banned
+    IPs get 403 before anything is tracked; `response_headers` are set on
+    every response, replacing any header of the same name set by the route.
+    """
+
+    def __init__(self, app: ASGIApp, response_headers: dict[str, str] | None = None) -> None:
+        self.app = app
+        self.response_headers = [
+            (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in (response_headers or {}).items()
+        ]
+        self._header_names = frozenset(name for name, _ in self.response_headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ip = _scope_client_ip(scope)
+        if is_banned(ip):
+            await _FORBIDDEN(scope, receive, send)
+            return
+
+        request_id = _new_request_id()
+        method = scope["method"]
+        path = scope["path"]
+        route = route_template(scope)
+        started_at = time.time()
+        _active_requests[request_id] = ActiveRequest(
+            request_id, method, path, ip, started_at, asyncio.current_task(),
         )
-        _active_requests[request_id] = active
+        metrics = start_request(method, route)
 
-        start = time.time()
         status_code = 500
+        request_bytes = 0
+        response_bytes = 0
         error_msg = ""
-        tb_short = ""
-
+        extra_headers = self.response_headers
+        extra_names = self._header_names
+
+        async def receive_counted() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_tracked(message: Message) -> None:
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if extra_headers:
+                    message["headers"] = [
+                        *((k, v) for k, v in message.get("headers", ()) if k.lower() not in extra_names),
+                        *extra_headers,
+                    ]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-            return response
+            await self.app(scope, receive_counted, send_tracked)
         except Exception as exc:
             status_code = 500
             error_msg = f"{type(exc).__name__}: {str(exc)[:200]}"
-            tb_short = ""
             raise
         finally:
-            duration_ms = round((time.time() - start) * 1000, 2)
+            duration = time.perf_counter() - start
+            duration_ms = round(duration * 1000, 2)
             _active_requests.pop(request_id, None)
+            finish_request(metrics, status_code, duration, request_bytes, response_bytes)
 
             _recent_requests.appendleft(RequestRecord(
-                request_id=request_id,
-                method=method,
-                path=path,
-                status_code=status_code,
-                duration_ms=duration_ms,
-                client_ip=ip,
-                timestamp=start,
+                request_id, method, path, route, status_code, duration_ms, ip, started_at,
             ))
 
             if status_code >= 400:
@@ -122,9 +194,9 @@ class RequestTrackerMiddleware(BaseHTTPMiddleware):
                     path=path,
                     status_code=status_code,
                     error=error_msg or f"HTTP {status_code}",
-                    traceback_short=tb_short,
+                    traceback_short="",
                     client_ip=ip,
-                    timestamp=start,
+                    timestamp=started_at,
                 ))
 
 
@@ -146,6 +218,7 @@ def get_recent_requests(
             "request_id": r.request_id,
             "method": r.method,
             "path": r.path,
+            "route": r.route,
             "status_code": r.status_code,
             "duration_ms": r.duration_ms,
             "client_ip": r.client_ip,
@@ -181,11 +254,22 @@ def get_active_requests() -> list[dict[str, Any]]:
             "path": a.path,
             "client_ip": a.client_ip,
             "elapsed_ms": round((now - a.started_at) * 1000, 2),
+            "kind": a.kind,
+            "progress": a.progress,
         }
         for a in _active_requests.values()
     ]
 
 
+def register_active(active: ActiveRequest) -> None:
+    """Track a task that does not go through the middleware (background jobs)."""
+    _active_requests[active.request_id] = active
+
+
+def unregister_active(request_id: str) -> None:
+    _active_requests.pop(request_id, None)
+
+
 def cancel_request(request_id: str) -> bool:
     active = _active_requests.get(request_id)
     if not active or not active.task:
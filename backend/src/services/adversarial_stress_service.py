@@ -12,7 +12,8 @@ Distributionally Robust подход к стресс-тестированию:
 import numpy as np
 import scipy.stats
 
-from src.services.hjb_service import simulate_monte_carlo
+from src.services.monte_carlo_engine import simulate_portfolio_paths, summarize_simulation
+from src.utils.compute_pool import cpu_bound
 
 # ── Worst-Case Mean Return ────────────────────────────────────────────────────
 
@@ -176,6 +177,7 @@ def plausibility_score(
 
 # ── Main Entry Point ──────────────────────────────────────────────────────────
 
+@cpu_bound
 def run_adversarial_stress(
     cov_matrix: list[list[float]],
     mu: list[float],
@@ -218,7 +220,7 @@ def run_adversarial_stress(
     mu_shift = mu_star - mu_arr
 
     # ── 2. Base MC simulation ──
-    base_mc = simulate_monte_carlo(
+    base_sim = simulate_portfolio_paths(
         mu=mu_arr,
         cov_matrix=Sigma,
         weights=w,
@@ -226,12 +228,12 @@ def run_adversarial_stress(
         horizon_years=1.0,
         n_paths=n_paths,
         n_steps=252,
-        random_seed=seed,
-        risk_free_rate=risk_free_rate,
+        seed=seed,
     )
+    base_mc = summarize_simulation(base_sim, risk_free_rate=risk_free_rate)
 
     # ── 3. Adversarial MC simulation ──
-    adv_mc = simulate_monte_carlo(
+    adv_sim = simulate_portfolio_paths(
         mu=mu_star,
         cov_matrix=Sigma_star,
         weights=w,
@@ -239,23 +241,12 @@ def run_adversarial_stress(
         horizon_years=1.0,
         n_paths=n_paths,
         n_steps=252,
-        random_seed=seed,
-        risk_free_rate=risk_free_rate,
+        seed=seed,
     )
+    adv_mc = summarize_simulation(adv_sim, risk_free_rate=risk_free_rate)
 
-    # ── 4. EVT on adversarial losses ──
-    adv_finals = np.array([p[-1] for p in adv_mc["paths"]])
-    # Extend with full simulation paths for EVT
-    all_adv_finals = np.zeros(n_paths)
-    all_adv_finals[:len(adv_finals)] = adv_finals
-    # Fill rest from stats if paths are truncated
-    if len(adv_finals) < n_paths:
-        mean_f = adv_mc["stats"]["mean_final"]
-        std_f = adv_mc["stats"]["std_final"]
-        remaining = n_paths - len(adv_finals)
-        rng = np.random.RandomState(seed)
-        all_adv_finals[len(adv_finals):] = rng.normal(mean_f, std_f, remaining)
-
+    # ── 4. EVT on adversarial losses (all simulated paths) ──
+    all_adv_finals = adv_sim.final_capitals
     losses = initial_capital - all_adv_finals
     losses = np.maximum(losses, 0)  # Only positive losses
     evt_result = fit_gpd_tail(losses, threshold_quantile=0.90)
@@ -272,9 +263,9 @@ def run_adversarial_stress(
     adv_sharpe = (adv_port_ret - risk_free_rate) / adv_port_vol if adv_port_vol > 1e-10 else 0.0
 
     # ── 7. Loss distribution histogram ──
-    base_finals = np.array([p[-1] for p in base_mc["paths"]])
-    base_returns_dist = ((base_finals / initial_capital) - 1).tolist()
-    adv_returns_dist = ((all_adv_finals[:len(adv_finals)] / initial_capital) - 1).tolist()
+    n_display = len(base_mc["paths"])
+    base_returns_dist = ((base_sim.final_capitals[:n_display] / initial_capital) - 1).tolist()
+    adv_returns_dist = ((all_adv_finals[:n_display] / initial_capital) - 1).tolist()
 
     return {
         "base_scenario": {
@@ -13,7 +13,7 @@ import logging
 import re
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -33,6 +33,12 @@ def _api_secret() -> str:
     return get_key_sync("ALPACA_API_SECRET")
 
 
+def _bars_ttl(result: dict[str, Any]) -> int:
+    """Intraday bars for a minute, daily and longer for 5 minutes."""
+    timeframe = result["timeframe"]
+    return 60 if "Min" in timeframe or "Hour" in timeframe else 300
+
+
 def _validate_symbol(symbol: str) -> str:
     symbol = symbol.strip().upper()
     if not _TICKER_RE.match(symbol):
@@ -75,6 +81,7 @@ async def _alpaca_paper_get(path: str, params: dict[str, Any] | None = None) ->
         return await resp.json(content_type=None)
 
 
+@cached("alpaca", ttl_seconds=_bars_ttl)
 async def alpaca_bars(
     symbol: str,
     timeframe: str = "1Day",
@@ -93,11 +100,6 @@ async def alpaca_bars(
         limit: Max bars (default 1000, max 10000)
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("alpaca", "bars", symbol, timeframe, start, end, limit)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {
         "timeframe": timeframe,
         "limit": min(limit, 10000),
@@ -137,19 +139,13 @@ async def alpaca_bars(
         "next_page_token": data.get("next_page_token"),
     }
 
-    ttl = 60 if "Min" in timeframe or "Hour" in timeframe else 300
-    cache_set(cache_key, result, ttl_seconds=ttl)
     return result
 
 
+@cached("alpaca", ttl_seconds=5)
 async def alpaca_latest_quote(symbol: str) -> dict[str, Any]:
     """Get latest quote (NBBO) for a US stock."""
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("alpaca", "quote", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _alpaca_data_get(f"/stocks/{symbol}/quotes/latest")
 
     quote = data.get("quote", {})
@@ -162,19 +158,13 @@ async def alpaca_latest_quote(symbol: str) -> dict[str, Any]:
         "timestamp": quote.get("t", ""),
         "provider": "alpaca",
     }
-
-    cache_set(cache_key, result, ttl_seconds=5)
     return result
 
 
+@cached("alpaca", ttl_seconds=5)
 async def alpaca_latest_trade(symbol: str) -> dict[str, Any]:
     """Get latest trade for a US stock."""
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("alpaca", "trade", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _alpaca_data_get(f"/stocks/{symbol}/trades/latest")
 
     trade = data.get("trade", {})
@@ -186,19 +176,13 @@ async def alpaca_latest_trade(symbol: str) -> dict[str, Any]:
         "exchange": trade.get("x", ""),
         "provider": "alpaca",
     }
-
-    cache_set(cache_key, result, ttl_seconds=5)
     return result
 
 
+@cached("alpaca", ttl_seconds=10)
 async def alpaca_snapshot(symbol: str) -> dict[str, Any]:
     """Get full snapshot (quote + trade + bar) for a US stock."""
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("alpaca", "snap", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _alpaca_data_get(f"/stocks/{symbol}/snapshot")
 
     result = {
@@ -210,11 +194,10 @@ async def alpaca_snapshot(symbol: str) -> dict[str, Any]:
         "prev_daily_bar": data.get("prevDailyBar", {}),
         "provider": "alpaca",
     }
-
-    cache_set(cache_key, result, ttl_seconds=10)
     return result
 
 
+@cached("alpaca", ttl_seconds=300)
 async def alpaca_multi_bars(
     symbols: list[str],
     timeframe: str = "1Day",
@@ -228,11 +211,6 @@ async def alpaca_multi_bars(
         raise ValueError("Maximum 50 symbols per multi-bar request")
 
     symbols_str = ",".join(validated)
-    cache_key = make_cache_key("alpaca", "mbars", symbols_str, timeframe, start, end)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {
         "symbols": symbols_str,
         "timeframe": timeframe,
@@ -252,18 +230,12 @@ async def alpaca_multi_bars(
         "provider": "alpaca",
         "next_page_token": data.get("next_page_token"),
     }
-
-    cache_set(cache_key, result, ttl_seconds=300)
     return result
 
 
+@cached("alpaca", ttl_seconds=30)
 async def alpaca_account() -> dict[str, Any]:
     """Get paper trading account info."""
-    cache_key = make_cache_key("alpaca", "account")
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _alpaca_paper_get("/account")
 
     result = {
@@ -278,6 +250,4 @@ async def alpaca_account() -> dict[str, Any]:
         "short_market_value": float(data.get("short_market_value", 0)),
         "provider": "alpaca",
     }
-
-    cache_set(cache_key, result, ttl_seconds=30)
     return result
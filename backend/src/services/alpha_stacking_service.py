@@ -13,17 +13,95 @@ Orthogonal Alpha Stacking (residualization + IC-weighted combination).
 """
 
 import numpy as np
-import scipy.stats
 
 # ── IC / IR утилиты ───────────────────────────────────────────────────────────
 
-def _rank_ic(signal: np.ndarray, fwd_returns: np.ndarray) -> float:
-    """Ранговая корреляция Спирмена (IC) между сигналом и форвардными доходностями."""
-    mask = np.isfinite(signal) & np.isfinite(fwd_returns)
-    if mask.sum() < 5:
-        return 0.0
-    rho, _ = scipy.stats.spearmanr(signal[mask], fwd_returns[mask])
-    return float(rho) if np.isfinite(rho) else 0.0
+MIN_IC_ASSETS = 5  # минимум пар (сигнал, доходность) для IC на дату
+
+
+def _cross_sectional_ranks(x: np.ndarray) -> np.ndarray:
+    """
+    Средние ранги (1..n, как scipy.stats.rankdata) по последней оси для
+    всех срезов сразу. NaN остаются NaN и не участвуют в ранжировании.
+    """
+    order = np.argsort(x, axis=-1, kind="stable")  # NaN в конце
+    xs = np.take_along_axis(x, order, axis=-1)
+    n = x.shape[-1]
+    pos = np.broadcast_to(np.arange(1, n + 1, dtype=float), x.shape)
+
+    # Группы равных значений: начало — где значение сменилось, конец — перед сменой
+    starts = np.ones(x.shape, dtype=bool)
+    starts[..., 1:] = xs[..., 1:] != xs[..., :-1]
+    ends = np.ones(x.shape, dtype=bool)
+    ends[..., :-1] = starts[..., 1:]
+    first = np.maximum.accumulate(np.where(starts, pos, 0.0), axis=-1)
+    last = np.flip(np.minimum.accumulate(np.flip(np.where(ends, pos, n + 1.0), axis=-1), axis=-1), axis=-1)
+
+    ranks = np.empty(x.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2.0, axis=-1)
+    ranks[np.isnan(x)] = np.nan
+    return ranks
+
+
+def _masked_pearson(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Корреляция Пирсона по последней оси, только по парам без NaN; < MIN_IC_ASSETS пар или константа → 0."""
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    n = valid.sum(axis=-1)
+    n_safe = np.maximum(n, 1)
+    dx = np.where(valid, x, 0.0)
+    dy = np.where(valid, y, 0.0)
+    dx = np.where(valid, dx - (dx.sum(axis=-1) / n_safe)[..., None], 0.0)
+    dy = np.where(valid, dy - (dy.sum(axis=-1) / n_safe)[..., None], 0.0)
+    cov = np.einsum("...i,...i->...", dx, dy)
+    denom = np.sqrt(np.einsum("...i,...i->...", dx, dx) * np.einsum("...i,...i->...", dy, dy))
+    ok = (n >= MIN_IC_ASSETS) & (denom > 0)
+    return np.where(ok, np.clip(cov / np.where(ok, denom, 1.0), -1.0, 1.0), 0.0)
+
+
+class RankICEngine:
+    """
+    Ранговый IC панелей сигналов против форвардных доходностей.
+
+    Каждая панель (T × N_assets × N_signals) ранжируется по активам один
+    раз и кэшируется; IC для всех дат, сигналов и любого горизонта — это
+    корреляция Пирсона на рангах, посчитанная массивными операциями.
+    IC(t, h) сопоставляет сигнал в t с доходностью в t + h − 1; меньше
+    MIN_IC_ASSETS пар или константный срез дают 0.
+    Если на дате у сигнала и доходности разные пропуски, эти срезы
+    переранжируются по общей маске, так что результат совпадает со spearmanr.
+    """
+
+    def __init__(self, fwd_returns: np.ndarray):
+        fwd = np.where(np.isfinite(fwd_returns), fwd_returns, np.nan)
+        self._fwd = fwd[:, None, :]                                # T × 1 × N_a
+        self._fwd_ranks = _cross_sectional_ranks(self._fwd)
+        self._panels: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    def add_panel(self, name: str, signals: np.ndarray) -> None:
+        """Ранжирует и кэширует панель T × N_assets × N_signals."""
+        values = np.ascontiguousarray(np.moveaxis(signals, 1, 2), dtype=float)  # T × N_s × N_a
+        values = np.where(np.isfinite(values), values, np.nan)
+        self._panels[name] = (values, _cross_sectional_ranks(values))
+
+    def ic(self, name: str, horizon: int = 1) -> np.ndarray:
+        """IC по датам для всех сигналов панели: (T − h) × N_signals."""
+        values, ranks = self._panels[name]
+        T = values.shape[0]
+        lag = max(horizon - 1, 0)
+        x, y = values[:T - horizon], self._fwd[lag:lag + T - horizon]
+        x_ranks, y_ranks = ranks[:T - horizon], self._fwd_ranks[lag:lag + T - horizon]
+
+        x_nan, y_nan = np.isnan(x), np.isnan(y)
+        mismatch = (x_nan != y_nan).any(axis=-1)  # срезы, где пропуски не совпадают
+        if mismatch.any():
+            y_ranks = np.broadcast_to(y_ranks, x_ranks.shape).copy()
+            x_ranks = x_ranks.copy()
+            joint = ~(x_nan | y_nan)[mismatch]
+            x_ranks[mismatch] = _cross_sectional_ranks(np.where(joint, x[mismatch], np.nan))
+            y_ranks[mismatch] = _cross_sectional_ranks(
+                np.where(joint, np.broadcast_to(y, x.shape)[mismatch], np.nan)
+            )
+        return _masked_pearson(x_ranks, y_ranks)
 
 
 def _ic_series(signals: np.ndarray, fwd_rets: np.ndarray, horizon: int = 1) -> np.ndarray:
@@ -32,13 +110,35 @@ def _ic_series(signals: np.ndarray, fwd_rets: np.ndarray, horizon: int = 1) -> n
     signals: T × N_assets, fwd_rets: T × N_assets (h-period fwd returns)
     Возвращает вектор IC длиной T−h.
     """
-    T = signals.shape[0]
-    ic_t = []
-    for t in range(T - horizon):
-        s_t = signals[t]
-        r_t = fwd_rets[t + horizon - 1] if horizon > 0 else fwd_rets[t]
-        ic_t.append(_rank_ic(s_t, r_t))
-    return np.array(ic_t)
+    engine = RankICEngine(fwd_rets)
+    engine.add_panel("signal", signals[:, :, None])
+    return engine.ic("signal", horizon)[:, 0]
+
+
+def _ic_summary(ic: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Среднее, std и IR по столбцам матрицы IC (даты × сигналы)."""
+    m = np.nanmean(ic, axis=0)
+    s = np.nanstd(ic, axis=0, ddof=1) if len(ic) > 1 else np.ones(ic.shape[1])
+    return m, s, m / (s + 1e-15)
+
+
+def _cross_rank_corr(flat: np.ndarray) -> np.ndarray:
+    """
+    Матрица ранговых корреляций Спирмена между столбцами (наблюдения × сигналы):
+    все столбцы ранжируются разом. Как spearmanr с nan_policy='propagate':
+    столбец с NaN или константный даёт 0 вне диагонали.
+    """
+    ranks = _cross_sectional_ranks(flat.T)
+    has_nan = np.isnan(ranks).any(axis=1)
+    ranks = np.where(has_nan[:, None], 0.0, ranks)
+    centered = ranks - ranks.mean(axis=1, keepdims=True)
+    norms = np.sqrt(np.einsum("ij,ij->i", centered, centered))
+    ok = ~has_nan & (norms > 0)
+    safe = np.where(ok, norms, 1.0)
+    corr = np.clip((centered @ centered.T) / np.outer(safe, safe), -1.0, 1.0)
+    corr[~(ok[:, None] & ok[None, :])] = 0.0
+    np.fill_diagonal(corr, 1.0)
+    return corr
 
 
 # ── Ортогонализация ───────────────────────────────────────────────────────────
@@ -97,6 +197,51 @@ def orthogonalize_signals(signals: np.ndarray, method: str = "sequential") -> np
     return ortho
 
 
+def _orthogonalize_panel(signals: np.ndarray, method: str = "sequential") -> np.ndarray:
+    """
+    orthogonalize_signals для каждого периода панели T × N_assets × N_signals
+    одним батчевым QR разложением X_t = [1, S_t] = Q_t R_t:
+
+      - 'sequential': первый сигнал без изменений, остаток сигнала k ≥ 1
+        на {1, сигналы < k} = Q[:, k+1] · R[k+1, k+1]
+      - 'pairwise': остаток на все остальные = Q (R⁻¹)[k]ᵀ / ‖(R⁻¹)[k]‖²
+        (из X (XᵀX)⁻¹ e_k / (XᵀX)⁻¹_kk)
+
+    Периоды с пропусками, плохо обусловленным X_t или N_assets ≤ N_signals
+    считаются прежним путём через lstsq.
+    """
+    if method not in ("sequential", "pairwise"):
+        raise ValueError(f"Unknown method: {method}")
+    T, N_a, N_s = signals.shape
+    ortho = np.empty(signals.shape)
+    batched = np.isfinite(signals).all(axis=(1, 2)) if N_a > N_s else np.zeros(T, dtype=bool)
+
+    if batched.any():
+        X = np.concatenate((np.ones((int(batched.sum()), N_a, 1)), signals[batched]), axis=2)
+        Q, R = np.linalg.qr(X)
+        diag = np.diagonal(R, axis1=1, axis2=2)
+        well_conditioned = np.abs(diag).min(axis=1) > 1e-8 * np.abs(diag).max(axis=1)
+
+        if method == "sequential":
+            resid = Q[..., 1:] * diag[:, None, 1:]
+            resid[..., 0] = X[..., 1]
+        else:
+            R_inv = np.linalg.inv(np.where(well_conditioned[:, None, None], R, np.eye(N_s + 1)))
+            resid = (Q @ np.swapaxes(R_inv, 1, 2))[..., 1:] / np.sum(R_inv[:, 1:, :] ** 2, axis=2)[:, None, :]
+
+        # Стандартизируем каждый ортогональный сигнал по активам
+        std = np.std(resid, axis=1, ddof=1, keepdims=True)
+        resid = np.where(std > 1e-15, resid / np.where(std > 1e-15, std, 1.0), resid)
+
+        idx = np.flatnonzero(batched)
+        ortho[idx[well_conditioned]] = resid[well_conditioned]
+        batched[idx[~well_conditioned]] = False
+
+    for t in np.flatnonzero(~batched):
+        ortho[t] = orthogonalize_signals(signals[t], method=method)
+    return ortho
+
+
 # ── IC decay ──────────────────────────────────────────────────────────────────
 
 def _compute_ic_decay(
@@ -104,24 +249,22 @@ def _compute_ic_decay(
     panel_fwd: np.ndarray,       # T × N_assets forward returns
     horizons: list[int],
     signal_names: list[str],
+    engine: RankICEngine | None = None,
+    panel: str = "signals",
 ) -> dict:
     """
     IC на горизонтах 1..H.
     panel_signals: T × N_assets × N_signals
     panel_fwd: T × N_assets
+    engine: готовый RankICEngine с уже ранжированной панелью `panel`
     """
-    T, _N_a, N_s = panel_signals.shape
+    if engine is None:
+        engine = RankICEngine(panel_fwd)
+        engine.add_panel(panel, panel_signals)
     decay = {}
     for h in horizons:
-        ic_by_signal = []
-        for k in range(N_s):
-            ic_t = []
-            for t in range(T - h):
-                s = panel_signals[t, :, k]
-                r = panel_fwd[t + h - 1] if h > 0 else panel_fwd[t]
-                ic_t.append(_rank_ic(s, r))
-            ic_by_signal.append(float(np.nanmean(ic_t)))
-        decay[h] = {signal_names[k]: ic_by_signal[k] for k in range(N_s)}
+        ic_mean = np.nanmean(engine.ic(panel, h), axis=0)
+        decay[h] = {name: float(ic_mean[k]) for k, name in enumerate(signal_names)}
     return decay
 
 
@@ -184,68 +327,30 @@ def compute_alpha_stacking(
     if signal_names is None or len(signal_names) != N_s:
         signal_names = [f"Alpha_{k+1}" for k in range(N_s)]
 
+    engine = RankICEngine(F_raw)
+    engine.add_panel("raw", S_raw)
+
     # ── 1. IC оригинальных сигналов (горизонт 1) ──────────────────────────────
-    raw_ic_mean = []
-    raw_ic_std = []
-    raw_ir = []
-    for k in range(N_s):
-        ic_list = []
-        for t in range(T - 1):
-            ic_list.append(_rank_ic(S_raw[t, :, k], F_raw[t]))
-        ic_arr = np.array(ic_list)
-        m = float(np.nanmean(ic_arr))
-        s = float(np.nanstd(ic_arr, ddof=1)) if len(ic_arr) > 1 else 1.0
-        raw_ic_mean.append(m)
-        raw_ic_std.append(s)
-        raw_ir.append(m / (s + 1e-15))
+    raw_ic_mean, raw_ic_std, raw_ir = _ic_summary(engine.ic("raw", 1))
 
     # ── 2. Cross-IC матрица (до ортогонализации) ───────────────────────────────
     # Аggregation: flatten (T × N_a) × N_s
-    flat = S_raw.reshape(T * N_a, N_s)
-    cross_ic_raw = np.zeros((N_s, N_s))
-    for i in range(N_s):
-        for j in range(N_s):
-            if i == j:
-                cross_ic_raw[i, j] = 1.0
-            else:
-                r, _ = scipy.stats.spearmanr(flat[:, i], flat[:, j])
-                cross_ic_raw[i, j] = float(r) if np.isfinite(r) else 0.0
+    cross_ic_raw = _cross_rank_corr(S_raw.reshape(T * N_a, N_s))
 
     # ── 3. Ортогонализация ─────────────────────────────────────────────────────
     # Применяем ортогонализацию отдельно для каждого периода и актива
-    S_ortho = np.zeros_like(S_raw)
-    for t in range(T):
-        S_ortho[t] = orthogonalize_signals(S_raw[t], method=ortho_method)
+    S_ortho = _orthogonalize_panel(S_raw, method=ortho_method)
+    engine.add_panel("ortho", S_ortho)
 
     # ── 4. IC ортогональных сигналов ──────────────────────────────────────────
-    ortho_ic_mean = []
-    ortho_ic_std = []
-    ortho_ir = []
-    for k in range(N_s):
-        ic_list = []
-        for t in range(T - 1):
-            ic_list.append(_rank_ic(S_ortho[t, :, k], F_raw[t]))
-        ic_arr = np.array(ic_list)
-        m = float(np.nanmean(ic_arr))
-        s = float(np.nanstd(ic_arr, ddof=1)) if len(ic_arr) > 1 else 1.0
-        ortho_ic_mean.append(m)
-        ortho_ic_std.append(s)
-        ortho_ir.append(m / (s + 1e-15))
+    ortho_ic = engine.ic("ortho", 1)
+    ortho_ic_mean, ortho_ic_std, ortho_ir = _ic_summary(ortho_ic)
 
     # ── 5. Cross-IC после ортогонализации ─────────────────────────────────────
-    flat_ortho = S_ortho.reshape(T * N_a, N_s)
-    cross_ic_ortho = np.zeros((N_s, N_s))
-    for i in range(N_s):
-        for j in range(N_s):
-            if i == j:
-                cross_ic_ortho[i, j] = 1.0
-            else:
-                r, _ = scipy.stats.spearmanr(flat_ortho[:, i], flat_ortho[:, j])
-                cross_ic_ortho[i, j] = float(r) if np.isfinite(r) else 0.0
+    cross_ic_ortho = _cross_rank_corr(S_ortho.reshape(T * N_a, N_s))
 
     # ── 6. Оптимальные веса (из IR ортогональных сигналов) ───────────────────
-    ir_arr = np.array(ortho_ir)
-    weights = _optimal_weights(ir_arr, shrinkage=shrinkage)
+    weights = _optimal_weights(ortho_ir, shrinkage=shrinkage)
 
     # ── 7. Стэкинговый сигнал ─────────────────────────────────────────────────
     # S_stack[t, a] = sum_k w_k * S_ortho[t, a, k]
@@ -255,42 +360,28 @@ def compute_alpha_stacking(
     std_stack = float(np.std(S_stack, ddof=1))
     if std_stack > 1e-15:
         S_stack = S_stack / std_stack
+    engine.add_panel("stack", S_stack[:, :, None])
 
     # IC стэкингового сигнала
-    stack_ic_list = []
-    for t in range(T - 1):
-        stack_ic_list.append(_rank_ic(S_stack[t], F_raw[t]))
-    stack_ic_arr = np.array(stack_ic_list)
+    stack_ic_arr = engine.ic("stack", 1)[:, 0]
     stack_ic_mean = float(np.nanmean(stack_ic_arr))
     stack_ic_std = float(np.nanstd(stack_ic_arr, ddof=1)) if len(stack_ic_arr) > 1 else 1.0
     stack_ir = stack_ic_mean / (stack_ic_std + 1e-15)
 
     # ── 8. IC decay по горизонтам ─────────────────────────────────────────────
-    ic_decay: dict[str, dict] = {}
     horizons_clipped = [h for h in ic_horizons if h < T]
-    for h in horizons_clipped:
-        decay_row: dict[str, float] = {}
-        for k in range(N_s):
-            ic_h = []
-            for t in range(T - h):
-                ic_h.append(_rank_ic(S_ortho[t, :, k], F_raw[min(t + h - 1, T - 1)]))
-            decay_row[signal_names[k]] = float(np.nanmean(ic_h))
-        # стэк
-        ic_h_stack = []
-        for t in range(T - h):
-            ic_h_stack.append(_rank_ic(S_stack[t], F_raw[min(t + h - 1, T - 1)]))
-        decay_row["Stacked"] = float(np.nanmean(ic_h_stack))
-        ic_decay[str(h)] = decay_row
+    ortho_decay = _compute_ic_decay(S_ortho, F_raw, horizons_clipped, signal_names, engine, "ortho")
+    stack_decay = _compute_ic_decay(S_stack[:, :, None], F_raw, horizons_clipped, ["Stacked"], engine, "stack")
+    ic_decay: dict[str, dict] = {
+        str(h): {**ortho_decay[h], **stack_decay[h]} for h in horizons_clipped
+    }
 
     # ── 9. IC over time (h=1) для графика ─────────────────────────────────────
     ic_time_series = {
-        "stacked": [float(v) for v in stack_ic_arr],
+        "stacked": stack_ic_arr.tolist(),
     }
     for k in range(N_s):
-        ic_k = []
-        for t in range(T - 1):
-            ic_k.append(_rank_ic(S_ortho[t, :, k], F_raw[t]))
-        ic_time_series[signal_names[k]] = [float(v) for v in ic_k]
+        ic_time_series[signal_names[k]] = ortho_ic[:, k].tolist()
 
     # ── 10. Диверсификация: avg abs cross-IC до и после ──────────────────────
     triu = np.triu_indices(N_s, k=1)
@@ -302,12 +393,12 @@ def compute_alpha_stacking(
     for k in range(N_s):
         signal_stats.append({
             "name": signal_names[k],
-            "raw_ic": raw_ic_mean[k],
-            "raw_ic_std": raw_ic_std[k],
-            "raw_ir": raw_ir[k],
-            "ortho_ic": ortho_ic_mean[k],
-            "ortho_ic_std": ortho_ic_std[k],
-            "ortho_ir": ortho_ir[k],
+            "raw_ic": float(raw_ic_mean[k]),
+            "raw_ic_std": float(raw_ic_std[k]),
+            "raw_ir": float(raw_ir[k]),
+            "ortho_ic": float(ortho_ic_mean[k]),
+            "ortho_ic_std": float(ortho_ic_std[k]),
+            "ortho_ir": float(ortho_ir[k]),
             "weight": float(weights[k]),
         })
 
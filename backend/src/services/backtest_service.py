@@ -5,8 +5,13 @@
 Модули:
 - Monte Carlo (run_backtest) — MC симуляция через HJB
 - Historical replay (run_historical_backtest) — реплей на реальных ценах
-- Walk-forward optimization (walk_forward_optimization) — IS/OOS rolling
+- Parameter sweep (run_backtest_sweep) — сетка стратегий/частот/окон/издержек
+- Walk-forward optimization (walk_forward_optimization) — IS/OOS rolling, окна
+  оптимизируются параллельно в общем пуле src.utils.compute_pool
 - Transaction costs (apply_transaction_costs) — turnover-based costs
+
+Кривые капитала и веса возвращаются массивами NumPy (без .tolist()); маршруты
+сериализуют их через src.utils.array_response.
 """
 import warnings
 from datetime import datetime, timedelta
@@ -14,6 +19,9 @@ from datetime import datetime, timedelta
 import numpy as np
 
 from src.services.hjb_service import HJBStrategy, simulate_monte_carlo
+from src.utils import compute_pool
+from src.utils.compute_pool import cpu_bound
+from src.utils.progress import ProgressCallback, report, scaled
 
 warnings.filterwarnings('ignore', category=DeprecationWarning)
 
@@ -28,10 +36,10 @@ _REBALANCE_PERIOD: dict[str, int] = {
 }
 
 
-def _rebalance_indices(n_periods: int, frequency: str) -> list[int]:
-    """Return indices at which rebalancing occurs (0-based)."""
+def _rebalance_indices(n_periods: int, frequency: str) -> np.ndarray:
+    """Return sorted return-row indices at which rebalancing occurs (0-based, t > 0)."""
     step = _REBALANCE_PERIOD.get(frequency, 21)
-    return list(range(0, n_periods, step))
+    return np.arange(step, n_periods, step)
 
 
 # ── Strategy weight computation ──────────────────────────────────────────────
@@ -45,7 +53,8 @@ def _compute_strategy_weights(
     """Compute target weights for a given strategy on a lookback window.
 
     Supported strategies: equal_weight, min_variance, risk_parity, max_sharpe, custom.
-    For optimization-based strategies, delegates to convex_portfolio_service.
+    Optimization-based strategies are solved by convex_portfolio_service.optimize_weights
+    (compiled parametric problem), warm-started from current_weights.
     """
     if strategy_type == "equal_weight" or returns_window.shape[0] < 30:
         return np.ones(n_assets) / n_assets
@@ -54,28 +63,16 @@ def _compute_strategy_weights(
         return current_weights
 
     # Import here to avoid circular imports at module level
-    from src.services.convex_portfolio_service import compute_convex_portfolio
-
-    objectives_map: dict[str, str] = {
-        "min_variance": "min_variance",
-        "risk_parity": "risk_parity",
-        "max_sharpe": "max_sharpe",
-    }
+    from src.services.convex_portfolio_service import PARAMETRIC_OBJECTIVES, optimize_weights
 
-    obj_key = objectives_map.get(strategy_type)
-    if obj_key is None:
+    if strategy_type not in PARAMETRIC_OBJECTIVES:
         return np.ones(n_assets) / n_assets
 
     try:
-        result = compute_convex_portfolio(
-            returns=returns_window.tolist(),
-            objectives=[obj_key],
-            long_only=True,
-        )
-        weights_list = result["results"][obj_key]["weights_list"]
-        return np.array(weights_list, dtype=float)
+        weights = optimize_weights(returns_window, strategy_type, warm_start=current_weights)
     except Exception:
-        return np.ones(n_assets) / n_assets
+        weights = None
+    return weights if weights is not None else np.ones(n_assets) / n_assets
 
 
 # ── Transaction cost engine ──────────────────────────────────────────────────
@@ -98,22 +95,6 @@ def apply_transaction_costs(
     cost_rate = cost_bps / 10_000.0
     adjusted = np.array(portfolio_values, dtype=float)
     total_cost = 0.0
-
-    for i in range(1, len(weights_history)):
-        turnover = float(np.sum(np.abs(weights_history[i] - weights_history[i - 1])))
-        cost = turnover * adjusted[i] * cost_rate
-        adjusted[i] -= cost
-        total_cost += cost
-        # propagate cost reduction to subsequent values
-        if i < len(adjusted) - 1:
-            ratio = adjusted[i] / (portfolio_values[i] if portfolio_values[i] > 0 else 1.0)
-            for j in range(i + 1, len(adjusted)):
-                adjusted[j] *= ratio
-            break  # only adjust once; we recompute each step
-
-    # Re-run properly: iterate through all rebalance points
-    adjusted = np.array(portfolio_values, dtype=float)
-    total_cost = 0.0
     cumulative_factor = 1.0
 
     for i in range(1, len(weights_history)):
@@ -177,8 +158,149 @@ def _compute_extended_metrics(
     }
 
 
+# ── Segment engine ───────────────────────────────────────────────────────────
+#
+# Between two rebalances the portfolio is buy-and-hold, so its value is
+# V_start · (w · G_t) with G_t the cumulative gross asset growth since the
+# segment start. Growth comes from one shared cumulative log-return matrix, so
+# a segment costs one matrix-vector product instead of a Python step per day.
+
+def _cumulative_log_growth(daily_returns: np.ndarray) -> np.ndarray:
+    """(T+1, N) matrix C with C[0] = 0 and C[t+1] - C[s] = log growth over rows s..t."""
+    if np.any(daily_returns <= -1.0):
+        raise ValueError("Asset returns must be above -100%: prices must be positive")
+    cum = np.zeros((daily_returns.shape[0] + 1, daily_returns.shape[1]))
+    np.cumsum(np.log1p(daily_returns), axis=0, out=cum[1:])
+    return cum
+
+
+def _drifted_weights(weights: np.ndarray, cum_log: np.ndarray, start: int, t: int) -> np.ndarray:
+    """Weights after buy-and-hold drift from row `start` through row `t` inclusive."""
+    drifted = weights * np.exp(cum_log[t + 1] - cum_log[start])
+    total = np.sum(drifted)
+    return drifted / total if abs(total) > 1e-10 else weights
+
+
+def _strategy_schedule(
+    daily_returns: np.ndarray,
+    cum_log: np.ndarray,
+    rebal_points: np.ndarray,
+    strategy_type: str,
+    lookback_window: int,
+    initial_weights: np.ndarray,
+    weight_cache: dict | None = None,
+) -> tuple[list[np.ndarray], np.ndarray]:
+    """Target weights per segment and turnover at each rebalance.
+
+    Rebalance at row t happens after the return of row t is applied, on the
+    window of returns strictly before t. Target weights depend only on the
+    returns (and, for 'custom', on the drifted weights), never on costs, so
+    they can be shared across cost levels; `weight_cache` additionally shares
+    them across rebalance frequencies keyed by (strategy, lookback, t).
+    """
+    n_assets = daily_returns.shape[1]
+    segment_weights = [initial_weights]
+    turnovers = np.zeros(len(rebal_points))
+    start = 0
+
+    for k, t in enumerate(rebal_points):
+        drifted = _drifted_weights(segment_weights[-1], cum_log, start, t)
+        key = (strategy_type, lookback_window, int(t))
+        if weight_cache is not None and strategy_type != "custom" and key in weight_cache:
+            new_weights = weight_cache[key]
+        else:
+            window = daily_returns[max(0, t - lookback_window):t]
+            new_weights = _compute_strategy_weights(window, strategy_type, n_assets, drifted)
+            if weight_cache is not None and strategy_type != "custom":
+                weight_cache[key] = new_weights
+
+        turnovers[k] = float(np.sum(np.abs(new_weights - drifted)))
+        segment_weights.append(new_weights)
+        start = t + 1
+
+    return segment_weights, turnovers
+
+
+def _segment_equity(
+    cum_log: np.ndarray,
+    rebal_points: np.ndarray,
+    segment_weights: list[np.ndarray],
+    turnovers: np.ndarray,
+    cost_bps: float,
+    initial_capital: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Equity curve (T+1,) and cost paid at each rebalance, one product per segment."""
+    n_returns = cum_log.shape[0] - 1
+    starts = np.concatenate([[0], rebal_points + 1])
+    ends = np.concatenate([rebal_points, [n_returns - 1]])
+
+    # Growth of each segment relative to its starting value
+    growth = np.empty(n_returns)
+    for s, e, w in zip(starts, ends, segment_weights, strict=True):
+        if e < s:
+            continue
+        # Σ w·G_t; the first day is 1 + w·r_s, which equals w·G_s when Σw = 1
+        weighted = np.exp(cum_log[s + 1:e + 2] - cum_log[s]) @ w
+        first_day = 1.0 + weighted[0] - np.sum(w)
+        growth[s:e + 1] = first_day * weighted / weighted[0]
+
+    # Value carried into each segment: previous end value net of rebalance cost
+    cost_fraction = turnovers * (cost_bps / 10_000.0)
+    end_factors = growth[rebal_points] * (1.0 - cost_fraction)
+    start_values = initial_capital * np.concatenate([[1.0], np.cumprod(end_factors)])
+
+    lengths = ends - starts + 1
+    equity = np.empty(n_returns + 1)
+    equity[0] = initial_capital
+    equity[1:] = np.repeat(start_values, lengths) * growth
+    pre_trade = equity[rebal_points + 1].copy()
+    equity[rebal_points + 1] = pre_trade * (1.0 - cost_fraction)
+
+    return equity, pre_trade * cost_fraction
+
+
+def _sampled_weights_history(
+    cum_log: np.ndarray,
+    rebal_points: np.ndarray,
+    segment_weights: list[np.ndarray],
+    stride: int,
+) -> np.ndarray:
+    """Portfolio weights at every `stride`-th day (row 0 = initial weights)."""
+    n_returns = cum_log.shape[0] - 1
+    starts = np.concatenate([[0], rebal_points + 1])
+    history = []
+    for i in range(0, n_returns + 1, stride):
+        if i == 0:
+            history.append(segment_weights[0])
+            continue
+        t = i - 1
+        seg = int(np.searchsorted(starts, t, side="right") - 1)
+        if seg < len(rebal_points) and rebal_points[seg] == t:
+            history.append(segment_weights[seg + 1])
+        else:
+            history.append(_drifted_weights(segment_weights[seg], cum_log, starts[seg], t))
+    return np.vstack(history)
+
+
+def _initial_weights(initial_weights: list[float] | None, n_assets: int) -> np.ndarray:
+    if initial_weights is not None and len(initial_weights) == n_assets:
+        weights = np.array(initial_weights, dtype=float)
+        return weights / weights.sum()
+    return np.ones(n_assets) / n_assets
+
+
+def _prices_to_returns(historical_prices: list[list[float]]) -> np.ndarray:
+    prices = np.asarray(historical_prices, dtype=float)
+    if prices.ndim != 2:
+        raise ValueError("historical_prices must be a T x N matrix")
+    if prices.shape[0] < 2:
+        raise ValueError("Need at least 2 price observations")
+    return np.diff(prices, axis=0) / prices[:-1]
+
+
 # ── Historical Backtest ──────────────────────────────────────────────────────
 
+@cpu_bound
 def run_historical_backtest(
     historical_prices: list[list[float]],
     asset_names: list[str] | None = None,
@@ -206,76 +328,28 @@ def run_historical_backtest(
     Returns:
         dict with equity_curve, dates, metrics, weights_history, etc.
     """
-    prices = np.asarray(historical_prices, dtype=float)
-    if prices.ndim != 2:
-        raise ValueError("historical_prices must be a T x N matrix")
-
-    t_total, n_assets = prices.shape
-    if t_total < 2:
-        raise ValueError("Need at least 2 price observations")
+    daily_returns = _prices_to_returns(historical_prices)
+    n_returns, n_assets = daily_returns.shape
 
     if asset_names is None or len(asset_names) != n_assets:
         asset_names = [f"Asset_{i + 1}" for i in range(n_assets)]
 
-    # Compute daily returns from prices
-    daily_returns = np.diff(prices, axis=0) / prices[:-1]
-    n_returns = daily_returns.shape[0]
-
-    # Determine rebalance schedule
-    rebal_indices = _rebalance_indices(n_returns, rebalance_frequency)
-
-    # Initialize
-    if initial_weights is not None and len(initial_weights) == n_assets:
-        weights = np.array(initial_weights, dtype=float)
-        weights = weights / weights.sum()
-    else:
-        weights = np.ones(n_assets) / n_assets
-
-    portfolio_value = initial_capital
-    equity_curve = [portfolio_value]
-    weights_history: list[np.ndarray] = [weights.copy()]
-    rebalance_values: list[float] = [portfolio_value]
-    rebalance_weights: list[np.ndarray] = [weights.copy()]
-
-    for t in range(n_returns):
-        # Daily portfolio return (weighted sum of asset returns)
-        daily_ret = float(np.dot(weights, daily_returns[t]))
-        portfolio_value *= (1.0 + daily_ret)
-
-        # Update weights for drift
-        if np.sum(weights) > 1e-10:
-            asset_growth = 1.0 + daily_returns[t]
-            drifted = weights * asset_growth
-            weights = drifted / np.sum(drifted)
-
-        # Rebalance check
-        if t in rebal_indices and t > 0:
-            lookback_start = max(0, t - lookback_window)
-            window = daily_returns[lookback_start:t]
-
-            new_weights = _compute_strategy_weights(
-                window, strategy_type, n_assets, weights
-            )
-
-            # Transaction cost
-            turnover = float(np.sum(np.abs(new_weights - weights)))
-            cost = turnover * portfolio_value * (transaction_cost_bps / 10_000.0)
-            portfolio_value -= cost
-
-            weights = new_weights
-            rebalance_values.append(portfolio_value)
-            rebalance_weights.append(weights.copy())
-
-        equity_curve.append(portfolio_value)
-        weights_history.append(weights.copy())
+    cum_log = _cumulative_log_growth(daily_returns)
+    rebal_points = _rebalance_indices(n_returns, rebalance_frequency)
+    weights = _initial_weights(initial_weights, n_assets)
 
-    equity_arr = np.array(equity_curve)
+    segment_weights, turnovers = _strategy_schedule(
+        daily_returns, cum_log, rebal_points, strategy_type, lookback_window, weights
+    )
+    equity_arr, costs = _segment_equity(
+        cum_log, rebal_points, segment_weights, turnovers, transaction_cost_bps, initial_capital
+    )
 
     # Generate date strings
     start_date = datetime.now() - timedelta(days=n_returns)
     dates = [
         (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        for i in range(len(equity_curve))
+        for i in range(len(equity_arr))
     ]
 
     # Compute base metrics
@@ -292,10 +366,8 @@ def run_historical_backtest(
     metrics["sortino_ratio"] = ext["sortino_ratio"]
     metrics["information_ratio"] = ext["information_ratio"]
 
-    # Transaction cost summary
-    tc_result = apply_transaction_costs(
-        rebalance_weights, np.array(rebalance_values), transaction_cost_bps
-    )
+    # Transaction cost summary: costs actually deducted along the equity curve
+    total_cost = float(np.sum(costs))
 
     # Benchmark: equal weight buy-and-hold
     ew = np.ones(n_assets) / n_assets
@@ -303,22 +375,209 @@ def run_historical_backtest(
     bh_curve = initial_capital * np.cumprod(np.concatenate([[1.0], 1.0 + bh_returns]))
 
     return {
-        "equity_curve": equity_arr.tolist(),
-        "benchmark_curve": bh_curve.tolist(),
+        "equity_curve": equity_arr,
+        "benchmark_curve": bh_curve,
         "dates": dates,
         "metrics": metrics,
-        "weights_history": [w.tolist() for w in weights_history[::max(1, n_returns // 50)]],
+        "weights_history": _sampled_weights_history(
+            cum_log, rebal_points, segment_weights, max(1, n_returns // 50)
+        ),
         "asset_names": asset_names,
-        "n_rebalances": len(rebalance_values) - 1,
-        "total_transaction_cost": tc_result["total_cost"],
-        "transaction_cost_pct": tc_result["cost_pct"],
+        "n_rebalances": len(rebal_points),
+        "total_transaction_cost": total_cost,
+        "transaction_cost_pct": total_cost / initial_capital if initial_capital > 0 else 0.0,
         "strategy_type": strategy_type,
         "rebalance_frequency": rebalance_frequency,
     }
 
 
+# ── Parameter sweep ──────────────────────────────────────────────────────────
+
+def _curve_summary(equity_curves: np.ndarray, initial_capital: float, risk_free_rate: float) -> dict:
+    """Headline metrics for a (K, T+1) stack of equity curves, same definitions as calculate_backtest_metrics."""
+    returns = np.diff(equity_curves, axis=1) / equity_curves[:, :-1]
+    n_years = equity_curves.shape[1] / 252
+    total_return = (equity_curves[:, -1] - initial_capital) / initial_capital
+    cagr = (equity_curves[:, -1] / initial_capital) ** (1 / n_years) - 1
+    volatility = np.std(returns, axis=1) * np.sqrt(252)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(volatility > 1e-10, (cagr - risk_free_rate) / volatility, 0.0)
+    peaks = np.maximum.accumulate(equity_curves, axis=1)
+    max_drawdown = np.min((equity_curves - peaks) / peaks, axis=1)
+    return {
+        "total_return": total_return,
+        "cagr": cagr,
+        "volatility": volatility,
+        "sharpe_ratio": sharpe,
+        "max_drawdown": max_drawdown,
+    }
+
+
+@cpu_bound
+def run_backtest_sweep(
+    historical_prices: list[list[float]],
+    strategies: list[str],
+    rebalance_frequencies: list[str],
+    lookback_windows: list[int],
+    transaction_costs_bps: list[float],
+    initial_weights: list[float] | None = None,
+    risk_free_rate: float = 0.05,
+    initial_capital: float = 1_000_000.0,
+    include_equity_curves: bool = False,
+) -> dict:
+    """Run run_historical_backtest over a grid of parameters on one price matrix.
+
+    Returns and cumulative log-growth are computed once for the whole grid.
+    Target weights are cached per (strategy, lookback, rebalance row) and shared
+    across frequencies; the weight schedule of each (strategy, frequency, lookback)
+    is reused for every cost level, since costs do not affect target weights.
+
+    Args:
+        historical_prices: T x N matrix of daily prices.
+        strategies: strategy types (see run_historical_backtest).
+        rebalance_frequencies: daily / weekly / monthly / quarterly.
+        lookback_windows: rolling window sizes (trading days).
+        transaction_costs_bps: proportional transaction costs in basis points.
+        initial_weights: starting weights (used by 'custom').
+        risk_free_rate: annualized risk-free rate.
+        initial_capital: starting portfolio value.
+        include_equity_curves: attach the full equity curve to each result.
+
+    Returns:
+        dict with one result per combination (grid order) and the benchmark summary.
+    """
+    daily_returns = _prices_to_returns(historical_prices)
+    n_returns, n_assets = daily_returns.shape
+    cum_log = _cumulative_log_growth(daily_returns)
+    weights = _initial_weights(initial_weights, n_assets)
+    weight_cache: dict = {}
+
+    combos: list[dict] = []
+    curves: list[np.ndarray] = []
+    for strategy_type in strategies:
+        for frequency in rebalance_frequencies:
+            rebal_points = _rebalance_indices(n_returns, frequency)
+            for lookback in lookback_windows:
+                segment_weights, turnovers = _strategy_schedule(
+                    daily_returns, cum_log, rebal_points, strategy_type, lookback, weights, weight_cache
+                )
+                for cost_bps in transaction_costs_bps:
+                    equity, costs = _segment_equity(
+                        cum_log, rebal_points, segment_weights, turnovers, cost_bps, initial_capital
+                    )
+                    curves.append(equity)
+                    combos.append({
+                        "strategy_type": strategy_type,
+                        "rebalance_frequency": frequency,
+                        "lookback_window": int(lookback),
+                        "transaction_cost_bps": float(cost_bps),
+                        "n_rebalances": len(rebal_points),
+                        "total_transaction_cost": float(np.sum(costs)),
+                        "avg_turnover": float(np.mean(turnovers)) if len(turnovers) else 0.0,
+                    })
+
+    bh_curve = initial_capital * np.cumprod(
+        np.concatenate([[1.0], 1.0 + daily_returns @ (np.ones(n_assets) / n_assets)])
+    )
+    stacked = np.vstack([*curves, bh_curve])
+    summary = _curve_summary(stacked, initial_capital, risk_free_rate)
+
+    results = []
+    for k, combo in enumerate(combos):
+        ext = _compute_extended_metrics(stacked[k], risk_free_rate)
+        combo["metrics"] = {name: float(values[k]) for name, values in summary.items()}
+        combo["metrics"]["calmar_ratio"] = ext["calmar_ratio"]
+        combo["metrics"]["sortino_ratio"] = ext["sortino_ratio"]
+        if include_equity_curves:
+            combo["equity_curve"] = stacked[k]
+        results.append(combo)
+
+    best = max(range(len(results)), key=lambda k: results[k]["metrics"]["sharpe_ratio"]) if results else None
+
+    return {
+        "results": results,
+        "n_combinations": len(results),
+        "best_by_sharpe": best,
+        "benchmark_metrics": {name: float(values[-1]) for name, values in summary.items()},
+        "n_periods": n_returns,
+        "n_assets": n_assets,
+    }
+
+
 # ── Walk-Forward Optimization ────────────────────────────────────────────────
 
+# Fan IS window optimizations out to the compute pool from this many windows
+WALK_FORWARD_PARALLEL_MIN_WINDOWS = 8
+
+
+def _walk_forward_windows(
+    n_returns: int,
+    in_sample_window: int,
+    out_of_sample_window: int,
+    step_size: int,
+) -> list[tuple[int, int, int, int]]:
+    """(is_start, is_end, oos_start, oos_end) for every walk-forward window."""
+    windows = []
+    window_start = 0
+    while window_start + in_sample_window + out_of_sample_window <= n_returns:
+        is_end = window_start + in_sample_window
+        windows.append((window_start, is_end, is_end, min(is_end + out_of_sample_window, n_returns)))
+        window_start += step_size
+    return windows
+
+
+def _optimize_window_chunk(
+    returns_span: np.ndarray,
+    is_bounds: list[tuple[int, int]],
+    optimization_method: str,
+    progress: ProgressCallback | None = None,
+) -> list[np.ndarray]:
+    """Process-pool worker: optimize consecutive IS windows, each warm-started from the previous one."""
+    n_assets = returns_span.shape[1]
+    weights_out = []
+    prev_weights = None
+    for start, stop in is_bounds:
+        prev_weights = _compute_strategy_weights(
+            returns_span[start:stop], optimization_method, n_assets, prev_weights
+        )
+        weights_out.append(prev_weights)
+        report(progress, len(weights_out) / len(is_bounds), f"IS window {len(weights_out)}/{len(is_bounds)}")
+    return weights_out
+
+
+def _optimize_walk_forward_windows(
+    daily_returns: np.ndarray,
+    windows: list[tuple[int, int, int, int]],
+    optimization_method: str,
+    n_workers: int,
+    progress: ProgressCallback | None = None,
+) -> list[np.ndarray]:
+    """IS-optimal weights per window, in window order.
+
+    Windows are split into contiguous chunks, one per worker, so every worker
+    keeps its compiled problem and warm start across neighbouring windows and
+    only ships the slice of returns its chunk covers. Chunks go through the
+    shared compute pool (at most its worker count, 503 when it is saturated);
+    with a pool, progress advances as whole chunks complete.
+    """
+    is_bounds = [(is_start, is_end) for is_start, is_end, _, _ in windows]
+    n_workers = compute_pool.fan_out_width(min(n_workers, len(windows)))
+    if n_workers <= 1:
+        return _optimize_window_chunk(daily_returns, is_bounds, optimization_method, progress)
+
+    tasks = []
+    for chunk in np.array_split(np.arange(len(is_bounds)), n_workers):
+        offset = is_bounds[chunk[0]][0]
+        span = daily_returns[offset:is_bounds[chunk[-1]][1]]
+        rel_bounds = [(is_bounds[k][0] - offset, is_bounds[k][1] - offset) for k in chunk]
+        tasks.append((span, rel_bounds, optimization_method))
+    chunks = compute_pool.run_tasks(
+        _optimize_window_chunk, tasks,
+        on_done=lambda done, total: report(progress, done / total, f"IS chunk {done}/{total}"),
+    )
+    return [weights for chunk_weights in chunks for weights in chunk_weights]
+
+
 def walk_forward_optimization(
     historical_prices: list[list[float]],
     asset_names: list[str] | None = None,
@@ -329,9 +588,14 @@ def walk_forward_optimization(
     transaction_cost_bps: float = 10.0,
     risk_free_rate: float = 0.05,
     initial_capital: float = 1_000_000.0,
+    n_workers: int | None = None,
+    progress: ProgressCallback | None = None,
 ) -> dict:
     """Rolling walk-forward: optimize on IS window, test on OOS window, step forward.
 
+    IS optimizations are independent, so they fan out to the shared compute
+    pool and the OOS replay (costs, equity) is assembled sequentially in window order.
+
     Args:
         historical_prices: T x N price matrix.
         asset_names: N asset names.
@@ -342,6 +606,11 @@ def walk_forward_optimization(
         transaction_cost_bps: cost in bps.
         risk_free_rate: annualized risk-free rate.
         initial_capital: starting capital.
+        n_workers: compute-pool tasks for IS optimizations, capped by the pool's
+            worker count. None = all pool workers when there are at least
+            WALK_FORWARD_PARALLEL_MIN_WINDOWS windows, otherwise sequential.
+            Sequential when the pool is disabled or inside a pool worker.
+        progress: optional progress(fraction, message) callback (src.utils.progress).
 
     Returns:
         dict with oos_equity_curve, per_window_metrics, aggregated_stats.
@@ -366,27 +635,22 @@ def walk_forward_optimization(
     daily_returns = np.diff(prices, axis=0) / prices[:-1]
     n_returns = daily_returns.shape[0]
 
+    windows = _walk_forward_windows(n_returns, in_sample_window, out_of_sample_window, step_size)
+    if n_workers is None:
+        n_workers = len(windows) if len(windows) >= WALK_FORWARD_PARALLEL_MIN_WINDOWS else 1
+    window_weights = _optimize_walk_forward_windows(
+        daily_returns, windows, optimization_method, n_workers, scaled(progress, 0.0, 0.95)
+    )
+
     per_window_metrics: list[dict] = []
-    oos_returns_all: list[float] = []
     portfolio_value = initial_capital
-    oos_equity = [portfolio_value]
+    oos_segments = [np.array([portfolio_value])]
     prev_weights: np.ndarray | None = None
 
-    window_start = 0
-    while window_start + in_sample_window + out_of_sample_window <= n_returns:
-        is_start = window_start
-        is_end = window_start + in_sample_window
-        oos_start = is_end
-        oos_end = min(is_end + out_of_sample_window, n_returns)
-
+    for (is_start, is_end, oos_start, oos_end), weights in zip(windows, window_weights, strict=True):
         is_returns = daily_returns[is_start:is_end]
         oos_returns = daily_returns[oos_start:oos_end]
 
-        # Optimize on IS
-        weights = _compute_strategy_weights(
-            is_returns, optimization_method, n_assets
-        )
-
         # Transaction cost at start of OOS
         if prev_weights is not None:
             turnover = float(np.sum(np.abs(weights - prev_weights)))
@@ -404,12 +668,11 @@ def walk_forward_optimization(
         oos_vol = float(np.std(oos_port_returns) * np.sqrt(252))
         oos_mean = float(np.mean(oos_port_returns) * 252)
         oos_sharpe = oos_mean / oos_vol if oos_vol > 1e-10 else 0.0
-        oos_total = float(np.prod(1.0 + oos_port_returns) - 1.0)
+        oos_growth = np.cumprod(1.0 + oos_port_returns)
+        oos_total = float(oos_growth[-1] - 1.0)
 
-        for ret in oos_port_returns:
-            portfolio_value *= (1.0 + float(ret))
-            oos_equity.append(portfolio_value)
-            oos_returns_all.append(float(ret))
+        oos_segments.append(portfolio_value * oos_growth)
+        portfolio_value = float(oos_segments[-1][-1])
 
         per_window_metrics.append({
             "window": len(per_window_metrics) + 1,
@@ -424,16 +687,15 @@ def walk_forward_optimization(
             "weights": weights.tolist(),
         })
 
-        prev_weights = weights.copy()
-        window_start += step_size
+        prev_weights = weights
 
-    oos_equity_arr = np.array(oos_equity)
+    oos_equity_arr = np.concatenate(oos_segments)
 
     # Generate dates
-    start_date = datetime.now() - timedelta(days=len(oos_equity))
+    start_date = datetime.now() - timedelta(days=len(oos_equity_arr))
     dates = [
         (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        for i in range(len(oos_equity))
+        for i in range(len(oos_equity_arr))
     ]
 
     # Aggregated stats
@@ -457,9 +719,10 @@ def walk_forward_optimization(
     ext = _compute_extended_metrics(oos_equity_arr, risk_free_rate)
     oos_metrics["calmar_ratio"] = ext["calmar_ratio"]
     oos_metrics["sortino_ratio"] = ext["sortino_ratio"]
+    report(progress, 1.0, "OOS replay")
 
     return {
-        "oos_equity_curve": oos_equity_arr.tolist(),
+        "oos_equity_curve": oos_equity_arr,
         "dates": dates,
         "metrics": oos_metrics,
         "per_window_metrics": per_window_metrics,
@@ -593,7 +856,7 @@ def calculate_backtest_metrics(
         'avg_profit': float(avg_profit),
         'avg_loss': float(avg_loss),
         'hold_time': float(hold_time),
-        'equity_curve': equity_curve.tolist(),
+        'equity_curve': equity_curve,
         'dates': dates
     }
 
@@ -664,6 +927,7 @@ def calculate_average_hold_time(returns: np.ndarray) -> float:
     return np.mean(positive_periods) if len(positive_periods) > 0 else 0.0
 
 
+@cpu_bound
 def run_backtest(
     mu: list[float],
     cov_matrix: list[list[float]],
@@ -721,7 +985,7 @@ def run_backtest(
     )
 
     # Используем медианную траекторию как equity curve
-    equity_curve = np.array(monte_carlo_result['median_path'])
+    equity_curve = monte_carlo_result['median_path']
 
     # Генерируем даты
     start_date = datetime.now() - timedelta(days=int(horizon_years * 365))
@@ -744,10 +1008,10 @@ def run_backtest(
 
     return {
         'metrics': metrics,
-        'equity_curve': equity_curve.tolist(),
-        'benchmark_curve': benchmark_curve.tolist(),
+        'equity_curve': equity_curve,
+        'benchmark_curve': benchmark_curve,
         'dates': dates,
-        'optimal_weights': optimal_weights.tolist(),
+        'optimal_weights': optimal_weights,
         'portfolio_stats': portfolio_stats,
         'monte_carlo_stats': monte_carlo_result.get('stats', {})
     }
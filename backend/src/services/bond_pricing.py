@@ -3,11 +3,11 @@
 Использует данные MOEX ISS API.
 """
 
+import asyncio
 import logging
 from typing import Any
 
 import pandas as pd
-import requests
 
 # Re-export cashflow calculators for backward compatibility
 from .bond_pricing_cashflows import (
@@ -16,7 +16,8 @@ from .bond_pricing_cashflows import (
 )
 
 # Re-export types and constants for backward compatibility
-from .bond_pricing_types import BASE_ISS, DayCountConvention
+from .bond_pricing_types import DayCountConvention
+from .moex_iss_client import REFERENCE_TTL_SECONDS, iss_get, iss_get_paginated, run_sync
 
 logger = logging.getLogger(__name__)
 
@@ -378,20 +379,33 @@ class BondPricer:
     @staticmethod
     def fetch_bond_data(secid: str, from_date: str = "2000-01-01", day_count: int = 365) -> dict:
         """
-        Загружает параметры облигации из MOEX ISS API
+        Загружает параметры облигации из MOEX ISS API (синхронная обёртка для скриптов)
+        """
+        return run_sync(BondPricer.fetch_bond_data_async(secid, from_date=from_date, day_count=day_count))
+
+    @staticmethod
+    async def fetch_bond_data_async(secid: str, from_date: str = "2000-01-01", day_count: int = 365) -> dict:
+        """
+        Загружает параметры облигации из MOEX ISS API.
+
+        Описание и купоны запрашиваются параллельно; страницы купонов
+        (start=) тоже загружаются параллельно.
         """
         try:
-            # 1. Описание облигации
-            desc_url = (
-                f"{BASE_ISS}/securities/{secid}.json"
-                "?iss.meta=off"
-                "&iss.only=description"
-                "&description.columns=name,title,value"
+            # 1. Описание облигации, 2. Купоны
+            data, ctab = await asyncio.gather(
+                iss_get(
+                    f"securities/{secid}.json",
+                    {"iss.only": "description", "description.columns": "name,title,value"},
+                    ttl_seconds=REFERENCE_TTL_SECONDS,
+                ),
+                iss_get_paginated(
+                    f"statistics/engines/stock/markets/bonds/bondization/{secid}.json",
+                    "coupons",
+                    {"from": from_date, "iss.only": "coupons"},
+                    ttl_seconds=REFERENCE_TTL_SECONDS,
+                ),
             )
-
-            r = requests.get(desc_url, timeout=10)
-            r.raise_for_status()
-            data = r.json()
             rows = data["description"]["data"]
             params = {name: value for name, title, value in rows}
 
@@ -411,22 +425,9 @@ class BondPricer:
             issue_date = pd.to_datetime(issue_date_str)
             mat_date = pd.to_datetime(mat_date_str)
 
-            # 2. Купоны и амортизация
-            bond_url = (
-                f"{BASE_ISS}/statistics/engines/stock/markets/bonds/bondization/{secid}.json"
-                f"?from={from_date}"
-                "&iss.only=coupons,amortizations"
-                "&iss.meta=off"
-            )
-
-            rb = requests.get(bond_url, timeout=10)
-            rb.raise_for_status()
-            jb = rb.json()
-
-            if "coupons" not in jb:
+            if not ctab["columns"]:
                 raise RuntimeError("В bondization нет таблицы coupons")
 
-            ctab = jb["coupons"]
             coupons_df = pd.DataFrame(ctab["data"], columns=ctab["columns"])
 
             if coupons_df.empty:
@@ -2,14 +2,23 @@
 Сервис для оценки облигаций (DCF).
 Использует bond_pricing.py для расчетов.
 """
+import asyncio
 import logging
+from datetime import timedelta
 
 import pandas as pd
 
+from .moex_iss_client import history_ttl, iss_get, run_sync
+
 logger = logging.getLogger(__name__)
 
 
 def get_market_yield_from_moex(secid: str, valuation_date: str) -> float | None:
+    """Синхронная обёртка над get_market_yield_from_moex_async (для скриптов)."""
+    return run_sync(get_market_yield_from_moex_async(secid, valuation_date))
+
+
+async def get_market_yield_from_moex_async(secid: str, valuation_date: str) -> float | None:
     """
     Получает рыночную доходность облигации из MOEX ISS API на указанную дату.
     
@@ -21,13 +30,6 @@ def get_market_yield_from_moex(secid: str, valuation_date: str) -> float | None:
         Рыночная доходность в процентах или None, если не найдена
     """
     try:
-        from datetime import timedelta
-
-        import pandas as pd
-        import requests
-
-        BASE_ISS = "https://iss.moex.com/iss"
-
         # Преобразуем дату
         val_date = pd.to_datetime(valuation_date)
 
@@ -35,18 +37,13 @@ def get_market_yield_from_moex(secid: str, valuation_date: str) -> float | None:
         date_from = (val_date - timedelta(days=5)).strftime("%Y-%m-%d")
         date_to = (val_date + timedelta(days=5)).strftime("%Y-%m-%d")
 
-        # Получаем исторические данные по облигации
-        url = (
-            f"{BASE_ISS}/history/engines/stock/markets/bonds/securities/{secid}.json"
-            f"?from={date_from}&till={date_to}"
-            "&iss.meta=off"
-            "&history.columns=TRADEDATE,CLOSE,YIELD"
+        # Получаем исторические данные по облигации (прошедшие дни кэшируются надолго)
+        data = await iss_get(
+            f"history/engines/stock/markets/bonds/securities/{secid}.json",
+            {"from": date_from, "till": date_to, "history.columns": "TRADEDATE,CLOSE,YIELD"},
+            ttl_seconds=history_ttl(date_to),
         )
 
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
         if "history" not in data or not data["history"]["data"]:
             return None
 
@@ -139,13 +136,49 @@ except ImportError:
     DayCountConvention = None
 
 
-def calculate_bond_valuation(
+def _fetch_day_count(day_count: int | None) -> int:
+    # Для fetch_bond_data используем day_count для определения частоты выплат (обратная совместимость)
+    return 365 if day_count is None else day_count
+
+
+async def calculate_bond_valuation_async(
     secid: str,
     valuation_date: str,
     discount_yield1: float,
     discount_yield2: float,
     day_count: int | None = None,
     day_count_convention: str | None = None
+) -> dict:
+    """
+    Асинхронная оценка облигации: данные MOEX загружаются без блокировки
+    event loop (параллельные запросы), расчет выполняется в пуле потоков.
+    """
+    if BondPricer is None:
+        raise ValueError("Модуль bond_pricing не найден. Убедитесь, что файл bond_pricing.py находится в папке src/services.")
+
+    bond_data = await BondPricer.fetch_bond_data_async(
+        secid, from_date="2000-01-01", day_count=_fetch_day_count(day_count)
+    )
+    return await asyncio.to_thread(
+        calculate_bond_valuation,
+        secid=secid,
+        valuation_date=valuation_date,
+        discount_yield1=discount_yield1,
+        discount_yield2=discount_yield2,
+        day_count=day_count,
+        day_count_convention=day_count_convention,
+        bond_data=bond_data,
+    )
+
+
+def calculate_bond_valuation(
+    secid: str,
+    valuation_date: str,
+    discount_yield1: float,
+    discount_yield2: float,
+    day_count: int | None = None,
+    day_count_convention: str | None = None,
+    bond_data: dict | None = None
 ) -> dict:
     """
     Рассчитывает оценку облигации для двух сценариев доходности.
@@ -157,6 +190,7 @@ def calculate_bond_valuation(
         discount_yield2: Ставка дисконтирования для сценария 2 (доходность индекса) в процентах
         day_count: Базис расчета (365 или 360) - устаревший параметр, используется для обратной совместимости
         day_count_convention: Базис расчета (например, "Actual/365F", "Actual/360", "Actual/Actual (ISDA)")
+        bond_data: Уже загруженные данные BondPricer.fetch_bond_data; если None, загружаются здесь
     
     Returns:
         Результаты оценки для обоих сценариев
@@ -178,15 +212,13 @@ def calculate_bond_valuation(
     else:
         convention = DayCountConvention.ACTUAL_365F  # По умолчанию
 
-    # Для fetch_bond_data используем day_count для определения частоты выплат (обратная совместимость)
-    day_count_for_fetch = 365 if day_count is None else day_count
-
     # Конвертируем дату
     valuation_date_ts = pd.to_datetime(valuation_date)
 
     # Загружаем данные облигации
-    from_date = "2000-01-01"  # Начальная дата для загрузки данных
-    bond_data = BondPricer.fetch_bond_data(secid, from_date=from_date, day_count=day_count_for_fetch)
+    if bond_data is None:
+        from_date = "2000-01-01"  # Начальная дата для загрузки данных
+        bond_data = BondPricer.fetch_bond_data(secid, from_date=from_date, day_count=_fetch_day_count(day_count))
 
     # Определяем период купона в месяцах для ISMA базиса
     coupon_period_months = None
@@ -1,64 +1,345 @@
 """
-Simple in-memory TTL cache for external API responses with size limit.
+In-memory TTL cache for external API responses.
+
+Keys are namespaced by their first segment (make_cache_key("finnhub", ...) →
+namespace "finnhub"). Each namespace is an ordered LRU with its own size
+limit, optional TTL cap and stale-while-revalidate window, so eviction and
+expiry are O(1) per operation. MAX_CACHE_SIZE bounds all namespaces
+together: past it, the largest namespace evicts its least recently used
+entry, so one busy provider cannot grow the process without limit.
+
+Concurrent misses on the same key are coalesced (single-flight): one
+upstream fetch runs and every caller awaits its result. With a stale window,
+an expired entry is served immediately while a single background refresh
+replaces it.
 
 Usage:
-    from src.services.cache_service import cache_get, cache_set, make_cache_key
+    from src.services.cache_service import cached
+
+    @cached("finnhub", ttl_seconds=15)
+    async def finnhub_quote(symbol: str) -> dict: ...
+
+or explicitly:
+    from src.services.cache_service import cache_get_or_fetch, make_cache_key
 
     key = make_cache_key("alpha_vantage", "quote", symbol)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-    result = await fetch_data(...)
-    cache_set(key, result, ttl_seconds=60)
-    return result
+    return await cache_get_or_fetch(key, lambda: fetch_data(...), ttl_seconds=60)
 """
 
+import asyncio
+import functools
+import inspect
+import logging
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 from typing import Any
 
-MAX_CACHE_SIZE = 2000
+logger = logging.getLogger(__name__)
+
+# Entry limit across all namespaces
+MAX_CACHE_SIZE = 10000
+# Default per-namespace entry limit
+NAMESPACE_MAX_SIZE = 2000
+
+DEFAULT_TTL_SECONDS = 300
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    expires_at: float
+    stale_until: float
+
+
+@dataclass
+class _Namespace:
+    max_size: int = NAMESPACE_MAX_SIZE
+    max_ttl_seconds: float | None = None
+    stale_ttl_seconds: float = 0.0
+    entries: OrderedDict[str, _Entry] = field(default_factory=OrderedDict)
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    coalesced: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "max_ttl_seconds": self.max_ttl_seconds,
+            "stale_ttl_seconds": self.stale_ttl_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
 
-_cache: dict[str, tuple[Any, float]] = {}
+_namespaces: dict[str, _Namespace] = {}
+_lock = threading.Lock()
 
+# key -> task fetching it; shared by every caller that misses while it runs
+_inflight: dict[str, asyncio.Task] = {}
 
-def _evict_expired() -> None:
-    """Remove all expired entries."""
+_FRESH, _STALE, _MISS = "fresh", "stale", "miss"
+
+
+def _namespace_of(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def _get_namespace(name: str) -> _Namespace:
+    ns = _namespaces.get(name)
+    if ns is None:
+        ns = _namespaces.setdefault(name, _Namespace())
+    return ns
+
+
+def configure_namespace(
+    namespace: str,
+    max_size: int | None = None,
+    max_ttl_seconds: float | None = None,
+    stale_ttl_seconds: float | None = None,
+) -> None:
+    """Set size limit, TTL cap and stale-while-revalidate window for a namespace."""
+    with _lock:
+        ns = _get_namespace(namespace)
+        if max_size is not None:
+            ns.max_size = max(1, int(max_size))
+            while len(ns.entries) > ns.max_size:
+                ns.entries.popitem(last=False)
+                ns.evictions += 1
+        if max_ttl_seconds is not None:
+            ns.max_ttl_seconds = max_ttl_seconds
+        if stale_ttl_seconds is not None:
+            ns.stale_ttl_seconds = max(0.0, stale_ttl_seconds)
+
+
+def _lookup(key: str, allow_stale: bool = True) -> tuple[str, Any]:
+    """(state, value) for a key, updating LRU order and counters."""
     now = time.time()
-    expired = [k for k, (_, exp) in _cache.items() if now >= exp]
-    for k in expired:
-        del _cache[k]
+    with _lock:
+        ns = _get_namespace(_namespace_of(key))
+        entry = ns.entries.get(key)
+        if entry is None:
+            ns.misses += 1
+            return _MISS, None
+        if now < entry.expires_at:
+            ns.entries.move_to_end(key)
+            ns.hits += 1
+            return _FRESH, entry.value
+        if now < entry.stale_until:
+            if not allow_stale:
+                ns.misses += 1
+                return _MISS, None
+            ns.entries.move_to_end(key)
+            ns.stale_hits += 1
+            return _STALE, entry.value
+        del ns.entries[key]
+        ns.expirations += 1
+        ns.misses += 1
+        return _MISS, None
 
 
 def cache_get(key: str) -> Any | None:
     """Get a value from cache if it exists and hasn't expired."""
-    if key in _cache:
-        value, expires_at = _cache[key]
-        if time.time() < expires_at:
-            return value
-        del _cache[key]
-    return None
+    state, value = _lookup(key, allow_stale=False)
+    return value if state == _FRESH else None
+
+
+def cache_set(
+    key: str,
+    value: Any,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    stale_ttl_seconds: float | None = None,
+) -> None:
+    """Store a value in cache with a TTL in seconds (capped by the namespace limit)."""
+    now = time.time()
+    with _lock:
+        ns = _get_namespace(_namespace_of(key))
+        if ns.max_ttl_seconds is not None:
+            ttl_seconds = min(ttl_seconds, ns.max_ttl_seconds)
+        stale = ns.stale_ttl_seconds if stale_ttl_seconds is None else stale_ttl_seconds
+        expires_at = now + ttl_seconds
+        ns.entries[key] = _Entry(value, expires_at, expires_at + stale)
+        ns.entries.move_to_end(key)
+        while len(ns.entries) > ns.max_size:
+            ns.entries.popitem(last=False)
+            ns.evictions += 1
+        _enforce_total_limit()
 
 
-def cache_set(key: str, value: Any, ttl_seconds: int = 300) -> None:
-    """Store a value in cache with a TTL in seconds."""
-    if len(_cache) >= MAX_CACHE_SIZE:
-        _evict_expired()
-    if len(_cache) >= MAX_CACHE_SIZE:
-        oldest_key = min(_cache, key=lambda k: _cache[k][1])
-        del _cache[oldest_key]
-    _cache[key] = (value, time.time() + ttl_seconds)
+def _enforce_total_limit() -> None:
+    """Under _lock: past MAX_CACHE_SIZE the largest namespace evicts its LRU entries."""
+    total = sum(len(ns.entries) for ns in _namespaces.values())
+    while total > MAX_CACHE_SIZE:
+        largest = max(_namespaces.values(), key=lambda ns: len(ns.entries))
+        largest.entries.popitem(last=False)
+        largest.evictions += 1
+        total -= 1
 
 
-def cache_clear() -> None:
-    """Clear the entire cache."""
-    _cache.clear()
+def cache_clear(namespace: str | None = None) -> None:
+    """Clear the entire cache, or a single namespace."""
+    with _lock:
+        if namespace is None:
+            for ns in _namespaces.values():
+                ns.entries.clear()
+        elif namespace in _namespaces:
+            _namespaces[namespace].entries.clear()
 
 
 def cache_delete(key: str) -> None:
     """Delete a specific key from cache."""
-    _cache.pop(key, None)
+    with _lock:
+        ns = _namespaces.get(_namespace_of(key))
+        if ns is not None:
+            ns.entries.pop(key, None)
+
+
+def cache_stats() -> dict[str, Any]:
+    """Hit/miss/eviction counters per namespace and in total."""
+    with _lock:
+        namespaces = {name: ns.stats() for name, ns in sorted(_namespaces.items())}
+    counters = ("size", "hits", "stale_hits", "misses", "evictions", "expirations",
+                "coalesced", "refreshes", "refresh_errors")
+    total = {c: sum(s[c] for s in namespaces.values()) for c in counters}
+    lookups = total["hits"] + total["stale_hits"] + total["misses"]
+    total["hit_rate"] = (total["hits"] + total["stale_hits"]) / lookups if lookups else 0.0
+    total["max_size"] = MAX_CACHE_SIZE
+    total["inflight"] = len(_inflight)
+    return {"total": total, "namespaces": namespaces}
 
 
 def make_cache_key(*args) -> str:
     """Build a cache key from multiple arguments."""
     return ":".join(str(a) for a in args)
+
+
+# ── Single-flight fetch ──────────────────────────────────────────────────────
+
+TTL = float | Callable[[Any], float]
+
+
+def _resolve_ttl(ttl_seconds: TTL, value: Any) -> float:
+    return ttl_seconds(value) if callable(ttl_seconds) else ttl_seconds
+
+
+def _start_fetch(
+    key: str,
+    fetch: Callable[[], Awaitable[Any]],
+    ttl_seconds: TTL,
+    stale_ttl_seconds: float | None,
+) -> asyncio.Task:
+    """Start (or join) the single upstream fetch for a key."""
+    task = _inflight.get(key)
+    # A task can only be awaited on its own loop (sync facades run a second one)
+    if task is not None and task.get_loop() is asyncio.get_running_loop():
+        return task
+
+    async def run() -> Any:
+        value = await fetch()
+        if value is not None:
+            ttl = _resolve_ttl(ttl_seconds, value)
+            if ttl > 0:
+                cache_set(key, value, ttl, stale_ttl_seconds)
+        return value
+
+    task = asyncio.ensure_future(run())
+    _inflight[key] = task
+    task.add_done_callback(functools.partial(_on_fetch_done, key))
+    return task
+
+
+def _on_fetch_done(key: str, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        _inflight.pop(key, None)
+    if not task.cancelled():
+        task.exception()  # retrieved here; callers still receive it via await
+
+
+def _on_refresh_done(key: str, task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        with _lock:
+            _get_namespace(_namespace_of(key)).refresh_errors += 1
+        logger.warning("Background refresh of %s failed: %s", key, exc)
+
+
+async def cache_get_or_fetch(
+    key: str,
+    fetch: Callable[[], Awaitable[Any]],
+    ttl_seconds: TTL = DEFAULT_TTL_SECONDS,
+    stale_ttl_seconds: float | None = None,
+) -> Any:
+    """
+    Return the cached value for key, fetching it at most once across concurrent callers.
+
+    Args:
+        key: cache key (namespace = first segment).
+        fetch: coroutine factory producing the value; None results are not cached.
+        ttl_seconds: freshness in seconds, or a function of the fetched value
+            (0 leaves that value uncached, e.g. a job that is still pending).
+        stale_ttl_seconds: how long an expired value may still be served while a
+            background refresh runs (default: the namespace setting).
+    """
+    state, value = _lookup(key)
+    if state == _FRESH:
+        return value
+    if state == _STALE:
+        if key not in _inflight:
+            with _lock:
+                _get_namespace(_namespace_of(key)).refreshes += 1
+            task = _start_fetch(key, fetch, ttl_seconds, stale_ttl_seconds)
+            task.add_done_callback(functools.partial(_on_refresh_done, key))
+        return value
+
+    if key in _inflight:
+        with _lock:
+            _get_namespace(_namespace_of(key)).coalesced += 1
+    task = _start_fetch(key, fetch, ttl_seconds, stale_ttl_seconds)
+    # shield: a cancelled caller must not cancel the fetch other callers are awaiting
+    return await asyncio.shield(task)
+
+
+def cached(
+    namespace: str,
+    ttl_seconds: TTL = DEFAULT_TTL_SECONDS,
+    stale_ttl_seconds: float | None = None,
+) -> Callable:
+    """
+    Decorator for async provider functions: single-flight cached calls.
+
+    The key is namespace:function:<bound arguments with defaults applied>, so
+    positional and keyword calls share entries.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = make_cache_key(namespace, func.__name__, *bound.arguments.values())
+            return await cache_get_or_fetch(
+                key, lambda: func(*args, **kwargs), ttl_seconds, stale_ttl_seconds
+            )
+
+        return wrapper
+
+    return decorator
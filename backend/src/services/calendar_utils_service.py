@@ -7,7 +7,7 @@ Public holiday data and work calendar information.
 import defusedxml.ElementTree as ET
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.utils.http_client import get_session
 
 NAGER_BASE = "https://date.nager.at/api/v3"
@@ -16,13 +16,9 @@ XMLCAL_BASE = "https://xmlcalendar.ru/data/ru"
 
 # ─── Nager.Date ───────────────────────────────────────────────────────────────
 
+@cached("nager", ttl_seconds=86400)
 async def nager_public_holidays(country_code: str, year: int) -> list[dict[str, Any]]:
     """Get public holidays for a country and year."""
-    key = make_cache_key("nager", "holidays", country_code, year)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     session = await get_session()
     async with session.get(f"{NAGER_BASE}/PublicHolidays/{year}/{country_code}") as resp:
         resp.raise_for_status()
@@ -40,44 +36,34 @@ async def nager_public_holidays(country_code: str, year: int) -> list[dict[str,
             "types": h.get("types", []),
         })
 
-    cache_set(key, holidays, ttl_seconds=86400)
     return holidays
 
 
+@cached("nager", ttl_seconds=86400)
 async def nager_next_holidays(country_code: str) -> list[dict[str, Any]]:
     """Get upcoming public holidays."""
-    key = make_cache_key("nager", "next", country_code)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     session = await get_session()
     async with session.get(f"{NAGER_BASE}/NextPublicHolidays/{country_code}") as resp:
         resp.raise_for_status()
         data = await resp.json(content_type=None)
 
-    cache_set(key, data, ttl_seconds=86400)
     return data
 
 
+@cached("nager", ttl_seconds=3600)
 async def nager_is_today_holiday(country_code: str) -> dict[str, Any]:
     """Check if today is a public holiday."""
-    key = make_cache_key("nager", "today", country_code)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     session = await get_session()
     async with session.get(f"{NAGER_BASE}/IsTodayPublicHoliday/{country_code}") as resp:
         # 200 = today is a holiday, 204 = not a holiday
         result = {"is_holiday": resp.status == 200, "country_code": country_code}
 
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
 # ─── Russian Calendar (xmlcalendar.ru) ────────────────────────────────────────
 
+@cached("rucal", ttl_seconds=86400)
 async def russian_calendar(year: int) -> dict[str, Any]:
     """Get Russian work/holiday calendar for a given year.
 
@@ -86,11 +72,6 @@ async def russian_calendar(year: int) -> dict[str, Any]:
       t=2: pre-holiday (shortened work day)
       t=3: transferred work day
     """
-    key = make_cache_key("rucal", year)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{XMLCAL_BASE}/{year}/calendar.xml"
     session = await get_session()
     async with session.get(url) as resp:
@@ -130,5 +111,4 @@ async def russian_calendar(year: int) -> dict[str, Any]:
         "total_preholidays": sum(1 for d in days if d["type"] == "preholiday"),
         "provider": "xmlcalendar",
     }
-    cache_set(key, result, ttl_seconds=86400)
     return result
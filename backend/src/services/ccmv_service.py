@@ -2,20 +2,114 @@
 Сервис для CCMV (Cardinality-Constrained Mean-Variance) оптимизации портфеля.
 Основан на методе кластеризации с ограничением кардинальности.
 """
+import hashlib
+import threading
 import warnings
+from collections import OrderedDict
 from math import floor
 
 import cvxpy as cp
 import numpy as np
+from scipy.cluster.hierarchy import linkage
 from scipy.optimize import brentq
+from scipy.spatial.distance import pdist
 
 warnings.filterwarnings('ignore', category=DeprecationWarning)
 
 
+# ── Кэш Ward-linkage ─────────────────────────────────────────────────────────
+#
+# Linkage зависит только от R, поэтому повторные delta_ccmv / alpha_ccmv по
+# тем же доходностям (другие Delta, gamma, bar_w) не пересчитывают кластеризацию.
+
+LINKAGE_CACHE_SIZE = 32
+
+_linkage_cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+_linkage_lock = threading.Lock()
+
+
+def _returns_key(R: np.ndarray) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str((R.shape, R.dtype.str)).encode())
+    digest.update(np.ascontiguousarray(R).tobytes())
+    return digest.digest()
+
+
+def _ward_linkage(R: np.ndarray) -> np.ndarray:
+    """
+    Ward-linkage активов по строкам матрицы расстояний D = 1 − corr(R).
+
+    Расстояние между кластерами — прирост внутрикластерной суммы квадратов
+    d(Ci, Cj) = |Ci||Cj| / (|Ci| + |Cj|) · ||c_i − c_j||², где c — центроид
+    строк D. SciPy обновляет его формулой Lance–Williams (nearest-neighbour
+    chain, O(N²) по памяти и времени поверх сжатой матрицы pdist) и хранит
+    √(2·d), поэтому высоты слияний переводятся обратно в d = h²/2.
+    Результат кэшируется по содержимому R (LRU на LINKAGE_CACHE_SIZE записей).
+    """
+    key = _returns_key(R)
+    with _linkage_lock:
+        Z = _linkage_cache.get(key)
+        if Z is not None:
+            _linkage_cache.move_to_end(key)
+            return Z
+
+    D = 1 - np.corrcoef(R, rowvar=False)
+    if not np.all(np.isfinite(D)):
+        raise ValueError("Корреляционная матрица содержит NaN: у активов должна быть ненулевая дисперсия доходностей")
+    Z = linkage(pdist(D), method='ward')
+    Z[:, 2] = Z[:, 2] ** 2 / 2
+    Z.setflags(write=False)
+
+    with _linkage_lock:
+        _linkage_cache[key] = Z
+        _linkage_cache.move_to_end(key)
+        while len(_linkage_cache) > LINKAGE_CACHE_SIZE:
+            _linkage_cache.popitem(last=False)
+    return Z
+
+
+def _cut_labels(Z: np.ndarray, n: int) -> np.ndarray:
+    """
+    Метки кластеров по порогу наибольшего скачка высот слияний.
+
+    Порог — высота слияния сразу после наибольшего прироста между
+    последовательными слияниями. Слияние применяется, если его высота не
+    выше порога и оба дочерних кластера уже сформированы. Нумерация: сначала
+    не объединённые активы по возрастанию индекса, затем объединённые
+    кластеры в порядке их последнего слияния.
+    """
+    heights = Z[:, 2]
+    threshold = heights[np.argmax(np.diff(heights)) + 1] if len(heights) > 1 else heights[0]
+
+    children = Z[:, :2].astype(int)
+    formed = np.ones(2 * n - 1, dtype=bool)
+    formed[n:] = False
+    parent_applied = np.zeros(2 * n - 1, dtype=bool)
+    for k, (a, b) in enumerate(children):
+        if heights[k] <= threshold and formed[a] and formed[b]:
+            formed[n + k] = True
+            parent_applied[a] = parent_applied[b] = True
+
+    roots = np.flatnonzero(formed & ~parent_applied)  # листья по возрастанию, затем узлы по порядку слияния
+    labels = np.empty(n, dtype=int)
+    for cluster_id, node in enumerate(roots):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node < n:
+                labels[node] = cluster_id
+            else:
+                stack.extend(children[node - n])
+    return labels
+
+
 def hierarchical_clustering(R: np.ndarray) -> np.ndarray:
     """
     Выполняет иерархическую кластеризацию активов на основе матрицы доходностей.
-    
+
+    Ward-кластеризация строк D = 1 − corr(R) с отсечением по наибольшему
+    скачку расстояний слияния (см. _ward_linkage, _cut_labels).
+
     Parameters:
     -----------
     R : np.ndarray
@@ -26,80 +120,11 @@ def hierarchical_clustering(R: np.ndarray) -> np.ndarray:
     np.ndarray
         Массив меток кластеров для каждого актива
     """
-    # 1. Вычисляем корреляционную матрицу
-    tau = np.corrcoef(R, rowvar=False)
-
-    # 2. Строим матрицу расстояний
-    D = 1 - tau
-
-    # 3. Инициализируем кластеры
-    C = [[i] for i in np.arange(R.shape[1])]
-
-    def d(Ci, Cj):
-        """Вычисляет расстояние между двумя кластерами."""
-        cent_i = 1 / len(Ci) * np.sum(D[Ci, :], axis=0)
-        cent_j = 1 / len(Cj) * np.sum(D[Cj, :], axis=0)
-        dist = (len(Ci) * len(Cj)) / (len(Ci) + len(Cj)) * np.linalg.norm(cent_i - cent_j) ** 2
-        return dist
-
-    # 4. Повторяем до тех пор, пока не останется один кластер
-    merge_distances = []
-    merge_log = []
-
-    while len(C) > 1:
-        min_distance = float('inf')
-        best_pair = (0, 0)
-
-        for i in range(len(C)):
-            for j in range(i + 1, len(C)):
-                distance = d(C[i], C[j])
-                if distance < min_distance:
-                    min_distance = distance
-                    best_pair = (i, j)
-
-        # Объединяем лучшую пару кластеров
-        i, j = best_pair
-        new_cluster = C[i] + C[j]
-        merge_log.append((C[i], C[j], new_cluster, min_distance))
-
-        del C[max(i, j)]  # Удаляем больший индекс сначала
-        del C[min(i, j)]
-        C.append(new_cluster)
-        merge_distances.append(min_distance)
-
-    # 5. Определяем оптимальное количество кластеров
-    if len(merge_distances) > 1:
-        gap = []
-        for k in range(1, len(merge_distances)):
-            gap.append(merge_distances[k] - merge_distances[k - 1])
-        largest_gap = np.argmax(gap) + 1
-        threshold = merge_distances[largest_gap]
-    else:
-        threshold = merge_distances[0] if merge_distances else 0
-
-    # 6. Назначаем кластеры на основе порога
-    clusters = [{i} for i in range(R.shape[1])]
-
-    for log in merge_log:
-        if log[3] <= threshold:
-            Ci, Cj = log[0], log[1]
-            to_merge = []
-            for cluster in clusters:
-                if any(i in cluster for i in Ci) or any(i in cluster for i in Cj):
-                    to_merge.append(cluster)
-
-            if len(to_merge) == 2:
-                clusters.remove(to_merge[0])
-                clusters.remove(to_merge[1])
-                clusters.append(set(to_merge[0]).union(set(to_merge[1])))
-
-    # Преобразуем в метки
-    labels = np.empty(R.shape[1], dtype=int)
-    for cluster_id, asset_set in enumerate(clusters):
-        for asset in asset_set:
-            labels[asset] = cluster_id
-
-    return labels
+    R = np.asarray(R, dtype=float)
+    n = R.shape[1]
+    if n == 1:
+        return np.zeros(1, dtype=int)
+    return _cut_labels(_ward_linkage(R), n)
 
 
 def hierarchical_clustering_to_clusters(R: np.ndarray) -> list[list[int]]:
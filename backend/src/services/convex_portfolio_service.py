@@ -16,8 +16,17 @@ Convex Portfolio Construction.
 - target_return (μ'w ≥ r_target)
 
 Диагностика: Sharpe, CVaR, VaR, max drawdown, risk contributions, eff-N.
+
+Задачи компилируются один раз на (objective, N, набор ограничений) в
+DPP-форме и хранятся в ProblemCache; повторные вызовы (эффективная граница,
+бэктесты, walk-forward) только обновляют значения параметров.
 """
 
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
 import cvxpy as cp
 import numpy as np
 
@@ -70,146 +79,337 @@ def _portfolio_stats(w: np.ndarray, mu: np.ndarray, Sigma: np.ndarray,
     }
 
 
-def _build_constraints(w: cp.Variable, N: int, mu: np.ndarray,
-                       long_only: bool, lb: float, ub: float,
-                       max_weight: float | None,
-                       target_return: float | None,
-                       leverage: float) -> list:
+def _sample_moments(R: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Среднесуточные доходности и ковариация с простым shrinkage к диагонали."""
+    T, N = R.shape
+    mu = R.mean(axis=0)          # (N,) среднесуточная
+    Sigma = np.cov(R.T)          # (N, N)
+    # Ledoit-Wolf shrinkage (simple): Σ → (1-α)Σ + α·tr(Σ)/N·I
+    lw_alpha = min(1.0, (N + 2) / (T + N + 2))  # простой shrinkage
+    mu_target = np.trace(Sigma) / N
+    Sigma = (1.0 - lw_alpha) * Sigma + lw_alpha * mu_target * np.eye(N)
+    Sigma = (Sigma + Sigma.T) / 2  # симметризация
+    return mu, Sigma
+
+
+def _sigma_factor(Sigma: np.ndarray) -> np.ndarray:
+    """F с FᵀF = Σ (Холецкий; для вырожденной Σ — через спектральное разложение)."""
+    try:
+        return np.linalg.cholesky(Sigma).T
+    except np.linalg.LinAlgError:
+        eigvals, eigvecs = np.linalg.eigh(Sigma)
+        return np.sqrt(np.clip(eigvals, 0.0, None))[:, None] * eigvecs.T
+
+
+def _unit_sigma_factor(Sigma: np.ndarray) -> tuple[np.ndarray, float]:
+    """
+    Фактор Σ, нормированной к единичной средней дисперсии, и масштаб нормировки.
+
+    На дневных доходностях w'Σw ~ 1e-5 — ниже абсолютных допусков солвера;
+    задачи вида min w'Σw − c·μ'w инвариантны к делению всей цели на масштаб.
+    """
+    scale = float(np.trace(Sigma) / len(Sigma))
+    scale = scale if scale > 1e-300 else 1.0
+    return _sigma_factor(Sigma) / np.sqrt(scale), scale
+
+
+# ── Кэш скомпилированных задач ───────────────────────────────────────────────
+#
+# Задачи строятся один раз на (objective, N, набор ограничений) в DPP-форме:
+# Σ входит через фактор F (FᵀF = Σ), границы весов, плечо, целевая доходность
+# и коэффициенты целевой функции — через cp.Parameter. Повторный вызов только
+# обновляет значения параметров и пересобирает решение без canonicalization.
+
+PROBLEM_CACHE_SIZE = 128
+
+_SOLVERS = [s for s in (cp.CLARABEL, cp.SCS, cp.ECOS) if s in cp.installed_solvers()]
+
+
+class _CompiledProblem:
+    """DPP-задача с именованными параметрами и переменной весов."""
+
+    def __init__(self, problem: cp.Problem, variable: cp.Variable, params: dict[str, cp.Parameter]):
+        self.problem = problem
+        self.variable = variable
+        self.params = params
+        # Значения параметров — общее состояние задачи; решения одной задачи сериализуются
+        self.lock = threading.Lock()
+
+    def solve(self, values: dict[str, Any], warm_start: np.ndarray | None = None) -> np.ndarray | None:
+        with self.lock:
+            for name, value in values.items():
+                self.params[name].value = value
+            if warm_start is not None:
+                self.variable.value = warm_start
+            if _solve(self.problem, warm_start=warm_start is not None):
+                return np.array(self.variable.value)
+            return None
+
+
+class ProblemCache:
+    """LRU-кэш скомпилированных задач со счётчиками попаданий/промахов."""
+
+    def __init__(self, maxsize: int = PROBLEM_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._problems: OrderedDict[tuple, _CompiledProblem] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, builder: Callable[[], _CompiledProblem]) -> _CompiledProblem:
+        with self._lock:
+            problem = self._problems.get(key)
+            if problem is not None:
+                self._problems.move_to_end(key)
+                self.hits += 1
+                return problem
+            self.misses += 1
+
+        problem = builder()
+        with self._lock:
+            problem = self._problems.setdefault(key, problem)
+            self._problems.move_to_end(key)
+            while len(self._problems) > self.maxsize:
+                self._problems.popitem(last=False)
+        return problem
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._problems),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._problems.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_problem_cache = ProblemCache()
+
+
+def problem_cache_stats() -> dict:
+    """Статистика кэша скомпилированных задач текущего процесса."""
+    return _problem_cache.stats()
+
+
+def _constraint_key(long_only: bool, lb: float, ub: float, max_weight: float | None,
+                    target_return: float | None, leverage: float) -> tuple:
+    """Структура ограничений (значения границ — параметры и в ключ не входят)."""
+    return (long_only, max_weight is not None, target_return is not None, leverage < 2.0)
+
+
+def _build_constraints(w: cp.Variable, N: int, key: tuple) -> tuple[list, dict[str, cp.Parameter]]:
+    long_only, has_max_weight, has_target, has_leverage = key
+    params = {"lb": cp.Parameter(), "ub": cp.Parameter()}
     cons = [cp.sum(w) == 1.0]
     if long_only:
-        cons.append(w >= lb)
+        cons.append(w >= params["lb"])
     else:
-        cons.append(w >= -ub)
-    cons.append(w <= ub)
+        cons.append(w >= -params["ub"])
+    cons.append(w <= params["ub"])
+    if has_max_weight:
+        params["max_weight"] = cp.Parameter()
+        cons.append(w <= params["max_weight"])
+    if has_target:
+        params["mu"] = cp.Parameter(N)
+        params["target_return"] = cp.Parameter()
+        cons.append(params["mu"] @ w >= params["target_return"])
+    if has_leverage:
+        params["leverage"] = cp.Parameter(nonneg=True)
+        cons.append(cp.norm1(w) <= params["leverage"])
+    return cons, params
+
+
+def _constraint_values(mu: np.ndarray, long_only: bool, lb: float, ub: float,
+                       max_weight: float | None, target_return: float | None,
+                       leverage: float) -> dict[str, Any]:
+    values: dict[str, Any] = {"lb": lb, "ub": ub}
     if max_weight is not None:
-        cons.append(w <= max_weight)
+        values["max_weight"] = max_weight
     if target_return is not None:
-        cons.append(mu @ w >= target_return)
+        values["mu"] = mu
+        values["target_return"] = target_return
     if leverage < 2.0:
-        cons.append(cp.norm1(w) <= leverage)
-    return cons
+        values["leverage"] = leverage
+    return values
 
 
-def _solve(problem: cp.Problem) -> bool:
+def _solve(problem: cp.Problem, warm_start: bool = False) -> bool:
     """Решаем с fallback по солверам."""
-    for solver in [cp.CLARABEL, cp.SCS, cp.ECOS]:
-        if solver in cp.installed_solvers():
-            try:
-                problem.solve(solver=solver, verbose=False)
-                if problem.status in ("optimal", "optimal_inaccurate"):
-                    return True
-            except Exception:
-                continue
+    for solver in _SOLVERS:
+        try:
+            problem.solve(solver=solver, verbose=False, warm_start=warm_start)
+            if problem.status in ("optimal", "optimal_inaccurate"):
+                return True
+        except Exception:
+            continue
     return False
 
 
 # ── Задачи оптимизации ────────────────────────────────────────────────────────
 
-def _min_variance(Sigma: np.ndarray, N: int, mu: np.ndarray, **kw) -> np.ndarray | None:
+def _quadratic_problem(N: int, cons_key: tuple) -> _CompiledProblem:
+    """min ‖Fw‖² − cᵀw при общих ограничениях (min variance, mean-variance, Kelly)."""
     w = cp.Variable(N)
-    obj = cp.Minimize(cp.quad_form(w, Sigma))
-    cons = _build_constraints(w, N, mu, **kw)
-    if _solve(cp.Problem(obj, cons)):
-        return np.array(w.value)
-    return None
+    factor = cp.Parameter((N, N))
+    linear = cp.Parameter(N)
+    cons, params = _build_constraints(w, N, cons_key)
+    obj = cp.Minimize(cp.sum_squares(factor @ w) - linear @ w)
+    return _CompiledProblem(cp.Problem(obj, cons), w, {**params, "factor": factor, "linear": linear})
+
+
+def _solve_quadratic(Sigma: np.ndarray, N: int, mu: np.ndarray, risk_tolerance: float,
+                     warm_start: np.ndarray | None = None, **kw) -> np.ndarray | None:
+    """min w'Σw − risk_tolerance · μ'w (на нормированной Σ)."""
+    factor, scale = _unit_sigma_factor(Sigma)
+    cons_key = _constraint_key(**kw)
+    problem = _problem_cache.get(("quadratic", N, cons_key), lambda: _quadratic_problem(N, cons_key))
+    values = {**_constraint_values(mu, **kw), "factor": factor, "linear": risk_tolerance * mu / scale}
+    return problem.solve(values, warm_start)
+
+
+def _min_variance(Sigma: np.ndarray, N: int, mu: np.ndarray,
+                  warm_start: np.ndarray | None = None, **kw) -> np.ndarray | None:
+    return _solve_quadratic(Sigma, N, mu, 0.0, warm_start, **kw)
+
+
+def _max_sharpe_problem(N: int) -> _CompiledProblem:
+    y = cp.Variable(N)
+    factor = cp.Parameter((N, N))
+    excess_mu = cp.Parameter(N)
+    problem = cp.Problem(cp.Minimize(cp.sum_squares(factor @ y)), [excess_mu @ y == 1.0, y >= 0])
+    return _CompiledProblem(problem, y, {"factor": factor, "excess_mu": excess_mu})
 
 
-def _max_sharpe(mu: np.ndarray, Sigma: np.ndarray, N: int, rf: float = 0.0, **kw) -> np.ndarray | None:
+def _max_sharpe(mu: np.ndarray, Sigma: np.ndarray, N: int, rf: float = 0.0,
+                warm_start: np.ndarray | None = None, **kw) -> np.ndarray | None:
     """
     Charnes-Cooper: пусть κ = 1/(μ'w − rf), y = κ·w.
     Тогда: min y'Σy  s.t. (μ-rf)'y = 1, Σyᵢ = κ, y ≥ 0.
     Эквивалентно: min y'Σy  s.t. (μ-rf)'y = 1, y ≥ 0, Σyᵢ·rf=...
     Простая формулировка: min y'Σy s.t. (μ-rf)'y=1, y≥0.
     Weights: w = y / sum(y).
+    max_weight в этой формулировке не накладывается.
     """
     excess_mu = mu - rf
     if np.any(excess_mu > 0):
-        y = cp.Variable(N)
-        obj = cp.Minimize(cp.quad_form(y, Sigma))
-        cons = [excess_mu @ y == 1.0, y >= 0]
-        if kw.get("max_weight") is not None:
-            # approximate: y/sum(y) ≤ max_weight → hard to enforce exactly,
-            # skip for Charnes-Cooper
-            pass
-        if _solve(cp.Problem(obj, cons)):
-            yv = np.array(y.value)
+        factor, _ = _unit_sigma_factor(Sigma)
+        y_start = None
+        if warm_start is not None:
+            scale = float(excess_mu @ warm_start)
+            y_start = warm_start / scale if scale > 1e-12 else None
+        problem = _problem_cache.get(("max_sharpe", N), lambda: _max_sharpe_problem(N))
+        yv = problem.solve({"factor": factor, "excess_mu": excess_mu}, y_start)
+        if yv is not None:
             s = yv.sum()
             if s > 1e-10:
                 return yv / s
     # Fallback: min variance
-    return _min_variance(Sigma, N, mu, **kw)
+    return _min_variance(Sigma, N, mu, warm_start, **kw)
 
 
-def _mean_variance(mu: np.ndarray, Sigma: np.ndarray, N: int, gamma: float = 1.0, **kw) -> np.ndarray | None:
+def _mean_variance(mu: np.ndarray, Sigma: np.ndarray, N: int, gamma: float = 1.0,
+                   warm_start: np.ndarray | None = None, **kw) -> np.ndarray | None:
     """min w'Σw − (1/γ) μ'w"""
+    return _solve_quadratic(Sigma, N, mu, 1.0 / (gamma + 1e-15), warm_start, **kw)
+
+
+def _cvar_problem(T: int, N: int, cons_key: tuple) -> _CompiledProblem:
     w = cp.Variable(N)
-    obj = cp.Minimize(cp.quad_form(w, Sigma) - (1.0 / (gamma + 1e-15)) * mu @ w)
-    cons = _build_constraints(w, N, mu, **kw)
-    if _solve(cp.Problem(obj, cons)):
-        return np.array(w.value)
-    return None
+    var_var = cp.Variable()        # VaR scalar
+    z = cp.Variable(T)             # exceedances
+    scenarios = cp.Parameter((T, N))
+    tail_weight = cp.Parameter(nonneg=True)
+    cons, params = _build_constraints(w, N, cons_key)
+    obj = cp.Minimize(var_var + tail_weight * cp.sum(z))
+    cons += [z >= -scenarios @ w - var_var, z >= 0]
+    return _CompiledProblem(cp.Problem(obj, cons), w,
+                            {**params, "scenarios": scenarios, "tail_weight": tail_weight})
 
 
-def _cvar_opt(R: np.ndarray, N: int, mu: np.ndarray, alpha: float = 0.95, **kw) -> np.ndarray | None:
+def _cvar_opt(R: np.ndarray, N: int, mu: np.ndarray, alpha: float = 0.95,
+              warm_start: np.ndarray | None = None, **kw) -> np.ndarray | None:
     """
     min CVaR_α(w) = min VaR + 1/((1-α)T) · Σ zₜ
     s.t. zₜ ≥ -Rₜ'w − VaR, zₜ ≥ 0
     """
     T = R.shape[0]
+    cons_key = _constraint_key(**kw)
+    problem = _problem_cache.get(("cvar", T, N, cons_key), lambda: _cvar_problem(T, N, cons_key))
+    values = {**_constraint_values(mu, **kw), "scenarios": R, "tail_weight": 1.0 / ((1.0 - alpha) * T)}
+    return problem.solve(values, warm_start)
+
+
+def _risk_parity_problem(N: int, has_max_weight: bool) -> _CompiledProblem:
     w = cp.Variable(N)
-    var_var = cp.Variable()        # VaR scalar
-    z = cp.Variable(T)             # exceedances
-    cvar_obj = var_var + (1.0 / ((1.0 - alpha) * T)) * cp.sum(z)
-    obj = cp.Minimize(cvar_obj)
-    cons = [*_build_constraints(w, N, mu, **kw), z >= -R @ w - var_var, z >= 0]
-    if _solve(cp.Problem(obj, cons)):
-        return np.array(w.value)
-    return None
+    factor = cp.Parameter((N, N))
+    c_barrier = cp.Parameter(nonneg=True)
+    eps = 1e-4
+    cons = [cp.sum(w) == 1.0, w >= eps]
+    params = {"factor": factor, "c_barrier": c_barrier}
+    if has_max_weight:
+        params["max_weight"] = cp.Parameter()
+        cons.append(w <= params["max_weight"])
+    obj = cp.Minimize(cp.sum_squares(factor @ w) - c_barrier * cp.sum(cp.log(w)))
+    return _CompiledProblem(cp.Problem(obj, cons), w, params)
 
 
-def _risk_parity(Sigma: np.ndarray, N: int, mu: np.ndarray, c_barrier: float = 0.1, **kw) -> np.ndarray | None:
+def _risk_parity(Sigma: np.ndarray, N: int, mu: np.ndarray, c_barrier: float = 0.1,
+                 warm_start: np.ndarray | None = None, **kw) -> np.ndarray | None:
     """
     ERC via log-barrier: min w'Σw − c · Σ log(wᵢ)  s.t. Σwᵢ=1, w≥ε
     Convex (QP + concave barrier → overall convex).
     Maillard (2010): с ростом c решение стремится к ERC.
+    Барьер не инвариантен к масштабу Σ, поэтому фактор не нормируется.
     """
-    w = cp.Variable(N)
-    obj = cp.Minimize(cp.quad_form(w, Sigma) - c_barrier * cp.sum(cp.log(w)))
-    eps = 1e-4
-    cons = [cp.sum(w) == 1.0, w >= eps]
-    if kw.get("max_weight") is not None:
-        cons.append(w <= kw["max_weight"])
-    if _solve(cp.Problem(obj, cons)):
-        return np.array(w.value)
-    return None
+    max_weight = kw.get("max_weight")
+    problem = _problem_cache.get(
+        ("risk_parity", N, max_weight is not None),
+        lambda: _risk_parity_problem(N, max_weight is not None),
+    )
+    values = {"factor": _sigma_factor(Sigma), "c_barrier": c_barrier}
+    if max_weight is not None:
+        values["max_weight"] = max_weight
+    if warm_start is not None:
+        warm_start = np.clip(warm_start, 1e-4, None)
+    return problem.solve(values, warm_start)
 
 
-def _kelly(mu: np.ndarray, Sigma: np.ndarray, N: int, fraction: float = 0.5, **kw) -> np.ndarray | None:
+def _kelly(mu: np.ndarray, Sigma: np.ndarray, N: int, fraction: float = 0.5,
+           warm_start: np.ndarray | None = None, **kw) -> np.ndarray | None:
     """
     Fractional Kelly: max f·μ'w − ½ f² w'Σw
     При f=1 — полный Kelly; f=0.5 — половинный.
     Эквивалентно min w'Σw − (2f/f²)·μ'w = min w'Σw − (2/f)·μ'w.
     """
-    w = cp.Variable(N)
     gamma_kelly = 1.0 / (fraction + 1e-10)  # risk aversion = 1/f
-    obj = cp.Minimize(cp.quad_form(w, Sigma) - (1.0 / gamma_kelly) * mu @ w)
-    cons = _build_constraints(w, N, mu, **kw)
-    if _solve(cp.Problem(obj, cons)):
-        return np.array(w.value)
-    return None
+    return _solve_quadratic(Sigma, N, mu, 1.0 / gamma_kelly, warm_start, **kw)
 
 
 # ── Efficient Frontier ────────────────────────────────────────────────────────
 
 def _efficient_frontier(mu: np.ndarray, Sigma: np.ndarray, N: int,
                          n_points: int = 30, **kw) -> list[dict]:
-    """Sweep γ от высокого (min vol) до низкого (max return) значения."""
+    """Sweep γ от высокого (min vol) до низкого (max return) значения.
+
+    Все точки решаются одной скомпилированной задачей; каждая стартует с
+    решения предыдущей.
+    """
     gammas = np.logspace(3, -1, n_points)  # от осторожного к агрессивному
     frontier = []
+    prev = None
     for gamma in gammas:
-        w = _mean_variance(mu, Sigma, N, gamma=float(gamma), **kw)
+        w = _mean_variance(mu, Sigma, N, gamma=float(gamma), warm_start=prev, **kw)
         if w is None:
             continue
+        prev = w
         w = np.clip(w, 0, None)
         s = w.sum()
         if s < 1e-10:
@@ -222,6 +422,56 @@ def _efficient_frontier(mu: np.ndarray, Sigma: np.ndarray, N: int,
     return frontier
 
 
+# ── Повторные решения на скользящих окнах ────────────────────────────────────
+
+PARAMETRIC_OBJECTIVES = ("min_variance", "max_sharpe", "risk_parity")
+
+_DEFAULT_CONSTRAINTS = dict(long_only=True, lb=0.0, ub=1.0, max_weight=None,
+                            target_return=None, leverage=1.0)
+
+
+def optimize_weights(
+    returns: np.ndarray,
+    objective: str,
+    warm_start: np.ndarray | None = None,
+    risk_free: float = 0.0,
+) -> np.ndarray | None:
+    """
+    Веса одной задачи (long-only, Σwᵢ=1) на окне доходностей без диагностики
+    и эффективной границы — для бэктестов и walk-forward.
+
+    Совпадает с compute_convex_portfolio(returns, [objective])["results"][objective]
+    (до округления весов) и использует тот же кэш скомпилированных задач.
+
+    Args:
+        returns: T × N матрица доходностей окна
+        objective: min_variance / max_sharpe / risk_parity
+        warm_start: начальное приближение (обычно веса прошлого окна)
+        risk_free: дневная безрисковая ставка (для max_sharpe)
+
+    Returns:
+        Нормированные веса или None, если солвер не сошёлся
+    """
+    if objective not in PARAMETRIC_OBJECTIVES:
+        raise ValueError(f"Unknown parametric objective: {objective}. Use: {list(PARAMETRIC_OBJECTIVES)}")
+    R = np.asarray(returns, dtype=float)
+    N = R.shape[1]
+    mu, Sigma = _sample_moments(R)
+
+    if objective == "max_sharpe":
+        w = _max_sharpe(mu, Sigma, N, rf=risk_free, warm_start=warm_start, **_DEFAULT_CONSTRAINTS)
+    elif objective == "risk_parity":
+        w = _risk_parity(Sigma, N, mu, warm_start=warm_start)
+    else:
+        w = _min_variance(Sigma, N, mu, warm_start=warm_start, **_DEFAULT_CONSTRAINTS)
+
+    if w is None or np.any(np.isnan(w)):
+        return None
+    w = np.clip(w, 0, None)
+    s = w.sum()
+    return w / s if s > 1e-10 else None
+
+
 # ── Главная функция ───────────────────────────────────────────────────────────
 
 def compute_convex_portfolio(
@@ -276,13 +526,7 @@ def compute_convex_portfolio(
     if objectives is None:
         objectives = ["min_variance", "max_sharpe", "cvar", "risk_parity", "kelly"]
 
-    mu = R.mean(axis=0)          # (N,) среднесуточная
-    Sigma = np.cov(R.T)          # (N, N)
-    # Ledoit-Wolf shrinkage (simple): Σ → (1-α)Σ + α·tr(Σ)/N·I
-    lw_alpha = min(1.0, (N + 2) / (T + N + 2))  # простой shrinkage
-    mu_target = np.trace(Sigma) / N
-    Sigma = (1.0 - lw_alpha) * Sigma + lw_alpha * mu_target * np.eye(N)
-    Sigma = (Sigma + Sigma.T) / 2  # симметризация
+    mu, Sigma = _sample_moments(R)
 
     kw = dict(long_only=long_only, lb=lb, ub=ub, max_weight=max_weight,
               target_return=target_return, leverage=leverage)
@@ -6,7 +6,7 @@ Proxies crypto market data and arbitrage opportunities.
 
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cache_get, cache_get_or_fetch, cache_set, cached, make_cache_key
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -29,10 +29,20 @@ async def coingecko_markets(
 ) -> list[dict[str, Any]]:
     """Get top crypto markets from CoinGecko."""
     key = make_cache_key("cg", "markets", vs_currency, per_page, page, order)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
+    fallback_key = make_cache_key(key, "fallback")
+    data = await cache_get_or_fetch(
+        key, lambda: _fetch_coingecko_markets(vs_currency, per_page, page, order, fallback_key), ttl_seconds=120,
+    )
+    if data is None:
+        # Rate limited: serve the last good page for up to 10 minutes
+        return cache_get(fallback_key) or []
+    return data
+
 
+async def _fetch_coingecko_markets(
+    vs_currency: str, per_page: int, page: int, order: str, fallback_key: str,
+) -> list[dict[str, Any]] | None:
+    """One /coins/markets request; None when rate limited (not cached)."""
     params: dict[str, Any] = {
         "vs_currency": vs_currency,
         "order": order,
@@ -49,25 +59,17 @@ async def coingecko_markets(
     session = await get_session()
     async with session.get(f"{COINGECKO_BASE}/coins/markets", params=params, headers=headers) as resp:
         if resp.status == 429:
-            cached_fallback = cache_get(make_cache_key("cg", "markets", vs_currency, per_page, page, order, "fallback"))
-            if cached_fallback is not None:
-                return cached_fallback
-            return []
+            return None
         resp.raise_for_status()
         data = await resp.json(content_type=None)
 
-    cache_set(key, data, ttl_seconds=120)
-    cache_set(make_cache_key("cg", "markets", vs_currency, per_page, page, order, "fallback"), data, ttl_seconds=600)
+    cache_set(fallback_key, data, ttl_seconds=600)
     return data
 
 
+@cached("cg", ttl_seconds=120)
 async def coingecko_coin(coin_id: str) -> dict[str, Any]:
     """Get detailed coin info from CoinGecko."""
-    key = make_cache_key("cg", "coin", coin_id)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {
         "localization": "false",
         "tickers": "false",
@@ -96,21 +98,16 @@ async def coingecko_coin(coin_id: str) -> dict[str, Any]:
         "genesis_date": data.get("genesis_date", ""),
         "provider": "coingecko",
     }
-    cache_set(key, result, ttl_seconds=120)
     return result
 
 
+@cached("cg", ttl_seconds=120)
 async def coingecko_market_chart(
     coin_id: str,
     vs_currency: str = "usd",
     days: int = 30
 ) -> dict[str, Any]:
     """Get price history chart data from CoinGecko."""
-    key = make_cache_key("cg", "chart", coin_id, vs_currency, days)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {"vs_currency": vs_currency, "days": days}
     headers: dict[str, str] = {}
     cg_key = _cg_key()
@@ -130,17 +127,12 @@ async def coingecko_market_chart(
         "total_volumes": data.get("total_volumes", []),
         "provider": "coingecko",
     }
-    cache_set(key, result, ttl_seconds=120)
     return result
 
 
+@cached("cg", ttl_seconds=300)
 async def coingecko_trending() -> dict[str, Any]:
     """Get trending coins from CoinGecko."""
-    key = make_cache_key("cg", "trending")
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers: dict[str, str] = {}
     cg_key = _cg_key()
     if cg_key:
@@ -151,17 +143,12 @@ async def coingecko_trending() -> dict[str, Any]:
         resp.raise_for_status()
         data = await resp.json(content_type=None)
 
-    cache_set(key, data, ttl_seconds=300)
     return data
 
 
+@cached("cg", ttl_seconds=120)
 async def coingecko_global() -> dict[str, Any]:
     """Get global crypto market stats."""
-    key = make_cache_key("cg", "global")
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers: dict[str, str] = {}
     cg_key = _cg_key()
     if cg_key:
@@ -174,19 +161,14 @@ async def coingecko_global() -> dict[str, Any]:
 
     result = data.get("data", {})
     result["provider"] = "coingecko"
-    cache_set(key, result, ttl_seconds=120)
     return result
 
 
 # ─── CoinGap ──────────────────────────────────────────────────────────────────
 
+@cached("coingap", ttl_seconds=60)
 async def coingap_arbitrage() -> list[dict[str, Any]]:
     """Get crypto arbitrage opportunities from CoinGap."""
-    key = make_cache_key("coingap", "arb")
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers: dict[str, str] = {}
     gap_key = _gap_key()
     if gap_key:
@@ -198,5 +180,4 @@ async def coingap_arbitrage() -> list[dict[str, Any]]:
         data = await resp.json(content_type=None)
 
     result = data if isinstance(data, list) else data.get("data", [])
-    cache_set(key, result, ttl_seconds=60)
     return result
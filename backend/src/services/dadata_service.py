@@ -6,7 +6,7 @@ Suggestions API: https://suggestions.dadata.ru/suggestions/api/4_1/rs
 
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -28,13 +28,9 @@ def _dadata_headers() -> dict[str, str]:
     return headers
 
 
+@cached("dadata", ttl_seconds=3600)
 async def dadata_find_company(inn: str) -> dict[str, Any]:
     """Find company by INN/OGRN."""
-    key = make_cache_key("dadata", "company", inn)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     session = await get_session()
     async with session.post(
         f"{DADATA_BASE}/findById/party",
@@ -69,17 +65,12 @@ async def dadata_find_company(inn: str) -> dict[str, Any]:
         })
 
     result = {"query": inn, "companies": companies, "provider": "dadata"}
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
+@cached("dadata", ttl_seconds=600)
 async def dadata_suggest_company(query: str, count: int = 10) -> dict[str, Any]:
     """Suggest companies by name or partial INN."""
-    key = make_cache_key("dadata", "suggest_company", query, count)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     session = await get_session()
     async with session.post(
         f"{DADATA_BASE}/suggest/party",
@@ -102,17 +93,12 @@ async def dadata_suggest_company(query: str, count: int = 10) -> dict[str, Any]:
         })
 
     result = {"query": query, "suggestions": suggestions, "provider": "dadata"}
-    cache_set(key, result, ttl_seconds=600)
     return result
 
 
+@cached("dadata", ttl_seconds=3600)
 async def dadata_find_bank(bik: str) -> dict[str, Any]:
     """Find bank by BIK."""
-    key = make_cache_key("dadata", "bank", bik)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     session = await get_session()
     async with session.post(
         f"{DADATA_BASE}/findById/bank",
@@ -139,5 +125,4 @@ async def dadata_find_bank(bik: str) -> dict[str, Any]:
         })
 
     result = {"query": bik, "banks": banks, "provider": "dadata"}
-    cache_set(key, result, ttl_seconds=3600)
     return result
@@ -9,8 +9,12 @@
 - Random Matrix Theory (Marchenko-Pastur): отделение сигнала от шума
 - Реконструкция Σ с K < N главными компонентами
 - Декомпозиция риска портфеля на вклады PC
+- CovarianceStream: инкрементальная (опц. экспоненциально взвешенная)
+  ковариация с RMT-фильтрацией по мере поступления новых строк
 """
 
+import threading
+
 import numpy as np
 
 # ── Marchenko-Pastur распределение ────────────────────────────────────────────
@@ -42,36 +46,211 @@ def _marchenko_pastur_pdf(x: np.ndarray, sigma2: float, q: float) -> np.ndarray:
 
 # ── Ledoit-Wolf shrinkage ─────────────────────────────────────────────────────
 
+def _shrink_to_identity(S: np.ndarray, beta2: float) -> tuple[np.ndarray, float]:
+    """
+    Σ_LW = (1 − α) · S + α · μ · I, α = min(β̄² / δ², 1), μ = trace(S)/N.
+    beta2 — оценка дисперсии выборочной ковариации (числитель α).
+    """
+    N = S.shape[0]
+    mu = float(np.trace(S) / N)
+    # delta²: squared Frobenius norm of S - mu*I (знаменатель shrinkage)
+    delta2 = float(np.sum((S - mu * np.eye(N)) ** 2))
+    alpha = min(beta2 / delta2, 1.0) if delta2 > 0 else 0.0
+    return (1.0 - alpha) * S + alpha * mu * np.eye(N), float(alpha)
+
+
 def _ledoit_wolf_shrinkage(X: np.ndarray) -> tuple[np.ndarray, float]:
     """
     Ledoit-Wolf аналитический shrinkage для ковариационной матрицы.
     Σ_LW = (1 − α) · S + α · μ · I
     где μ = trace(S)/N — shrinkage target (scaled identity).
     Возвращает (Σ_LW, α).
+
+    β̄² = Σₜ ||xₜxₜᵀ − S||²_F / T² считается в замкнутой форме без N×N
+    временных матриц на каждое наблюдение:
+    ||xₜxₜᵀ − S||² = ||xₜ||⁴ − 2·xₜᵀSxₜ + ||S||², а Σₜ xₜᵀSxₜ = (T−1)·||S||².
     """
-    T, N = X.shape
+    T = X.shape[0]
     S = np.cov(X.T, ddof=1)  # выборочная ковариационная матрица N×N
 
-    # Аналитические формулы Ledoit-Wolf (2004, Analytical Shrinkage)
-    # Оптимальный α минимизирует E[||Σ_LW − Σ||²_F]
-    mu = float(np.trace(S) / N)
+    X_c = X - X.mean(axis=0)
+    sq_norms = np.einsum("ij,ij->i", X_c, X_c)  # ||xₜ||²
+    beta2_sum = float(sq_norms @ sq_norms) - (T - 2) * float(np.sum(S ** 2))
+    return _shrink_to_identity(S, max(beta2_sum, 0.0) / (T ** 2))
 
-    # delta²: squared Frobenius norm of S - mu*I (numerator of shrinkage)
-    delta2 = float(np.sum((S - mu * np.eye(N)) ** 2))
 
-    # beta_bar²: mean of squared sum of outer products (variance of sample cov)
-    X_c = X - X.mean(axis=0)
-    beta2_sum = 0.0
-    for t in range(T):
-        xi = X_c[t]
-        outer = np.outer(xi, xi)
-        beta2_sum += float(np.sum((outer - S) ** 2))
-    beta2 = beta2_sum / (T ** 2)
+# ── Спектр и RMT ──────────────────────────────────────────────────────────────
+
+def _sorted_eigh(Sigma: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Σ = QΛQᵀ по убыванию собственных значений.
+    Знак каждого PC нормализуется: наибольший по модулю элемент положителен.
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(Sigma)
+    idx = np.argsort(eigenvalues)[::-1]
+    eigenvalues = eigenvalues[idx]
+    eigenvectors = eigenvectors[:, idx]   # N × N, столбцы = PC
+    pivots = eigenvectors[np.abs(eigenvectors).argmax(axis=0), np.arange(eigenvectors.shape[1])]
+    eigenvectors *= np.where(pivots < 0, -1.0, 1.0)
+    return eigenvalues, eigenvectors
 
-    alpha = min(beta2 / delta2, 1.0) if delta2 > 0 else 0.0
-    Sigma_lw = (1.0 - alpha) * S + alpha * mu * np.eye(N)
 
-    return Sigma_lw, float(alpha)
+def _rmt_clip(eigenvalues: np.ndarray, lam_plus: float) -> np.ndarray:
+    """
+    RMT-фильтрация (clipping): собственные значения в шумовой зоне (≤ λ₊)
+    заменяются их средним — след Σ сохраняется, сигнальные PC не меняются.
+    """
+    clipped = eigenvalues.copy()
+    noise = eigenvalues <= lam_plus
+    if noise.any():
+        clipped[noise] = eigenvalues[noise].mean()
+    return clipped
+
+
+# ── Инкрементальная ковариация ────────────────────────────────────────────────
+
+class CovarianceStream:
+    """
+    Нарастающая ковариация и её спектр для панели доходностей N активов.
+
+    Новые строки поглощаются rank-k обновлением достаточных статистик
+    (Σw, Σw², Σw·y, Σw·yyᵀ, Σw·||y||²·y, Σw·||y||⁴) за O(k·N²), без пересчёта
+    по всей истории. При halflife веса экспоненциальные: каждая новая строка
+    умножает прошлые веса на 0.5^(1/halflife). Данные сдвигаются на среднее
+    первого чанка, чтобы суммы не теряли точность.
+
+    С равными весами ковариация и Ledoit-Wolf α совпадают с пакетным
+    compute_eigenportfolios по тем же строкам. Спектральное разложение
+    кэшируется до следующего update — обновление и перечитывание
+    RMT-фильтра для 200 активов занимают миллисекунды.
+    """
+
+    def __init__(self, n_assets: int, halflife: float | None = None):
+        if n_assets < 2:
+            raise ValueError("Нужно минимум 2 актива.")
+        if halflife is not None and halflife <= 0:
+            raise ValueError("halflife должен быть положительным")
+        self.n_assets = n_assets
+        self.halflife = halflife
+        self._decay = 1.0 if halflife is None else 0.5 ** (1.0 / halflife)
+        self.n_obs = 0
+        self._shift: np.ndarray | None = None
+        self._w = 0.0
+        self._w2 = 0.0
+        self._sum = np.zeros(n_assets)
+        self._cross = np.zeros((n_assets, n_assets))
+        self._sq_sum = np.zeros(n_assets)
+        self._quartic = 0.0
+        self._spectra: dict[bool, tuple] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def effective_obs(self) -> float:
+        """Эффективное число наблюдений (Σw)² / Σw² (= T при равных весах)."""
+        return self._w ** 2 / self._w2 if self._w2 > 0 else 0.0
+
+    def update(self, returns) -> int:
+        """Добавляет строки доходностей k × N (хронологический порядок). Возвращает число строк в потоке."""
+        Y = np.asarray(returns, dtype=float)
+        if Y.ndim == 1:
+            Y = Y[None, :]
+        if Y.ndim != 2 or Y.shape[1] != self.n_assets:
+            raise ValueError(f"Ожидается матрица k × {self.n_assets}, получено {Y.shape}")
+        if not np.all(np.isfinite(Y)):
+            raise ValueError("Доходности должны быть конечными числами")
+        k = len(Y)
+        if k == 0:
+            return self.n_obs
+
+        with self._lock:
+            if self._shift is None:
+                self._shift = Y.mean(axis=0)
+            Y = Y - self._shift
+            w = self._decay ** np.arange(k - 1, -1, -1, dtype=float)
+            scale = self._decay ** k
+            sq = np.einsum("ij,ij->i", Y, Y)
+            wsq = w * sq
+
+            self._w = scale * self._w + float(w.sum())
+            self._w2 = scale ** 2 * self._w2 + float(w @ w)
+            self._sum = scale * self._sum + w @ Y
+            self._cross = scale * self._cross + (Y.T * w) @ Y
+            self._sq_sum = scale * self._sq_sum + wsq @ Y
+            self._quartic = scale * self._quartic + float(wsq @ sq)
+            self.n_obs += k
+            self._spectra = {}
+            return self.n_obs
+
+    def _moments(self, use_shrinkage: bool) -> tuple[np.ndarray, float]:
+        """(Σ, α): несмещённая взвешенная ковариация, опционально с Ledoit-Wolf shrinkage."""
+        if self.n_obs < 2:
+            raise ValueError("Нужно минимум 2 наблюдения")
+        W = self._w
+        m = self._sum / W
+        M2 = self._cross / W
+        C_b = M2 - np.outer(m, m)             # Σ pₜ cₜcₜᵀ, cₜ = yₜ − m
+        ratio = self._w2 / W ** 2             # 1/T при равных весах
+        S = C_b / (1.0 - ratio)
+        if not use_shrinkage:
+            return S, 0.0
+
+        # Σ pₜ ||cₜ||⁴ через моменты y: ||c||² = ||y||² − 2yᵀm + ||m||²
+        d = float(m @ m)
+        quartic_c = (
+            self._quartic / W - 4.0 * float(m @ self._sq_sum) / W
+            + 4.0 * float(m @ M2 @ m) + 2.0 * d * float(np.trace(M2)) - 3.0 * d ** 2
+        )
+        beta2 = ratio * (quartic_c - 2.0 * float(np.sum(S * C_b)) + float(np.sum(S ** 2)))
+        return _shrink_to_identity(S, max(beta2, 0.0))
+
+    def _spectrum(self, use_shrinkage: bool) -> tuple:
+        with self._lock:
+            if use_shrinkage not in self._spectra:
+                Sigma, alpha = self._moments(use_shrinkage)
+                self._spectra[use_shrinkage] = (Sigma, alpha, *_sorted_eigh(Sigma), self.effective_obs, self.n_obs)
+            return self._spectra[use_shrinkage]
+
+    def covariance(self, use_shrinkage: bool = True, rmt_filter: bool = False) -> np.ndarray:
+        """Текущая Σ (N × N); rmt_filter=True — с RMT-clipping шумовых собственных значений."""
+        Sigma, _, eigenvalues, eigenvectors, t_eff, _ = self._spectrum(use_shrinkage)
+        if not rmt_filter:
+            return Sigma.copy()
+        _, lam_plus = _marchenko_pastur_bounds(float(np.median(eigenvalues)), self.n_assets / t_eff)
+        return (eigenvectors * _rmt_clip(eigenvalues, lam_plus)) @ eigenvectors.T
+
+    def estimates(self, use_shrinkage: bool = True, n_components: int | None = None) -> dict:
+        """Спектр, RMT-границы и отфильтрованные собственные значения по всем принятым строкам."""
+        Sigma, alpha, eigenvalues, eigenvectors, t_eff, n_obs = self._spectrum(use_shrinkage)
+        N = self.n_assets
+        q = N / t_eff
+        sigma2_noise = float(np.median(eigenvalues))
+        lam_minus, lam_plus = _marchenko_pastur_bounds(sigma2_noise, q)
+        n_signal = int(np.sum(eigenvalues > lam_plus))
+        filtered = _rmt_clip(eigenvalues, lam_plus)
+
+        total_var = float(eigenvalues.sum())
+        K = min(n_components if n_components is not None else min(N, 10), N)
+        n_show = min(N, 30)
+        return {
+            "n_obs": int(n_obs),
+            "effective_obs": float(t_eff),
+            "halflife": self.halflife,
+            "eigenvalues": eigenvalues[:n_show].tolist(),
+            "filtered_eigenvalues": filtered[:n_show].tolist(),
+            "explained_variance": (eigenvalues[:n_show] / total_var).tolist(),
+            "total_variance": total_var,
+            "eigenvectors": eigenvectors[:, :K].tolist(),  # N × K
+            "volatilities": np.sqrt(np.clip(np.diag(Sigma), 0.0, None)).tolist(),
+            "rmt": {
+                "lambda_minus": float(lam_minus),
+                "lambda_plus": float(lam_plus),
+                "sigma2_noise": sigma2_noise,
+                "q": float(q),
+                "n_signal": n_signal,
+                "n_noise": N - n_signal,
+            },
+            "shrinkage": {"applied": bool(use_shrinkage), "alpha": float(alpha)},
+        }
 
 
 # ── Главная функция ───────────────────────────────────────────────────────────
@@ -121,15 +300,7 @@ def compute_eigenportfolios(
 
     # ── Спектральное разложение Σ = QΛQᵀ ────────────────────────────────────
     # Сортируем по убыванию собственных значений
-    eigenvalues, eigenvectors = np.linalg.eigh(Sigma)
-    idx = np.argsort(eigenvalues)[::-1]
-    eigenvalues = eigenvalues[idx]
-    eigenvectors = eigenvectors[:, idx]   # N × N, столбцы = PC
-
-    # Нормализуем знак: первый ненулевой элемент каждого PC положителен
-    for k in range(N):
-        if eigenvectors[:, k][np.abs(eigenvectors[:, k]).argmax()] < 0:
-            eigenvectors[:, k] *= -1
+    eigenvalues, eigenvectors = _sorted_eigh(Sigma)
 
     # ── Explained variance ───────────────────────────────────────────────────
     total_var = float(eigenvalues.sum())
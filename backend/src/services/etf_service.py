@@ -6,19 +6,15 @@ Combines MOEX TQTF board data with yfinance for international ETFs.
 
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.utils.http_client import get_session
 
 MOEX_BASE = "https://iss.moex.com/iss"
 
 
+@cached("etf", ttl_seconds=60)
 async def moex_etf_list() -> dict[str, Any]:
     """Get list of Russian ETFs from MOEX TQTF board."""
-    key = make_cache_key("etf", "moex_list")
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{MOEX_BASE}/engines/stock/markets/shares/boards/TQTF/securities.json"
     params = {
         "iss.meta": "off",
@@ -66,10 +62,10 @@ async def moex_etf_list() -> dict[str, Any]:
         })
 
     result = {"etfs": etfs, "count": len(etfs), "provider": "moex_iss"}
-    cache_set(key, result, ttl_seconds=60)
     return result
 
 
+@cached("etf", ttl_seconds=120)
 async def etf_candles(
     ticker: str,
     interval: int = 24,
@@ -78,11 +74,6 @@ async def etf_candles(
     limit: int = 100,
 ) -> dict[str, Any]:
     """Get ETF candles from MOEX TQTF board."""
-    key = make_cache_key("etf", "candles", ticker, interval, from_date, till_date, limit)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{MOEX_BASE}/engines/stock/markets/shares/boards/TQTF/securities/{ticker}/candles.json"
     params: dict[str, Any] = {"iss.meta": "off", "interval": interval}
     if from_date:
@@ -112,7 +103,6 @@ async def etf_candles(
         })
 
     result = {"ticker": ticker, "interval": interval, "candles": candles, "provider": "moex_iss"}
-    cache_set(key, result, ttl_seconds=120)
     return result
 
 
@@ -12,7 +12,7 @@ import logging
 import re
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -49,6 +49,7 @@ async def _fcs_get(path: str, params: dict[str, Any] | None = None) -> Any:
         return await resp.json(content_type=None)
 
 
+@cached("fcs", ttl_seconds=60)
 async def fcs_forex_latest(symbol: str) -> dict[str, Any]:
     """
     Get latest forex quote.
@@ -56,11 +57,6 @@ async def fcs_forex_latest(symbol: str) -> dict[str, Any]:
     Symbol format: EUR/USD, GBP/JPY, USD/RUB
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("fcs", "fx", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _fcs_get("/forex/latest", {"symbol": symbol})
 
     response = data.get("response", [])
@@ -80,10 +76,10 @@ async def fcs_forex_latest(symbol: str) -> dict[str, Any]:
         "provider": "fcs_api",
     }
 
-    cache_set(cache_key, result, ttl_seconds=60)
     return result
 
 
+@cached("fcs", ttl_seconds=30)
 async def fcs_crypto_latest(symbol: str) -> dict[str, Any]:
     """
     Get latest crypto quote.
@@ -91,11 +87,6 @@ async def fcs_crypto_latest(symbol: str) -> dict[str, Any]:
     Symbol format: BTC/USD, ETH/USD, SOL/USD
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("fcs", "crypto", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _fcs_get("/crypto/latest", {"symbol": symbol})
 
     response = data.get("response", [])
@@ -115,10 +106,10 @@ async def fcs_crypto_latest(symbol: str) -> dict[str, Any]:
         "provider": "fcs_api",
     }
 
-    cache_set(cache_key, result, ttl_seconds=30)
     return result
 
 
+@cached("fcs", ttl_seconds=60)
 async def fcs_stock_latest(symbol: str) -> dict[str, Any]:
     """
     Get latest stock quote.
@@ -126,11 +117,6 @@ async def fcs_stock_latest(symbol: str) -> dict[str, Any]:
     Symbol format: AAPL, MSFT, GOOGL
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("fcs", "stock", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _fcs_get("/stock/latest", {"symbol": symbol})
 
     response = data.get("response", [])
@@ -150,22 +136,16 @@ async def fcs_stock_latest(symbol: str) -> dict[str, Any]:
         "provider": "fcs_api",
     }
 
-    cache_set(cache_key, result, ttl_seconds=60)
     return result
 
 
+@cached("fcs", ttl_seconds=86400)
 async def fcs_forex_list() -> list[dict[str, str]]:
     """Get list of available forex pairs."""
-    cache_key = make_cache_key("fcs", "fx_list")
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _fcs_get("/forex/list", {"type": "forex"})
     pairs = [
         {"symbol": item.get("s", ""), "name": item.get("n", "")}
         for item in data.get("response", [])
     ]
 
-    cache_set(cache_key, pairs, ttl_seconds=86400)
     return pairs
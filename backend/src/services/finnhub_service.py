@@ -13,7 +13,7 @@ import re
 from datetime import datetime, timedelta
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -35,6 +35,13 @@ RESOLUTION_MAP = {
     "M": "M",
 }
 
+INTRADAY_RESOLUTIONS = ("1", "5", "15", "30", "60")
+
+
+def _candles_ttl(result: dict[str, Any]) -> int:
+    """Cache based on resolution: intraday = 1min, daily+ = 5min."""
+    return 60 if result["resolution"] in INTRADAY_RESOLUTIONS else 300
+
 
 def _api_key() -> str:
     return get_key_sync("FINNHUB_API_KEY")
@@ -65,6 +72,9 @@ async def _finnhub_get(path: str, params: dict[str, Any]) -> dict[str, Any] | li
         return await resp.json(content_type=None)
 
 
+# Short TTL — this is near-real-time data; a stale quote is served for up to
+# 30s more while a single request refreshes it
+@cached("finnhub", ttl_seconds=15, stale_ttl_seconds=30)
 async def finnhub_quote(symbol: str) -> dict[str, Any]:
     """
     Get real-time quote for a stock symbol.
@@ -72,11 +82,6 @@ async def finnhub_quote(symbol: str) -> dict[str, Any]:
     Returns: current price, change, percent change, high, low, open, prev close.
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("finnhub", "quote", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _finnhub_get("/quote", {"symbol": symbol})
 
     result = {
@@ -92,11 +97,10 @@ async def finnhub_quote(symbol: str) -> dict[str, Any]:
         "provider": "finnhub",
     }
 
-    # Short TTL — this is near-real-time data
-    cache_set(cache_key, result, ttl_seconds=15)
     return result
 
 
+@cached("finnhub", ttl_seconds=_candles_ttl)
 async def finnhub_candles(
     symbol: str,
     resolution: str = "D",
@@ -121,11 +125,6 @@ async def finnhub_candles(
     if from_ts is None:
         from_ts = int((datetime.now() - timedelta(days=365)).timestamp())
 
-    cache_key = make_cache_key("finnhub", "candles", symbol, res, from_ts, to_ts)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _finnhub_get("/stock/candle", {
         "symbol": symbol,
         "resolution": res,
@@ -162,20 +161,13 @@ async def finnhub_candles(
         },
     }
 
-    # Cache based on resolution: intraday = 1min, daily+ = 5min
-    ttl = 60 if res in ("1", "5", "15", "30", "60") else 300
-    cache_set(cache_key, result, ttl_seconds=ttl)
     return result
 
 
+@cached("finnhub", ttl_seconds=3600)
 async def finnhub_company_profile(symbol: str) -> dict[str, Any]:
     """Get company profile: name, industry, market cap, logo, etc."""
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("finnhub", "profile", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _finnhub_get("/stock/profile2", {"symbol": symbol})
 
     if not data:
@@ -195,21 +187,16 @@ async def finnhub_company_profile(symbol: str) -> dict[str, Any]:
         "provider": "finnhub",
     }
 
-    cache_set(cache_key, result, ttl_seconds=3600)
     return result
 
 
+@cached("finnhub", ttl_seconds=300)
 async def finnhub_market_news(category: str = "general") -> list[dict[str, Any]]:
     """
     Get latest market news.
 
     Categories: general, forex, crypto, merger
     """
-    cache_key = make_cache_key("finnhub", "news", category)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _finnhub_get("/news", {"category": category})
 
     articles = [
@@ -227,18 +214,13 @@ async def finnhub_market_news(category: str = "general") -> list[dict[str, Any]]
         for item in (data if isinstance(data, list) else [])
     ]
 
-    cache_set(cache_key, articles, ttl_seconds=300)
     return articles
 
 
+@cached("finnhub", ttl_seconds=300)
 async def finnhub_forex_rates(base: str = "USD") -> dict[str, Any]:
     """Get forex exchange rates for a base currency."""
     base = _validate_symbol(base.upper())
-    cache_key = make_cache_key("finnhub", "forex", base)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _finnhub_get("/forex/rates", {"base": base})
 
     result = {
@@ -247,10 +229,10 @@ async def finnhub_forex_rates(base: str = "USD") -> dict[str, Any]:
         "provider": "finnhub",
     }
 
-    cache_set(cache_key, result, ttl_seconds=300)
     return result
 
 
+@cached("finnhub", ttl_seconds=_candles_ttl)
 async def finnhub_crypto_candles(
     symbol: str,
     resolution: str = "D",
@@ -271,11 +253,6 @@ async def finnhub_crypto_candles(
     if from_ts is None:
         from_ts = int((datetime.now() - timedelta(days=365)).timestamp())
 
-    cache_key = make_cache_key("finnhub", "crypto", symbol, res, from_ts, to_ts)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _finnhub_get("/crypto/candle", {
         "symbol": symbol,
         "resolution": res,
@@ -312,22 +289,16 @@ async def finnhub_crypto_candles(
         },
     }
 
-    ttl = 60 if res in ("1", "5", "15", "30", "60") else 300
-    cache_set(cache_key, result, ttl_seconds=ttl)
     return result
 
 
+@cached("finnhub", ttl_seconds=3600)
 async def finnhub_search(query: str) -> list[dict[str, Any]]:
     """
     Search for symbols by name or ticker.
 
     Returns up to 20 matches with symbol, description, and type.
     """
-    cache_key = make_cache_key("finnhub", "search", query)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _finnhub_get("/search", {"q": query})
 
     results = [
@@ -341,5 +312,4 @@ async def finnhub_search(query: str) -> list[dict[str, Any]]:
         for item in data.get("result", [])[:20]
     ]
 
-    cache_set(cache_key, results, ttl_seconds=3600)
     return results
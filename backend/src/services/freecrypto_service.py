@@ -11,7 +11,7 @@ import logging
 import re
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.utils.http_client import get_session
 
 logger = logging.getLogger(__name__)
@@ -40,6 +40,7 @@ async def _fc_get(path: str, params: dict[str, Any] | None = None) -> Any:
         return await resp.json(content_type=None)
 
 
+@cached("fc", ttl_seconds=30)
 async def freecrypto_price(symbol: str) -> dict[str, Any]:
     """
     Get current price for a cryptocurrency.
@@ -47,11 +48,6 @@ async def freecrypto_price(symbol: str) -> dict[str, Any]:
     Symbol: BTC, ETH, SOL, etc.
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("fc", "price", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _fc_get(f"/getData/{symbol}")
 
     coin_data = data.get("data", data)
@@ -66,10 +62,10 @@ async def freecrypto_price(symbol: str) -> dict[str, Any]:
         "provider": "freecryptoapi",
     }
 
-    cache_set(cache_key, result, ttl_seconds=30)
     return result
 
 
+@cached("fc", ttl_seconds=30)
 async def freecrypto_prices(symbols: list[str]) -> dict[str, Any]:
     """Get prices for multiple cryptocurrencies."""
     validated = [_validate_symbol(s) for s in symbols]
@@ -77,11 +73,6 @@ async def freecrypto_prices(symbols: list[str]) -> dict[str, Any]:
         raise ValueError("Maximum 50 symbols per request")
 
     symbols_str = ",".join(validated)
-    cache_key = make_cache_key("fc", "prices", symbols_str)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _fc_get(f"/getData/{symbols_str}")
 
     coins_data = data.get("data", data)
@@ -106,5 +97,4 @@ async def freecrypto_prices(symbols: list[str]) -> dict[str, Any]:
         "provider": "freecryptoapi",
     }
 
-    cache_set(cache_key, result, ttl_seconds=30)
     return result
@@ -99,7 +99,7 @@ def forecast_dcc(
         raise ValueError(f"n_steps must be in [1, 252], got {n_steps}")
 
     univariate_results = dcc_result["univariate_results"]
-    last_R = np.array(dcc_result["last_R"])
+    last_R = np.asarray(dcc_result["last_R"])
     n_assets = len(univariate_results)
 
     # Forecast individual volatilities
@@ -110,17 +110,15 @@ def forecast_dcc(
 
     vol_matrix = np.array(vol_forecasts)  # shape: (n_assets, n_steps)
 
-    # DCC mean-reverts to Q_bar; approximate by keeping last R constant
-    cov_matrices = []
-    for h in range(n_steps):
-        D_h = np.diag(vol_matrix[:, h])
-        cov_h = D_h @ last_R @ D_h
-        cov_matrices.append(cov_h.tolist())
+    # DCC mean-reverts to Q_bar; approximate by keeping last R constant:
+    # Σ_h = D_h R D_h for every horizon at once, shape (n_steps, n_assets, n_assets)
+    vols = vol_matrix.T
+    cov_matrices = vols[:, :, np.newaxis] * last_R * vols[:, np.newaxis, :]
 
     return {
         "covariance_matrices": cov_matrices,
-        "correlation_matrix": last_R.tolist(),
-        "volatility_forecasts": vol_matrix.tolist(),
+        "correlation_matrix": last_R,
+        "volatility_forecasts": vol_matrix,
         "n_steps": n_steps,
         "n_assets": n_assets,
     }
@@ -1,7 +1,8 @@
 """
 Facade for all GARCH operations.
 
-Provides async-safe methods that wrap CPU-bound MLE fitting in asyncio.to_thread().
+Provides async-safe methods: MLE fitting runs in the compute process pool
+(src.utils.compute_pool.offload), cheap filters in asyncio.to_thread().
 """
 import asyncio
 import logging
@@ -13,6 +14,7 @@ from src.services.garch.forecasting import forecast_dcc, forecast_volatility
 from src.services.garch.model_selection import arch_lm_test, compare_models, ljung_box_test
 from src.services.garch.multivariate import dcc_garch
 from src.services.garch.univariate import egarch, ewma, garch_11, gjr_garch
+from src.utils.compute_pool import offload
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +35,7 @@ class GarchService:
         params: dict[str, float] | None = None,
         initial_variance: float | None = None,
     ) -> dict[str, Any]:
-        """Fit a univariate GARCH model. Runs MLE in a thread to avoid blocking."""
+        """Fit a univariate GARCH model. Runs MLE in the compute pool to avoid blocking."""
         arr = np.array(returns, dtype=np.float64)
 
         if model == "ewma":
@@ -44,7 +46,7 @@ class GarchService:
         if model_fn is None:
             raise ValueError(f"Unknown model: {model}. Use: {[*MODEL_MAP.keys(), 'ewma']}")
 
-        return await asyncio.to_thread(model_fn, arr, params, initial_variance)
+        return await offload(model_fn, arr, params, initial_variance)
 
     @staticmethod
     async def forecast(
@@ -64,7 +66,7 @@ class GarchService:
             model_fn = MODEL_MAP.get(model)
             if model_fn is None:
                 raise ValueError(f"Unknown model: {model}")
-            fit_result = await asyncio.to_thread(model_fn, arr, params)
+            fit_result = await offload(model_fn, arr, params)
 
         fc = forecast_volatility(fit_result, n_steps=n_steps, confidence_levels=confidence_levels)
 
@@ -79,13 +81,14 @@ class GarchService:
         univariate_model: str = "garch_11",
         univariate_params: list[dict[str, float]] | None = None,
         dcc_params: dict[str, float] | None = None,
+        dcc_method: str = "auto",
         n_steps: int = 22,
     ) -> dict[str, Any]:
         """Fit DCC-GARCH and produce multivariate forecasts."""
-        arr = np.array(returns_matrix, dtype=np.float64)
+        arr = np.asarray(returns_matrix, dtype=np.float64)
 
         dcc_result = await asyncio.to_thread(
-            dcc_garch, arr, univariate_model, univariate_params, dcc_params
+            dcc_garch, arr, univariate_model, univariate_params, dcc_params, dcc_method
         )
 
         fc = forecast_dcc(dcc_result, n_steps=n_steps)
@@ -103,7 +106,7 @@ class GarchService:
         results = []
         for _name, fn in MODEL_MAP.items():
             try:
-                result = await asyncio.to_thread(fn, arr, None)
+                result = await offload(fn, arr, None)
                 results.append(result)
             except (ValueError, RuntimeError) as e:
                 logger.warning("GARCH model %s failed to fit: %s", _name, e)
@@ -0,0 +1,195 @@
+"""
+Likelihood kernels for univariate GARCH-family models.
+
+GARCH(1,1) and GJR-GARCH variance recursions are linear in sigma^2:
+    sigma_t^2 = x_t + beta * sigma_{t-1}^2,   x_t = omega + alpha * r_{t-1}^2 (+ gamma * I(r<0) * r_{t-1}^2)
+so the whole path is one IIR filter (scipy.signal.lfilter). The parameter
+derivatives d sigma_t^2 / d theta obey the same recursion with different
+drives, so the analytic score is a single filter over a (T, k) drive matrix.
+
+EGARCH is non-linear (z_t depends on sigma_t), so its recursion and the
+forward-mode derivatives run in one scalar loop over Python floats.
+
+Each *_nll function returns (negative log-likelihood, gradient) and can be
+passed to scipy.optimize.minimize with jac=True.
+"""
+import math
+
+import numpy as np
+from scipy.signal import lfilter
+
+VARIANCE_FLOOR = 1e-12
+LOG_VARIANCE_CLIP = 50.0
+EXPECTED_ABS_Z = math.sqrt(2.0 / math.pi)
+_LOG_2PI = math.log(2.0 * math.pi)
+
+
+def linear_variance_filter(drive: np.ndarray, beta: float) -> np.ndarray:
+    """y_0 = drive_0, y_t = drive_t + beta * y_{t-1} along axis 0."""
+    return lfilter([1.0], [1.0, -beta], drive, axis=0)
+
+
+def garch_variances(
+    returns: np.ndarray,
+    omega: float,
+    alpha: float,
+    beta: float,
+    var0: float,
+    gamma: float = 0.0,
+) -> np.ndarray:
+    """Conditional variance path of GARCH(1,1) (gamma=0) or GJR-GARCH."""
+    r2 = returns ** 2
+    drive = np.empty(len(returns))
+    drive[0] = var0
+    drive[1:] = omega + alpha * r2[:-1]
+    if gamma != 0.0:
+        drive[1:] += gamma * np.where(returns[:-1] < 0, r2[:-1], 0.0)
+    return np.maximum(linear_variance_filter(drive, beta), VARIANCE_FLOOR)
+
+
+def _gaussian_nll_and_weights(r2: np.ndarray, variances: np.ndarray) -> tuple[float, np.ndarray]:
+    """Gaussian NLL and its derivative w.r.t. each sigma_t^2."""
+    nll = 0.5 * (len(r2) * _LOG_2PI + np.sum(np.log(variances) + r2 / variances))
+    weights = 0.5 * (1.0 / variances - r2 / variances ** 2)
+    return float(nll), weights
+
+
+def garch_11_nll(params: np.ndarray, returns: np.ndarray, sample_var: float) -> tuple[float, np.ndarray]:
+    """GARCH(1,1) negative log-likelihood and analytic gradient w.r.t. (omega, alpha, beta)."""
+    omega, alpha, beta = params
+    return _linear_garch_nll(returns, sample_var, omega, alpha, beta, None)
+
+
+def gjr_nll(params: np.ndarray, returns: np.ndarray, sample_var: float) -> tuple[float, np.ndarray]:
+    """GJR-GARCH negative log-likelihood and analytic gradient w.r.t. (omega, alpha, beta, gamma)."""
+    omega, alpha, beta, gamma = params
+    return _linear_garch_nll(returns, sample_var, omega, alpha, beta, gamma)
+
+
+def _linear_garch_nll(
+    returns: np.ndarray,
+    sample_var: float,
+    omega: float,
+    alpha: float,
+    beta: float,
+    gamma: float | None,
+) -> tuple[float, np.ndarray]:
+    n = len(returns)
+    r2 = returns ** 2
+    n_params = 3 if gamma is None else 4
+    persistence = alpha + beta + (0.0 if gamma is None else gamma / 2.0)
+
+    # Initial variance: unconditional level if stationary, otherwise sample variance (constant)
+    dvar0 = np.zeros(n_params)
+    if persistence < 1.0:
+        var0 = omega / (1.0 - persistence)
+        dvar0[0] = 1.0 / (1.0 - persistence)
+        dvar0[1:3] = omega / (1.0 - persistence) ** 2
+        if gamma is not None:
+            dvar0[3] = 0.5 * omega / (1.0 - persistence) ** 2
+    else:
+        var0 = sample_var
+    if var0 < VARIANCE_FLOOR:
+        var0 = VARIANCE_FLOOR
+        dvar0[:] = 0.0
+
+    drive = np.empty((n, n_params + 1))
+    drive[0, 0] = var0
+    drive[1:, 0] = omega + alpha * r2[:-1]
+    if gamma is not None:
+        leverage = np.where(returns[:-1] < 0, r2[:-1], 0.0)
+        drive[1:, 0] += gamma * leverage
+    variances = linear_variance_filter(drive[:, 0], beta)
+
+    # d sigma_t^2 / d theta = x_t' + beta * d sigma_{t-1}^2 / d theta
+    drive[0, 1:] = dvar0
+    drive[1:, 1] = 1.0
+    drive[1:, 2] = r2[:-1]
+    drive[1:, 3] = variances[:-1]
+    if gamma is not None:
+        drive[1:, 4] = leverage
+    dvariances = linear_variance_filter(drive[:, 1:], beta)
+
+    floored = variances < VARIANCE_FLOOR
+    if np.any(floored):
+        variances = np.maximum(variances, VARIANCE_FLOOR)
+        dvariances[floored] = 0.0
+
+    nll, weights = _gaussian_nll_and_weights(r2, variances)
+    return nll, weights @ dvariances
+
+
+def egarch_log_variances(
+    returns: np.ndarray,
+    omega: float,
+    alpha: float,
+    beta: float,
+    gamma: float,
+    log_var0: float,
+) -> np.ndarray:
+    """EGARCH log-variance path with log-variance clipping to [-50, 50]."""
+    r = returns.tolist()
+    n = len(r)
+    out = [0.0] * n
+    lv = min(max(log_var0, -LOG_VARIANCE_CLIP), LOG_VARIANCE_CLIP)
+    out[0] = lv
+    sqrt_floor = math.sqrt(VARIANCE_FLOOR)
+    for t in range(1, n):
+        z = r[t - 1] / max(math.exp(0.5 * lv), sqrt_floor)
+        lv = omega + alpha * (abs(z) - EXPECTED_ABS_Z) + gamma * z + beta * lv
+        lv = min(max(lv, -LOG_VARIANCE_CLIP), LOG_VARIANCE_CLIP)
+        out[t] = lv
+    return np.array(out)
+
+
+def egarch_nll(params: np.ndarray, returns: np.ndarray, sample_var: float) -> tuple[float, np.ndarray]:
+    """EGARCH negative log-likelihood and forward-mode gradient w.r.t. (omega, alpha, beta, gamma)."""
+    omega, alpha, beta, gamma = (float(p) for p in params)
+    r = returns.tolist()
+    n = len(r)
+    clip = LOG_VARIANCE_CLIP
+    log_floor = math.log(VARIANCE_FLOOR)
+
+    if abs(beta) < 1.0:
+        lv = omega / (1.0 - beta)
+        d_om, d_al, d_be, d_ga = 1.0 / (1.0 - beta), 0.0, omega / (1.0 - beta) ** 2, 0.0
+    else:
+        lv = math.log(max(sample_var, VARIANCE_FLOOR))
+        d_om = d_al = d_be = d_ga = 0.0
+
+    nll = 0.5 * n * _LOG_2PI
+    g_om = g_al = g_be = g_ga = 0.0
+    for t in range(n):
+        if t > 0:
+            # sigma_{t-1} from the previous (clipped) log-variance
+            if lv >= log_floor:
+                z = r[t - 1] * math.exp(-0.5 * lv)
+                dz = -0.5 * z
+            else:
+                z = r[t - 1] / math.sqrt(VARIANCE_FLOOR)
+                dz = 0.0
+            slope = (alpha * ((z > 0) - (z < 0)) + gamma) * dz
+            lv_prev = lv
+            lv = omega + alpha * (abs(z) - EXPECTED_ABS_Z) + gamma * z + beta * lv_prev
+            d_om = 1.0 + slope * d_om + beta * d_om
+            d_al = (abs(z) - EXPECTED_ABS_Z) + slope * d_al + beta * d_al
+            d_be = lv_prev + slope * d_be + beta * d_be
+            d_ga = z + slope * d_ga + beta * d_ga
+
+        if lv > clip or lv < -clip:
+            lv = clip if lv > clip else -clip
+            d_om = d_al = d_be = d_ga = 0.0
+
+        r2 = r[t] * r[t]
+        if lv >= log_floor:
+            inv_var = math.exp(-lv)
+            nll += 0.5 * (lv + r2 * inv_var)
+            w = 0.5 * (1.0 - r2 * inv_var)
+            g_om += w * d_om
+            g_al += w * d_al
+            g_be += w * d_be
+            g_ga += w * d_ga
+        else:
+            nll += 0.5 * (log_floor + r2 / VARIANCE_FLOOR)
+
+    return nll, np.array([g_om, g_al, g_be, g_ga])
@@ -6,19 +6,30 @@ Two-step estimation:
 2. Estimate DCC parameters (a, b) from z_t:
    Q_t = (1-a-b) * Q_bar + a * z_{t-1} * z_{t-1}' + b * Q_{t-1}
    R_t = diag(Q_t)^{-1/2} * Q_t * diag(Q_t)^{-1/2}
+
+The Q_t recursion is linear, so it runs as an IIR filter over blocks of
+time steps stacked in (B, N, N) arrays; the likelihood uses batched
+Cholesky factors. Peak memory is bounded by DCC_BLOCK_BYTES.
+
+For large N the full likelihood (one N x N factorization per step) is
+replaced by the composite likelihood over contiguous pairs
+(Engle, Shephard & Sheppard 2008), which is O(T * N) per evaluation.
 """
 from typing import Any
 
 import numpy as np
 from scipy.optimize import minimize
+from scipy.signal import lfilter
 
 from src.services.garch.univariate import (
     VARIANCE_FLOOR,
     egarch,
     ewma,
+    fit_many,
     garch_11,
     gjr_garch,
 )
+from src.utils.progress import ProgressCallback, report, scaled
 
 MODEL_MAP = {
     "garch_11": garch_11,
@@ -27,12 +38,26 @@ MODEL_MAP = {
     "ewma": ewma,
 }
 
+DCC_METHODS = ("auto", "full", "composite")
+
+# Above this many assets "auto" switches to the pairwise composite likelihood
+COMPOSITE_MIN_ASSETS = 50
+
+# Fan the univariate stage out to a process pool from this many assets
+PARALLEL_MIN_ASSETS = 32
+
+# Memory budget for one block of stacked (B, N, N) Q_t matrices
+DCC_BLOCK_BYTES = 64 * 1024 * 1024
+
 
 def dcc_garch(
     returns_matrix: np.ndarray,
     univariate_model: str = "garch_11",
     univariate_params: list[dict[str, float]] | None = None,
     dcc_params: dict[str, float] | None = None,
+    dcc_method: str = "auto",
+    n_workers: int | None = None,
+    progress: ProgressCallback | None = None,
 ) -> dict[str, Any]:
     """
     Fit DCC-GARCH model to multivariate returns.
@@ -42,6 +67,13 @@ def dcc_garch(
         univariate_model: which univariate model to use per asset.
         univariate_params: optional pre-fitted params per asset.
         dcc_params: optional {"a": float, "b": float} for DCC. If None, MLE fit.
+        dcc_method: "full" likelihood, pairwise "composite" likelihood, or "auto"
+            (composite for N > COMPOSITE_MIN_ASSETS).
+        n_workers: compute-pool tasks for the univariate stage, capped by the
+            pool's worker count. None = all pool workers when
+            N >= PARALLEL_MIN_ASSETS, otherwise sequential.
+        progress: optional progress(fraction, message) callback, called per
+            univariate fit, per DCC optimizer iteration and between stages.
 
     Returns:
         Dict with univariate results, DCC params, correlation matrices, covariance matrices.
@@ -60,19 +92,28 @@ def dcc_garch(
     model_fn = MODEL_MAP.get(univariate_model)
     if model_fn is None:
         raise ValueError(f"Unknown model: {univariate_model}. Use: {list(MODEL_MAP.keys())}")
+    if dcc_method not in DCC_METHODS:
+        raise ValueError(f"Unknown dcc_method: {dcc_method}. Use: {list(DCC_METHODS)}")
 
     # Step 1: Fit univariate models
-    univariate_results = []
-    standardized_residuals = np.zeros((T, N))
-
-    for i in range(N):
-        asset_returns = returns_matrix[:, i]
-        params_i = univariate_params[i] if univariate_params else None
+    if univariate_params:
+        univariate_results = [
+            model_fn(returns_matrix[:, i]) if univariate_model == "ewma"
+            else model_fn(returns_matrix[:, i], params=univariate_params[i])
+            for i in range(N)
+        ]
+    else:
+        if n_workers is None:
+            n_workers = N if N >= PARALLEL_MIN_ASSETS else 1
+        univariate_results = fit_many(
+            returns_matrix, univariate_model, n_workers=n_workers,
+            progress=scaled(progress, 0.0, 0.5),
+        )
 
-        result = model_fn(asset_returns) if univariate_model == "ewma" else model_fn(asset_returns, params=params_i)
+    standardized_residuals = np.column_stack([r["residuals"] for r in univariate_results])
+    variances = np.column_stack([r["variances"] for r in univariate_results])
 
-        univariate_results.append(result)
-        standardized_residuals[:, i] = result["residuals"]
+    report(progress, 0.5, "univariate fits")
 
     # Step 2: DCC estimation
     Q_bar = np.corrcoef(standardized_residuals.T)
@@ -81,92 +122,178 @@ def dcc_garch(
     if np.min(eigvals) < 1e-8:
         Q_bar += np.eye(N) * 1e-6
 
+    if dcc_method == "auto":
+        dcc_method = "composite" if N > COMPOSITE_MIN_ASSETS else "full"
+
     if dcc_params is None:
-        dcc_params = _fit_dcc_mle(standardized_residuals, Q_bar)
+        dcc_params = _fit_dcc_mle(
+            standardized_residuals, Q_bar, dcc_method, progress=scaled(progress, 0.5, 0.9),
+        )
+    report(progress, 0.9, "DCC estimation")
 
     a = dcc_params["a"]
     b = dcc_params["b"]
 
-    # Step 3: Compute time-varying correlations
-    Q_t = Q_bar.copy()
-    correlations = np.zeros((T, N, N))
-    covariances = np.zeros((T, N, N))
-
-    for t in range(T):
-        if t > 0:
-            z_outer = np.outer(standardized_residuals[t - 1], standardized_residuals[t - 1])
-            Q_t = (1 - a - b) * Q_bar + a * z_outer + b * Q_t
-
-        # Normalize Q_t -> R_t
-        Q_diag_inv_sqrt = np.diag(1.0 / np.sqrt(np.maximum(np.diag(Q_t), VARIANCE_FLOOR)))
-        R_t = Q_diag_inv_sqrt @ Q_t @ Q_diag_inv_sqrt
-
-        # Clip to valid correlation range
-        np.fill_diagonal(R_t, 1.0)
-        R_t = np.clip(R_t, -1.0, 1.0)
-
-        correlations[t] = R_t
-
-        # Build covariance matrix: D_t * R_t * D_t
-        vols_t = np.array([
-            np.sqrt(max(univariate_results[i]["variances"][t], VARIANCE_FLOOR))
-            for i in range(N)
-        ])
-        D_t = np.diag(vols_t)
-        covariances[t] = D_t @ R_t @ D_t
-
-    # Return last few correlations and summary
-    last_R = correlations[-1]
+    # Step 3: Time-varying correlations (only the tail is returned)
+    n_tail = min(T, 10)
+    t0 = T - n_tail
+    Q_t = _q_at(standardized_residuals, Q_bar, a, b, t0)
+    correlations_tail = np.empty((n_tail, N, N))
+    for k, t in enumerate(range(t0, T)):
+        if t > t0:
+            z_prev = standardized_residuals[t - 1]
+            Q_t = (1 - a - b) * Q_bar + a * np.outer(z_prev, z_prev) + b * Q_t
+        correlations_tail[k] = _normalize_q(Q_t[np.newaxis])[0]
+
+    last_R = correlations_tail[-1]
+    vols_last = np.sqrt(np.maximum(variances[-1], VARIANCE_FLOOR))
+    covariance_last = last_R * np.outer(vols_last, vols_last)
 
     return {
         "univariate_results": univariate_results,
         "dcc_params": {"a": a, "b": b},
-        "Q_bar": Q_bar.tolist(),
-        "last_R": last_R.tolist(),
-        "correlations_last_10": correlations[-10:].tolist() if T >= 10 else correlations.tolist(),
-        "covariances_last": covariances[-1].tolist(),
+        "dcc_method": dcc_method,
+        "Q_bar": Q_bar,
+        "last_R": last_R,
+        "correlations_last_10": correlations_tail,
+        "covariances_last": covariance_last,
         "n_assets": N,
         "n_obs": T,
     }
 
 
-def _fit_dcc_mle(z: np.ndarray, Q_bar: np.ndarray) -> dict[str, float]:
-    """Estimate DCC parameters (a, b) via MLE on standardized residuals."""
-    T, _N = z.shape
+# ---------- Batched Q_t recursion ----------
 
-    def neg_ll(params: np.ndarray) -> float:
-        a, b = params
-        if a + b >= 0.9999 or a < 0 or b < 0:
-            return 1e10
+def _block_size(n_assets: int) -> int:
+    return max(1, DCC_BLOCK_BYTES // (8 * n_assets * n_assets))
 
-        Q_t = Q_bar.copy()
-        ll = 0.0
-        for t in range(1, T):
-            z_outer = np.outer(z[t - 1], z[t - 1])
-            Q_t = (1 - a - b) * Q_bar + a * z_outer + b * Q_t
-
-            Q_diag = np.diag(Q_t)
-            Q_diag = np.maximum(Q_diag, VARIANCE_FLOOR)
-            Q_diag_inv_sqrt = 1.0 / np.sqrt(Q_diag)
-            R_t = Q_t * np.outer(Q_diag_inv_sqrt, Q_diag_inv_sqrt)
-            np.fill_diagonal(R_t, 1.0)
-
-            # DCC log-likelihood contribution
-            try:
-                sign, logdet = np.linalg.slogdet(R_t)
-                if sign <= 0:
-                    return 1e10
-                z_t = z[t]
-                ll += -0.5 * (logdet + z_t @ np.linalg.solve(R_t, z_t) - z_t @ z_t)
-            except np.linalg.LinAlgError:
-                return 1e10
-
-        return -ll
+
+def _iter_q_blocks(z: np.ndarray, Q_bar: np.ndarray, a: float, b: float):
+    """
+    Yield (start, stop, Q[start:stop]) covering t = 0..T-1 in memory-bounded blocks.
+
+    Q_0 = Q_bar; for t >= 1 the recursion is y_t = x_t + b * y_{t-1} with
+    x_t = (1-a-b) * Q_bar + a * z_{t-1} z_{t-1}', evaluated elementwise by lfilter.
+    """
+    T, N = z.shape
+    block = _block_size(N)
+    yield 0, 1, Q_bar[np.newaxis]
+    Q_prev = Q_bar
+    for start in range(1, T, block):
+        stop = min(start + block, T)
+        z_lag = z[start - 1:stop - 1]
+        drive = a * (z_lag[:, :, np.newaxis] * z_lag[:, np.newaxis, :])
+        drive += (1 - a - b) * Q_bar
+        drive[0] += b * Q_prev
+        Q = lfilter([1.0], [1.0, -b], drive, axis=0)
+        yield start, stop, Q
+        Q_prev = Q[-1]
+
+
+def _q_at(z: np.ndarray, Q_bar: np.ndarray, a: float, b: float, t: int) -> np.ndarray:
+    """
+    Q_t in closed form without materializing the path:
+    Q_t = b^t Q_bar + (1-a-b) Q_bar sum_{s=1..t} b^{t-s} + a Z' diag(b^{t-s}) Z.
+    """
+    if t == 0:
+        return Q_bar.copy()
+    decay = b ** np.arange(t - 1, -1, -1, dtype=np.float64)  # b^{t-s}, s = 1..t
+    z_lag = z[:t]
+    return (b ** t + (1 - a - b) * decay.sum()) * Q_bar + a * (z_lag.T * decay) @ z_lag
+
+
+def _normalize_q(Q: np.ndarray) -> np.ndarray:
+    """R_t = diag(Q_t)^{-1/2} Q_t diag(Q_t)^{-1/2} for a (B, N, N) stack."""
+    d = 1.0 / np.sqrt(np.maximum(np.diagonal(Q, axis1=1, axis2=2), VARIANCE_FLOOR))
+    R = Q * d[:, :, np.newaxis] * d[:, np.newaxis, :]
+    idx = np.arange(Q.shape[1])
+    R[:, idx, idx] = 1.0
+    return np.clip(R, -1.0, 1.0)
+
+
+# ---------- DCC likelihoods ----------
+
+def _dcc_neg_ll_full(params: np.ndarray, z: np.ndarray, Q_bar: np.ndarray) -> float:
+    """Full DCC correlation likelihood with batched Cholesky per block of time steps."""
+    a, b = params
+    if a + b >= 0.9999 or a < 0 or b < 0:
+        return 1e10
+
+    ll = 0.0
+    for start, stop, Q in _iter_q_blocks(z, Q_bar, a, b):
+        if start == 0:
+            continue  # likelihood starts at t = 1
+        R = _normalize_q(Q)
+        try:
+            L = np.linalg.cholesky(R)
+        except np.linalg.LinAlgError:
+            return 1e10
+        z_t = z[start:stop]
+        logdet = 2.0 * np.sum(np.log(np.diagonal(L, axis1=1, axis2=2)), axis=1)
+        # z_t' R_t^{-1} z_t = ||L_t^{-1} z_t||^2
+        w = np.linalg.solve(L, z_t[:, :, np.newaxis])[:, :, 0]
+        quad = np.einsum("ti,ti->t", w, w)
+        ll += -0.5 * float(np.sum(logdet + quad - np.einsum("ti,ti->t", z_t, z_t)))
+    return -ll
+
+
+def _dcc_neg_ll_composite(params: np.ndarray, z: np.ndarray, Q_bar: np.ndarray) -> float:
+    """Composite likelihood over contiguous pairs (i, i+1); each pair is a 2 x 2 DCC."""
+    a, b = params
+    if a + b >= 0.9999 or a < 0 or b < 0:
+        return 1e10
+
+    N = z.shape[1]
+    i, j = np.arange(N - 1), np.arange(1, N)
+    z_lag = z[:-1]
+
+    # Scalar recursions for q_ii and q_{i,i+1}; Q_0 = Q_bar
+    q_bar = np.concatenate([np.diag(Q_bar), Q_bar[i, j]])
+    innov = np.concatenate([z_lag ** 2, z_lag[:, i] * z_lag[:, j]], axis=1)
+    drive = np.empty((len(z), len(q_bar)))
+    drive[0] = q_bar
+    drive[1:] = (1 - a - b) * q_bar + a * innov
+    q = lfilter([1.0], [1.0, -b], drive, axis=0)[1:]
+
+    q_diag = np.maximum(q[:, :N], VARIANCE_FLOOR)
+    rho = q[:, N:] / np.sqrt(q_diag[:, i] * q_diag[:, j])
+    one_minus_rho2 = 1.0 - rho ** 2
+    if np.any(one_minus_rho2 <= 0):
+        return 1e10
+
+    zi, zj = z[1:, i], z[1:, j]
+    ll = -0.5 * np.sum(
+        np.log(one_minus_rho2)
+        + (zi ** 2 + zj ** 2 - 2.0 * rho * zi * zj) / one_minus_rho2
+        - zi ** 2 - zj ** 2
+    )
+    return -float(ll)
+
+
+def _fit_dcc_mle(
+    z: np.ndarray,
+    Q_bar: np.ndarray,
+    method: str = "full",
+    progress: ProgressCallback | None = None,
+) -> dict[str, float]:
+    """Estimate DCC parameters (a, b) via (composite) MLE on standardized residuals.
+
+    progress is called after every optimizer iteration (fraction of maxiter).
+    """
+    neg_ll = _dcc_neg_ll_composite if method == "composite" else _dcc_neg_ll_full
 
     x0 = np.array([0.05, 0.90])
     bounds = [(1e-6, 0.3), (0.5, 0.999)]
+    maxiter = 200
+    iterations = 0
+
+    def on_iteration(xk: np.ndarray) -> None:
+        nonlocal iterations
+        iterations += 1
+        report(progress, iterations / maxiter, f"DCC iteration {iterations}")
 
-    result = minimize(neg_ll, x0, method="L-BFGS-B", bounds=bounds,
-                      options={"maxiter": 200, "ftol": 1e-8})
+    result = minimize(neg_ll, x0, args=(z, Q_bar), method="L-BFGS-B", bounds=bounds,
+                      callback=on_iteration if progress is not None else None,
+                      options={"maxiter": maxiter, "ftol": 1e-8})
 
     return {"a": float(result.x[0]), "b": float(result.x[1])}
@@ -2,7 +2,7 @@
 Univariate GARCH models: GARCH(1,1), GJR-GARCH, EGARCH, EWMA.
 
 Each model supports two modes:
-- params=None -> MLE fitting via L-BFGS-B
+- params=None -> MLE fitting via L-BFGS-B with analytic gradients (see kernels.py)
 - params=dict  -> forward pass only (skip fitting)
 
 All return log_likelihood for AIC/BIC comparison.
@@ -12,9 +12,21 @@ from typing import Any
 import numpy as np
 from scipy.optimize import minimize
 
-VARIANCE_FLOOR = 1e-12
-
-
+from src.services.garch.kernels import (
+    VARIANCE_FLOOR,
+    egarch_log_variances,
+    egarch_nll,
+    garch_11_nll,
+    garch_variances,
+    gjr_nll,
+    linear_variance_filter,
+)
+from src.utils import compute_pool
+from src.utils.compute_pool import cpu_bound
+from src.utils.progress import ProgressCallback, report
+
+
+@cpu_bound
 def garch_11(
     returns: np.ndarray,
     params: dict[str, float] | None = None,
@@ -27,6 +39,7 @@ def garch_11(
     return _forward_garch_11(returns, params, initial_variance)
 
 
+@cpu_bound
 def gjr_garch(
     returns: np.ndarray,
     params: dict[str, float] | None = None,
@@ -39,6 +52,7 @@ def gjr_garch(
     return _forward_gjr(returns, params, initial_variance)
 
 
+@cpu_bound
 def egarch(
     returns: np.ndarray,
     params: dict[str, float] | None = None,
@@ -66,11 +80,10 @@ def ewma(
     var0 = initial_variance if initial_variance is not None else float(np.var(returns))
     var0 = max(var0, VARIANCE_FLOOR)
 
-    variances = np.zeros(n)
-    variances[0] = var0
-    for t in range(1, n):
-        variances[t] = lam * variances[t - 1] + (1 - lam) * returns[t - 1] ** 2
-        variances[t] = max(variances[t], VARIANCE_FLOOR)
+    drive = np.empty(n)
+    drive[0] = var0
+    drive[1:] = (1 - lam) * returns[:-1] ** 2
+    variances = np.maximum(linear_variance_filter(drive, lam), VARIANCE_FLOOR)
 
     volatilities = np.sqrt(variances)
     residuals = returns / volatilities
@@ -110,11 +123,7 @@ def _forward_garch_11(
         var0 = float(np.var(returns))
     var0 = max(var0, VARIANCE_FLOOR)
 
-    variances = np.zeros(n)
-    variances[0] = var0
-    for t in range(1, n):
-        variances[t] = omega + alpha * returns[t - 1] ** 2 + beta * variances[t - 1]
-        variances[t] = max(variances[t], VARIANCE_FLOOR)
+    variances = garch_variances(returns, omega, alpha, beta, var0)
 
     volatilities = np.sqrt(variances)
     residuals = returns / volatilities
@@ -157,13 +166,7 @@ def _forward_gjr(
         var0 = float(np.var(returns))
     var0 = max(var0, VARIANCE_FLOOR)
 
-    variances = np.zeros(n)
-    variances[0] = var0
-    for t in range(1, n):
-        r2 = returns[t - 1] ** 2
-        leverage = float(returns[t - 1] < 0) * r2
-        variances[t] = omega + alpha * r2 + gamma * leverage + beta * variances[t - 1]
-        variances[t] = max(variances[t], VARIANCE_FLOOR)
+    variances = garch_variances(returns, omega, alpha, beta, var0, gamma=gamma)
 
     volatilities = np.sqrt(variances)
     residuals = returns / volatilities
@@ -197,8 +200,6 @@ def _forward_egarch(
     if n < 2:
         raise ValueError(f"Need >= 2 observations, got {n}")
 
-    expected_abs_z = np.sqrt(2.0 / np.pi)
-
     if initial_variance is not None:
         log_var0 = np.log(max(initial_variance, VARIANCE_FLOOR))
     elif abs(beta) < 1.0:
@@ -206,19 +207,7 @@ def _forward_egarch(
     else:
         log_var0 = np.log(max(float(np.var(returns)), VARIANCE_FLOOR))
 
-    log_variances = np.zeros(n)
-    log_variances[0] = np.clip(log_var0, -50, 50)
-
-    for t in range(1, n):
-        vt_prev = np.exp(log_variances[t - 1])
-        z = returns[t - 1] / np.sqrt(max(vt_prev, VARIANCE_FLOOR))
-        log_variances[t] = np.clip(
-            omega
-            + alpha * (abs(z) - expected_abs_z)
-            + gamma * z
-            + beta * log_variances[t - 1],
-            -50, 50,
-        )
+    log_variances = egarch_log_variances(returns, omega, alpha, beta, gamma, float(log_var0))
 
     variances = np.exp(log_variances)
     variances = np.maximum(variances, VARIANCE_FLOOR)
@@ -248,46 +237,53 @@ def _fit_mle(returns: np.ndarray, model: str) -> dict[str, float]:
     if n < 10:
         raise ValueError(f"MLE requires >= 10 observations, got {n}")
 
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
     sample_var = float(np.var(returns))
 
+    # omega is optimized in units of the sample variance so that all
+    # coordinates of the analytic gradient are of comparable magnitude
+    scale = np.array([sample_var, 1.0, 1.0, 1.0])
+
     if model == "garch_11":
-        x0 = np.array([sample_var * 0.05, 0.08, 0.88])
-        bounds = [(1e-8, sample_var * 10), (1e-6, 0.999), (1e-6, 0.999)]
+        x0 = np.array([0.05, 0.08, 0.88])
+        bounds = [(1e-8 / sample_var, 10.0), (1e-6, 0.999), (1e-6, 0.999)]
 
-        def obj(p: np.ndarray) -> float:
-            if p[1] + p[2] >= 0.9999:
-                return 1e10
-            return _neg_ll_garch_11(p, returns)
+        def obj(q: np.ndarray) -> tuple[float, np.ndarray]:
+            if q[1] + q[2] >= 0.9999:
+                return 1e10, np.zeros(3)
+            p = q * scale[:3]
+            value, grad = garch_11_nll(p, returns, sample_var)
+            return value, grad * scale[:3]
 
-        result = minimize(obj, x0, method="L-BFGS-B", bounds=bounds,
+        result = minimize(obj, x0, method="L-BFGS-B", jac=True, bounds=bounds,
                           options={"maxiter": 500, "ftol": 1e-10})
-        return {"omega": float(result.x[0]), "alpha": float(result.x[1]), "beta": float(result.x[2])}
+        p = result.x * scale[:3]
+        return {"omega": float(p[0]), "alpha": float(p[1]), "beta": float(p[2])}
 
     if model == "gjr_garch":
-        x0 = np.array([sample_var * 0.05, 0.05, 0.85, 0.05])
-        bounds = [(1e-8, sample_var * 10), (1e-6, 0.5), (1e-6, 0.999), (1e-6, 0.5)]
+        x0 = np.array([0.05, 0.05, 0.85, 0.05])
+        bounds = [(1e-8 / sample_var, 10.0), (1e-6, 0.5), (1e-6, 0.999), (1e-6, 0.5)]
 
-        def obj(p: np.ndarray) -> float:
-            if p[1] + p[2] + p[3] / 2.0 >= 0.9999:
-                return 1e10
-            return _neg_ll_gjr(p, returns)
+        def obj(q: np.ndarray) -> tuple[float, np.ndarray]:
+            if q[1] + q[2] + q[3] / 2.0 >= 0.9999:
+                return 1e10, np.zeros(4)
+            value, grad = gjr_nll(q * scale, returns, sample_var)
+            return value, grad * scale
 
-        result = minimize(obj, x0, method="L-BFGS-B", bounds=bounds,
+        result = minimize(obj, x0, method="L-BFGS-B", jac=True, bounds=bounds,
                           options={"maxiter": 500, "ftol": 1e-10})
+        p = result.x * scale
         return {
-            "omega": float(result.x[0]), "alpha": float(result.x[1]),
-            "beta": float(result.x[2]), "gamma": float(result.x[3]),
+            "omega": float(p[0]), "alpha": float(p[1]),
+            "beta": float(p[2]), "gamma": float(p[3]),
         }
 
     if model == "egarch":
         x0 = np.array([np.log(sample_var) * 0.05, 0.15, 0.95, -0.05])
         bounds = [(-10.0, 10.0), (-2.0, 2.0), (-0.999, 0.999), (-2.0, 2.0)]
 
-        def obj(p: np.ndarray) -> float:
-            return _neg_ll_egarch(p, returns)
-
-        result = minimize(obj, x0, method="L-BFGS-B", bounds=bounds,
-                          options={"maxiter": 500, "ftol": 1e-10})
+        result = minimize(egarch_nll, x0, args=(returns, sample_var), method="L-BFGS-B", jac=True,
+                          bounds=bounds, options={"maxiter": 500, "ftol": 1e-10})
         return {
             "omega": float(result.x[0]), "alpha": float(result.x[1]),
             "beta": float(result.x[2]), "gamma": float(result.x[3]),
@@ -296,61 +292,67 @@ def _fit_mle(returns: np.ndarray, model: str) -> dict[str, float]:
     raise ValueError(f"Unknown model: {model}")
 
 
-# ---------- Negative log-likelihood functions ----------
-
-def _neg_ll_garch_11(params_vec: np.ndarray, returns: np.ndarray) -> float:
-    omega, alpha, beta = params_vec
-    n = len(returns)
-    var0 = omega / (1.0 - alpha - beta) if alpha + beta < 1.0 else float(np.var(returns))
-    var0 = max(var0, VARIANCE_FLOOR)
-
-    variances = np.zeros(n)
-    variances[0] = var0
-    for t in range(1, n):
-        variances[t] = omega + alpha * returns[t - 1] ** 2 + beta * variances[t - 1]
-        variances[t] = max(variances[t], VARIANCE_FLOOR)
-
-    return -_gaussian_log_likelihood(returns, variances)
-
-
-def _neg_ll_gjr(params_vec: np.ndarray, returns: np.ndarray) -> float:
-    omega, alpha, beta, gamma = params_vec
-    n = len(returns)
-    persistence = alpha + beta + gamma / 2.0
-    var0 = omega / (1.0 - persistence) if persistence < 1.0 else float(np.var(returns))
-    var0 = max(var0, VARIANCE_FLOOR)
-
-    variances = np.zeros(n)
-    variances[0] = var0
-    for t in range(1, n):
-        r2 = returns[t - 1] ** 2
-        leverage = float(returns[t - 1] < 0) * r2
-        variances[t] = omega + alpha * r2 + gamma * leverage + beta * variances[t - 1]
-        variances[t] = max(variances[t], VARIANCE_FLOOR)
-
-    return -_gaussian_log_likelihood(returns, variances)
-
-
-def _neg_ll_egarch(params_vec: np.ndarray, returns: np.ndarray) -> float:
-    omega, alpha, beta, gamma = params_vec
-    n = len(returns)
-    expected_abs_z = np.sqrt(2.0 / np.pi)
-
-    log_var0 = omega / (1.0 - beta) if abs(beta) < 1.0 else np.log(max(float(np.var(returns)), VARIANCE_FLOOR))
-
-    log_variances = np.zeros(n)
-    log_variances[0] = log_var0
-    for t in range(1, n):
-        # Clamp log-variance to prevent exp overflow
-        log_variances[t - 1] = np.clip(log_variances[t - 1], -50, 50)
-        vt_prev = np.exp(log_variances[t - 1])
-        z = returns[t - 1] / np.sqrt(max(vt_prev, VARIANCE_FLOOR))
-        log_variances[t] = omega + alpha * (abs(z) - expected_abs_z) + gamma * z + beta * log_variances[t - 1]
-
-    log_variances = np.clip(log_variances, -50, 50)
-    variances = np.exp(log_variances)
-    variances = np.maximum(variances, VARIANCE_FLOOR)
-    return -_gaussian_log_likelihood(returns, variances)
+# ---------- Batch fitting ----------
+
+FIT_MANY_MODELS = {
+    "garch_11": garch_11,
+    "gjr_garch": gjr_garch,
+    "egarch": egarch,
+}
+
+
+def fit_many(
+    returns_matrix: np.ndarray,
+    model: str = "garch_11",
+    n_workers: int | None = 1,
+    progress: ProgressCallback | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Fit the same univariate model to every column of a (T, N) returns panel.
+
+    Returns one result dict per column, identical to calling the model function
+    on that column with params=None. Columns are independent, so with
+    n_workers > 1 (None = all pool workers) contiguous blocks of columns are
+    fitted as tasks on the shared compute pool, capped by its worker count.
+    progress is called after every column (inline) or every finished block.
+    """
+    returns_matrix = np.asarray(returns_matrix, dtype=np.float64)
+    if returns_matrix.ndim != 2:
+        raise ValueError("returns_matrix must be 2D (T x N)")
+    if model != "ewma" and model not in FIT_MANY_MODELS:
+        raise ValueError(f"Unknown model: {model}. Use: {[*FIT_MANY_MODELS.keys(), 'ewma']}")
+
+    n_assets = returns_matrix.shape[1]
+    n_workers = compute_pool.fan_out_width(min(n_workers or n_assets, n_assets))
+    if n_workers <= 1:
+        return _fit_columns(model, returns_matrix, progress)
+
+    blocks = [
+        (model, np.ascontiguousarray(returns_matrix[:, cols[0]:cols[-1] + 1]))
+        for cols in np.array_split(np.arange(n_assets), n_workers)
+    ]
+    assets_done = np.cumsum([block.shape[1] for _, block in blocks])
+
+    def on_done(completed: int, total: int) -> None:
+        report(progress, completed / total, f"{assets_done[completed - 1]}/{n_assets} assets fitted")
+
+    chunks = compute_pool.run_tasks(_fit_columns, blocks, on_done=on_done)
+    return [result for chunk in chunks for result in chunk]
+
+
+def _fit_columns(
+    model: str,
+    returns_block: np.ndarray,
+    progress: ProgressCallback | None = None,
+) -> list[dict[str, Any]]:
+    """Pool worker: fit every column of a (T, k) block (module-level so it can be pickled)."""
+    fit = ewma if model == "ewma" else FIT_MANY_MODELS[model]
+    n_assets = returns_block.shape[1]
+    results = []
+    for i in range(n_assets):
+        results.append(fit(np.ascontiguousarray(returns_block[:, i])))
+        report(progress, (i + 1) / n_assets, f"{i + 1}/{n_assets} assets fitted")
+    return results
 
 
 # ---------- Helpers ----------
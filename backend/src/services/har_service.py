@@ -12,30 +12,43 @@
 """
 
 import numpy as np
+import scipy.signal
 import scipy.stats
 
+from src.utils.compute_pool import cpu_bound
+
+HAR_LAGS = 22  # первые 22 наблюдения уходят на формирование лагов
+
 # ── Построение регрессоров HAR ────────────────────────────────────────────────
 
+def _trailing_means(x: np.ndarray, start: int = HAR_LAGS) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Дневной лаг и скользящие средние за 5 и 22 дня, предшествующие t = start..T−1.
+
+    Средние берутся разностями кумулятивной суммы: x̄_{t-w} = (Cₜ − Cₜ₋w)/w.
+    Работает по последней оси, поэтому x может быть панелью N × T.
+    """
+    T = x.shape[-1]
+    csum = np.zeros((*x.shape[:-1], T + 1))
+    np.cumsum(x, axis=-1, out=csum[..., 1:])
+    t = np.arange(start, T)
+    daily = x[..., t - 1]
+    weekly = (csum[..., t] - csum[..., t - 5]) / 5.0
+    monthly = (csum[..., t] - csum[..., t - 22]) / 22.0
+    return daily, weekly, monthly
+
+
 def _build_har_features(rv: np.ndarray) -> tuple[np.ndarray, int]:
     """
     Строит матрицу регрессоров [1, RV_{t-1}, RV̄_{t-5}, RV̄_{t-22}].
     Первые 22 наблюдения теряются для формирования лагов.
 
     Returns:
-        X: матрица регрессоров (T-22) × 4
+        X: матрица регрессоров (T-22) × 4 (для панели N × T — N × (T-22) × 4)
         start: индекс первого используемого таргета
     """
-    T = len(rv)
-    start = 22
-    n = T - start
-
-    X = np.ones((n, 4))
-    for i in range(n):
-        t = i + start
-        X[i, 1] = rv[t - 1]                          # дневной лаг
-        X[i, 2] = np.mean(rv[t - 5: t])              # недельный (5 дней)
-        X[i, 3] = np.mean(rv[t - 22: t])             # месячный (22 дня)
-    return X, start
+    daily, weekly, monthly = _trailing_means(rv)
+    return np.stack([np.ones_like(daily), daily, weekly, monthly], axis=-1), HAR_LAGS
 
 
 def _build_har_cj_features(rv: np.ndarray, bv: np.ndarray) -> tuple[np.ndarray, int]:
@@ -44,113 +57,137 @@ def _build_har_cj_features(rv: np.ndarray, bv: np.ndarray) -> tuple[np.ndarray,
     [1, C_{t-1}, J_{t-1}, C̄_{t-5}, C̄_{t-22}]
     где C_t = BV_t (continuous), J_t = max(RV_t − BV_t, 0) (jump)
     """
-    C = bv.copy()
+    C = bv
     J = np.maximum(rv - bv, 0.0)
 
-    T = len(rv)
-    start = 22
-    n = T - start
+    c_daily, c_weekly, c_monthly = _trailing_means(C)
+    j_daily = J[..., HAR_LAGS - 1:-1]
+    return np.stack([np.ones_like(c_daily), c_daily, j_daily, c_weekly, c_monthly], axis=-1), HAR_LAGS
+
 
-    X = np.ones((n, 5))
-    for i in range(n):
-        t = i + start
-        X[i, 1] = C[t - 1]
-        X[i, 2] = J[t - 1]
-        X[i, 3] = np.mean(C[t - 5: t])
-        X[i, 4] = np.mean(C[t - 22: t])
-    return X, start
+def _log_features(X: np.ndarray) -> np.ndarray:
+    """Log-HAR: логарифм всех регрессоров, кроме константы."""
+    X_log = X.copy()
+    X_log[..., 1:] = np.log(np.maximum(X[..., 1:], 1e-15))
+    return X_log
 
 
 # ── OLS с Newey-West HAC SE ───────────────────────────────────────────────────
 
-def _ols_newey_west(X: np.ndarray, y: np.ndarray, lags: int = 5) -> dict:
+def _ols_hac(X: np.ndarray, y: np.ndarray, lags: int = 5) -> dict:
     """
-    OLS оценка с HAC стандартными ошибками (Newey-West 1987).
+    OLS с HAC ковариацией для одной (n × k) или пачки (N × n × k) регрессий.
 
     Var_NW = (XᵀX)⁻¹ · S_NW · (XᵀX)⁻¹
     S_NW = Γ₀ + Σ_{h=1}^{L} w_h · (Γ_h + Γ_hᵀ)
     w_h = 1 − h/(L+1)  (веса Бартлетта)
+
+    Σ_h w_h Γ_h = Σₜ sₜ zₜᵀ, где zₜ = Σ_h w_h sₜ₋h — КИХ-фильтр по скорам,
+    поэтому вся сумма по лагам считается одним проходом lfilter.
     """
-    n, k = X.shape
+    n, k = X.shape[-2:]
+    Xt = np.swapaxes(X, -1, -2)
     # OLS β = (XᵀX)⁻¹ Xᵀy
-    XtX = X.T @ X
+    XtX = Xt @ X
     try:
         XtX_inv = np.linalg.inv(XtX)
     except np.linalg.LinAlgError:
         XtX_inv = np.linalg.pinv(XtX)
 
-    beta = XtX_inv @ (X.T @ y)
-    resid = y - X @ beta
-    fitted = X @ beta
+    beta = (XtX_inv @ (Xt @ y[..., None]))[..., 0]
+    fitted = (X @ beta[..., None])[..., 0]
+    resid = y - fitted
 
     # R²
-    ss_res = float(np.sum(resid ** 2))
-    ss_tot = float(np.sum((y - np.mean(y)) ** 2))
-    r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
+    ss_res = np.sum(resid ** 2, axis=-1)
+    ss_tot = np.sum((y - np.mean(y, axis=-1, keepdims=True)) ** 2, axis=-1)
+    r2 = np.where(ss_tot > 0, 1.0 - ss_res / np.where(ss_tot > 0, ss_tot, 1.0), 0.0)
     r2_adj = 1.0 - (1.0 - r2) * (n - 1) / (n - k - 1) if n > k + 1 else r2
 
     # Newey-West HAC
-    scores = resid[:, None] * X  # n × k
-    S = scores.T @ scores  # Γ₀
-    for h in range(1, lags + 1):
-        w = 1.0 - h / (lags + 1.0)
-        gamma_h = scores[h:].T @ scores[:-h]
-        S += w * (gamma_h + gamma_h.T)
+    scores = resid[..., None] * X  # n × k
+    weights = np.concatenate(([0.0], 1.0 - np.arange(1, lags + 1) / (lags + 1.0)))
+    smoothed = scipy.signal.lfilter(weights, [1.0], scores, axis=-2)
+    cross = np.swapaxes(scores, -1, -2) @ smoothed
+    S = np.swapaxes(scores, -1, -2) @ scores + cross + np.swapaxes(cross, -1, -2)
 
     vcov = XtX_inv @ S @ XtX_inv
-    se = np.sqrt(np.maximum(np.diag(vcov), 0.0))
+    se = np.sqrt(np.maximum(np.diagonal(vcov, axis1=-2, axis2=-1), 0.0))
     t_stats = beta / (se + 1e-15)
     p_values = 2.0 * (1.0 - scipy.stats.t.cdf(np.abs(t_stats), df=n - k))
 
     return {
-        "beta": beta.tolist(),
-        "se": se.tolist(),
-        "t_stat": t_stats.tolist(),
-        "p_value": p_values.tolist(),
-        "r2": float(r2),
-        "r2_adj": float(r2_adj),
-        "n_obs": int(n),
-        "fitted": fitted.tolist(),
-        "residuals": resid.tolist(),
+        "beta": beta, "se": se, "t_stat": t_stats, "p_value": p_values,
+        "r2": r2, "r2_adj": r2_adj, "n_obs": n, "fitted": fitted, "residuals": resid,
+    }
+
+
+def _ols_newey_west(X: np.ndarray, y: np.ndarray, lags: int = 5) -> dict:
+    """OLS оценка с HAC стандартными ошибками (Newey-West 1987) для одной регрессии."""
+    ols = _ols_hac(X, y, lags)
+    return {
+        "beta": ols["beta"].tolist(),
+        "se": ols["se"].tolist(),
+        "t_stat": ols["t_stat"].tolist(),
+        "p_value": ols["p_value"].tolist(),
+        "r2": float(ols["r2"]),
+        "r2_adj": float(ols["r2_adj"]),
+        "n_obs": int(ols["n_obs"]),
+        "fitted": ols["fitted"].tolist(),
+        "residuals": ols["residuals"].tolist(),
     }
 
 
 # ── Метрики прогноза ──────────────────────────────────────────────────────────
 
-def _forecast_metrics(actual: np.ndarray, predicted: np.ndarray) -> dict:
-    """RMSE, MAE, QLIKE (стандартная функция потерь для волатильности)."""
+def _forecast_losses(actual: np.ndarray, predicted: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """RMSE, MAE, QLIKE по последней оси (ряд или панель N × T)."""
     err = actual - predicted
-    rmse = float(np.sqrt(np.mean(err ** 2)))
-    mae = float(np.mean(np.abs(err)))
+    rmse = np.sqrt(np.mean(err ** 2, axis=-1))
+    mae = np.mean(np.abs(err), axis=-1)
     # QLIKE: E[RV/RV_hat − log(RV/RV_hat) − 1]
     ratio = actual / np.maximum(predicted, 1e-15)
-    qlike = float(np.mean(ratio - np.log(ratio) - 1.0))
-    return {"rmse": rmse, "mae": mae, "qlike": qlike}
+    qlike = np.mean(ratio - np.log(ratio) - 1.0, axis=-1)
+    return rmse, mae, qlike
+
+
+def _forecast_metrics(actual: np.ndarray, predicted: np.ndarray) -> dict:
+    """RMSE, MAE, QLIKE (стандартная функция потерь для волатильности)."""
+    rmse, mae, qlike = _forecast_losses(actual, predicted)
+    return {"rmse": float(rmse), "mae": float(mae), "qlike": float(qlike)}
 
 
 # ── h-шаговые прогнозы ────────────────────────────────────────────────────────
 
+def _multi_step_forecast_batch(rv: np.ndarray, beta: np.ndarray, h: int = 1) -> np.ndarray:
+    """
+    Прогноз HAR-RV на h шагов вперёд для панели: rv — N × T, beta — N × 4.
+    Для h > 1 итеративно подставляет прогнозы; держит только хвост из 22 значений.
+    """
+    tail = rv[:, -HAR_LAGS:]
+    for _ in range(h):
+        x = np.stack([
+            np.ones(len(tail)),
+            tail[:, -1],
+            np.mean(tail[:, -5:], axis=1),
+            np.mean(tail, axis=1),
+        ], axis=1)
+        rv_next = np.maximum(np.sum(beta * x, axis=1), 0.0)
+        tail = np.concatenate((tail[:, 1:], rv_next[:, None]), axis=1)
+    return tail[:, -1]
+
+
 def _multi_step_forecast(rv: np.ndarray, beta: np.ndarray, h: int = 1) -> float:
     """
     Прогноз HAR-RV на h шагов вперёд.
     Для h > 1 итеративно подставляет прогнозы.
     """
-    rv_ext = list(rv.copy())
-    for _ in range(h):
-        t = len(rv_ext)
-        x = np.array([
-            1.0,
-            rv_ext[t - 1],
-            np.mean(rv_ext[max(t - 5, 0): t]),
-            np.mean(rv_ext[max(t - 22, 0): t]),
-        ])
-        rv_next = float(max(np.dot(beta, x), 0.0))
-        rv_ext.append(rv_next)
-    return rv_ext[-1]
+    return float(_multi_step_forecast_batch(np.asarray(rv)[None, :], np.asarray(beta)[None, :], h)[0])
 
 
 # ── Главная функция ───────────────────────────────────────────────────────────
 
+@cpu_bound
 def fit_har_model(
     rv: list[float],
     bv: list[float] | None = None,
@@ -181,8 +218,7 @@ def fit_har_model(
         raise ValueError("Все значения RV должны быть положительными")
 
     # ── Разбивка train/test ────────────────────────────────────────────────
-    split = int(len(rv_arr) * train_ratio)
-    split = max(split, 44)  # минимум 22 для лагов + 22 для оценки
+    split = _split_index(len(rv_arr), train_ratio)
 
     rv_train = rv_arr[:split]
     rv_test = rv_arr[split:]
@@ -197,10 +233,8 @@ def fit_har_model(
     if log_transform:
         y_fit = np.log(y_train)
         y_all_fit = np.log(y_all)
-        X_train_log = X_train.copy()
-        X_train_log[:, 1:] = np.log(np.maximum(X_train[:, 1:], 1e-15))
-        X_all_log = X_all.copy()
-        X_all_log[:, 1:] = np.log(np.maximum(X_all[:, 1:], 1e-15))
+        X_train_log = _log_features(X_train)
+        X_all_log = _log_features(X_all)
         ols_train = _ols_newey_west(X_train_log, y_fit)
         ols_all = _ols_newey_west(X_all_log, y_all_fit)
     else:
@@ -219,8 +253,7 @@ def fit_har_model(
         y_test = rv_arr[22 + n_train_X:]
 
         if log_transform:
-            X_test_log = X_test_part.copy()
-            X_test_log[:, 1:] = np.log(np.maximum(X_test_part[:, 1:], 1e-15))
+            X_test_log = _log_features(X_test_part)
             y_hat_test = np.exp(X_test_log @ beta_har)
         else:
             y_hat_test = np.maximum(X_test_part @ beta_har, 0.0)
@@ -274,8 +307,7 @@ def fit_har_model(
     # ── Данные для графиков ───────────────────────────────────────────────────
     # Fitted (полная выборка)
     if log_transform:
-        X_all_log = X_all.copy()
-        X_all_log[:, 1:] = np.log(np.maximum(X_all[:, 1:], 1e-15))
+        X_all_log = _log_features(X_all)
         fitted_full = np.exp(X_all_log @ beta_har).tolist()
     else:
         fitted_full = np.maximum(X_all @ beta_har, 0.0).tolist()
@@ -321,3 +353,227 @@ def fit_har_model(
         "n_train": split,
         "n_test": len(rv_test),
     }
+
+
+# ── Рекурсивная переоценка ────────────────────────────────────────────────────
+
+def _recursive_betas(X: np.ndarray, y: np.ndarray, first: int, window: int | None = None) -> np.ndarray:
+    """
+    β для прогноза каждой строки i = first..n−1 по строкам [i − window, i)
+    (window=None — расширяющееся окно [0, i)).
+
+    Рекурсивный МНК в информационной форме: Aᵢ = Σ xⱼxⱼᵀ и bᵢ = Σ xⱼyⱼ по
+    окну получаются из окна первой строки ранг-1 обновлениями (добавление
+    строки i−1, для скользящего окна — удаление строки lo−1), накопленными
+    кумулятивной суммой; все системы Aᵢβᵢ = bᵢ решаются одним батчевым
+    вызовом. Совпадает с переоценкой OLS на каждом шаге без O(n) работы
+    на шаг. Поддерживает панель: X — N × n × k, y — N × n.
+    """
+    n = X.shape[-2]
+    rows = np.arange(first, n)
+    lo = np.zeros_like(rows) if window is None else np.maximum(rows - window, 0)
+    Xy = X * y[..., None]
+
+    head = X[..., lo[0]:first, :]
+    A0 = np.swapaxes(head, -1, -2) @ head
+    b0 = Xy[..., lo[0]:first, :].sum(axis=-2)
+
+    added = rows[1:] - 1
+    dA = X[..., added, :, None] * X[..., added, None, :]
+    db = Xy[..., added, :]
+    dropped = np.flatnonzero(lo[1:] > lo[:-1])
+    if dropped.size:
+        old = lo[1:][dropped] - 1
+        dA[..., dropped, :, :] -= X[..., old, :, None] * X[..., old, None, :]
+        db[..., dropped, :] -= Xy[..., old, :]
+
+    A = np.concatenate((A0[..., None, :, :], A0[..., None, :, :] + np.cumsum(dA, axis=-3)), axis=-3)
+    b = np.concatenate((b0[..., None, :], b0[..., None, :] + np.cumsum(db, axis=-2)), axis=-2)
+    try:
+        return np.linalg.solve(A, b[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return (np.linalg.pinv(A) @ b[..., None])[..., 0]
+
+
+def _split_index(T: int, train_ratio: float) -> int:
+    """Индекс начала тестовой выборки: минимум 22 для лагов + 22 для оценки."""
+    return max(int(T * train_ratio), 2 * HAR_LAGS)
+
+
+@cpu_bound
+def fit_har_recursive(
+    rv: list[float],
+    log_transform: bool = False,
+    train_ratio: float = 0.8,
+    window: int | None = None,
+) -> dict:
+    """
+    Out-of-sample путь однодневных прогнозов HAR-RV с переоценкой β каждый день.
+
+    Args:
+        rv: ряд реализованных дисперсий (ежедневные)
+        log_transform: Log-HAR
+        train_ratio: доля выборки до первого прогноза
+        window: длина скользящего окна оценки в днях (None = расширяющееся окно)
+
+    Returns:
+        dict с прогнозами, фактом, путём коэффициентов и OOS метриками
+    """
+    rv_arr = np.asarray(rv, dtype=float)
+    if len(rv_arr) < 50:
+        raise ValueError("Нужно минимум 50 наблюдений для HAR модели")
+    if np.any(rv_arr <= 0):
+        raise ValueError("Все значения RV должны быть положительными")
+    if window is not None and window < HAR_LAGS:
+        raise ValueError(f"Окно оценки должно быть не короче {HAR_LAGS} дней")
+
+    split = _split_index(len(rv_arr), train_ratio)
+    if split >= len(rv_arr):
+        raise ValueError("Нет наблюдений для out-of-sample прогноза")
+
+    X, start = _build_har_features(rv_arr)
+    y = rv_arr[start:]
+    if log_transform:
+        X, y = _log_features(X), np.log(y)
+
+    first = split - start
+    betas = _recursive_betas(X, y, first, window)
+    predicted = np.sum(X[first:] * betas, axis=1)
+    predicted = np.exp(predicted) if log_transform else np.maximum(predicted, 0.0)
+    actual = rv_arr[split:]
+
+    return {
+        "forecast": predicted.tolist(),
+        "actual": actual.tolist(),
+        "forecast_vol": (np.sqrt(predicted * 252) * 100).tolist(),
+        "actual_vol": (np.sqrt(actual * 252) * 100).tolist(),
+        "beta_path": betas.tolist(),
+        "beta_last": betas[-1].tolist(),
+        "oos_metrics": _forecast_metrics(actual, predicted),
+        "window": window,
+        "log_transform": log_transform,
+        "first_forecast_index": split,
+        "n_forecasts": len(actual),
+        "n_observations": len(rv_arr),
+    }
+
+
+# ── Панель инструментов ───────────────────────────────────────────────────────
+
+@cpu_bound
+def fit_har_panel(
+    rv: np.ndarray,
+    tickers: list[str] | None = None,
+    log_transform: bool = False,
+    forecast_horizons: list[int] | None = None,
+    train_ratio: float = 0.8,
+    window: int | None = None,
+) -> dict:
+    """
+    HAR-RV сразу для панели инструментов одним батчевым проходом.
+
+    Для каждого столбца даёт те же коэффициенты, метрики и прогнозы, что
+    fit_har_model, плюс OOS метрики рекурсивной переоценки (как в
+    fit_har_recursive). Регрессоры, OLS, HAC и прогнозы считаются на
+    массивах N × T без цикла по инструментам.
+
+    Args:
+        rv: T × N матрица ежедневных RV (столбец — инструмент)
+        tickers: названия инструментов (по умолчанию "0", "1", ...)
+        log_transform: Log-HAR
+        forecast_horizons: горизонты прогноза в днях (по умолчанию [1, 5, 22])
+        train_ratio: доля обучающей выборки
+        window: окно рекурсивной переоценки (None = расширяющееся)
+    """
+    if forecast_horizons is None:
+        forecast_horizons = [1, 5, 22]
+
+    panel = np.asarray(rv, dtype=float)
+    if panel.ndim != 2:
+        raise ValueError("rv должен быть матрицей T × N")
+    T, N = panel.shape
+    if T < 50:
+        raise ValueError("Нужно минимум 50 наблюдений для HAR модели")
+    if np.any(panel <= 0):
+        raise ValueError("Все значения RV должны быть положительными")
+    if tickers is None:
+        tickers = [str(i) for i in range(N)]
+    if len(tickers) != N:
+        raise ValueError("Количество тикеров не совпадает с числом столбцов rv")
+    if window is not None and window < HAR_LAGS:
+        raise ValueError(f"Окно оценки должно быть не короче {HAR_LAGS} дней")
+
+    series = np.ascontiguousarray(panel.T)  # N × T
+    split = _split_index(T, train_ratio)
+    start = HAR_LAGS
+    first = split - start
+
+    X_all, _ = _build_har_features(series)
+    y_all = series[:, start:]
+    X_fit, y_fit = (_log_features(X_all), np.log(y_all)) if log_transform else (X_all, y_all)
+
+    def to_level(z: np.ndarray) -> np.ndarray:
+        return np.exp(z) if log_transform else np.maximum(z, 0.0)
+
+    # β на обучающей выборке (как в fit_har_model)
+    ols = _ols_hac(X_fit[:, :first], y_fit[:, :first])
+    fitted_train = np.exp(ols["fitted"]) if log_transform else ols["fitted"]
+    is_losses = _forecast_losses(y_all[:, :first], fitted_train)
+
+    oos_losses = recursive_losses = None
+    if split < T:
+        y_test = y_all[:, first:]
+        y_hat = to_level(np.sum(X_fit[:, first:] * ols["beta"][:, None, :], axis=2))
+        oos_losses = _forecast_losses(y_test, y_hat)
+        betas = _recursive_betas(X_fit, y_fit, first, window)
+        recursive_losses = _forecast_losses(y_test, to_level(np.sum(X_fit[:, first:] * betas, axis=2)))
+
+    forecasts = {}
+    for h in forecast_horizons:
+        val = _multi_step_forecast_batch(series, ols["beta"], h)
+        forecasts[h] = np.exp(val) if log_transform else val
+
+    def metrics(losses, i) -> dict:
+        if losses is None:
+            return {}
+        return {name: float(loss[i]) for name, loss in zip(("rmse", "mae", "qlike"), losses, strict=True)}
+
+    coef_names = ["β₀ (intercept)", "β_d (daily)", "β_w (weekly)", "β_m (monthly)"]
+    results = {}
+    for i, ticker in enumerate(tickers):
+        results[ticker] = {
+            "coefficients": [
+                {
+                    "name": coef_names[j],
+                    "beta": float(ols["beta"][i, j]),
+                    "se": float(ols["se"][i, j]),
+                    "t_stat": float(ols["t_stat"][i, j]),
+                    "p_value": float(ols["p_value"][i, j]),
+                    "significant": bool(ols["p_value"][i, j] < 0.05),
+                }
+                for j in range(len(coef_names))
+            ],
+            "r2": float(ols["r2"][i]),
+            "r2_adj": float(ols["r2_adj"][i]),
+            "is_metrics": metrics(is_losses, i),
+            "oos_metrics": metrics(oos_losses, i),
+            "recursive_oos_metrics": metrics(recursive_losses, i),
+            "forecasts": {
+                f"h{h}": {
+                    "rv": float(val[i]),
+                    "vol_annual": float(np.sqrt(max(val[i] * 252, 0.0))),
+                    "horizon_days": h,
+                }
+                for h, val in forecasts.items()
+            },
+        }
+
+    return {
+        "results": results,
+        "log_transform": log_transform,
+        "window": window,
+        "n_tickers": N,
+        "n_observations": T,
+        "n_train": split,
+        "n_test": T - split,
+    }
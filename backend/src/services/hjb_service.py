@@ -6,6 +6,8 @@ import logging
 
 import numpy as np
 
+from src.services.monte_carlo_engine import simulate_portfolio_paths, summarize_simulation
+
 _logger = logging.getLogger(__name__)
 
 
@@ -173,6 +175,9 @@ def simulate_monte_carlo(
     """
     Монте-Карло симуляция портфеля.
 
+    Тонкая обёртка над monte_carlo_engine: траектории генерируются блоками
+    без Python-циклов по путям и шагам.
+
     Args:
         mu: Ожидаемые доходности активов
         cov_matrix: Ковариационная матрица
@@ -187,110 +192,17 @@ def simulate_monte_carlo(
     Returns:
         Результаты симуляции
     """
-    if random_seed is not None:
-        np.random.seed(random_seed)
-
-    # Параметры симуляции
-    dt = horizon_years / n_steps  # Временной шаг в годах
-
-    # Cholesky разложение для коррелированных шоков
-    try:
-        np.linalg.cholesky(cov_matrix)
-    except np.linalg.LinAlgError:
-        # Если матрица не положительно определенная, используем приближение
-        np.linalg.cholesky(cov_matrix + np.eye(len(cov_matrix)) * 1e-6)
-
-    # Симуляция траекторий
-    X_paths = np.zeros((n_paths, n_steps + 1))
-    X_paths[:, 0] = initial_capital
-
-    # Портфельная волатильность
-    portfolio_vol = np.sqrt(np.dot(weights, np.dot(cov_matrix, weights)))
-    # Портфельная доходность
-    portfolio_mu = np.dot(weights, mu)
-
-    for i in range(n_paths):
-        X = initial_capital
-        for t in range(1, n_steps + 1):
-            # Геометрическое броуновское движение
-            Z = np.random.normal(0, 1)
-            drift = (portfolio_mu - 0.5 * portfolio_vol ** 2) * dt
-            diffusion = portfolio_vol * np.sqrt(dt) * Z
-            X = X * np.exp(drift + diffusion)
-            X_paths[i, t] = X
-
-    # Вычисление статистик
-    final_capitals = X_paths[:, -1]
-
-    mean_final = float(np.mean(final_capitals))
-    median_final = float(np.median(final_capitals))
-    std_final = float(np.std(final_capitals))
-    min_final = float(np.min(final_capitals))
-    max_final = float(np.max(final_capitals))
-
-    # VaR и CVaR (95%)
-    var_95 = float(np.quantile(final_capitals, 0.05))
-    cvar_95 = float(np.mean(final_capitals[final_capitals <= var_95]))
-
-    # VaR и CVaR (99%)
-    var_99 = float(np.quantile(final_capitals, 0.01))
-    cvar_99 = float(np.mean(final_capitals[final_capitals <= var_99]))
-
-    # Maximum Drawdown
-    max_drawdowns = []
-    for path in X_paths:
-        peak = path[0]
-        max_dd = 0
-        for value in path:
-            if value > peak:
-                peak = value
-            dd = (peak - value) / peak if peak > 0 else 0
-            if dd > max_dd:
-                max_dd = dd
-        max_drawdowns.append(max_dd)
-    mean_max_drawdown = float(np.mean(max_drawdowns))
-
-    # Годовая доходность
-    returns = (final_capitals / initial_capital) ** (1 / horizon_years) - 1
-    mean_return = float(np.mean(returns))
-    median_return = float(np.median(returns))
-    std_return = float(np.std(returns))
-
-    # Sharpe ratio: (E[R] - R_f) / σ
-    sharpe = (mean_return - risk_free_rate) / std_return if std_return > 1e-10 else 0.0
-
-    # Квантили траекторий
-    t_grid = np.linspace(0, horizon_years, n_steps + 1)
-    median_path = np.median(X_paths, axis=0).tolist()
-    q05_path = np.quantile(X_paths, 0.05, axis=0).tolist()
-    q95_path = np.quantile(X_paths, 0.95, axis=0).tolist()
-
-    # Выбираем подмножество траекторий для отображения (до 50)
-    display_paths = X_paths[:min(50, n_paths)].tolist()
-
-    return {
-        'paths': display_paths,
-        'median_path': median_path,
-        'q05_path': q05_path,
-        'q95_path': q95_path,
-        't_grid': t_grid.tolist(),
-        'stats': {
-            'mean_final': mean_final,
-            'median_final': median_final,
-            'std_final': std_final,
-            'min_final': min_final,
-            'max_final': max_final,
-            'var_95': var_95,
-            'cvar_95': cvar_95,
-            'var_99': var_99,
-            'cvar_99': cvar_99,
-            'mean_max_drawdown': mean_max_drawdown,
-            'mean_return': mean_return,
-            'median_return': median_return,
-            'std_return': std_return,
-            'sharpe_ratio': float(sharpe)
-        }
-    }
+    sim = simulate_portfolio_paths(
+        mu=mu,
+        cov_matrix=cov_matrix,
+        weights=weights,
+        initial_capital=initial_capital,
+        horizon_years=horizon_years,
+        n_paths=n_paths,
+        n_steps=n_steps,
+        seed=random_seed,
+    )
+    return summarize_simulation(sim, risk_free_rate=risk_free_rate)
 
 
 def optimize_hjb(
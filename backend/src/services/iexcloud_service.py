@@ -14,7 +14,7 @@ import logging
 import re
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -57,6 +57,7 @@ async def _iex_get(path: str, params: dict[str, Any] | None = None) -> Any:
         return await resp.json(content_type=None)
 
 
+@cached("iex", ttl_seconds=15)
 async def iex_quote(symbol: str) -> dict[str, Any]:
     """
     Get real-time quote for a US stock.
@@ -64,11 +65,6 @@ async def iex_quote(symbol: str) -> dict[str, Any]:
     Returns: price, change, changePercent, volume, marketCap, etc.
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("iex", "quote", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _iex_get(f"/stock/{symbol}/quote")
 
     result = {
@@ -91,10 +87,10 @@ async def iex_quote(symbol: str) -> dict[str, Any]:
         "provider": "iex_cloud",
     }
 
-    cache_set(cache_key, result, ttl_seconds=15)
     return result
 
 
+@cached("iex", ttl_seconds=300)
 async def iex_historical(
     symbol: str,
     range_period: str = "1m",
@@ -105,11 +101,6 @@ async def iex_historical(
     range_period: 5d, 1m, 3m, 6m, ytd, 1y, 2y, 5y, max
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("iex", "hist", symbol, range_period)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _iex_get(f"/stock/{symbol}/chart/{range_period}")
 
     if not isinstance(data, list):
@@ -141,18 +132,13 @@ async def iex_historical(
         },
     }
 
-    cache_set(cache_key, result, ttl_seconds=300)
     return result
 
 
+@cached("iex", ttl_seconds=3600)
 async def iex_company(symbol: str) -> dict[str, Any]:
     """Get company information for a US stock."""
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("iex", "company", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _iex_get(f"/stock/{symbol}/company")
 
     result = {
@@ -169,18 +155,13 @@ async def iex_company(symbol: str) -> dict[str, Any]:
         "provider": "iex_cloud",
     }
 
-    cache_set(cache_key, result, ttl_seconds=3600)
     return result
 
 
+@cached("iex", ttl_seconds=300)
 async def iex_key_stats(symbol: str) -> dict[str, Any]:
     """Get key financial statistics for a US stock."""
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("iex", "stats", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _iex_get(f"/stock/{symbol}/stats")
 
     result = {
@@ -199,10 +180,10 @@ async def iex_key_stats(symbol: str) -> dict[str, Any]:
         "provider": "iex_cloud",
     }
 
-    cache_set(cache_key, result, ttl_seconds=300)
     return result
 
 
+@cached("iex", ttl_seconds=30)
 async def iex_batch(symbols: list[str], types: str = "quote") -> dict[str, Any]:
     """
     Batch request for multiple symbols.
@@ -214,11 +195,6 @@ async def iex_batch(symbols: list[str], types: str = "quote") -> dict[str, Any]:
         raise ValueError("Maximum 100 symbols per batch request")
 
     symbols_str = ",".join(validated)
-    cache_key = make_cache_key("iex", "batch", symbols_str, types)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _iex_get("/stock/market/batch", {
         "symbols": symbols_str,
         "types": types,
@@ -231,5 +207,4 @@ async def iex_batch(symbols: list[str], types: str = "quote") -> dict[str, Any]:
         "provider": "iex_cloud",
     }
 
-    cache_set(cache_key, result, ttl_seconds=30)
     return result
@@ -0,0 +1,340 @@
+"""
+Background jobs for computations that outlive an HTTP request.
+
+POST /api/jobs/{kind} validates the body against the kind's request model,
+queues the computation (at most JOB_MAX_WORKERS jobs run at once) and
+returns a job id at once; the client polls the status (progress percent,
+message) and fetches the result when the job has succeeded.
+
+Runners take (body, progress) and pass `progress` down to the service as
+its cooperative progress callback (src.utils.progress). They are dispatched
+with compute_pool.offload(): a @cpu_bound runner executes in the shared
+process pool with a ProgressChannel as its callback, which the job polls
+every JOB_PROGRESS_POLL_SECONDS; other runners (and all of them when the
+pool is disabled) run in a thread with the job's own callback. Cancelling
+a job — DELETE /api/jobs/{id} or the admin request-cancel endpoint, since
+every job is registered in the request tracker's active-task table — drops
+a queued job at once. A running one is "cancelling" until its runner stops
+with JobCancelled at its next progress call: until then it keeps its worker
+slot, its compute-pool admission and its place in the per-user limit, so
+submit/cancel cycles cannot stack runners past JOB_MAX_WORKERS.
+
+Jobs and their results live in memory of the process that accepted them
+(the app runs as a single uvicorn worker). At most JOB_MAX_QUEUED jobs wait
+for a worker and JOB_MAX_ACTIVE_PER_USER per user are queued or running;
+finished jobs are kept for JOB_RESULT_TTL_SECONDS, at most MAX_FINISHED_JOBS.
+
+Usage:
+    register_job_kind("pbo", PBORequest, run_pbo, "PBO/DSR analysis")
+    job = await submit_job("pbo", body, user_id=user.sub)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import BaseModel
+
+from src.middleware.request_tracker import ActiveRequest, register_active, unregister_active
+from src.utils import compute_pool
+from src.utils.progress import JobCancelled, ProgressCallback
+
+logger = logging.getLogger(__name__)
+
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "2"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "16"))
+JOB_MAX_ACTIVE_PER_USER = int(os.getenv("JOB_MAX_ACTIVE_PER_USER", "4"))
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+JOB_PROGRESS_POLL_SECONDS = float(os.getenv("JOB_PROGRESS_POLL_SECONDS", "0.2"))
+MAX_FINISHED_JOBS = 200
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+# Cancel requested, runner not stopped yet
+CANCELLING = "cancelling"
+PENDING_STATUSES = (QUEUED, RUNNING, CANCELLING)
+
+
+class JobLimitExceededError(RuntimeError):
+    """Raised when the queue or the per-user limit is full."""
+
+
+@dataclass
+class JobKind:
+    name: str
+    model: type[BaseModel]
+    runner: Callable[[Any, ProgressCallback], Any]
+    description: str = ""
+    # Field that may be sent as a binary array body (src.utils.array_payload)
+    array_field: str | None = None
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    user_id: int
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = ""
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    result: Any = field(default=None, repr=False)
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    task: asyncio.Task[Any] | None = field(default=None, repr=False)
+    active: ActiveRequest | None = field(default=None, repr=False)
+    # Progress/cancel channel of a runner executing in the compute pool
+    channel: compute_pool.ProgressChannel | None = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status not in PENDING_STATUSES
+
+    def report(self, fraction: float, message: str = "") -> None:
+        """Progress callback handed to the runner; raises JobCancelled once cancelled."""
+        if self.cancel_event.is_set():
+            raise JobCancelled(self.job_id)
+        self.set_progress(fraction, message)
+
+    def set_progress(self, fraction: float, message: str = "") -> None:
+        self.progress = min(max(float(fraction), self.progress), 1.0)
+        if message:
+            self.message = message
+        if self.active is not None:
+            self.active.progress = round(self.progress * 100, 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress_percent": round(self.progress * 100, 1),
+            "message": self.message,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at else None,
+            "error": self.error,
+        }
+
+
+_kinds: dict[str, JobKind] = {}
+_jobs: OrderedDict[str, Job] = OrderedDict()
+# Bounds running jobs to JOB_MAX_WORKERS; bound to the loop it was created on
+_slots: asyncio.Semaphore | None = None
+_slots_loop: asyncio.AbstractEventLoop | None = None
+
+
+def register_job_kind(
+    name: str,
+    model: type[BaseModel],
+    runner: Callable[[Any, ProgressCallback], Any],
+    description: str = "",
+    array_field: str | None = None,
+) -> None:
+    _kinds[name] = JobKind(name, model, runner, description, array_field)
+
+
+def get_job_kind(name: str) -> JobKind | None:
+    return _kinds.get(name)
+
+
+def list_job_kinds() -> list[dict[str, str]]:
+    return [{"kind": k.name, "description": k.description} for k in _kinds.values()]
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots_loop is not loop:
+        _slots, _slots_loop = asyncio.Semaphore(JOB_MAX_WORKERS), loop
+    return _slots
+
+
+def _prune(now: float) -> None:
+    finished = [job for job in _jobs.values() if job.done]
+    expired = {j.job_id for j in finished if now - (j.finished_at or now) > JOB_RESULT_TTL_SECONDS}
+    overflow = len(finished) - len(expired) - MAX_FINISHED_JOBS
+    if overflow > 0:
+        # _jobs is in submission order: drop the oldest finished jobs first
+        remaining = [j.job_id for j in finished if j.job_id not in expired]
+        expired.update(remaining[:overflow])
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+async def _follow(job: Job, channel: compute_pool.ProgressChannel) -> None:
+    """Copy a pool runner's progress into the job."""
+    while True:
+        await asyncio.sleep(JOB_PROGRESS_POLL_SECONDS)
+        job.set_progress(*channel.read())
+
+
+def _request_cancel(job: Job) -> None:
+    """Ask a running runner to stop at its next progress call."""
+    job.cancel_event.set()
+    if job.channel is not None:
+        job.channel.cancel()
+    if job.status == RUNNING:
+        job.status = CANCELLING
+
+
+async def _wait_stopped(call: asyncio.Future) -> None:
+    """Wait for a runner asked to stop to return, whatever it raises."""
+    while not call.done():
+        try:
+            await asyncio.wait({call})
+        except asyncio.CancelledError:
+            continue
+    if not call.cancelled():
+        call.exception()
+
+
+async def _dispatch(job: Job, kind: JobKind, body: BaseModel) -> Any:
+    progress: ProgressCallback = job.report
+    follower = None
+    if compute_pool.runs_in_pool(kind.runner):
+        job.channel = progress = compute_pool.ProgressChannel()
+        follower = asyncio.create_task(_follow(job, job.channel))
+    call = asyncio.ensure_future(compute_pool.offload(kind.runner, body, progress))
+    try:
+        # shield: a killed job task keeps its slot and pool admission until the runner returns
+        return await asyncio.shield(call)
+    except asyncio.CancelledError:
+        _request_cancel(job)
+        await _wait_stopped(call)
+        raise
+    finally:
+        if follower is not None:
+            follower.cancel()
+        channel, job.channel = job.channel, None
+        if channel is not None:
+            job.set_progress(*channel.read())
+            channel.release()
+
+
+async def _run(job: Job, kind: JobKind, body: BaseModel) -> None:
+    try:
+        async with _get_slots():
+            if job.cancel_event.is_set():
+                raise JobCancelled(job.job_id)
+            job.started_at = time.time()
+            if job.status == QUEUED:
+                job.status = RUNNING
+            result = await _dispatch(job, kind, body)
+        if job.cancel_event.is_set():
+            # Finished without reaching another progress call
+            raise JobCancelled(job.job_id)
+        job.result = result
+        job.progress = 1.0
+        job.status = SUCCEEDED
+    except JobCancelled:
+        job.status = CANCELLED
+    except Exception as e:
+        if job.cancel_event.is_set():
+            job.status = CANCELLED
+            return
+        logger.warning("Job %s (%s) failed: %s", job.job_id, job.kind, e, exc_info=True)
+        job.status = FAILED
+        job.error = f"{type(e).__name__}: {str(e)[:500]}"
+
+
+def _finish(job: Job, task: asyncio.Task[Any]) -> None:
+    """Task done-callback; also covers tasks cancelled before they started."""
+    if task.cancelled():
+        # A running task only ends once its runner has stopped (_dispatch)
+        job.cancel_event.set()
+        job.status = CANCELLED
+    job.finished_at = time.time()
+    unregister_active(job.job_id)
+
+
+async def submit_job(kind_name: str, body: BaseModel, user_id: int, client_ip: str = "job") -> Job:
+    """Queue a job; raises KeyError for an unknown kind and JobLimitExceededError when full."""
+    kind = _kinds[kind_name]
+    now = time.time()
+    _prune(now)
+
+    pending = [job for job in _jobs.values() if not job.done]
+    if sum(job.status == QUEUED for job in pending) >= JOB_MAX_QUEUED:
+        raise JobLimitExceededError("Job queue is full, try again later")
+    if sum(job.user_id == user_id for job in pending) >= JOB_MAX_ACTIVE_PER_USER:
+        raise JobLimitExceededError(f"At most {JOB_MAX_ACTIVE_PER_USER} active jobs per user")
+
+    job = Job(job_id=uuid.uuid4().hex, kind=kind_name, user_id=user_id, created_at=now)
+    _jobs[job.job_id] = job
+    job.task = asyncio.create_task(_run(job, kind, body), name=f"job-{job.job_id}")
+    job.task.add_done_callback(lambda task: _finish(job, task))
+    job.active = ActiveRequest(
+        request_id=job.job_id,
+        method="JOB",
+        path=f"/api/jobs/{kind_name}",
+        client_ip=client_ip,
+        started_at=now,
+        task=job.task,
+        kind="job",
+        progress=0.0,
+    )
+    register_active(job.active)
+    return job
+
+
+def get_job(job_id: str, user_id: int | None = None) -> Job | None:
+    """Job by id; with user_id, only that user's jobs are visible."""
+    job = _jobs.get(job_id)
+    if job is None or (user_id is not None and job.user_id != user_id):
+        return None
+    return job
+
+
+def list_jobs(user_id: int | None = None) -> list[Job]:
+    _prune(time.time())
+    return [job for job in reversed(_jobs.values()) if user_id is None or job.user_id == user_id]
+
+
+def cancel_job(job: Job) -> bool:
+    """Request cancellation; False if the job has already finished.
+
+    A queued job is cancelled at once. A running one only becomes CANCELLING:
+    it stays pending, holding its worker slot, until the runner has stopped.
+    """
+    if job.done:
+        return False
+    if job.status != QUEUED:
+        _request_cancel(job)
+        return True
+    job.cancel_event.set()
+    job.status = CANCELLED
+    if job.task is not None:
+        job.task.cancel()
+    return True
+
+
+def forget_job(job: Job) -> None:
+    """Drop a finished job and its result."""
+    _jobs.pop(job.job_id, None)
+
+
+def stats() -> dict[str, Any]:
+    counts: dict[str, int] = {}
+    for job in _jobs.values():
+        counts[job.status] = counts.get(job.status, 0) + 1
+    return {
+        "max_workers": JOB_MAX_WORKERS,
+        "max_queued": JOB_MAX_QUEUED,
+        "jobs": counts,
+        "kinds": sorted(_kinds),
+    }
@@ -12,7 +12,7 @@ from xml.sax.saxutils import escape as _xml_escape
 
 import defusedxml.ElementTree as ET
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -39,6 +39,7 @@ def _openfigi_key() -> str: return get_key_sync("OPENFIGI_API_KEY")
 
 # ─── FRED ─────────────────────────────────────────────────────────────────────
 
+@cached("fred", ttl_seconds=3600)
 async def fred_series_observations(
     series_id: str,
     limit: int = 100,
@@ -47,11 +48,6 @@ async def fred_series_observations(
     observation_end: str | None = None,
 ) -> dict[str, Any]:
     """Get observations for a FRED series (GDP, CPI, UNRATE, etc.)."""
-    key = make_cache_key("fred", "obs", series_id, limit, sort_order, observation_start)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {
         "series_id": series_id,
         "api_key": _fred_key(),
@@ -83,17 +79,12 @@ async def fred_series_observations(
         "observations": observations,
         "provider": "fred",
     }
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
+@cached("fred", ttl_seconds=3600)
 async def fred_search(query: str, limit: int = 20) -> dict[str, Any]:
     """Search FRED series by keyword."""
-    key = make_cache_key("fred", "search", query, limit)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {
         "search_text": query,
         "api_key": _fred_key(),
@@ -118,19 +109,14 @@ async def fred_search(query: str, limit: int = 20) -> dict[str, Any]:
         })
 
     result = {"query": query, "series": series_list, "provider": "fred"}
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
 # ─── Frankfurter (ECB exchange rates) ────────────────────────────────────────
 
+@cached("ecb", ttl_seconds=1800)
 async def ecb_latest_rates(base: str = "EUR") -> dict[str, Any]:
     """Get latest ECB exchange rates."""
-    key = make_cache_key("ecb", "latest", base)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     session = await get_session()
     async with session.get(f"{FRANKFURTER_BASE}/latest", params={"base": base}) as resp:
         resp.raise_for_status()
@@ -142,10 +128,10 @@ async def ecb_latest_rates(base: str = "EUR") -> dict[str, Any]:
         "rates": data.get("rates", {}),
         "provider": "frankfurter",
     }
-    cache_set(key, result, ttl_seconds=1800)
     return result
 
 
+@cached("ecb", ttl_seconds=1800)
 async def ecb_historical_rates(
     base: str = "EUR",
     start_date: str = "2024-01-01",
@@ -153,11 +139,6 @@ async def ecb_historical_rates(
     symbols: str | None = None,
 ) -> dict[str, Any]:
     """Get historical ECB exchange rates."""
-    key = make_cache_key("ecb", "hist", base, start_date, end_date, symbols)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{FRANKFURTER_BASE}/{start_date}"
     if end_date:
         url += f"..{end_date}"
@@ -178,19 +159,14 @@ async def ecb_historical_rates(
         "rates": data.get("rates", {}),
         "provider": "frankfurter",
     }
-    cache_set(key, result, ttl_seconds=1800)
     return result
 
 
 # ─── Bank of Russia ───────────────────────────────────────────────────────────
 
+@cached("cbr", ttl_seconds=3600)
 async def cbr_daily_rates() -> dict[str, Any]:
     """Get CBR daily FX rates (parses XML)."""
-    key = make_cache_key("cbr", "daily_rates")
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     session = await get_session()
     async with session.get(CBR_DAILY_URL) as resp:
         resp.raise_for_status()
@@ -218,17 +194,12 @@ async def cbr_daily_rates() -> dict[str, Any]:
         })
 
     result = {"date": date_attr, "rates": rates, "provider": "cbr"}
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
+@cached("cbr", ttl_seconds=3600)
 async def cbr_key_rate() -> dict[str, Any]:
     """Get current CBR key rate via SOAP endpoint."""
-    key = make_cache_key("cbr", "key_rate")
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     soap_body = """<?xml version="1.0" encoding="utf-8"?>
     <soap12:Envelope xmlns:soap12="http://www.w3.org/2003/05/soap-envelope"
                      xmlns:web="http://web.cbr.ru/">
@@ -272,12 +243,12 @@ async def cbr_key_rate() -> dict[str, Any]:
         "history": history,
         "provider": "cbr",
     }
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
 # ─── CBR Extended: RUONIA, Precious Metals, Deposit/Credit Rates ─────────────
 
+@cached("cbr", ttl_seconds=3600)
 async def cbr_ruonia(
     from_date: str = "2024-01-01",
     to_date: str = "2026-12-31",
@@ -285,11 +256,6 @@ async def cbr_ruonia(
     """Get RUONIA rates from CBR SOAP API."""
     if not _DATE_RE.match(from_date) or not _DATE_RE.match(to_date):
         raise ValueError("Invalid date format (expected YYYY-MM-DD)")
-    key = make_cache_key("cbr", "ruonia", from_date, to_date)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     soap_body = f"""<?xml version="1.0" encoding="utf-8"?>
     <soap12:Envelope xmlns:soap12="http://www.w3.org/2003/05/soap-envelope"
                      xmlns:web="http://web.cbr.ru/">
@@ -330,10 +296,10 @@ async def cbr_ruonia(
 
     current_rate = rates[-1]["rate"] if rates else 0.0
     result = {"current_rate": current_rate, "history": rates, "provider": "cbr"}
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
+@cached("cbr", ttl_seconds=3600)
 async def cbr_precious_metals(
     from_date: str = "2024-01-01",
     to_date: str = "2026-12-31",
@@ -341,11 +307,6 @@ async def cbr_precious_metals(
     """Get precious metals prices from CBR SOAP API."""
     if not _DATE_RE.match(from_date) or not _DATE_RE.match(to_date):
         raise ValueError("Invalid date format (expected YYYY-MM-DD)")
-    key = make_cache_key("cbr", "metals", from_date, to_date)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     soap_body = f"""<?xml version="1.0" encoding="utf-8"?>
     <soap12:Envelope xmlns:soap12="http://www.w3.org/2003/05/soap-envelope"
                      xmlns:web="http://web.cbr.ru/">
@@ -391,10 +352,10 @@ async def cbr_precious_metals(
         grouped.setdefault(name, []).append({"date": m["date"], "price": m.get("price", 0)})
 
     result = {"metals": grouped, "provider": "cbr"}
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
+@cached("cbr", ttl_seconds=3600)
 async def cbr_deposit_rates(
     from_date: str = "2024-01-01",
     to_date: str = "2026-12-31",
@@ -402,11 +363,6 @@ async def cbr_deposit_rates(
     """Get average deposit rates from CBR SOAP API (DepoDynamicXML)."""
     if not _DATE_RE.match(from_date) or not _DATE_RE.match(to_date):
         raise ValueError("Invalid date format (expected YYYY-MM-DD)")
-    key = make_cache_key("cbr", "depo_rates", from_date, to_date)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     soap_body = f"""<?xml version="1.0" encoding="utf-8"?>
     <soap12:Envelope xmlns:soap12="http://www.w3.org/2003/05/soap-envelope"
                      xmlns:web="http://web.cbr.ru/">
@@ -443,10 +399,10 @@ async def cbr_deposit_rates(
         logger.warning("Failed to parse CBR XML response: %s", e)
 
     result = {"rates": rates, "provider": "cbr"}
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
+@cached("cbr", ttl_seconds=3600)
 async def cbr_repo_rates(
     from_date: str = "2024-01-01",
     to_date: str = "2026-12-31",
@@ -454,11 +410,6 @@ async def cbr_repo_rates(
     """Get repo debt data from CBR SOAP API (RepoDebtXML)."""
     if not _DATE_RE.match(from_date) or not _DATE_RE.match(to_date):
         raise ValueError("Invalid date format (expected YYYY-MM-DD)")
-    key = make_cache_key("cbr", "repo", from_date, to_date)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     soap_body = f"""<?xml version="1.0" encoding="utf-8"?>
     <soap12:Envelope xmlns:soap12="http://www.w3.org/2003/05/soap-envelope"
                      xmlns:web="http://web.cbr.ru/">
@@ -497,20 +448,15 @@ async def cbr_repo_rates(
         logger.warning("Failed to parse CBR XML response: %s", e)
 
     result = {"entries": entries, "provider": "cbr"}
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
 # ─── SEC EDGAR ────────────────────────────────────────────────────────────────
 
+@cached("sec", ttl_seconds=3600)
 async def sec_company_filings(cik: str) -> dict[str, Any]:
     """Get SEC company filings by CIK number."""
     cik_padded = cik.zfill(10)
-    key = make_cache_key("sec", "filings", cik_padded)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers = {"User-Agent": SEC_USER_AGENT, "Accept": "application/json"}
     url = f"{SEC_BASE}/submissions/CIK{cik_padded}.json"
     session = await get_session()
@@ -543,18 +489,13 @@ async def sec_company_filings(cik: str) -> dict[str, Any]:
         "filings": filings,
         "provider": "sec_edgar",
     }
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
+@cached("sec", ttl_seconds=3600)
 async def sec_company_facts(cik: str) -> dict[str, Any]:
     """Get SEC XBRL company facts."""
     cik_padded = cik.zfill(10)
-    key = make_cache_key("sec", "facts", cik_padded)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers = {"User-Agent": SEC_USER_AGENT, "Accept": "application/json"}
     url = f"{SEC_BASE}/api/xbrl/companyfacts/CIK{cik_padded}.json"
     session = await get_session()
@@ -568,10 +509,10 @@ async def sec_company_facts(cik: str) -> dict[str, Any]:
         "facts": data.get("facts", {}),
         "provider": "sec_edgar",
     }
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
+@cached("sec", ttl_seconds=1800)
 async def sec_full_text_search(
     query: str,
     date_range: str = "",
@@ -579,11 +520,6 @@ async def sec_full_text_search(
     limit: int = 20,
 ) -> dict[str, Any]:
     """Full-text search of SEC EDGAR filings via EFTS."""
-    key = make_cache_key("sec", "search", query, date_range, forms, limit)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {
         "q": query,
         "dateRange": date_range or "custom",
@@ -614,12 +550,12 @@ async def sec_full_text_search(
         })
 
     result = {"query": query, "total": data.get("hits", {}).get("total", {}).get("value", 0), "filings": filings, "provider": "sec_edgar"}
-    cache_set(key, result, ttl_seconds=1800)
     return result
 
 
 # ─── OpenFIGI ─────────────────────────────────────────────────────────────────
 
+@cached("figi", ttl_seconds=86400)
 async def openfigi_map(
     jobs: list[dict[str, str]]
 ) -> list[dict[str, Any]]:
@@ -627,11 +563,6 @@ async def openfigi_map(
 
     Each job: {"idType": "ID_ISIN", "idValue": "US0378331005"}
     """
-    key = make_cache_key("figi", str(jobs))
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers: dict[str, str] = {"Content-Type": "application/json"}
     figi_key = _openfigi_key()
     if figi_key:
@@ -643,5 +574,4 @@ async def openfigi_map(
         data = await resp.json(content_type=None)
 
     result = data if isinstance(data, list) else []
-    cache_set(key, result, ttl_seconds=86400)
     return result
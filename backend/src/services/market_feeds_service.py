@@ -6,7 +6,7 @@ Proxies real-time and historical market data from three providers.
 
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached, configure_namespace
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -15,6 +15,11 @@ TWELVE_DATA_BASE = "https://api.twelvedata.com"
 POLYGON_BASE = "https://api.polygon.io"
 
 
+# Alpha Vantage has a small daily quota: keep serving expired responses for up
+# to 15 minutes while a single background request refreshes them
+configure_namespace("av", stale_ttl_seconds=900)
+
+
 def _av_key() -> str: return get_key_sync("ALPHA_VANTAGE_API_KEY")
 def _td_key() -> str: return get_key_sync("TWELVE_DATA_API_KEY")
 def _pg_key() -> str: return get_key_sync("POLYGON_API_KEY")
@@ -22,13 +27,9 @@ def _pg_key() -> str: return get_key_sync("POLYGON_API_KEY")
 
 # ─── Alpha Vantage ────────────────────────────────────────────────────────────
 
+@cached("av", ttl_seconds=60)
 async def alpha_vantage_quote(symbol: str) -> dict[str, Any]:
     """Get real-time quote for a symbol."""
-    key = make_cache_key("av", "quote", symbol)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {
         "function": "GLOBAL_QUOTE",
         "symbol": symbol,
@@ -53,21 +54,16 @@ async def alpha_vantage_quote(symbol: str) -> dict[str, Any]:
         "change_percent": quote_raw.get("10. change percent", "0%"),
         "provider": "alpha_vantage",
     }
-    cache_set(key, result, ttl_seconds=60)
     return result
 
 
+@cached("av", ttl_seconds=300)
 async def alpha_vantage_time_series(
     symbol: str,
     interval: str = "daily",
     outputsize: str = "compact"
 ) -> dict[str, Any]:
     """Get historical time series data."""
-    key = make_cache_key("av", "ts", symbol, interval, outputsize)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     func_map = {
         "daily": "TIME_SERIES_DAILY",
         "weekly": "TIME_SERIES_WEEKLY",
@@ -105,17 +101,12 @@ async def alpha_vantage_time_series(
         })
 
     result = {"symbol": symbol, "interval": interval, "series": series, "provider": "alpha_vantage"}
-    cache_set(key, result, ttl_seconds=300)
     return result
 
 
+@cached("av", ttl_seconds=120)
 async def alpha_vantage_forex(from_currency: str, to_currency: str) -> dict[str, Any]:
     """Get real-time FX exchange rate."""
-    key = make_cache_key("av", "fx", from_currency, to_currency)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {
         "function": "CURRENCY_EXCHANGE_RATE",
         "from_currency": from_currency,
@@ -135,10 +126,10 @@ async def alpha_vantage_forex(from_currency: str, to_currency: str) -> dict[str,
         "last_refreshed": raw.get("6. Last Refreshed", ""),
         "provider": "alpha_vantage",
     }
-    cache_set(key, result, ttl_seconds=120)
     return result
 
 
+@cached("av", ttl_seconds=300)
 async def alpha_vantage_technicals(
     symbol: str,
     indicator: str = "SMA",
@@ -147,11 +138,6 @@ async def alpha_vantage_technicals(
     series_type: str = "close"
 ) -> dict[str, Any]:
     """Get technical indicators (SMA, EMA, RSI, MACD, etc.)."""
-    key = make_cache_key("av", "tech", symbol, indicator, interval, time_period)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {
         "function": indicator.upper(),
         "symbol": symbol,
@@ -188,19 +174,14 @@ async def alpha_vantage_technicals(
         "data": points,
         "provider": "alpha_vantage",
     }
-    cache_set(key, result, ttl_seconds=300)
     return result
 
 
 # ─── Twelve Data ──────────────────────────────────────────────────────────────
 
+@cached("td", ttl_seconds=60)
 async def twelve_data_quote(symbol: str) -> dict[str, Any]:
     """Get real-time quote from Twelve Data."""
-    key = make_cache_key("td", "quote", symbol)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {"symbol": symbol, "apikey": _td_key()}
     session = await get_session()
     async with session.get(f"{TWELVE_DATA_BASE}/quote", params=params) as resp:
@@ -222,21 +203,16 @@ async def twelve_data_quote(symbol: str) -> dict[str, Any]:
         "datetime": data.get("datetime", ""),
         "provider": "twelve_data",
     }
-    cache_set(key, result, ttl_seconds=60)
     return result
 
 
+@cached("td", ttl_seconds=300)
 async def twelve_data_time_series(
     symbol: str,
     interval: str = "1day",
     outputsize: int = 30
 ) -> dict[str, Any]:
     """Get historical time series from Twelve Data."""
-    key = make_cache_key("td", "ts", symbol, interval, outputsize)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {
         "symbol": symbol,
         "interval": interval,
@@ -261,17 +237,12 @@ async def twelve_data_time_series(
         })
 
     result = {"symbol": symbol, "interval": interval, "series": series, "provider": "twelve_data"}
-    cache_set(key, result, ttl_seconds=300)
     return result
 
 
+@cached("td", ttl_seconds=86400)
 async def twelve_data_forex_pairs() -> list[dict[str, str]]:
     """Get available forex pairs."""
-    key = make_cache_key("td", "forex_pairs")
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {"apikey": _td_key()}
     session = await get_session()
     async with session.get(f"{TWELVE_DATA_BASE}/forex_pairs", params=params) as resp:
@@ -279,19 +250,14 @@ async def twelve_data_forex_pairs() -> list[dict[str, str]]:
         data = await resp.json(content_type=None)
 
     result = data.get("data", [])
-    cache_set(key, result, ttl_seconds=86400)
     return result
 
 
 # ─── Polygon.io ───────────────────────────────────────────────────────────────
 
+@cached("poly", ttl_seconds=3600)
 async def polygon_ticker_details(ticker: str) -> dict[str, Any]:
     """Get ticker details from Polygon."""
-    key = make_cache_key("poly", "ticker", ticker)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers = {"Authorization": f"Bearer {_pg_key()}"}
     session = await get_session()
     async with session.get(
@@ -303,10 +269,10 @@ async def polygon_ticker_details(ticker: str) -> dict[str, Any]:
 
     result = data.get("results", {})
     result["provider"] = "polygon"
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
+@cached("poly", ttl_seconds=300)
 async def polygon_aggregates(
     ticker: str,
     from_date: str,
@@ -315,11 +281,6 @@ async def polygon_aggregates(
     multiplier: int = 1
 ) -> dict[str, Any]:
     """Get aggregated bars from Polygon."""
-    key = make_cache_key("poly", "aggs", ticker, from_date, to_date, timespan)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers = {"Authorization": f"Bearer {_pg_key()}"}
     url = f"{POLYGON_BASE}/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from_date}/{to_date}"
     session = await get_session()
@@ -347,10 +308,10 @@ async def polygon_aggregates(
         "series": series,
         "provider": "polygon",
     }
-    cache_set(key, result, ttl_seconds=300)
     return result
 
 
+@cached("poly", ttl_seconds=300)
 async def polygon_options_chain(
     ticker: str,
     expiration_date: str | None = None,
@@ -359,11 +320,6 @@ async def polygon_options_chain(
     limit: int = 50
 ) -> dict[str, Any]:
     """Get options chain from Polygon."""
-    key = make_cache_key("poly", "options", ticker, expiration_date, strike_price, contract_type)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers = {"Authorization": f"Bearer {_pg_key()}"}
     params: dict[str, Any] = {
         "underlying_ticker": ticker,
@@ -390,20 +346,15 @@ async def polygon_options_chain(
         "contracts": data.get("results", []),
         "provider": "polygon",
     }
-    cache_set(key, result, ttl_seconds=300)
     return result
 
 
+@cached("poly", ttl_seconds=120)
 async def polygon_news(
     ticker: str | None = None,
     limit: int = 20
 ) -> list[dict[str, Any]]:
     """Get ticker news from Polygon."""
-    key = make_cache_key("poly", "news", ticker or "all", limit)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers = {"Authorization": f"Bearer {_pg_key()}"}
     params: dict[str, Any] = {"limit": limit}
     if ticker:
@@ -419,5 +370,4 @@ async def polygon_news(
         data = await resp.json(content_type=None)
 
     result = data.get("results", [])
-    cache_set(key, result, ttl_seconds=120)
     return result
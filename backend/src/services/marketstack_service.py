@@ -13,7 +13,7 @@ import logging
 import re
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -51,6 +51,7 @@ async def _ms_get(path: str, params: dict[str, Any] | None = None) -> Any:
         return await resp.json(content_type=None)
 
 
+@cached("ms", ttl_seconds=3600)
 async def marketstack_eod(
     symbol: str,
     date_from: str | None = None,
@@ -67,11 +68,6 @@ async def marketstack_eod(
         limit: Max results (default 100, max 1000)
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("ms", "eod", symbol, date_from, date_to, limit)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {"symbols": symbol, "limit": min(limit, 1000)}
     if date_from:
         params["date_from"] = date_from
@@ -107,10 +103,10 @@ async def marketstack_eod(
         "pagination": data.get("pagination", {}),
     }
 
-    cache_set(cache_key, result, ttl_seconds=3600)
     return result
 
 
+@cached("ms", ttl_seconds=300)
 async def marketstack_eod_latest(symbols: list[str]) -> dict[str, Any]:
     """Get latest EOD data for multiple symbols."""
     validated = [_validate_symbol(s) for s in symbols]
@@ -118,11 +114,6 @@ async def marketstack_eod_latest(symbols: list[str]) -> dict[str, Any]:
         raise ValueError("Maximum 50 symbols per request")
 
     symbols_str = ",".join(validated)
-    cache_key = make_cache_key("ms", "latest", symbols_str)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _ms_get("/eod/latest", {"symbols": symbols_str})
 
     quotes = [
@@ -146,17 +137,12 @@ async def marketstack_eod_latest(symbols: list[str]) -> dict[str, Any]:
         "provider": "marketstack",
     }
 
-    cache_set(cache_key, result, ttl_seconds=300)
     return result
 
 
+@cached("ms", ttl_seconds=3600)
 async def marketstack_tickers(search: str | None = None, limit: int = 50) -> dict[str, Any]:
     """Search or list available tickers on Marketstack."""
-    cache_key = make_cache_key("ms", "tickers", search, limit)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {"limit": min(limit, 1000)}
     if search:
         params["search"] = search
@@ -174,5 +160,4 @@ async def marketstack_tickers(search: str | None = None, limit: int = 50) -> dic
     ]
 
     result = {"success": True, "tickers": tickers, "total": len(tickers)}
-    cache_set(cache_key, result, ttl_seconds=3600)
     return result
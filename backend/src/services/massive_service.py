@@ -12,7 +12,7 @@ import logging
 import re
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -49,14 +49,10 @@ async def _massive_get(path: str, params: dict[str, Any] | None = None) -> Any:
         return await resp.json(content_type=None)
 
 
+@cached("massive", ttl_seconds=15)
 async def massive_quote(symbol: str) -> dict[str, Any]:
     """Get real-time quote for a global stock."""
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("massive", "quote", symbol)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _massive_get("/quote", {"symbol": symbol})
 
     quote_data = data.get("data", data)
@@ -73,10 +69,10 @@ async def massive_quote(symbol: str) -> dict[str, Any]:
         "provider": "massive",
     }
 
-    cache_set(cache_key, result, ttl_seconds=15)
     return result
 
 
+@cached("massive", ttl_seconds=300)
 async def massive_history(
     symbol: str,
     date_from: str | None = None,
@@ -91,11 +87,6 @@ async def massive_history(
         date_to: YYYY-MM-DD
     """
     symbol = _validate_symbol(symbol)
-    cache_key = make_cache_key("massive", "hist", symbol, date_from, date_to)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {"symbol": symbol}
     if date_from:
         params["date_from"] = date_from
@@ -131,17 +122,12 @@ async def massive_history(
         },
     }
 
-    cache_set(cache_key, result, ttl_seconds=300)
     return result
 
 
+@cached("massive", ttl_seconds=3600)
 async def massive_search(query: str) -> list[dict[str, Any]]:
     """Search for stock symbols."""
-    cache_key = make_cache_key("massive", "search", query)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     data = await _massive_get("/search", {"query": query})
 
     results = [
@@ -155,5 +141,4 @@ async def massive_search(query: str) -> list[dict[str, Any]]:
         for item in data.get("data", data) if isinstance(data.get("data", data), list)
     ]
 
-    cache_set(cache_key, results, ttl_seconds=3600)
     return results
@@ -13,6 +13,8 @@ import numpy as np
 import scipy.optimize
 import scipy.stats
 
+from src.utils.compute_pool import cpu_bound
+
 # ── Утилиты ──────────────────────────────────────────────────────────────────
 
 def _sigmoid(z: np.ndarray) -> np.ndarray:
@@ -57,41 +59,130 @@ def _standardize(X_train: np.ndarray, X_test: np.ndarray) -> tuple[np.ndarray, n
 
 # ── Шаг 1: Признаки ─────────────────────────────────────────────────────────
 
-def _build_features(prices: np.ndarray, window: int = 20) -> np.ndarray:
+ROLLING_CHUNK_ROWS = 65_536          # строк скользящего окна за один проход
+BARRIER_CHUNK_ELEMENTS = 4_000_000   # событий × баров в одном блоке барьеров
+
+
+def _trailing_sum(x: np.ndarray, n: int) -> np.ndarray:
+    """Σ x[t−n+1..t] для t ≥ n−1 через кумулятивную сумму (длина len(x) − n + 1)."""
+    csum = np.concatenate(([0.0], np.cumsum(x)))
+    return csum[n:] - csum[:-n]
+
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    std(ddof=1) по окнам x[t−window+1..t] (длина len(x) − window + 1).
+    sliding_window_view без копирования; блоками по ROLLING_CHUNK_ROWS окон,
+    чтобы временный массив отклонений не рос с длиной ряда.
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(x, window)
+    out = np.empty(len(windows))
+    for lo in range(0, len(windows), ROLLING_CHUNK_ROWS):
+        out[lo:lo + ROLLING_CHUNK_ROWS] = np.std(windows[lo:lo + ROLLING_CHUNK_ROWS], axis=1, ddof=1)
+    return out
+
+
+def _build_features(prices: np.ndarray, window: int = 20) -> tuple[np.ndarray, np.ndarray]:
     """
     Признаки для primary + meta моделей:
     - momentum (1-, 5-, 20-период доходность)
     - rolling vol (std returns за window)
     - z-score доходности
     - RSI-approx (avg up / avg total)
-    - Возвращает матрицу (T, K) — NaN в начале обрезаются снаружи.
+    - Возвращает матрицу (T, K) — NaN в начале обрезаются снаружи —
+      и rolling vol (T,), NaN до t = window.
+
+    Суммы по окнам — разности кумулятивных сумм, std — по sliding_window_view.
     """
     T = len(prices)
     rets = np.diff(np.log(prices), prepend=np.nan)  # log returns, len=T
 
     feats = np.full((T, 5), np.nan)
-    for t in range(window, T):
-        r_w = rets[t - window + 1: t + 1]
-        r_w = r_w[~np.isnan(r_w)]
-        if len(r_w) < 3:
-            continue
-        vol = float(np.std(r_w, ddof=1)) if len(r_w) > 1 else 1e-9
-        # momentum at lag 1, 5, 20
-        mom1 = rets[t] if not np.isnan(rets[t]) else 0.0
-        mom5 = float(np.sum(rets[max(0, t - 4): t + 1])) if t >= 4 else 0.0
-        mom20 = float(np.sum(rets[max(0, t - 19): t + 1])) if t >= 19 else 0.0
-        z = mom1 / (vol + 1e-15)
-        # RSI proxy
-        up = r_w[r_w > 0].sum()
-        total = np.abs(r_w).sum()
-        rsi = up / (total + 1e-15)
-        feats[t] = [mom1, mom5, mom20, z, rsi]
-
-    return feats  # (T, 5)
+    vol = np.full(T, np.nan)
+    if window < 3 or window >= T:
+        return feats, vol
+
+    r = rets[1:]            # без NaN в начале; r[i] = rets[i + 1]
+    t = np.arange(window, T)
+
+    # окно доходностей rets[t − window + 1 .. t] = r[t − window .. t − 1]
+    vol[window:] = _rolling_std(r, window)[t - window]
+    up = _trailing_sum(np.maximum(r, 0.0), window)[t - window]
+    total = _trailing_sum(np.abs(r), window)[t - window]
+
+    # momentum at lag 1, 5, 20; окно, задевающее rets[0] = NaN, даёт NaN
+    mom1 = rets[t]
+    mom = []
+    for n in (5, 20):
+        sums = np.concatenate(([0.0], _trailing_sum(r, n)))   # sums[t − n + 1] = Σ r[t−n..t−1]
+        m = np.where(t >= n, sums[np.maximum(t - n + 1, 0)], 0.0)
+        m[t == n - 1] = np.nan
+        mom.append(m)
+    mom5, mom20 = mom
+
+    z = mom1 / (vol[window:] + 1e-15)
+    rsi = up / (total + 1e-15)
+    feats[window:] = np.column_stack([mom1, mom5, mom20, z, rsi])
+
+    return feats, vol  # (T, 5), (T,)
 
 
 # ── Шаг 2: Triple-Barrier Labeling ───────────────────────────────────────────
 
+def _triple_barrier_batch(
+    prices: np.ndarray,
+    t0: np.ndarray,         # индексы событий
+    pt: float,              # profit-take multiplier (× daily_vol)
+    sl: float,              # stop-loss multiplier  (× daily_vol)
+    tmax: int,              # max holding (bars)
+    daily_vol: np.ndarray,  # vol каждого события
+    side: np.ndarray,       # primary side каждого события: +1 / -1
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Triple-barrier для всех событий сразу. Возвращает (labels, returns).
+
+    Окна цен [t0+1, t0+tmax] берутся из sliding_window_view (хвост дополнен
+    NaN — сравнения с NaN ложны, как выход за конец ряда); первое касание
+    каждого барьера — argmax по булевой маске. Блоки событий ограничены
+    BARRIER_CHUNK_ELEMENTS, чтобы память не зависела от длины истории.
+    """
+    T = len(prices)
+    t0 = np.asarray(t0, dtype=np.intp)
+    side = np.asarray(side, dtype=float)
+    daily_vol = np.asarray(daily_vol, dtype=float)
+
+    p0 = prices[t0]
+    # Барьеры в координатах side·p: take-profit сверху, stop-loss снизу
+    pt_level = side * p0 * (1.0 + side * pt * daily_vol)
+    sl_level = side * p0 * (1.0 - side * sl * daily_vol)
+
+    padded = np.concatenate((prices[1:], np.full(tmax, np.nan)))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, tmax)
+
+    labels = np.zeros(len(t0), dtype=int)
+    exit_idx = np.minimum(t0 + tmax, T - 1)
+    block = max(1, BARRIER_CHUNK_ELEMENTS // tmax)
+    for lo in range(0, len(t0), block):
+        chunk = slice(lo, lo + block)
+        path = windows[t0[chunk]] * side[chunk, None]  # (events, tmax)
+        hit_pt = path >= pt_level[chunk, None]
+        hit_sl = path <= sl_level[chunk, None]
+        first_pt = np.where(hit_pt.any(axis=1), hit_pt.argmax(axis=1), tmax)
+        first_sl = np.where(hit_sl.any(axis=1), hit_sl.argmax(axis=1), tmax)
+
+        # На одном баре take-profit проверяется первым
+        take = (first_pt < tmax) & (first_pt <= first_sl)
+        stop = ~take & (first_sl < tmax)
+        labels[chunk] = np.where(take, 1, np.where(stop, -1, 0))
+        exit_idx[chunk] = np.where(take, t0[chunk] + 1 + first_pt,
+                                   np.where(stop, t0[chunk] + 1 + first_sl, exit_idx[chunk]))
+
+    log_ret = np.log(prices[exit_idx] / p0)
+    # По барьерам — сырая лог-доходность, по времени — с учётом side
+    rets = np.where(labels == 0, side * log_ret, log_ret)
+    return labels, rets
+
+
 def _triple_barrier(
     prices: np.ndarray,
     t0: int,
@@ -107,46 +198,26 @@ def _triple_barrier(
     - -1: stop-loss barrier hit first  → loss
     -  0: time barrier                  → neutral
     """
-    pt_threshold = prices[t0] * (1.0 + side * pt * daily_vol)
-    sl_threshold = prices[t0] * (1.0 - side * sl * daily_vol)
-
-    T = len(prices)
-    for dt in range(1, tmax + 1):
-        t = t0 + dt
-        if t >= T:
-            break
-        p = prices[t]
-        if side == 1:
-            if p >= pt_threshold:
-                return +1, float(np.log(p / prices[t0]))
-            if p <= sl_threshold:
-                return -1, float(np.log(p / prices[t0]))
-        else:
-            if p <= pt_threshold:
-                return +1, float(np.log(p / prices[t0]))
-            if p >= sl_threshold:
-                return -1, float(np.log(p / prices[t0]))
-
-    t_end = min(t0 + tmax, T - 1)
-    r = float(np.log(prices[t_end] / prices[t0]))
-    return 0, side * r  # neutral
+    labels, rets = _triple_barrier_batch(prices, np.array([t0]), pt, sl, tmax, np.array([daily_vol]), np.array([side]))
+    return int(labels[0]), float(rets[0])
 
 
 # ── Шаг 3: Primary side rule ─────────────────────────────────────────────────
 
-def _primary_side(feats: np.ndarray) -> int:
+def _primary_side(feats: np.ndarray) -> np.ndarray:
     """
     Простое правило: side = sign(mom20 + mom5).
-    +1 → long, -1 → short.
+    +1 → long, -1 → short. feats — (5,) или (N, 5).
     """
-    mom5 = feats[1]
-    mom20 = feats[2]
+    mom5 = feats[..., 1]
+    mom20 = feats[..., 2]
     s = mom5 + mom20
-    return 1 if s >= 0 else -1
+    return np.where(s >= 0, 1, -1)
 
 
 # ── Шаг 4: Полный пайплайн ───────────────────────────────────────────────────
 
+@cpu_bound
 def compute_meta_labeling(
     prices: list[float],
     pt_multiplier: float = 1.5,
@@ -178,53 +249,35 @@ def compute_meta_labeling(
     if T < 50:
         raise ValueError(f"Нужно минимум 50 наблюдений, получено {T}")
 
-    # 1. Признаки
-    feats = _build_features(P, window=vol_window)
-
-    # 2. Triple-barrier labeling
-    records = []
-    for t in range(vol_window, T - max_holding - 1):
-        f = feats[t]
-        if np.any(np.isnan(f)):
-            continue
-        # rolling daily vol
-        rets_w = np.diff(np.log(P[max(0, t - vol_window): t + 1]))
-        daily_vol = float(np.std(rets_w, ddof=1)) if len(rets_w) > 1 else 1e-4
-        if daily_vol < 1e-8:
-            continue
-
-        primary_side = _primary_side(f)
-        label, ret = _triple_barrier(P, t, pt_multiplier, sl_multiplier, max_holding, daily_vol, primary_side)
-        records.append((t, primary_side, label, ret, f.copy(), daily_vol))
-
-    if len(records) < 20:
-        raise ValueError("Недостаточно меток после triple-barrier (нужно ≥ 20)")
+    # 1. Признаки (и rolling daily vol того же окна)
+    feats, vol = _build_features(P, window=vol_window)
+
+    # 2. Triple-barrier labeling — все события разом
+    t_all = np.arange(vol_window, max(T - max_holding - 1, vol_window))
+    valid = ~np.isnan(feats[t_all]).any(axis=1) & (vol[t_all] >= 1e-8)
+    t_idx = t_all[valid]
+    X_all = feats[t_idx]
+    daily_vol = vol[t_idx]
+    sides = _primary_side(X_all)
+    labels, rets = _triple_barrier_batch(P, t_idx, pt_multiplier, sl_multiplier, max_holding, daily_vol, sides)
 
-    records_arr = records  # list of tuples
+    if len(t_idx) < 20:
+        raise ValueError("Недостаточно меток после triple-barrier (нужно ≥ 20)")
 
     # 3. Разбиваем на train/test
-    n = len(records_arr)
+    n = len(t_idx)
     n_train = max(10, int(n * train_ratio))
-    train = records_arr[:n_train]
-    test = records_arr[n_train:]
 
-    if len(test) < 5:
+    if n - n_train < 5:
         raise ValueError("Слишком мало тестовых точек (< 5)")
 
     # 4. Primary model: оцениваем первичное качество
     # Используем логистическую регрессию для предсказания sign(ret) > 0
-    def make_Xy(recs):
-        X = np.array([r[4] for r in recs])    # (N, 5) features
-        # primary label: было ли выгодным?
-        y = np.array([1.0 if r[3] > 0 else 0.0 for r in recs])
-        sides = np.array([r[1] for r in recs])
-        labels = np.array([r[2] for r in recs])
-        rets = np.array([r[3] for r in recs])
-        t_idx = np.array([r[0] for r in recs])
-        return X, y, sides, labels, rets, t_idx
-
-    X_tr, y_tr, sides_tr, _labels_tr, rets_tr, _t_tr = make_Xy(train)
-    X_te, y_te, sides_te, labels_te, rets_te, _t_te = make_Xy(test)
+    # primary label: было ли выгодным?
+    y_all = (rets > 0).astype(float)
+    X_tr, y_tr, sides_tr, rets_tr = X_all[:n_train], y_all[:n_train], sides[:n_train], rets[:n_train]
+    X_te, y_te, sides_te, rets_te = X_all[n_train:], y_all[n_train:], sides[n_train:], rets[n_train:]
+    labels_te = labels[n_train:]
 
     # Стандартизация
     X_tr_s, X_te_s = _standardize(X_tr, X_te)
@@ -334,7 +387,7 @@ def compute_meta_labeling(
         # Config
         "n_samples": int(n),
         "n_train": n_train,
-        "n_test": len(test),
+        "n_test": n - n_train,
         "pt_multiplier": pt_multiplier,
         "sl_multiplier": sl_multiplier,
         "max_holding": max_holding,
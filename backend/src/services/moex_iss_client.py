@@ -0,0 +1,186 @@
+"""
+Shared async client for the MOEX ISS API (https://iss.moex.com/iss).
+
+All requests go through the pooled keep-alive session from
+src.utils.http_client and the "iss" cache namespace:
+- responses are cached per endpoint + parameters; data for past dates
+  never changes, so history requests use HISTORICAL_TTL_SECONDS
+  (see history_ttl);
+- concurrent identical requests are coalesced into one round trip;
+- paginated tables (start=, with a "<table>.cursor" block) are fetched by
+  reading the first page, then requesting the remaining pages concurrently.
+
+Synchronous callers (scripts, thread-pool code) use run_sync(), which
+executes coroutines on one long-lived background loop, so its session and
+connections stay warm between calls.
+
+Usage:
+    from src.services.moex_iss_client import iss_get, iss_get_paginated
+
+    data = await iss_get("engines/stock/zcyc/yearyields.json", {"date": "2024-01-10"})
+    table = await iss_get_paginated(
+        f"history/engines/stock/markets/bonds/securities/{secid}.json", "history",
+        {"from": "2020-01-01", "till": "2020-12-31"}, ttl_seconds=history_ttl("2020-12-31"),
+    )
+"""
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from datetime import date, datetime
+from typing import Any, TypeVar
+from urllib.parse import urlencode
+
+from src.services.cache_service import cache_get_or_fetch, configure_namespace, make_cache_key
+from src.utils.http_client import get_session
+
+ISS_BASE = "https://iss.moex.com/iss"
+
+# Responses for "today" / open ranges
+LIVE_TTL_SECONDS = 300
+# Reference data (descriptions, coupon schedules)
+REFERENCE_TTL_SECONDS = 3600
+# Closed trading days are immutable
+HISTORICAL_TTL_SECONDS = 7 * 24 * 3600
+
+# Concurrent page requests per paginated call (the shared session allows 10 per host)
+ISS_MAX_CONCURRENT_PAGES = 8
+
+configure_namespace("iss", max_size=5000)
+
+T = TypeVar("T")
+
+
+def history_ttl(till: str | date | None) -> float:
+    """Cache TTL for data up to `till`: long if the range ends before today."""
+    if till is None:
+        return LIVE_TTL_SECONDS
+    if isinstance(till, str):
+        till = datetime.strptime(till[:10], "%Y-%m-%d").date()
+    elif isinstance(till, datetime):
+        till = till.date()
+    return HISTORICAL_TTL_SECONDS if till < date.today() else LIVE_TTL_SECONDS
+
+
+def _with_defaults(params: dict[str, Any] | None) -> dict[str, str]:
+    merged = {"iss.meta": "off", **(params or {})}
+    return {k: str(v) for k, v in merged.items() if v is not None}
+
+
+def _key(*parts: Any, params: dict[str, str]) -> str:
+    return make_cache_key("iss", *parts, urlencode(sorted(params.items())))
+
+
+async def _fetch_json(path: str, params: dict[str, str]) -> dict[str, Any]:
+    session = await get_session()
+    async with session.get(f"{ISS_BASE}/{path.lstrip('/')}", params=params) as resp:
+        resp.raise_for_status()
+        return await resp.json(content_type=None)
+
+
+async def iss_get(
+    path: str,
+    params: dict[str, Any] | None = None,
+    ttl_seconds: float = LIVE_TTL_SECONDS,
+) -> dict[str, Any]:
+    """
+    GET an ISS endpoint (path relative to ISS_BASE, e.g. "securities/SU26238RMFS4.json").
+
+    Returns the parsed JSON; raises aiohttp.ClientResponseError on HTTP errors.
+    """
+    params = _with_defaults(params)
+    return await cache_get_or_fetch(
+        _key(path, params=params), lambda: _fetch_json(path, params), ttl_seconds
+    )
+
+
+def _cursor(data: dict[str, Any], table: str) -> dict[str, int] | None:
+    block = data.get(f"{table}.cursor") or {}
+    rows = block.get("data") or []
+    if not rows:
+        return None
+    cursor = dict(zip(block.get("columns", []), rows[0], strict=False))
+    if "TOTAL" not in cursor or "PAGESIZE" not in cursor:
+        return None
+    return {"index": int(cursor.get("INDEX") or 0), "total": int(cursor["TOTAL"]), "page_size": int(cursor["PAGESIZE"])}
+
+
+async def _fetch_all_pages(path: str, table: str, params: dict[str, str]) -> dict[str, Any]:
+    first = await _fetch_json(path, {**params, "start": "0"})
+    block = first.get(table) or {}
+    columns = block.get("columns", [])
+    rows = list(block.get("data") or [])
+
+    cursor = _cursor(first, table)
+    if cursor is None or cursor["page_size"] <= 0:
+        # Not a paginated table: the first response is complete
+        return {"columns": columns, "data": rows}
+
+    semaphore = asyncio.Semaphore(ISS_MAX_CONCURRENT_PAGES)
+
+    async def page(start: int) -> list[list[Any]]:
+        async with semaphore:
+            data = await _fetch_json(path, {**params, "start": str(start)})
+        return (data.get(table) or {}).get("data") or []
+
+    starts = range(cursor["page_size"], cursor["total"], cursor["page_size"])
+    for page_rows in await asyncio.gather(*(page(s) for s in starts)):
+        rows.extend(page_rows)
+    return {"columns": columns, "data": rows}
+
+
+async def iss_get_paginated(
+    path: str,
+    table: str,
+    params: dict[str, Any] | None = None,
+    ttl_seconds: float = LIVE_TTL_SECONDS,
+) -> dict[str, Any]:
+    """
+    All rows of one ISS table across start= pages: {"columns": [...], "data": [...]}.
+
+    The first page's "<table>.cursor" (INDEX, TOTAL, PAGESIZE) gives the page
+    count; the remaining pages are requested concurrently and concatenated in
+    order. Tables without a cursor are returned from the first response.
+    """
+    params = _with_defaults(params)
+    if "iss.only" in params:
+        only = params["iss.only"].split(",")
+        if f"{table}.cursor" not in only:
+            params["iss.only"] = ",".join([*only, f"{table}.cursor"])
+    return await cache_get_or_fetch(
+        _key(path, table, params=params),
+        lambda: _fetch_all_pages(path, table, params),
+        ttl_seconds,
+    )
+
+
+# ── Sync facade ──────────────────────────────────────────────────────────────
+
+_sync_loop: asyncio.AbstractEventLoop | None = None
+_sync_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None or _sync_loop.is_closed():
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="iss-sync", daemon=True).start()
+        return _sync_loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run an ISS coroutine from synchronous code and return its result.
+
+    Must not be called from a thread with a running event loop: await the
+    coroutine there instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError("run_sync() called from a running event loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
@@ -6,12 +6,13 @@ Public API (no key required): https://iss.moex.com/iss
 
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.utils.http_client import get_session
 
 MOEX_BASE = "https://iss.moex.com/iss"
 
 
+@cached("moex", ttl_seconds=60)
 async def moex_securities(
     board: str = "TQBR",
     market: str = "shares",
@@ -19,11 +20,6 @@ async def moex_securities(
     limit: int = 100,
 ) -> dict[str, Any]:
     """Get list of securities from MOEX board."""
-    key = make_cache_key("moex", "securities", engine, market, board, limit)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{MOEX_BASE}/engines/{engine}/markets/{market}/boards/{board}/securities.json"
     params = {"iss.meta": "off", "iss.only": "securities,marketdata", "securities.columns": "SECID,SHORTNAME,ISIN,LOTSIZE,PREVPRICE,CURRENCYID", "marketdata.columns": "SECID,LAST,OPEN,HIGH,LOW,VOLTODAY,VALTODAY,CHANGE,CHANGEPCT,UPDATETIME", "start": 0}
 
@@ -66,10 +62,10 @@ async def moex_securities(
         })
 
     result = {"board": board, "market": market, "engine": engine, "securities": securities[:limit], "provider": "moex_iss"}
-    cache_set(key, result, ttl_seconds=60)
     return result
 
 
+@cached("moex", ttl_seconds=120)
 async def moex_candles(
     ticker: str,
     board: str = "TQBR",
@@ -81,11 +77,6 @@ async def moex_candles(
     limit: int = 100,
 ) -> dict[str, Any]:
     """Get OHLCV candles for a MOEX ticker."""
-    key = make_cache_key("moex", "candles", ticker, board, interval, from_date, till_date, limit)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{MOEX_BASE}/engines/{engine}/markets/{market}/boards/{board}/securities/{ticker}/candles.json"
     params: dict[str, Any] = {"iss.meta": "off", "interval": interval, "start": 0}
     if from_date:
@@ -115,10 +106,10 @@ async def moex_candles(
         })
 
     result = {"ticker": ticker, "board": board, "interval": interval, "candles": candles, "provider": "moex_iss"}
-    cache_set(key, result, ttl_seconds=120)
     return result
 
 
+@cached("moex", ttl_seconds=15)
 async def moex_orderbook(
     ticker: str,
     board: str = "TQBR",
@@ -126,11 +117,6 @@ async def moex_orderbook(
     engine: str = "stock",
 ) -> dict[str, Any]:
     """Get order book (bids/asks) for a MOEX ticker."""
-    key = make_cache_key("moex", "orderbook", ticker, board)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{MOEX_BASE}/engines/{engine}/markets/{market}/boards/{board}/securities/{ticker}/orderbook.json"
     params = {"iss.meta": "off"}
 
@@ -153,10 +139,10 @@ async def moex_orderbook(
             asks.append(item)
 
     result = {"ticker": ticker, "board": board, "bids": bids, "asks": asks, "provider": "moex_iss"}
-    cache_set(key, result, ttl_seconds=15)
     return result
 
 
+@cached("moex", ttl_seconds=15)
 async def moex_trades(
     ticker: str,
     board: str = "TQBR",
@@ -165,11 +151,6 @@ async def moex_trades(
     limit: int = 50,
 ) -> dict[str, Any]:
     """Get recent trades for a MOEX ticker."""
-    key = make_cache_key("moex", "trades", ticker, board, limit)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{MOEX_BASE}/engines/{engine}/markets/{market}/boards/{board}/securities/{ticker}/trades.json"
     params = {"iss.meta": "off", "limit": limit, "reversed": 1}
 
@@ -194,10 +175,10 @@ async def moex_trades(
         })
 
     result = {"ticker": ticker, "board": board, "trades": trades, "provider": "moex_iss"}
-    cache_set(key, result, ttl_seconds=15)
     return result
 
 
+@cached("moex", ttl_seconds=120)
 async def moex_index(
     index_id: str = "IMOEX",
     limit: int = 100,
@@ -205,11 +186,6 @@ async def moex_index(
     till_date: str | None = None,
 ) -> dict[str, Any]:
     """Get MOEX index analytics (IMOEX, RTSI, etc.)."""
-    key = make_cache_key("moex", "index", index_id, limit, from_date)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{MOEX_BASE}/statistics/engines/stock/markets/index/analytics/{index_id}.json"
     params: dict[str, Any] = {"iss.meta": "off", "limit": limit}
     if from_date:
@@ -231,20 +207,15 @@ async def moex_index(
         analytics.append(a)
 
     result = {"index_id": index_id, "analytics": analytics, "provider": "moex_iss"}
-    cache_set(key, result, ttl_seconds=120)
     return result
 
 
+@cached("moex", ttl_seconds=60)
 async def moex_futures_oi(
     ticker: str,
     limit: int = 50,
 ) -> dict[str, Any]:
     """Get futures open interest from MOEX."""
-    key = make_cache_key("moex", "futures_oi", ticker, limit)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"{MOEX_BASE}/engines/futures/markets/forts/boards/RFUD/securities/{ticker}.json"
     params = {"iss.meta": "off", "iss.only": "securities,marketdata"}
 
@@ -269,5 +240,4 @@ async def moex_futures_oi(
         }
 
     result = {**futures_data, "provider": "moex_iss"}
-    cache_set(key, result, ttl_seconds=60)
     return result
@@ -0,0 +1,200 @@
+"""
+Векторизованный Монте-Карло движок для портфельных симуляций.
+
+Коррелированные шоки активов генерируются блоками через numpy.random.Generator,
+траектории портфеля, просадки, квантильные полосы и VaR/CVaR считаются
+редукциями по массивам. Пиковая память временных тензоров шоков ограничена
+параметром max_chunk_bytes.
+
+Используется в hjb_service.simulate_monte_carlo, StressTestSimulator,
+run_backtest и adversarial_stress_service.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+# Бюджет памяти на один блок шоков (n_chunk × n_steps × n_assets × 8 байт)
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+
+# Количество траекторий, возвращаемых клиенту для отображения
+N_DISPLAY_PATHS = 50
+
+
+@dataclass
+class PortfolioSimulation:
+    """Результат симуляции: полные траектории капитала и просадки по путям."""
+
+    paths: np.ndarray          # (n_paths, n_steps + 1)
+    max_drawdowns: np.ndarray  # (n_paths,)
+    t_grid: np.ndarray         # (n_steps + 1,)
+    initial_capital: float
+    horizon_years: float
+
+    @property
+    def final_capitals(self) -> np.ndarray:
+        return self.paths[:, -1]
+
+
+def safe_cholesky(cov_matrix: np.ndarray, jitter: float = 1e-6) -> np.ndarray:
+    """Cholesky-фактор ковариационной матрицы с регуляризацией диагонали при неудаче."""
+    cov_matrix = np.asarray(cov_matrix, dtype=float)
+    try:
+        return np.linalg.cholesky(cov_matrix)
+    except np.linalg.LinAlgError:
+        return np.linalg.cholesky(cov_matrix + np.eye(len(cov_matrix)) * jitter)
+
+
+def tail_risk(values: np.ndarray, alpha: float) -> tuple[float, float]:
+    """VaR (α-квантиль) и CVaR (среднее значений не выше квантиля)."""
+    var = float(np.quantile(values, alpha))
+    tail = values[values <= var]
+    cvar = float(np.mean(tail)) if len(tail) > 0 else var
+    return var, cvar
+
+
+def _chunk_rows(n_steps: int, width: int, max_chunk_bytes: int) -> int:
+    """Число траекторий в блоке, при котором тензор шоков укладывается в бюджет памяти."""
+    bytes_per_path = max(1, n_steps * width * 8)
+    return max(1, int(max_chunk_bytes // bytes_per_path))
+
+
+def _max_drawdowns(paths: np.ndarray) -> np.ndarray:
+    """Максимальная относительная просадка по каждой траектории (ось 1 — время)."""
+    peaks = np.maximum.accumulate(paths, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = np.where(peaks > 0, (peaks - paths) / peaks, 0.0)
+    return drawdowns.max(axis=1)
+
+
+def simulate_portfolio_paths(
+    mu: np.ndarray,
+    cov_matrix: np.ndarray,
+    weights: np.ndarray,
+    initial_capital: float,
+    horizon_years: float,
+    n_paths: int,
+    n_steps: int = 252,
+    seed: int | np.random.Generator | None = None,
+    rebalance: bool = True,
+    max_chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> PortfolioSimulation:
+    """
+    Симуляция траекторий капитала портфеля с коррелированными GBM-активами.
+
+    Args:
+        mu: Ожидаемые годовые доходности активов
+        cov_matrix: Годовая ковариационная матрица
+        weights: Веса активов
+        initial_capital: Начальный капитал
+        horizon_years: Горизонт (годы)
+        n_paths: Количество траекторий
+        n_steps: Количество временных шагов
+        seed: Seed или готовый numpy.random.Generator
+        rebalance: True — постоянные веса (непрерывная ребалансировка, модель Мертона);
+            False — buy-and-hold, веса дрейфуют вместе с ценами активов
+        max_chunk_bytes: Бюджет памяти на блок шоков
+
+    Returns:
+        PortfolioSimulation с полными траекториями и просадками
+    """
+    mu = np.asarray(mu, dtype=float).ravel()
+    weights = np.asarray(weights, dtype=float).ravel()
+    cov_matrix = np.asarray(cov_matrix, dtype=float)
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+    dt = horizon_years / n_steps
+    sqrt_dt = np.sqrt(dt)
+    chol = safe_cholesky(cov_matrix)
+
+    paths = np.empty((n_paths, n_steps + 1))
+    paths[:, 0] = initial_capital
+    max_drawdowns = np.empty(n_paths)
+
+    if rebalance:
+        # При постоянных весах диффузия портфеля w·(L z) = (Lᵀw)·z ~ N(0, wᵀΣw),
+        # поэтому достаточно одного нормального шока на шаг вместо N коррелированных.
+        loading = chol.T @ weights
+        port_var = float(loading @ loading)
+        drift = (float(weights @ mu) - 0.5 * port_var) * dt
+        diffusion = np.sqrt(port_var) * sqrt_dt
+        rows = _chunk_rows(n_steps, 1, max_chunk_bytes)
+        for start in range(0, n_paths, rows):
+            stop = min(start + rows, n_paths)
+            z = rng.standard_normal((stop - start, n_steps))
+            log_increments = drift + diffusion * z
+            np.cumsum(log_increments, axis=1, out=log_increments)
+            paths[start:stop, 1:] = initial_capital * np.exp(log_increments)
+            max_drawdowns[start:stop] = _max_drawdowns(paths[start:stop])
+    else:
+        # Buy-and-hold: симулируем коррелированные шоки по каждому активу
+        n_assets = len(mu)
+        asset_drift = (mu - 0.5 * np.diag(cov_matrix)) * dt
+        holdings = initial_capital * weights
+        cash = initial_capital - float(holdings.sum())
+        rows = _chunk_rows(n_steps, n_assets, max_chunk_bytes)
+        for start in range(0, n_paths, rows):
+            stop = min(start + rows, n_paths)
+            z = rng.standard_normal((stop - start, n_steps, n_assets))
+            log_increments = asset_drift + sqrt_dt * (z @ chol.T)
+            np.cumsum(log_increments, axis=1, out=log_increments)
+            np.exp(log_increments, out=log_increments)
+            paths[start:stop, 1:] = log_increments @ holdings + cash
+            max_drawdowns[start:stop] = _max_drawdowns(paths[start:stop])
+
+    return PortfolioSimulation(
+        paths=paths,
+        max_drawdowns=max_drawdowns,
+        t_grid=np.linspace(0, horizon_years, n_steps + 1),
+        initial_capital=float(initial_capital),
+        horizon_years=float(horizon_years),
+    )
+
+
+def summarize_simulation(
+    sim: PortfolioSimulation,
+    risk_free_rate: float = 0.0,
+    n_display_paths: int = N_DISPLAY_PATHS,
+) -> dict:
+    """
+    Статистики симуляции в формате ответа simulate_monte_carlo.
+
+    Квантильные полосы считаются одним вызовом np.quantile по всем траекториям.
+    Траектории и сетка возвращаются массивами NumPy: маршруты сериализуют
+    их через src.utils.array_response.
+    """
+    final_capitals = sim.final_capitals
+    var_95, cvar_95 = tail_risk(final_capitals, 0.05)
+    var_99, cvar_99 = tail_risk(final_capitals, 0.01)
+
+    # Годовая доходность
+    returns = (final_capitals / sim.initial_capital) ** (1 / sim.horizon_years) - 1
+    mean_return = float(np.mean(returns))
+    std_return = float(np.std(returns))
+    sharpe = (mean_return - risk_free_rate) / std_return if std_return > 1e-10 else 0.0
+
+    # Квантили траекторий
+    q05_path, median_path, q95_path = np.quantile(sim.paths, [0.05, 0.5, 0.95], axis=0)
+
+    return {
+        'paths': sim.paths[:n_display_paths],
+        'median_path': median_path,
+        'q05_path': q05_path,
+        'q95_path': q95_path,
+        't_grid': sim.t_grid,
+        'stats': {
+            'mean_final': float(np.mean(final_capitals)),
+            'median_final': float(np.median(final_capitals)),
+            'std_final': float(np.std(final_capitals)),
+            'min_final': float(np.min(final_capitals)),
+            'max_final': float(np.max(final_capitals)),
+            'var_95': var_95,
+            'cvar_95': cvar_95,
+            'var_99': var_99,
+            'cvar_99': cvar_99,
+            'mean_max_drawdown': float(np.mean(sim.max_drawdowns)),
+            'mean_return': mean_return,
+            'median_return': float(np.median(returns)),
+            'std_return': std_return,
+            'sharpe_ratio': float(sharpe)
+        }
+    }
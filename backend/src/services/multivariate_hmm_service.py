@@ -15,8 +15,12 @@ from typing import Any
 
 import numpy as np
 import pandas as pd
-from numpy.linalg import LinAlgError, det, inv
+from numpy.linalg import LinAlgError, cholesky
 from scipy.cluster.vq import kmeans2
+from scipy.linalg import solve_triangular
+
+from src.utils.compute_pool import cpu_bound
+from src.utils.progress import ProgressCallback, report
 
 warnings.filterwarnings('ignore', category=DeprecationWarning)
 logger = logging.getLogger(__name__)
@@ -126,11 +130,8 @@ class MultivariateHMMRegimeAnalyzer:
         log_likelihood_old = -np.inf
 
         for iteration in range(max_iterations):
-            # E-step: Forward-Backward
-            alpha, beta = self.forward_backward(self.y_normalized)
-
-            # Вычисление gamma и xi
-            gamma, xi = self.forward_backward_posterior(self.y_normalized, alpha, beta)
+            # E-step: эмиссии, forward-backward и апостериорные вероятности
+            gamma, xi, log_likelihood_new = self._e_step(self.y_normalized)
 
             # M-step: Обновление параметров
             pi_new, P_new, mu_new, sigma_new = self.estimate_parameters(
@@ -145,8 +146,7 @@ class MultivariateHMMRegimeAnalyzer:
             self.gamma = gamma
             self.xi = xi
 
-            # Вычисление log-likelihood
-            log_likelihood_new = self.compute_log_likelihood(self.y_normalized, alpha)
+            # Log-likelihood параметров, использованных в E-step
             self.log_likelihood_history.append(log_likelihood_new)
 
             # Проверка сходимости
@@ -205,6 +205,30 @@ class MultivariateHMMRegimeAnalyzer:
                 else:
                     self.transition_matrix[i, j] = 0.1 / (M - 1)
 
+    @staticmethod
+    def _regime_cholesky(sigma: np.ndarray) -> np.ndarray:
+        """
+        Нижний Cholesky-фактор ковариации режима с регуляризацией.
+
+        При вырожденной матрице наращивает диагональную добавку, а в крайнем
+        случае переходит к диагональной ковариации.
+        """
+        K = sigma.shape[0]
+        for jitter in (1e-6, 1e-4):
+            try:
+                return cholesky(sigma + np.eye(K) * jitter)
+            except LinAlgError:
+                continue
+        return np.diag(np.sqrt(np.maximum(np.diag(sigma), 0.0) + 1e-4))
+
+    def _log_gaussian(self, y: np.ndarray, mu: np.ndarray, sigma: np.ndarray) -> np.ndarray:
+        """Логарифм многомерной гауссовой плотности для всех строк y через Cholesky-фактор."""
+        K = y.shape[1]
+        L = self._regime_cholesky(sigma)
+        z = solve_triangular(L, (y - mu).T, lower=True)  # (K, T)
+        log_det = 2.0 * np.sum(np.log(np.diag(L)))
+        return -0.5 * (K * np.log(2 * np.pi) + log_det + np.einsum('kt,kt->t', z, z))
+
     def gaussian_pdf(self, y: np.ndarray, mu: np.ndarray, sigma: np.ndarray) -> np.ndarray:
         """
         Вычислить многомерное гауссово распределение.
@@ -225,35 +249,107 @@ class MultivariateHMMRegimeAnalyzer:
         """
         if y.ndim == 1:
             y = y.reshape(1, -1)
+        return np.exp(self._log_gaussian(y, mu, sigma))
 
-        T, K = y.shape
+    def emission_log_likelihood(self, y: np.ndarray) -> np.ndarray:
+        """
+        Матрица логарифмов эмиссий log p(y_t | S_t = k).
 
-        # Регуляризация для положительной определенности
-        sigma_reg = sigma + np.eye(K) * 1e-6
+        Считается один раз на EM-итерацию: одно Cholesky-разложение на режим
+        вместо обращения матрицы на каждую пару (t, k).
 
-        try:
-            det_sigma = det(sigma_reg)
-            if det_sigma <= 0:
-                sigma_reg = sigma + np.eye(K) * 1e-4
-                det_sigma = det(sigma_reg)
-
-            sigma_inv = inv(sigma_reg)
-        except LinAlgError:
-            # Если матрица вырождена, используем диагональную
-            sigma_reg = np.diag(np.diag(sigma)) + np.eye(K) * 1e-4
-            det_sigma = det(sigma_reg)
-            sigma_inv = inv(sigma_reg)
-
-        # Вычисление PDF для каждого наблюдения
-        pdf_values = np.zeros(T)
-        const = 1.0 / ((2 * np.pi) ** (K / 2) * np.sqrt(det_sigma))
+        Parameters
+        ----------
+        y : np.ndarray
+            (T, K) нормализованный временной ряд
+
+        Returns
+        -------
+        np.ndarray
+            (T, M) матрица log-правдоподобий эмиссий
+        """
+        log_b = np.empty((y.shape[0], self.n_regimes))
+        for k in range(self.n_regimes):
+            log_b[:, k] = self._log_gaussian(y, self.mu[k], self.sigma[k])
+        return log_b
+
+    @staticmethod
+    def _scaled_emissions(log_b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Эмиссии, отмасштабированные на построчный максимум (защита от underflow)."""
+        offsets = np.max(log_b, axis=1)
+        return np.exp(log_b - offsets[:, np.newaxis]), offsets
+
+    def _forward_backward_scaled(
+        self,
+        b: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Нормированные forward/backward рекурсии (Rabiner, 1989).
+
+        Каждый шаг — одно матрично-векторное произведение с матрицей переходов.
+
+        Returns
+        -------
+        alpha, beta : np.ndarray
+            (T, M) нормированные forward/backward вероятности
+        scale : np.ndarray
+            (T,) нормировочные множители c_t
+        """
+        T, M = b.shape
+        P = self.transition_matrix
 
+        alpha = np.empty((T, M))
+        scale = np.empty(T)
+        a = self.pi * b[0]
         for t in range(T):
-            diff = y[t] - mu
-            exponent = -0.5 * diff.T @ sigma_inv @ diff
-            pdf_values[t] = const * np.exp(exponent)
+            if t > 0:
+                a = (alpha[t - 1] @ P) * b[t]
+            c = a.sum()
+            if c <= 0:
+                # Underflow: равномерное распределение
+                a = np.full(M, 1.0 / M)
+                c = 1e-300
+            else:
+                a = a / c
+            alpha[t] = a
+            scale[t] = c
+
+        beta = np.empty((T, M))
+        beta[-1] = 1.0
+        for t in range(T - 2, -1, -1):
+            beta[t] = P @ (b[t + 1] * beta[t + 1]) / scale[t + 1]
+
+        return alpha, beta, scale
+
+    def _posteriors(
+        self,
+        alpha: np.ndarray,
+        beta: np.ndarray,
+        b: np.ndarray,
+        scale: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """γ и ξ из нормированных forward/backward вероятностей (без циклов по t)."""
+        gamma = alpha * beta
+        gamma_sum = gamma.sum(axis=1, keepdims=True)
+        gamma = np.where(gamma_sum > 0, gamma / np.where(gamma_sum > 0, gamma_sum, 1.0), 1.0 / gamma.shape[1])
+
+        # ξ_t(i, j) = α_t(i) P(i, j) b_{t+1}(j) β_{t+1}(j) / c_{t+1}
+        xi = np.einsum(
+            'ti,ij,tj->tij', alpha[:-1], self.transition_matrix, b[1:] * beta[1:]
+        ) / scale[1:, np.newaxis, np.newaxis]
+        return gamma, xi
+
+    def _e_step(self, y: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+        """
+        E-step: γ, ξ и log-правдоподобие при текущих параметрах.
 
-        return pdf_values
+        Эмиссии вычисляются один раз и переиспользуются в forward, backward и ξ.
+        """
+        b, offsets = self._scaled_emissions(self.emission_log_likelihood(y))
+        alpha, beta, scale = self._forward_backward_scaled(b)
+        gamma, xi = self._posteriors(alpha, beta, b, scale)
+        log_likelihood = float(np.sum(np.log(scale)) + np.sum(offsets))
+        return gamma, xi, log_likelihood
 
     def forward_backward(self, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
         """
@@ -271,59 +367,8 @@ class MultivariateHMMRegimeAnalyzer:
         beta : np.ndarray
             (T, M) backward вероятности
         """
-        T, _K = y.shape
-        M = self.n_regimes
-
-        # Forward pass
-        alpha = np.zeros((T, M))
-
-        # t=1
-        for i in range(M):
-            pdf_val = self.gaussian_pdf(y[0], self.mu[i], self.sigma[i])
-            alpha[0, i] = self.pi[i] * pdf_val[0]
-
-        # Нормализация для численной стабильности
-        alpha_sum = np.sum(alpha[0])
-        if alpha_sum > 0:
-            alpha[0] = alpha[0] / alpha_sum
-        else:
-            alpha[0] = np.ones(M) / M
-
-        # t=2..T
-        for t in range(1, T):
-            for i in range(M):
-                pdf_val = self.gaussian_pdf(y[t], self.mu[i], self.sigma[i])
-                prob = pdf_val[0]
-
-                # Сумма по предыдущим состояниям
-                sum_term = np.sum(self.transition_matrix[:, i] * alpha[t-1, :])
-                alpha[t, i] = prob * sum_term
-
-            # Нормализация
-            alpha_sum = np.sum(alpha[t])
-            if alpha_sum > 0:
-                alpha[t] = alpha[t] / alpha_sum
-            else:
-                alpha[t] = np.ones(M) / M
-
-        # Backward pass
-        beta = np.ones((T, M))
-
-        for t in range(T-2, -1, -1):
-            for i in range(M):
-                sum_term = 0.0
-                for j in range(M):
-                    pdf_val = self.gaussian_pdf(y[t+1], self.mu[j], self.sigma[j])
-                    sum_term += self.transition_matrix[i, j] * pdf_val[0] * beta[t+1, j]
-                beta[t, i] = sum_term
-
-            # Нормализация
-            beta_sum = np.sum(beta[t])
-            if beta_sum > 0:
-                beta[t] = beta[t] / beta_sum
-            else:
-                beta[t] = np.ones(M) / M
-
+        b, _ = self._scaled_emissions(self.emission_log_likelihood(y))
+        alpha, beta, _ = self._forward_backward_scaled(b)
         return alpha, beta
 
     def forward_backward_posterior(
@@ -351,37 +396,12 @@ class MultivariateHMMRegimeAnalyzer:
         xi : np.ndarray
             (T-1, M, M) вероятности переходов
         """
-        T, M = alpha.shape[0], alpha.shape[1]
-
-        # Compute gamma
-        gamma = np.zeros((T, M))
-        for t in range(T):
-            denominator = np.sum(alpha[t, :] * beta[t, :])
-            if denominator > 0:
-                gamma[t, :] = (alpha[t, :] * beta[t, :]) / denominator
-            else:
-                gamma[t, :] = 1.0 / M  # Равномерное распределение при underflow
-
-        # Compute xi
-        xi = np.zeros((T-1, M, M))
-        for t in range(T-1):
-            denominator = 0.0
-            for i in range(M):
-                for j in range(M):
-                    pdf_val = self.gaussian_pdf(y[t+1], self.mu[j], self.sigma[j])
-                    denominator += alpha[t, i] * self.transition_matrix[i, j] * pdf_val[0] * beta[t+1, j]
-
-            if denominator > 0:
-                for i in range(M):
-                    for j in range(M):
-                        pdf_val = self.gaussian_pdf(y[t+1], self.mu[j], self.sigma[j])
-                        numerator = alpha[t, i] * self.transition_matrix[i, j] * pdf_val[0] * beta[t+1, j]
-                        xi[t, i, j] = numerator / denominator
-            else:
-                # Равномерное распределение при underflow
-                xi[t, :, :] = 1.0 / (M * M)
-
-        return gamma, xi
+        b, _ = self._scaled_emissions(self.emission_log_likelihood(y))
+        # Нормировочные множители восстанавливаются из α без повторного прохода
+        scale = np.ones(len(alpha))
+        scale[1:] = np.sum((alpha[:-1] @ self.transition_matrix) * b[1:], axis=1)
+        scale = np.where(scale > 0, scale, 1e-300)
+        return self._posteriors(alpha, beta, b, scale)
 
     def estimate_parameters(
         self,
@@ -412,7 +432,7 @@ class MultivariateHMMRegimeAnalyzer:
         sigma_new : np.ndarray
             (M, K, K) новые ковариации
         """
-        T, K = y.shape
+        _T, K = y.shape
         M = self.n_regimes
 
         # Новое начальное распределение
@@ -420,78 +440,52 @@ class MultivariateHMMRegimeAnalyzer:
         pi_sum = np.sum(pi_new)
         pi_new = pi_new / pi_sum if pi_sum > 0 else np.ones(M) / M
 
-        # Новая матрица переходов
-        P_new = np.zeros((M, M))
-        for i in range(M):
-            denominator = np.sum(gamma[:-1, i])
-            if denominator > 0:
-                for j in range(M):
-                    numerator = np.sum(xi[:, i, j])
-                    P_new[i, j] = numerator / denominator
-            else:
-                # Если режим не встречается, используем равномерное распределение
-                P_new[i, :] = 1.0 / M
+        # Новая матрица переходов; для не встречающихся режимов — равномерное распределение
+        trans_denominator = np.sum(gamma[:-1], axis=0)
+        P_new = np.full((M, M), 1.0 / M)
+        visited = trans_denominator > 0
+        P_new[visited] = np.sum(xi, axis=0)[visited] / trans_denominator[visited, np.newaxis]
 
         # Нормализация строк матрицы переходов
         row_sums = np.sum(P_new, axis=1, keepdims=True)
         row_sums = np.where(row_sums > 0, row_sums, 1.0)
         P_new = P_new / row_sums
 
-        # Новые средние
-        mu_new = np.zeros((M, K))
-        for k in range(M):
-            denominator = np.sum(gamma[:, k])
-            if denominator > 0:
-                numerator = np.sum(gamma[:, k, np.newaxis] * y, axis=0)
-                mu_new[k] = numerator / denominator
-            else:
-                mu_new[k] = self.mu[k].copy()  # Сохраняем старое значение
+        # Новые средние; пустые режимы сохраняют старые параметры
+        weights = np.sum(gamma, axis=0)
+        active = weights > 0
+        safe_weights = np.where(active, weights, 1.0)
+        mu_new = np.where(active[:, np.newaxis], (gamma.T @ y) / safe_weights[:, np.newaxis], self.mu)
 
-        # Новые ковариации
-        sigma_new = np.zeros((M, K, K))
-        for k in range(M):
-            denominator = np.sum(gamma[:, k])
-            if denominator > 0:
-                numerator_matrix = np.zeros((K, K))
-                for t in range(T):
-                    diff = y[t] - mu_new[k]
-                    outer_product = np.outer(diff, diff)
-                    numerator_matrix += gamma[t, k] * outer_product
-                sigma_new[k] = numerator_matrix / denominator
-            else:
-                sigma_new[k] = self.sigma[k].copy()  # Сохраняем старое значение
+        # Новые ковариации: Σ_k = Σ_t γ_tk (y_t - μ_k)(y_t - μ_k)ᵀ / Σ_t γ_tk
+        diff = y[np.newaxis, :, :] - mu_new[:, np.newaxis, :]  # (M, T, K)
+        sigma_new = np.einsum('tm,mti,mtj->mij', gamma, diff, diff) / safe_weights[:, np.newaxis, np.newaxis]
+        sigma_new = np.where(active[:, np.newaxis, np.newaxis], sigma_new, self.sigma)
 
-            # Регуляризация для положительной определенности
-            sigma_new[k] += np.eye(K) * 1e-6
+        # Регуляризация для положительной определенности
+        sigma_new = sigma_new + np.eye(K) * 1e-6
 
         return pi_new, P_new, mu_new, sigma_new
 
-    def compute_log_likelihood(self, y: np.ndarray, alpha: np.ndarray) -> float:
+    def compute_log_likelihood(self, y: np.ndarray) -> float:
         """
         Вычислить логарифм правдоподобия.
+
+        log L = Σ_t log c_t, где c_t — нормировочные множители forward-прохода.
         
         Parameters
         ----------
         y : np.ndarray
             (T, K) нормализованный временной ряд
-        alpha : np.ndarray
-            (T, M) forward вероятности
         
         Returns
         -------
         float
             Log-likelihood
         """
-        T = alpha.shape[0]
-        log_likelihood = 0.0
-
-        for t in range(T):
-            likelihood_t = np.sum(alpha[t, :])
-            if likelihood_t <= 0:
-                return -np.inf
-            log_likelihood += np.log(max(likelihood_t, 1e-300))
-
-        return log_likelihood
+        b, offsets = self._scaled_emissions(self.emission_log_likelihood(y))
+        _, _, scale = self._forward_backward_scaled(b)
+        return float(np.sum(np.log(scale)) + np.sum(offsets))
 
     def predict_states(self, y: np.ndarray | None = None) -> np.ndarray:
         """
@@ -630,7 +624,6 @@ class MultivariateHMMRegimeAnalyzer:
         if self.gamma is None:
             raise ValueError("Модель не обучена. Вызовите fit() сначала.")
 
-        T = len(self.gamma)
         M = self.n_regimes
 
         # Вычисляем VaR для каждого режима
@@ -645,11 +638,7 @@ class MultivariateHMMRegimeAnalyzer:
                 var_per_regime[k] = 0.0
 
         # Динамический VaR
-        dynamic_var = np.zeros(T)
-        for t in range(T):
-            dynamic_var[t] = np.sum(self.gamma[t, :] * var_per_regime)
-
-        return dynamic_var
+        return self.gamma @ var_per_regime
 
     def simulate(self, n_steps: int = 100) -> np.ndarray:
         """
@@ -728,7 +717,8 @@ class MultivariateHMMRegimeAnalyzer:
         max_regimes: int = 5,
         criterion: str = 'aicc',
         max_iterations: int = 30,
-        tol: float = 1e-6
+        tol: float = 1e-6,
+        progress: ProgressCallback | None = None
     ) -> tuple[int, float]:
         """
         Автоматически определить оптимальное количество режимов.
@@ -759,6 +749,9 @@ class MultivariateHMMRegimeAnalyzer:
             Максимальное число EM итераций для каждой модели
         tol : float, default=1e-6
             Tolerance для сходимости
+        progress : callable, optional
+            Колбэк прогресса progress(fraction, message), вызывается перед
+            обучением каждой модели (см. src.utils.progress)
         
         Returns
         -------
@@ -776,7 +769,9 @@ class MultivariateHMMRegimeAnalyzer:
         criterion_values = []
         models = []
 
+        n_candidates = max_regimes - min_regimes + 1
         for n_regimes in range(min_regimes, max_regimes + 1):
+            report(progress, (n_regimes - min_regimes) / n_candidates, f"n_regimes={n_regimes}")
             try:
                 # Создаем модель с n_regimes режимами
                 model = MultivariateHMMRegimeAnalyzer(
@@ -856,6 +851,7 @@ class MultivariateHMMRegimeAnalyzer:
                 self.y_mean = optimal_model.y_mean
                 self.y_std = optimal_model.y_std
 
+        report(progress, 1.0, f"n_regimes={optimal_n_regimes}")
         return optimal_n_regimes, best_criterion_value
 
     def print_summary(self):
@@ -872,3 +868,45 @@ class MultivariateHMMRegimeAnalyzer:
 
         if self.log_likelihood_history:
             pass
+
+
+@cpu_bound
+def fit_regime_model(
+    y: np.ndarray,
+    asset_names: list[str] | None = None,
+    n_regimes: int = 2,
+    random_state: int = 42,
+    max_iterations: int = 50,
+    tol: float = 1e-6,
+    auto_optimize: bool = False,
+    criterion: str = 'aicc',
+    min_regimes: int = 2,
+    max_regimes: int = 5,
+) -> tuple[MultivariateHMMRegimeAnalyzer, int]:
+    """
+    Обучить модель (с подбором числа режимов при auto_optimize).
+
+    Функция уровня модуля, чтобы её мог выполнить пул процессов
+    (src.utils.compute_pool); обученная модель возвращается целиком.
+
+    Returns
+    -------
+    model : MultivariateHMMRegimeAnalyzer
+        Обученная модель
+    n_regimes : int
+        Использованное число режимов
+    """
+    model = MultivariateHMMRegimeAnalyzer(n_regimes=n_regimes, random_state=random_state)
+    if auto_optimize:
+        n_regimes, _ = model.find_optimal_n_regimes(
+            y=y,
+            asset_names=asset_names,
+            min_regimes=min_regimes,
+            max_regimes=max_regimes,
+            criterion=criterion,
+            max_iterations=max_iterations,
+            tol=tol
+        )
+    else:
+        model.fit(y=y, asset_names=asset_names, max_iterations=max_iterations, tol=tol)
+    return model, n_regimes
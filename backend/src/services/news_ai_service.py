@@ -7,7 +7,7 @@ Proxies news feeds and ML inference endpoints.
 import re
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -25,6 +25,7 @@ def _hf_token() -> str: return get_key_sync("HUGGINGFACE_TOKEN")
 
 # ─── NewsAPI ──────────────────────────────────────────────────────────────────
 
+@cached("newsapi", ttl_seconds=300)
 async def newsapi_top_headlines(
     country: str = "us",
     category: str | None = None,
@@ -32,11 +33,6 @@ async def newsapi_top_headlines(
     page_size: int = 20,
 ) -> dict[str, Any]:
     """Get top headlines from NewsAPI."""
-    key = make_cache_key("newsapi", "headlines", country, category, q, page_size)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {
         "country": country,
         "pageSize": page_size,
@@ -70,10 +66,10 @@ async def newsapi_top_headlines(
         "articles": articles,
         "provider": "newsapi",
     }
-    cache_set(key, result, ttl_seconds=300)
     return result
 
 
+@cached("newsapi", ttl_seconds=300)
 async def newsapi_everything(
     q: str = "",
     from_date: str | None = None,
@@ -83,11 +79,6 @@ async def newsapi_everything(
     language: str = "en",
 ) -> dict[str, Any]:
     """Search all articles from NewsAPI."""
-    key = make_cache_key("newsapi", "everything", q, from_date, to_date, sort_by, page_size)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {
         "q": q,
         "sortBy": sort_by,
@@ -122,23 +113,18 @@ async def newsapi_everything(
         "articles": articles,
         "provider": "newsapi",
     }
-    cache_set(key, result, ttl_seconds=300)
     return result
 
 
 # ─── Currents API ─────────────────────────────────────────────────────────────
 
+@cached("currents", ttl_seconds=300)
 async def currents_latest(
     language: str = "en",
     keywords: str | None = None,
     category: str | None = None,
 ) -> dict[str, Any]:
     """Get latest news from Currents API."""
-    key = make_cache_key("currents", "latest", language, keywords, category)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {
         "language": language,
         "apiKey": _currents_key(),
@@ -171,20 +157,15 @@ async def currents_latest(
         "articles": articles,
         "provider": "currents",
     }
-    cache_set(key, result, ttl_seconds=300)
     return result
 
 
+@cached("currents", ttl_seconds=300)
 async def currents_search(
     keywords: str = "",
     language: str = "en",
 ) -> dict[str, Any]:
     """Search news from Currents API."""
-    key = make_cache_key("currents", "search", keywords, language)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params: dict[str, Any] = {
         "keywords": keywords,
         "language": language,
@@ -208,7 +189,6 @@ async def currents_search(
         })
 
     result = {"articles": articles, "provider": "currents"}
-    cache_set(key, result, ttl_seconds=300)
     return result
 
 
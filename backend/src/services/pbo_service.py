@@ -9,10 +9,14 @@
 - Логит-распределение OOS ранга
 """
 import itertools
+import math
 
 import numpy as np
 import scipy.stats
 
+from src.utils.compute_pool import cpu_bound
+from src.utils.progress import ProgressCallback, report, scaled
+
 # ── Вспомогательные функции ───────────────────────────────────────────────────
 
 def _sharpe_ratio(returns: np.ndarray, annualize: int = 1) -> float:
@@ -24,24 +28,69 @@ def _sharpe_ratio(returns: np.ndarray, annualize: int = 1) -> float:
     return mu / sigma * np.sqrt(annualize)
 
 
-def _psr(sr_hat: float, sr_star: float, T: int, skew: float, excess_kurt: float) -> float:
+def _psr(sr_hat, sr_star: float, T: int, skew, excess_kurt):
     """
     Probabilistic Sharpe Ratio.
     PSR(SR*) = Φ[(SR̂ − SR*)·√(T−1) / √(1 − γ₁·SR̂ + (γ₂+1)/4·SR̂²)]
+
+    Принимает скаляры (возвращает float) или массивы по стратегиям.
     """
+    sr_hat, skew, excess_kurt = np.asarray(sr_hat), np.asarray(skew), np.asarray(excess_kurt)
     denom_sq = 1.0 - skew * sr_hat + (excess_kurt + 1.0) / 4.0 * sr_hat ** 2
-    if denom_sq <= 0 or T <= 1:
-        return 0.5
-    z = (sr_hat - sr_star) * np.sqrt(T - 1) / np.sqrt(denom_sq)
-    return float(scipy.stats.norm.cdf(z))
+    valid = (denom_sq > 0) & (T > 1)
+    z = (sr_hat - sr_star) * np.sqrt(max(T - 1, 0)) / np.sqrt(np.where(valid, denom_sq, 1.0))
+    psr = np.where(valid, scipy.stats.norm.cdf(z), 0.5)
+    return float(psr) if psr.ndim == 0 else psr
 
 
 # ── CSCV алгоритм ─────────────────────────────────────────────────────────────
 
+MAX_EXACT_COMBINATIONS = 200_000  # C(20, 10) = 184 756 — перебираем все
+SAMPLED_COMBINATIONS = 20_000     # для S > 20 — случайная выборка разбиений
+BLOCK_ELEMENTS = 1_000_000        # комбинаций × стратегий в одном блоке
+MAX_SCATTER_POINTS = 5_000
+
+
+def _combination_masks(S: int) -> tuple[np.ndarray, bool]:
+    """
+    Маски IS-подмножеств (n_combos × S, bool) для CSCV.
+
+    Все C(S, S/2) комбинаций в лексикографическом порядке, если их не больше
+    MAX_EXACT_COMBINATIONS; иначе — SAMPLED_COMBINATIONS случайных разбиений.
+    Returns: (masks, exact)
+    """
+    half = S // 2
+    if math.comb(S, half) <= MAX_EXACT_COMBINATIONS:
+        combos = np.array(list(itertools.combinations(range(S), half)), dtype=np.intp)
+        masks = np.zeros((len(combos), S), dtype=bool)
+        np.put_along_axis(masks, combos, True, axis=1)
+        return masks, True
+
+    rng = np.random.default_rng(42)
+    is_idx = np.argsort(rng.random((SAMPLED_COMBINATIONS, S)), axis=1)[:, :half]
+    masks = np.zeros((SAMPLED_COMBINATIONS, S), dtype=bool)
+    np.put_along_axis(masks, is_idx, True, axis=1)
+    return masks, False
+
+
+def _sharpe_from_sums(sums: np.ndarray, sumsq: np.ndarray, shift: np.ndarray, m: int, annualize: int) -> np.ndarray:
+    """
+    SR по достаточным статистикам сдвинутых доходностей (r − shift):
+    μ = shift + Σ/m, σ² = (Σ² − (Σ)²/m)/(m − 1). Сдвиг на среднее стратегии
+    убирает потерю точности при вычитании.
+    """
+    var = np.maximum(sumsq - sums ** 2 / m, 0.0) / (m - 1)
+    sigma = np.sqrt(var)
+    mu = shift + sums / m
+    safe = sigma >= 1e-15
+    return np.where(safe, mu / np.where(safe, sigma, 1.0), 0.0) * np.sqrt(annualize)
+
+
 def _cscv(
     returns_matrix: np.ndarray,  # T × N
     n_splits: int = 16,
     annualize: int = 1,
+    progress: ProgressCallback | None = None,
 ) -> dict:
     """
     Combinatorially Symmetric Cross-Validation (Bailey et al. 2014).
@@ -52,6 +101,11 @@ def _cscv(
        IS = первые S/2 подмножеств, OOS = остальные.
     3. Для каждой комбинации: найти лучшую стратегию по IS SR.
     4. Проверить её OOS ранг → PBO = доля комбинаций, где OOS ранг ≤ N/2.
+
+    Каждое подмножество сводится к суммам и суммам квадратов по стратегиям
+    (S × N), после чего IS/OOS статистики блока комбинаций — это произведение
+    маски принадлежности (блок × S) на эти суммы. Так перебор всех 12 870
+    комбинаций при S = 16 стоит несколько матричных умножений.
     """
     T, N = returns_matrix.shape
     S = n_splits
@@ -60,74 +114,66 @@ def _cscv(
     R = returns_matrix[:T_cut]
     chunk_size = T_cut // S
 
-    # Разбиваем на S подмножеств
-    chunks = [R[i * chunk_size:(i + 1) * chunk_size] for i in range(S)]
-
-    # Все комбинации C(S, S/2)
-    half = S // 2
-    all_combos = list(itertools.combinations(range(S), half))
-
-    # Ограничиваем число комбинаций для производительности
-    max_combos = 256
-    if len(all_combos) > max_combos:
-        rng = np.random.default_rng(42)
-        idx = rng.choice(len(all_combos), size=max_combos, replace=False)
-        all_combos = [all_combos[i] for i in sorted(idx)]
-
-    pbo_logit_values = []
-    is_sr_best = []
-    oos_sr_best = []
-    oos_ranks = []
-    is_sr_all_mean = []
-    oos_sr_all_mean = []
-
-    for is_indices in all_combos:
-        oos_indices = [i for i in range(S) if i not in is_indices]
-
-        is_data = np.vstack([chunks[i] for i in is_indices])   # (half*chunk) × N
-        oos_data = np.vstack([chunks[i] for i in oos_indices])  # (half*chunk) × N
-
-        # SR для каждой стратегии
-        is_sr = np.array([_sharpe_ratio(is_data[:, n], annualize) for n in range(N)])
-        oos_sr = np.array([_sharpe_ratio(oos_data[:, n], annualize) for n in range(N)])
-
-        # Лучшая стратегия по IS
-        best_idx = int(np.argmax(is_sr))
-        best_oos_sr = float(oos_sr[best_idx])
-        best_is_sr = float(is_sr[best_idx])
-
-        # OOS ранг лучшей стратегии (от 1=лучший до N=худший)
-        oos_rank = int(N - np.searchsorted(np.sort(oos_sr), best_oos_sr))
-        oos_rank = max(1, min(oos_rank, N))
-
-        # Логит OOS ранга (нормализованный на [0,1])
-        relative_rank = (oos_rank - 0.5) / N
-        logit = float(np.log(relative_rank / (1.0 - relative_rank + 1e-15)))
-
-        pbo_logit_values.append(logit)
-        is_sr_best.append(best_is_sr)
-        oos_sr_best.append(best_oos_sr)
-        oos_ranks.append(oos_rank)
-        is_sr_all_mean.append(float(np.mean(is_sr)))
-        oos_sr_all_mean.append(float(np.mean(oos_sr)))
+    # Достаточные статистики подмножеств: Σ и Σ² сдвинутых доходностей
+    shift = R.mean(axis=0)
+    chunks = (R - shift).reshape(S, chunk_size, N)
+    chunk_sums = chunks.sum(axis=1)                       # S × N
+    chunk_sumsq = np.einsum("stn,stn->sn", chunks, chunks)  # S × N
+    total_sums = chunk_sums.sum(axis=0)
+    total_sumsq = chunk_sumsq.sum(axis=0)
+    m = (S // 2) * chunk_size  # наблюдений в IS и в OOS
+
+    masks, exact = _combination_masks(S)
+    n_combos = len(masks)
+    block = max(1, BLOCK_ELEMENTS // N)
+
+    is_sr_best = np.empty(n_combos)
+    oos_sr_best = np.empty(n_combos)
+    oos_ranks = np.empty(n_combos, dtype=int)
+    is_sr_all_mean = np.empty(n_combos)
+    oos_sr_all_mean = np.empty(n_combos)
+
+    for lo in range(0, n_combos, block):
+        report(progress, lo / n_combos, f"CSCV {lo}/{n_combos}")
+        hi = min(lo + block, n_combos)
+        M = masks[lo:hi].astype(float)
+
+        is_sums = M @ chunk_sums
+        is_sumsq = M @ chunk_sumsq
+        is_sr = _sharpe_from_sums(is_sums, is_sumsq, shift, m, annualize)
+        oos_sr = _sharpe_from_sums(total_sums - is_sums, total_sumsq - is_sumsq, shift, m, annualize)
+
+        # Лучшая стратегия по IS и её OOS ранг (от 1=лучший до N=худший)
+        rows = np.arange(hi - lo)
+        best_idx = np.argmax(is_sr, axis=1)
+        best_oos = oos_sr[rows, best_idx]
+        n_worse = np.sum(oos_sr < best_oos[:, None], axis=1)
+
+        is_sr_best[lo:hi] = is_sr[rows, best_idx]
+        oos_sr_best[lo:hi] = best_oos
+        oos_ranks[lo:hi] = np.clip(N - n_worse, 1, N)
+        is_sr_all_mean[lo:hi] = is_sr.mean(axis=1)
+        oos_sr_all_mean[lo:hi] = oos_sr.mean(axis=1)
+
+    # Логит OOS ранга (нормализованный на [0,1])
+    relative_rank = (oos_ranks - 0.5) / N
+    logit_arr = np.log(relative_rank / (1.0 - relative_rank + 1e-15))
 
     # PBO = доля комбинаций, где OOS ранг ≤ N/2 (лучшая IS стратегия не победила в OOS)
-    pbo = float(np.mean([r <= N / 2 for r in oos_ranks]))
-
-    # Логит-распределение
-    logit_arr = np.array(pbo_logit_values)
+    pbo = float(np.mean(oos_ranks <= N / 2))
 
     return {
         "pbo": pbo,
-        "n_combinations": len(all_combos),
-        "is_sr_best": is_sr_best,
-        "oos_sr_best": oos_sr_best,
-        "oos_ranks": oos_ranks,
-        "logit_values": pbo_logit_values,
+        "n_combinations": n_combos,
+        "exact": exact,
+        "is_sr_best": is_sr_best.tolist(),
+        "oos_sr_best": oos_sr_best.tolist(),
+        "oos_ranks": oos_ranks.tolist(),
+        "logit_values": logit_arr.tolist(),
         "logit_mean": float(logit_arr.mean()),
         "logit_std": float(logit_arr.std(ddof=1)),
-        "is_sr_all_mean": is_sr_all_mean,
-        "oos_sr_all_mean": oos_sr_all_mean,
+        "is_sr_all_mean": is_sr_all_mean.tolist(),
+        "oos_sr_all_mean": oos_sr_all_mean.tolist(),
     }
 
 
@@ -148,26 +194,19 @@ def _compute_dsr_and_minbtl(
     T, N = returns_matrix.shape
     euler_gamma = 0.5772156649015329
 
-    # SR за период для каждой стратегии
-    sr_list = []
-    skew_list = []
-    kurt_list = []
-    for n in range(N):
-        r = returns_matrix[:, n]
-        mu, sigma = float(np.mean(r)), float(np.std(r, ddof=1))
-        sr_freq = mu / sigma if sigma > 1e-15 else 0.0
-        sr_list.append(sr_freq)
-        skew_list.append(float(scipy.stats.skew(r)))
-        kurt_list.append(float(scipy.stats.kurtosis(r)))  # excess kurtosis
-
-    sr_arr = np.array(sr_list)
+    # SR за период, асимметрия и эксцесс для всех стратегий сразу
+    mu = returns_matrix.mean(axis=0)
+    sigma = returns_matrix.std(axis=0, ddof=1)
+    sr_arr = np.where(sigma > 1e-15, mu / np.where(sigma > 1e-15, sigma, 1.0), 0.0)
+    skew_arr = scipy.stats.skew(returns_matrix, axis=0)
+    kurt_arr = scipy.stats.kurtosis(returns_matrix, axis=0)  # excess kurtosis
     sr_annual = sr_arr * np.sqrt(annualize)
 
     # Лучший SR
     best_idx = int(np.argmax(sr_arr))
     sr_hat = float(sr_arr[best_idx])
-    skew_best = float(skew_list[best_idx])
-    kurt_best = float(kurt_list[best_idx])
+    skew_best = float(skew_arr[best_idx])
+    kurt_best = float(kurt_arr[best_idx])
 
     # Expected max SR (Bailey et al. 2014, eq. 8)
     # SR* = E[max(SR_n)] ≈ μ_SR + σ_SR·[(1−γ_E)·z₁ + γ_E·z₂]
@@ -195,18 +234,20 @@ def _compute_dsr_and_minbtl(
         min_btl = max(min_btl, 0)
 
     # Для каждой стратегии: SR, аннуализированный SR, DSR_индивидуальный
-    strategy_stats = []
-    for n in range(N):
-        sr_n = float(sr_arr[n])
-        psr_n = _psr(sr_n, sr_star_freq, T, skew_list[n], kurt_list[n])
-        strategy_stats.append({
+    psr_arr = _psr(sr_arr, sr_star_freq, T, skew_arr, kurt_arr)
+    strategy_stats = [
+        {
             "strategy": n + 1,
             "sr_freq": sr_n,
-            "sr_annual": float(sr_annual[n]),
-            "skewness": skew_list[n],
-            "excess_kurtosis": kurt_list[n],
+            "sr_annual": sr_annual_n,
+            "skewness": skew_n,
+            "excess_kurtosis": kurt_n,
             "psr": psr_n,
-        })
+        }
+        for n, (sr_n, sr_annual_n, skew_n, kurt_n, psr_n) in enumerate(zip(
+            sr_arr.tolist(), sr_annual.tolist(), skew_arr.tolist(), kurt_arr.tolist(), psr_arr.tolist(), strict=True,
+        ))
+    ]
 
     return {
         "best_strategy": best_idx + 1,
@@ -223,11 +264,13 @@ def _compute_dsr_and_minbtl(
 
 # ── Главная функция ───────────────────────────────────────────────────────────
 
+@cpu_bound
 def compute_pbo(
     strategy_returns: list[list[float]],
     n_splits: int = 16,
     annualize: int = 252,
     sr_benchmark: float = 0.0,
+    progress: ProgressCallback | None = None,
 ) -> dict:
     """
     Полный анализ переобучения бэктеста: PBO (CSCV) + DSR + MinBTL.
@@ -238,6 +281,7 @@ def compute_pbo(
         n_splits: число подмножеств S для CSCV (чётное, ≥ 4)
         annualize: периодов в году для аннуализации SR
         sr_benchmark: пороговый SR для PSR (годовой)
+        progress: колбэк прогресса progress(fraction, message), см. src.utils.progress
 
     Returns:
         dict с PBO, DSR, MinBTL, IS/OOS scatter, logit histogram
@@ -257,16 +301,20 @@ def compute_pbo(
     n_splits = max(4, n_splits - (n_splits % 2))
 
     # ── CSCV ──────────────────────────────────────────────────────────────────
-    cscv = _cscv(R, n_splits=n_splits, annualize=1)  # нет аннуализации внутри CSCV
+    cscv = _cscv(R, n_splits=n_splits, annualize=1, progress=scaled(progress, 0.0, 0.9))  # нет аннуализации внутри CSCV
 
     # ── DSR + MinBTL ──────────────────────────────────────────────────────────
     dsr_result = _compute_dsr_and_minbtl(R, sr_benchmark=sr_benchmark, annualize=annualize)
+    report(progress, 1.0, "DSR/MinBTL")
 
     # ── Логит-гистограмма ─────────────────────────────────────────────────────
     logit_arr = np.array(cscv["logit_values"])
     hist_bins = 20
     counts, bin_edges = np.histogram(logit_arr, bins=hist_bins)
 
+    # IS/OOS scatter прореживаем: на графике достаточно MAX_SCATTER_POINTS точек
+    scatter_step = max(1, math.ceil(cscv["n_combinations"] / MAX_SCATTER_POINTS))
+
     # ── Сводная интерпретация ──────────────────────────────────────────────────
     pbo = cscv["pbo"]
     if pbo > 0.75:
@@ -285,6 +333,7 @@ def compute_pbo(
         "verdict": verdict,
         "verdict_level": verdict_level,
         "n_combinations": cscv["n_combinations"],
+        "cscv_exact": cscv["exact"],
         "n_splits": int(n_splits),
         # DSR / MinBTL
         "dsr": dsr_result["dsr"],
@@ -297,8 +346,8 @@ def compute_pbo(
         "n_strategies": int(N),
         # Данные для графиков
         "scatter": {
-            "is_sr": cscv["is_sr_best"],
-            "oos_sr": cscv["oos_sr_best"],
+            "is_sr": cscv["is_sr_best"][::scatter_step],
+            "oos_sr": cscv["oos_sr_best"][::scatter_step],
         },
         "logit_hist": {
             "counts": counts.tolist(),
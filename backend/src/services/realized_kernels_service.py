@@ -10,10 +10,21 @@
 - Оценка дисперсии шума ω²
 - Тест на наличие скачков (BN-Shephard ratio test)
 - Сигнатурный график: RV(Δ) по разным частотам дискретизации
+- Потоковый режим: нарастающие RV/BV/RK по чанкам внутридневных цен
+
+Все оценщики строятся на одном массиве лог-цен (кумулятивная сумма
+доходностей): RV на k-кратно прореженной сетке со всеми сдвигами — это
+Σ (ln pᵢ₊ₖ − ln pᵢ)², т.е. один векторный проход на масштаб вместо цикла
+по сдвигам; автоковариации γ_h для RK считаются разом через FFT.
 """
 
+import threading
+
 import numpy as np
 import scipy.stats
+from scipy.fft import irfft, next_fast_len, rfft
+
+from src.utils.compute_pool import cpu_bound
 
 # ── Ядерные функции ────────────────────────────────────────────────────────────
 
@@ -52,14 +63,49 @@ _KERNELS = {
 
 # ── Вспомогательные функции ────────────────────────────────────────────────────
 
-def _log_returns(prices: np.ndarray) -> np.ndarray:
-    """Логарифмические доходности."""
-    return np.log(prices[1:] / prices[:-1])
+def _log_prices(prices: np.ndarray) -> np.ndarray:
+    """
+    Кумулятивные лог-доходности ln(pᵢ/p₀).
+
+    Отсчёт от первой цены держит значения малыми, поэтому разности
+    ln pᵢ₊ₖ − ln pᵢ не теряют точность на длинных тиковых рядах.
+    """
+    return np.log(prices / prices[0])
+
+
+def _lagged_sq_sum(log_prices: np.ndarray, k: int) -> float:
+    """
+    Σₛ RV(prices[s::k]) = Σᵢ (ln pᵢ₊ₖ − ln pᵢ)² — сумма RV по всем k сдвигам
+    k-кратно прореженной сетки за один проход.
+    """
+    d = log_prices[k:] - log_prices[:-k]
+    return float(np.dot(d, d))
+
+
+def _autocovariances(returns: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    γ_h = Σᵢ rᵢ · rᵢ₊h для h = 0, ..., max_lag через FFT — O(n log n)
+    вместо H отдельных скалярных произведений. Лаги ≥ n дают 0.
+    """
+    n = len(returns)
+    if n == 0:
+        return np.zeros(max_lag + 1)
+    # Дополнение нулями до n + max_lag убирает циклическое перекрытие
+    n_fft = next_fast_len(n + max_lag, real=True)
+    spectrum = rfft(returns, n_fft)
+    return irfft(spectrum.real ** 2 + spectrum.imag ** 2, n_fft)[:max_lag + 1]
 
 
-def _subsample_prices(prices: np.ndarray, step: int) -> np.ndarray:
-    """Каждая k-я цена."""
-    return prices[::step]
+def _auto_bandwidth(n: int) -> int:
+    """H ∝ n^(3/5) (BN et al. рекомендация для Parzen kernel)."""
+    return max(1, int(np.ceil(n ** (3.0 / 5.0))))
+
+
+def _kernel_sum(gammas: np.ndarray, H: int, kernel: str) -> float:
+    """RK = γ₀ + 2 Σ_{h=1}^{H} k(h/(H+1)) · γ_h по готовым автоковариациям."""
+    kernel_fn = _KERNELS.get(kernel, _parzen_kernel)
+    k_vals = kernel_fn(np.arange(1, H + 1, dtype=float) / (H + 1))
+    return float(gammas[0] + 2.0 * np.dot(k_vals, gammas[1:H + 1]))
 
 
 # ── Оценщики ─────────────────────────────────────────────────────────────────
@@ -79,7 +125,7 @@ def _bipower_variation(returns: np.ndarray) -> float:
     return float((np.pi / 2.0) * np.sum(np.abs(returns[:-1]) * np.abs(returns[1:])))
 
 
-def _tsrv(prices: np.ndarray, K: int = 5) -> tuple[float, float]:
+def _tsrv(log_prices: np.ndarray, K: int = 5) -> tuple[float, float]:
     """
     TSRV — Two-Scale Realized Variance (Zhang, Mykland, Aït-Sahalia 2005).
 
@@ -88,28 +134,20 @@ def _tsrv(prices: np.ndarray, K: int = 5) -> tuple[float, float]:
 
     Returns: (tsrv_value, noise_variance)
     """
-    n = len(prices) - 1  # количество интервалов
+    n = len(log_prices) - 1  # количество интервалов
     if n < K * 2:
         K = max(1, n // 4)
 
     # Быстрый: RV на полной сетке (биас от шума максимален)
-    r_fast = _log_returns(prices)
-    rv_fast = _realized_variance(r_fast)
+    rv_fast = _lagged_sq_sum(log_prices, 1)
 
     # Медленный: среднее по K сдвинутым прореженным сеткам
-    rv_slow_sum = 0.0
-    count = 0
-    for s in range(K):
-        p_sub = prices[s::K]
-        if len(p_sub) > 1:
-            r_sub = _log_returns(p_sub)
-            rv_slow_sum += _realized_variance(r_sub)
-            count += 1
-
-    if count == 0:
+    # (сдвиг s даёт хотя бы одну доходность, если s + K ≤ n)
+    count = min(K, n - K + 1)
+    if count <= 0:
         return float(rv_fast), 0.0
+    rv_slow_avg = _lagged_sq_sum(log_prices, K) / count
 
-    rv_slow_avg = rv_slow_sum / count
     n_bar = (n - K + 1.0) / K  # среднее кол-во наблюдений в прореженной сетке
 
     # Дисперсия шума: ω² ≈ RV_fast / (2n)
@@ -126,7 +164,7 @@ def _tsrv(prices: np.ndarray, K: int = 5) -> tuple[float, float]:
     return float(max(tsrv, 0.0)), float(noise_var)
 
 
-def _msrv(prices: np.ndarray, K_max: int = 20) -> float:
+def _msrv(log_prices: np.ndarray, K_max: int = 20) -> float:
     """
     MSRV — Multi-Scale RV (Zhang 2006).
 
@@ -136,10 +174,10 @@ def _msrv(prices: np.ndarray, K_max: int = 20) -> float:
     Снижает дисперсию оценки по сравнению с TSRV за счёт
     усреднения по нескольким масштабам.
     """
-    n = len(prices) - 1
+    n = len(log_prices) - 1
     K_max = min(K_max, n // 4)
     if K_max < 2:
-        return _tsrv(prices, K=1)[0]
+        return _tsrv(log_prices, K=1)[0]
 
     # Веса a_k: убывающие, положительные, нормированные
     # Основаны на оптимальной схеме Zhang (2006):
@@ -148,28 +186,18 @@ def _msrv(prices: np.ndarray, K_max: int = 20) -> float:
     raw_weights = ks * (K_max - ks)
     weight_sum = raw_weights.sum()
     if weight_sum == 0:
-        return _tsrv(prices, K=K_max)[0]
+        return _tsrv(log_prices, K=K_max)[0]
     alpha_k = raw_weights / weight_sum
 
     # Вычитаем bias от шума: MSRV = Σ a_k RV_k^slow − (n_bar/n) · RV_fast
-    rv_fast = _realized_variance(_log_returns(prices))
+    # k < K_max ≤ n/4, поэтому все k сдвигов каждой сетки непусты
+    rv_slow = np.array([_lagged_sq_sum(log_prices, int(k)) for k in ks]) / ks
+    rv_fast = rv_slow[0]
     n_total = float(n)
 
-    msrv = 0.0
-    for i, k in enumerate(ks):
-        k_int = int(k)
-        rv_k_sum = 0.0
-        cnt = 0
-        for s in range(k_int):
-            p_sub = prices[s::k_int]
-            if len(p_sub) > 1:
-                rv_k_sum += _realized_variance(_log_returns(p_sub))
-                cnt += 1
-        if cnt > 0:
-            n_k = n_total / k_int  # среднее наблюдений в прореженной сетке
-            # bias-corrected: TSRV_k = RV_k_slow - (n_k/n) * RV_fast
-            tsrv_k = rv_k_sum / cnt - (n_k / n_total) * rv_fast
-            msrv += alpha_k[i] * tsrv_k
+    # bias-corrected: TSRV_k = RV_k_slow - (n_k/n) * RV_fast, n_k = n/k
+    tsrv_k = rv_slow - ((n_total / ks) / n_total) * rv_fast
+    msrv = float(np.dot(alpha_k, tsrv_k))
 
     return float(max(msrv, 0.0))
 
@@ -187,24 +215,11 @@ def _realized_kernel(returns: np.ndarray, H: int | None = None, kernel: str = "p
     if n < 4:
         return float(np.sum(returns ** 2))
 
-    kernel_fn = _KERNELS.get(kernel, _parzen_kernel)
-
     if H is None:
-        H = max(1, int(np.ceil(n ** (3.0 / 5.0))))
+        H = _auto_bandwidth(n)
     H = min(H, n - 1)
 
-    # γ₀ = RV (диагональ)
-    gamma0 = float(np.sum(returns ** 2))
-
-    # γ_h для h = 1, ..., H
-    h_vals = np.arange(1, H + 1, dtype=float)
-    k_vals = kernel_fn(h_vals / (H + 1))
-
-    rk = gamma0
-    for h in range(1, H + 1):
-        gamma_h = float(np.dot(returns[h:], returns[:-h]))
-        rk += 2.0 * k_vals[h - 1] * gamma_h
-
+    rk = _kernel_sum(_autocovariances(returns, H), H, kernel)
     return float(max(rk, 0.0))
 
 
@@ -243,26 +258,25 @@ def _jump_test(rv: float, bv: float, n: int) -> dict:
 
 # ── Сигнатурный график ────────────────────────────────────────────────────────
 
-def _signature_plot(prices: np.ndarray, steps: list[int] | None = None) -> dict:
+def _signature_plot(log_prices: np.ndarray, steps: list[int] | None = None) -> dict:
     """
     Сигнатурный график: RV(Δ) для разных шагов дискретизации Δ.
     Без шума: RV(Δ) ≈ const (истинная IV)
     С шумом: RV(Δ) → ∞ при Δ → 0 (микроструктурный эффект)
     """
-    n = len(prices) - 1
+    n = len(log_prices) - 1
     if steps is None:
         max_step = min(n // 4, 120)
         steps = list(range(1, max_step + 1, max(1, max_step // 30)))
 
     rv_vals, step_vals = [], []
     for step in steps:
-        p_sub = _subsample_prices(prices, step)
-        if len(p_sub) < 3:
+        lp_sub = log_prices[::step]
+        if len(lp_sub) < 3:
             continue
-        r_sub = _log_returns(p_sub)
-        rv_sub = _realized_variance(r_sub)
+        r_sub = np.diff(lp_sub)
         # Аннуализируем к единому базису: умножаем на кол-во шагов в "дне"
-        rv_per_period = rv_sub * step  # привести к масштабу step=1
+        rv_per_period = float(np.dot(r_sub, r_sub)) * step  # привести к масштабу step=1
         rv_vals.append(float(rv_per_period))
         step_vals.append(int(step))
 
@@ -271,6 +285,7 @@ def _signature_plot(prices: np.ndarray, steps: list[int] | None = None) -> dict:
 
 # ── Главная функция ───────────────────────────────────────────────────────────
 
+@cpu_bound
 def compute_realized_kernels(
     prices: list[float],
     kernel: str = "parzen",
@@ -299,7 +314,8 @@ def compute_realized_kernels(
     if np.any(p <= 0):
         raise ValueError("Все цены должны быть положительными")
 
-    r = _log_returns(p)
+    lp = _log_prices(p)
+    r = np.diff(lp)
     n = len(r)
 
     # Коэффициент аннуализации: 252 торговых дня
@@ -310,8 +326,8 @@ def compute_realized_kernels(
     # ── Оценщики ──────────────────────────────────────────────────────────────
     rv = _realized_variance(r)
     bv = _bipower_variation(r)
-    tsrv_val, noise_var = _tsrv(p, K=tsrv_scales)
-    msrv_val = _msrv(p)
+    tsrv_val, noise_var = _tsrv(lp, K=tsrv_scales)
+    msrv_val = _msrv(lp)
     rk_val = _realized_kernel(r, H=bandwidth, kernel=kernel)
 
     # Аннуализированные волатильности: σ = sqrt(IV · ann_factor)
@@ -325,7 +341,7 @@ def compute_realized_kernels(
     noise_vol = float(np.sqrt(max(noise_var, 0.0)))
 
     # ── Сигнатурный график ───────────────────────────────────────────────────
-    sig_plot = _signature_plot(p)
+    sig_plot = _signature_plot(lp)
 
     # ── Оптимальная частота дискретизации (критерий MSE) ─────────────────────
     # Δ* ≈ (4ω⁴ / μ₁⁴ · IQ)^(1/5) где IQ ≈ 3·RV² (нормальность)
@@ -343,7 +359,7 @@ def compute_realized_kernels(
             optimal_step = int(steps_arr[len(steps_arr) // 3])
 
     # ── Bandwidth информация ─────────────────────────────────────────────────
-    auto_H = max(1, int(np.ceil(n ** (3.0 / 5.0))))
+    auto_H = _auto_bandwidth(n)
     used_H = bandwidth if bandwidth is not None else auto_H
 
     return {
@@ -373,3 +389,102 @@ def compute_realized_kernels(
         "signature_plot": sig_plot,
         "optimal_sampling_step": optimal_step,
     }
+
+
+# ── Потоковый режим ──────────────────────────────────────────────────────────
+
+STREAM_MAX_LAG = 2000  # ⌈n^(3/5)⌉ ≤ 2000 покрывает дни до ~330k тиков
+
+
+class RealizedStream:
+    """
+    Нарастающие RV/BV/RK для одного инструмента по чанкам внутридневных цен.
+
+    Хранит только достаточные статистики: последнюю лог-цену, хвост из
+    max_lag последних доходностей, γ_h для h = 0..max_lag и Σ|rᵢ||rᵢ₊₁|.
+    Чанк из m цен обрабатывается за O((m + max_lag) log) — новые γ_h равны
+    автоковариациям [хвост, чанк] минус автоковариации хвоста, т.е. только
+    пары, правый элемент которых пришёл в этом чанке. Результат совпадает
+    с пакетным compute_realized_kernels по тем же ценам, пока bandwidth
+    не превышает max_lag.
+    """
+
+    def __init__(self, max_lag: int = STREAM_MAX_LAG):
+        self.max_lag = max_lag
+        self.n_prices = 0
+        self._last_log_price: float | None = None
+        self._tail = np.empty(0)
+        self._gammas = np.zeros(max_lag + 1)
+        self._abs_cross = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def n_returns(self) -> int:
+        return max(self.n_prices - 1, 0)
+
+    def update(self, prices) -> int:
+        """Добавляет чанк цен (хронологический порядок). Возвращает число цен в потоке."""
+        p = np.asarray(prices, dtype=float).ravel()
+        if np.any(p <= 0):
+            raise ValueError("Все цены должны быть положительными")
+        if p.size == 0:
+            return self.n_prices
+
+        with self._lock:
+            lp = np.log(p)
+            if self._last_log_price is not None:
+                lp = np.concatenate(([self._last_log_price], lp))
+            r = np.diff(lp)
+            if r.size:
+                tail = self._tail
+                joined = np.concatenate((tail, r))
+                self._gammas += (
+                    _autocovariances(joined, self.max_lag) - _autocovariances(tail, self.max_lag)
+                )
+                abs_joined = np.abs(joined[max(len(tail) - 1, 0):])
+                self._abs_cross += float(np.dot(abs_joined[:-1], abs_joined[1:]))
+                self._tail = joined[-self.max_lag:].copy()
+            self._last_log_price = float(lp[-1])
+            self.n_prices += p.size
+            return self.n_prices
+
+    def estimates(
+        self,
+        kernel: str = "parzen",
+        bandwidth: int | None = None,
+        annualize: bool = True,
+        periods_per_day: int = 390,
+    ) -> dict:
+        """Текущие RV, BV, RK и тест на скачки по всем принятым ценам."""
+        with self._lock:
+            n = self.n_returns
+            gammas = self._gammas.copy()
+            abs_cross = self._abs_cross
+        if n < 1:
+            raise ValueError("Нужно минимум 2 наблюдения цен")
+
+        rv = float(gammas[0])
+        bv = float((np.pi / 2.0) * abs_cross)
+        auto_H = _auto_bandwidth(n)
+        H = min(bandwidth if bandwidth is not None else auto_H, n - 1, self.max_lag)
+        rk = rv if n < 4 else max(_kernel_sum(gammas, H, kernel), 0.0)
+
+        ann_factor = 252 * periods_per_day / n if annualize else 1.0
+
+        def to_vol(iv: float) -> float:
+            return float(np.sqrt(max(iv, 0.0) * ann_factor))
+
+        return {
+            "rv_raw": rv,
+            "bv_raw": bv,
+            "rk_raw": float(rk),
+            "rv_vol": to_vol(rv),
+            "bv_vol": to_vol(bv),
+            "rk_vol": to_vol(rk),
+            "n_observations": int(n),
+            "bandwidth_used": int(H),
+            "bandwidth_auto": int(auto_H),
+            "kernel": kernel,
+            "ann_factor": float(ann_factor),
+            "jump_test": _jump_test(rv, bv, n),
+        }
@@ -0,0 +1,383 @@
+"""
+Persistent result cache for deterministic compute endpoints.
+
+A response is stored under a content address: the BLAKE2b hash of the
+endpoint name, the canonicalized request body and the code version (a hash
+of the src/ tree, or RESULT_CACHE_VERSION). Identical requests against the
+same code return the stored JSON bytes without recomputing.
+
+Entries live in a SQLite file (RESULT_CACHE_PATH) in WAL mode, so they
+survive restarts and are shared by every worker process on the host. The
+store is bounded by RESULT_CACHE_MAX_BYTES with least-recently-used
+eviction. Each computed entry is also recorded in calculation_history
+(calculation_type = endpoint, cache key and code version in input_data;
+disable with RESULT_CACHE_HISTORY=0). Responses carry X-Result-Cache
+(hit / miss / bypass) and X-Result-Cache-Key.
+
+Requests bypass the cache when:
+- they send Cache-Control: no-cache (recompute and refresh the entry) or
+  no-store (recompute, do not store);
+- the endpoint declares a seed field and the body leaves it unset — the
+  result is then random and must not be replayed.
+
+Usage:
+    @router.post("/test", response_model=dict[str, Any])
+    @limiter.limit("10/minute")
+    @service_endpoint("Stress test")
+    @result_cache("stress.test", seed_field="seed")
+    async def run_stress_tests(request: Request, body: StressTestRequest): ...
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from src.utils.array_response import JSON_CONTENT_TYPE, _accepted, array_response, dumps_json
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "cache/results.sqlite3")
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Record computed entries in calculation_history
+RESULT_CACHE_HISTORY = os.getenv("RESULT_CACHE_HISTORY", "1") == "1"
+# Entries above this share of the store are not cached
+MAX_ENTRY_FRACTION = 0.1
+# accessed_at is refreshed at most this often per entry (keeps hits read-mostly)
+TOUCH_INTERVAL_SECONDS = 60.0
+
+CACHE_HEADER = "X-Result-Cache"
+CACHE_KEY_HEADER = "X-Result-Cache-Key"
+
+_SRC_ROOT = Path(__file__).resolve().parents[1]
+
+
+# ── Keys ─────────────────────────────────────────────────────────────────────
+
+@functools.cache
+def code_version() -> str:
+    """RESULT_CACHE_VERSION, or a hash of every .py file under src/."""
+    override = os.getenv("RESULT_CACHE_VERSION")
+    if override:
+        return override
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(_SRC_ROOT.rglob("*.py")):
+        digest.update(str(path.relative_to(_SRC_ROOT)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _update(digest: Any, obj: Any) -> None:
+    """Feed a canonical, type-tagged encoding of obj into digest."""
+    if isinstance(obj, BaseModel):
+        obj = {name: getattr(obj, name) for name in type(obj).model_fields}
+    if isinstance(obj, dict):
+        digest.update(b"d%d:" % len(obj))
+        for key in sorted(obj, key=str):
+            _update(digest, str(key))
+            _update(digest, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"l%d:" % len(obj))
+        for item in obj:
+            _update(digest, item)
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        digest.update(f"a{arr.dtype.str}{arr.shape}:".encode())
+        digest.update(arr.data)
+    elif isinstance(obj, (bool, np.bool_)):
+        digest.update(b"T" if obj else b"F")
+    elif isinstance(obj, (int, np.integer)):
+        digest.update(b"i%d;" % int(obj))
+    elif isinstance(obj, (float, np.floating)):
+        # 1 and 1.0 produce the same result; hash them alike
+        value = float(obj)
+        if value.is_integer():
+            digest.update(b"i%d;" % int(value))
+        else:
+            digest.update(f"f{value!r};".encode())
+    elif isinstance(obj, str):
+        encoded = obj.encode()
+        digest.update(b"s%d:" % len(encoded))
+        digest.update(encoded)
+    elif obj is None:
+        digest.update(b"N")
+    elif isinstance(obj, (datetime, date)):
+        _update(digest, obj.isoformat())
+    else:
+        raise TypeError(f"cannot hash {type(obj).__name__} for the result cache")
+
+
+def result_key(endpoint: str, body: Any) -> str:
+    """Content address of (endpoint, canonical body, code version)."""
+    digest = hashlib.blake2b(digest_size=32)
+    _update(digest, endpoint)
+    _update(digest, code_version())
+    _update(digest, body)
+    return digest.hexdigest()
+
+
+# ── Store ────────────────────────────────────────────────────────────────────
+
+class ResultStore:
+    """Size-bounded LRU of response bodies in a SQLite file."""
+
+    def __init__(self, path: str | os.PathLike, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            if not self._initialized:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, body BLOB NOT NULL,"
+                    " size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS ix_results_accessed_at ON results (accessed_at)")
+                self._initialized = True
+        self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        conn = self._connect()
+        row = conn.execute("SELECT body, accessed_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        body, accessed_at = row
+        now = time.time()
+        if now - accessed_at > TOUCH_INTERVAL_SECONDS:
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        return body
+
+    def put(self, key: str, endpoint: str, body: bytes) -> bool:
+        """Store body; False if it is too large for the store."""
+        size = len(body)
+        if size > self.max_bytes * MAX_ENTRY_FRACTION:
+            return False
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, endpoint, body, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, size, now, now),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(conn, total - self.max_bytes)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    @staticmethod
+    def _evict(conn: sqlite3.Connection, excess: int) -> None:
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM results WHERE key = ?", victims)
+
+    def delete(self, key: str) -> None:
+        self._connect().execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def clear(self, endpoint: str | None = None) -> None:
+        conn = self._connect()
+        if endpoint is None:
+            conn.execute("DELETE FROM results")
+        else:
+            conn.execute("DELETE FROM results WHERE endpoint = ?", (endpoint,))
+
+    def stats(self) -> dict[str, Any]:
+        rows = self._connect().execute(
+            "SELECT endpoint, COUNT(*), COALESCE(SUM(size), 0) FROM results GROUP BY endpoint"
+        ).fetchall()
+        return {
+            "path": self.path,
+            "max_bytes": self.max_bytes,
+            "entries": sum(r[1] for r in rows),
+            "bytes": sum(r[2] for r in rows),
+            "endpoints": {r[0]: {"entries": r[1], "bytes": r[2]} for r in rows},
+        }
+
+
+_store: ResultStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ResultStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore(RESULT_CACHE_PATH)
+        return _store
+
+
+def set_store(store: ResultStore | None) -> None:
+    """Replace the process-wide store (tests, custom paths)."""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+# ── Provenance ───────────────────────────────────────────────────────────────
+
+# Background provenance writes; referenced so they are not garbage-collected
+_pending: set[asyncio.Task] = set()
+
+
+async def _record_history(endpoint: str, key: str, size: int, execution_time_ms: float) -> None:
+    from src.database.client import async_session_factory
+    from src.database.models import CalculationHistory
+    from src.database.repositories import CalculationHistoryRepository
+
+    async with async_session_factory() as session:
+        await CalculationHistoryRepository(session).create(CalculationHistory(
+            calculation_type=endpoint,
+            input_data={"cache_key": key, "code_version": code_version()},
+            result_data={"cache_key": key, "size_bytes": size},
+            execution_time_ms=execution_time_ms,
+        ))
+
+
+def _on_history_done(task: asyncio.Task) -> None:
+    _pending.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug("Result cache provenance not recorded: %s", task.exception())
+
+
+def _record_provenance(endpoint: str, key: str, size: int, execution_time_ms: float) -> None:
+    if not RESULT_CACHE_HISTORY:
+        return
+    task = asyncio.ensure_future(_record_history(endpoint, key, size, execution_time_ms))
+    _pending.add(task)
+    task.add_done_callback(_on_history_done)
+
+
+# ── Decorator ────────────────────────────────────────────────────────────────
+
+def _cache_directives(request: Request) -> set[str]:
+    header = request.headers.get("cache-control", "")
+    return {part.strip().split("=")[0].lower() for part in header.split(",") if part.strip()}
+
+
+def _wants_json(request: Request) -> bool:
+    for media_type in _accepted(request.headers.get("accept", "")):
+        if media_type in (JSON_CONTENT_TYPE, "application/*", "*/*"):
+            return True
+        if media_type.startswith("application/"):
+            return False
+    return True
+
+
+def _hit_response(request: Request, body: bytes, key: str) -> Response:
+    headers = {CACHE_HEADER: "hit", CACHE_KEY_HEADER: key}
+    if _wants_json(request):
+        return Response(body, media_type=JSON_CONTENT_TYPE, headers=headers)
+    response = array_response(request, json.loads(body))
+    response.headers.update(headers)
+    return response
+
+
+def _json_body(result: Any) -> bytes | None:
+    """JSON bytes of an endpoint result, or None if it cannot be stored."""
+    if isinstance(result, Response):
+        if result.status_code != 200 or result.media_type != JSON_CONTENT_TYPE:
+            return None
+        return bytes(result.body)
+    return dumps_json(result)
+
+
+def result_cache(endpoint: str, seed_field: str | None = None) -> Callable:
+    """
+    Cache an endpoint's response by content address of its `body` argument.
+
+    The endpoint must take `request: Request` and `body: <model>`. Place the
+    decorator below @service_endpoint so errors are never cached.
+
+    Args:
+        endpoint: stable name of the computation (part of the key).
+        seed_field: body field holding the RNG seed; when it is None the
+            request is non-deterministic and not cached.
+    """
+    def decorator(func: Callable) -> Callable:
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"]
+            body = kwargs["body"]
+            directives = _cache_directives(request)
+            seeded = seed_field is None or getattr(body, seed_field, None) is not None
+
+            if not seeded or "no-store" in directives:
+                response = await func(*args, **kwargs)
+                if isinstance(response, Response):
+                    response.headers[CACHE_HEADER] = "bypass"
+                return response
+
+            store = get_store()
+            # Off the loop: hashing a large price matrix takes milliseconds
+            key = await asyncio.to_thread(result_key, endpoint, body)
+            if "no-cache" not in directives:
+                try:
+                    cached = await asyncio.to_thread(store.get, key)
+                except sqlite3.Error as e:
+                    logger.warning("Result cache read failed: %s", e)
+                    cached = None
+                if cached is not None:
+                    return _hit_response(request, cached, key)
+
+            started = time.perf_counter()
+            result = await func(*args, **kwargs)
+            execution_time_ms = (time.perf_counter() - started) * 1000
+
+            stored = _json_body(result)
+            if stored is not None:
+                try:
+                    if await asyncio.to_thread(store.put, key, endpoint, stored):
+                        _record_provenance(endpoint, key, len(stored), execution_time_ms)
+                except sqlite3.Error as e:
+                    logger.warning("Result cache write failed: %s", e)
+                if not isinstance(result, Response):
+                    # Already rendered: return the stored bytes instead of encoding twice
+                    result = (
+                        Response(stored, media_type=JSON_CONTENT_TYPE) if _wants_json(request)
+                        else array_response(request, result)
+                    )
+            if isinstance(result, Response):
+                result.headers[CACHE_HEADER] = "miss"
+                result.headers[CACHE_KEY_HEADER] = key
+            return result
+
+        return wrapper
+
+    return decorator
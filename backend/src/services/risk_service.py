@@ -210,6 +210,7 @@ class RiskService:
         n_simulations: int = 10_000,
         use_garch: bool = False,
         garch_model: str = "garch_11",
+        seed: int | None = None,
     ) -> dict[str, Any]:
         """Calculate VaR/CVaR using the specified method."""
         arr = np.array(returns, dtype=np.float64)
@@ -242,7 +243,7 @@ class RiskService:
         elif method == "monte_carlo":
             result = await asyncio.to_thread(
                 monte_carlo_var, arr, confidence, horizon,
-                portfolio_value, n_simulations, garch_variances,
+                portfolio_value, n_simulations, garch_variances, seed,
             )
         else:
             raise ValueError(f"Unknown method: {method}. Use: parametric, historical, monte_carlo")
@@ -280,6 +281,7 @@ class RiskService:
         garch_model: str = "garch_11",
         returns_matrix: list[list[float]] | None = None,
         weights: list[float] | None = None,
+        seed: int | None = None,
     ) -> dict[str, Any]:
         """Run all 3 VaR methods + optional component VaR."""
         methods = ["parametric", "historical", "monte_carlo"]
@@ -293,6 +295,7 @@ class RiskService:
                 n_simulations=n_simulations,
                 use_garch=use_garch,
                 garch_model=garch_model,
+                seed=seed,
             )
             for m in methods
         ]
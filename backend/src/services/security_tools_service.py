@@ -7,7 +7,7 @@ Network security and IP intelligence utilities.
 
 from typing import Any
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.services.secrets_service import get_key_sync
 from src.utils.http_client import get_session
 
@@ -20,15 +20,16 @@ def _ipinfo_key() -> str: return get_key_sync("IPINFO_TOKEN")
 def _ip2loc_key() -> str: return get_key_sync("IP2LOCATION_API_KEY")
 
 
+def _completed_ttl(result: dict[str, Any]) -> int:
+    """Finished scans are cached for an hour; pending ones are fetched again."""
+    return 3600 if result["status"] == "completed" else 0
+
+
 # ─── ipinfo.io ────────────────────────────────────────────────────────────────
 
+@cached("ipinfo", ttl_seconds=3600)
 async def ipinfo_lookup(ip: str) -> dict[str, Any]:
     """Get IP geolocation from ipinfo.io."""
-    key = make_cache_key("ipinfo", ip)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     url = f"https://ipinfo.io/{ip}"
     ipinfo_token = _ipinfo_key()
     params = {"token": ipinfo_token} if ipinfo_token else {}
@@ -38,19 +39,14 @@ async def ipinfo_lookup(ip: str) -> dict[str, Any]:
         data = await resp.json(content_type=None)
 
     data["provider"] = "ipinfo"
-    cache_set(key, data, ttl_seconds=3600)
     return data
 
 
 # ─── IP2Location ──────────────────────────────────────────────────────────────
 
+@cached("ip2loc", ttl_seconds=3600)
 async def ip2location_lookup(ip: str) -> dict[str, Any]:
     """Get IP geolocation from IP2Location."""
-    key = make_cache_key("ip2loc", ip)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {"key": _ip2loc_key(), "ip": ip, "format": "json"}
     session = await get_session()
     async with session.get("https://api.ip2location.io/", params=params) as resp:
@@ -58,19 +54,14 @@ async def ip2location_lookup(ip: str) -> dict[str, Any]:
         data = await resp.json(content_type=None)
 
     data["provider"] = "ip2location"
-    cache_set(key, data, ttl_seconds=3600)
     return data
 
 
 # ─── BigDataCloud ─────────────────────────────────────────────────────────────
 
+@cached("bdc", ttl_seconds=3600)
 async def bigdatacloud_lookup(ip: str) -> dict[str, Any]:
     """Get IP geolocation from BigDataCloud (free tier)."""
-    key = make_cache_key("bdc", ip)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {"ip": ip, "localityLanguage": "en"}
     session = await get_session()
     async with session.get(
@@ -81,7 +72,6 @@ async def bigdatacloud_lookup(ip: str) -> dict[str, Any]:
         data = await resp.json(content_type=None)
 
     data["provider"] = "bigdatacloud"
-    cache_set(key, data, ttl_seconds=3600)
     return data
 
 
@@ -107,13 +97,9 @@ async def virustotal_scan_url(url_to_scan: str) -> dict[str, Any]:
     }
 
 
+@cached("vt", ttl_seconds=_completed_ttl)
 async def virustotal_analysis(analysis_id: str) -> dict[str, Any]:
     """Get VirusTotal analysis result."""
-    key = make_cache_key("vt", "analysis", analysis_id)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers = {"x-apikey": _vt_key()}
     session = await get_session()
     async with session.get(
@@ -137,20 +123,14 @@ async def virustotal_analysis(analysis_id: str) -> dict[str, Any]:
         },
         "provider": "virustotal",
     }
-    if result["status"] == "completed":
-        cache_set(key, result, ttl_seconds=3600)
     return result
 
 
 # ─── AbuseIPDB ────────────────────────────────────────────────────────────────
 
+@cached("abuse", ttl_seconds=1800)
 async def abuseipdb_check(ip: str) -> dict[str, Any]:
     """Check an IP against AbuseIPDB."""
-    key = make_cache_key("abuse", ip)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     headers = {"Key": _abuse_key(), "Accept": "application/json"}
     params = {"ipAddress": ip, "maxAgeInDays": "90", "verbose": ""}
     session = await get_session()
@@ -175,7 +155,6 @@ async def abuseipdb_check(ip: str) -> dict[str, Any]:
         "last_reported_at": d.get("lastReportedAt", ""),
         "provider": "abuseipdb",
     }
-    cache_set(key, result, ttl_seconds=1800)
     return result
 
 
@@ -204,13 +183,9 @@ async def urlscan_submit(url_to_scan: str) -> dict[str, Any]:
     }
 
 
+@cached("urlscan", ttl_seconds=_completed_ttl)
 async def urlscan_result(uuid: str) -> dict[str, Any]:
     """Get URLScan.io scan result."""
-    key = make_cache_key("urlscan", "result", uuid)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     session = await get_session()
     async with session.get(f"https://urlscan.io/api/v1/result/{uuid}/") as resp:
         if resp.status == 404:
@@ -239,19 +214,14 @@ async def urlscan_result(uuid: str) -> dict[str, Any]:
         "screenshot_url": data.get("task", {}).get("screenshotURL", ""),
         "provider": "urlscan",
     }
-    cache_set(key, result, ttl_seconds=3600)
     return result
 
 
 # ─── IP2WHOIS ─────────────────────────────────────────────────────────────────
 
+@cached("whois", ttl_seconds=86400)
 async def ip2whois_lookup(domain: str) -> dict[str, Any]:
     """WHOIS lookup for a domain."""
-    key = make_cache_key("whois", domain)
-    cached = cache_get(key)
-    if cached is not None:
-        return cached
-
     params = {"key": _whois_key(), "domain": domain}
     session = await get_session()
     async with session.get("https://api.ip2whois.com/v2", params=params) as resp:
@@ -259,5 +229,4 @@ async def ip2whois_lookup(domain: str) -> dict[str, Any]:
         data = await resp.json(content_type=None)
 
     data["provider"] = "ip2whois"
-    cache_set(key, data, ttl_seconds=86400)
     return data
@@ -24,9 +24,13 @@ from typing import Any
 import numpy as np
 from numpy.linalg import LinAlgError, eig, lstsq
 from scipy.cluster.hierarchy import fclusterdata
+from scipy.fft import irfft, next_fast_len, rfft
 from scipy.linalg import hankel
 from scipy.signal import hilbert
 
+from src.utils.compute_pool import cpu_bound
+from src.utils.progress import ProgressCallback, report, scaled
+
 warnings.filterwarnings('ignore', category=DeprecationWarning)
 
 
@@ -121,7 +125,10 @@ class SpectralRegimeAnalyzer:
         Вычислить автокорреляционную функцию из данных.
         
         Формула:
-        γ(h) = (1/T) * Σ(t=0 до T-h-1) (y_t - ȳ)(y_{t+h} - ȳ)
+        γ(h) = (1/(T-h)) * Σ(t=0 до T-h-1) (y_t - ȳ)(y_{t+h} - ȳ)
+
+        Суммы для всех лагов считаются одной свёрткой через FFT
+        (теорема Винера–Хинчина), O(T log T) вместо O(T·max_lag).
         
         Parameters
         ----------
@@ -153,10 +160,12 @@ class SpectralRegimeAnalyzer:
         # Центрирование данных
         y_centered = y - np.mean(y)
 
-        # Вычисление автоковариации для каждого лага
-        acf = np.zeros(self.max_lag + 1)
-        for h in range(self.max_lag + 1):
-            acf[h] = np.mean(y_centered[:T-h] * y_centered[h:]) if T-h > 0 else 0.0
+        # Автоковариация для всех лагов: IFFT(|FFT(y)|²), дополнение нулями
+        # до 2T-1 убирает циклическое перекрытие
+        n_fft = next_fast_len(2 * T - 1, real=True)
+        spectrum = rfft(y_centered, n_fft)
+        lagged_sums = irfft(spectrum.real ** 2 + spectrum.imag ** 2, n_fft)[:self.max_lag + 1]
+        acf = lagged_sums / (T - np.arange(self.max_lag + 1))
 
         # Нормализация (делим на дисперсию для получения автокорреляции)
         if acf[0] > 0:
@@ -209,9 +218,9 @@ class SpectralRegimeAnalyzer:
             Gamma_upper = hankel_matrix[:-1, :-1]
             Gamma_lower = hankel_matrix[1:, :-1]
 
-            # Регуляризация для численной стабильности
-            reg = 1e-8 * np.eye(Gamma_lower.shape[0])
-            Gamma_lower_reg = Gamma_lower + reg
+            # Регуляризация для численной стабильности (eye той же формы,
+            # без квадратной матрицы размера H-M)
+            Gamma_lower_reg = Gamma_lower + 1e-8 * np.eye(*Gamma_lower.shape)
 
             # Решение обобщённой проблемы собственных значений
             eigenvalues, _ = eig(Gamma_upper, Gamma_lower_reg)
@@ -231,10 +240,7 @@ class SpectralRegimeAnalyzer:
             # A * R = γ̂_vector
             # A[h, k] = λ_k^h
             n_residues = len(poles)
-            A = np.zeros((n_residues, n_residues), dtype=complex)
-            for h in range(n_residues):
-                for k in range(n_residues):
-                    A[h, k] = poles[k] ** h
+            A = np.vander(poles, n_residues, increasing=True).T
 
             gamma_vector = acf[:n_residues].astype(complex)
 
@@ -430,15 +436,12 @@ class SpectralRegimeAnalyzer:
         N = 512
         self.omega = np.linspace(-np.pi, np.pi, N)
 
-        # Вычисление спектра для каждой частоты
-        H = np.zeros(N, dtype=complex)
-
-        for i, omega in enumerate(self.omega):
-            np.exp(1j * omega)
-            for k in range(len(self.poles)):
-                denominator = 1 - self.poles[k] * np.exp(-1j * omega)
-                if np.abs(denominator) > 1e-10:
-                    H[i] += self.residues[k] / denominator
+        # Спектр на всех частотах сразу: матрица знаменателей (N, M)
+        denominators = 1 - self.poles[None, :] * np.exp(-1j * self.omega)[:, None]
+        valid = np.abs(denominators) > 1e-10
+        residues = self.residues[None, :len(self.poles)]
+        terms = np.divide(residues, denominators, out=np.zeros_like(denominators), where=valid)
+        H = terms.sum(axis=1)
 
         self.H_spectrum = H
         self.amplitude_spectrum = np.abs(H)
@@ -503,13 +506,6 @@ class SpectralRegimeAnalyzer:
         if T <= W:
             raise ValueError(f"Длина ряда ({T}) должна быть больше window_size ({W})")
 
-        n_points = T - W
-
-        # Инициализация массивов
-        self.regime_energies = np.zeros((n_points, self.K))
-        self.regime_signal = np.zeros(n_points, dtype=int)
-        self.entropy = np.zeros(n_points)
-
         # Используем остатки режимов (агрегированные для каждого режима)
         regime_residues = np.zeros(self.K, dtype=complex)
         for k in range(self.K):
@@ -519,38 +515,27 @@ class SpectralRegimeAnalyzer:
             else:
                 regime_residues[k] = 1.0 / self.K
 
-        # Для каждого момента времени
-        for t_idx in range(n_points):
-            t = t_idx + W
-
-            # Вычисление энергии каждого режима
-            for k in range(self.K):
-                lambda_k = self.regime_poles[k]
-                R_k = regime_residues[k]
-
-                # E_k(t) = Σ(s=0 до W-1) |R_k * λ_k^{t-s}|²
-                # Используем формулу геометрического ряда
-                r_squared = np.abs(lambda_k) ** 2
-                if np.abs(1 - r_squared) > 1e-10:
-                    # Геометрический ряд: |R_k|² * |λ_k|^{2t} * (1 - |λ_k|^{2W}) / (1 - |λ_k|²)
-                    energy = (np.abs(R_k) ** 2) * (r_squared ** t) * \
-                             (1 - r_squared ** W) / (1 - r_squared + 1e-10)
-                else:
-                    energy = (np.abs(R_k) ** 2) * W
-
-                self.regime_energies[t_idx, k] = max(energy, 1e-10)
+        # E_k(t) = Σ(s=0 до W-1) |R_k * λ_k^{t-s}|² в замкнутой форме
+        # (геометрический ряд) сразу для всех t = W..T-1 и всех режимов:
+        # |R_k|² * |λ_k|^{2t} * (1 - |λ_k|^{2W}) / (1 - |λ_k|²)
+        t = np.arange(W, T)[:, None]
+        r_squared = np.abs(self.regime_poles) ** 2
+        amplitude = np.abs(regime_residues) ** 2
+        unit_circle = np.abs(1 - r_squared) <= 1e-10
+        decay = amplitude * (1 - r_squared ** W) / (1 - r_squared + 1e-10)
+        energies = np.where(unit_circle, amplitude * W, decay * r_squared ** t)
+        self.regime_energies = np.maximum(energies, 1e-10)
 
-            # Нормализация энергий (мягкие вероятности)
-            total_energy = np.sum(self.regime_energies[t_idx, :])
-            probs = self.regime_energies[t_idx, :] / total_energy if total_energy > 0 else np.ones(self.K) / self.K
+        # Нормализация энергий (мягкие вероятности); энергии ≥ 1e-10, сумма > 0
+        probs = self.regime_energies / self.regime_energies.sum(axis=1, keepdims=True)
 
-            # Доминирующий режим
-            self.regime_signal[t_idx] = np.argmax(probs)
+        # Доминирующий режим
+        self.regime_signal = np.argmax(probs, axis=1)
 
-            # Энтропия режимности
-            # H(t) = -Σ P̃_k * log(P̃_k + ε)
-            eps = 1e-10
-            self.entropy[t_idx] = -np.sum(probs * np.log(probs + eps))
+        # Энтропия режимности
+        # H(t) = -Σ P̃_k * log(P̃_k + ε)
+        eps = 1e-10
+        self.entropy = -np.sum(probs * np.log(probs + eps), axis=1)
 
     def fit(self, y: np.ndarray) -> 'SpectralRegimeAnalyzer':
         """
@@ -614,7 +599,12 @@ class SpectralRegimeAnalyzer:
 
         return self
 
-    def fit_auto(self, y: np.ndarray, criterion: str = 'bic') -> 'SpectralRegimeAnalyzer':
+    def fit_auto(
+        self,
+        y: np.ndarray,
+        criterion: str = 'bic',
+        progress: ProgressCallback | None = None
+    ) -> 'SpectralRegimeAnalyzer':
         """
         Полный pipeline оценки с автоматическим определением оптимальных параметров.
         
@@ -628,6 +618,8 @@ class SpectralRegimeAnalyzer:
             Временной ряд размерности (T,)
         criterion : str
             Критерий для выбора количества полюсов: 'aic', 'bic', или 'aicc'
+        progress : callable, optional
+            Колбэк прогресса progress(fraction, message), см. src.utils.progress
         
         Returns
         -------
@@ -643,10 +635,13 @@ class SpectralRegimeAnalyzer:
 
         # 1. Вычисление ACF
         self.compute_acf(y)
+        report(progress, 0.05, "ACF")
 
         # 2. Автоматическое определение оптимального количества полюсов
         if self.n_poles is None or self.n_poles <= 0:
-            self.n_poles = self.find_optimal_n_poles(self.acf, criterion=criterion)
+            self.n_poles = self.find_optimal_n_poles(
+                self.acf, criterion=criterion, progress=scaled(progress, 0.05, 0.8)
+            )
 
         # 3. Автоматическое определение оптимального размера окна
         if self.window_size is None or self.window_size <= 0:
@@ -654,6 +649,7 @@ class SpectralRegimeAnalyzer:
 
         # 4. Метод Prony
         self.prony_method(self.acf)
+        report(progress, 0.85, "Prony")
 
         # 5. Кластеризация полюсов
         self.cluster_poles(self.poles)
@@ -666,10 +662,12 @@ class SpectralRegimeAnalyzer:
 
         # 8. Восстановление фазы
         self.minimum_phase_recovery()
+        report(progress, 0.9, "Спектральная факторизация")
 
         # 9. Динамический анализ
         if self.window_size < self.T:
             self.dynamic_regime_analysis(y)
+        report(progress, 1.0, "Динамический анализ")
 
         return self
 
@@ -746,14 +744,7 @@ class SpectralRegimeAnalyzer:
         if self.acf is None or self.poles is None or self.residues is None:
             return 0.0, 0.0
 
-        H = len(self.acf)
-        acf_recon = np.zeros(H, dtype=complex)
-
-        for h in range(H):
-            for k in range(len(self.poles)):
-                acf_recon[h] += self.residues[k] * (self.poles[k] ** h)
-
-        acf_recon = np.real(acf_recon)
+        acf_recon = self._reconstruct_acf(self.poles, self.residues, len(self.acf))
 
         # RMSE
         rmse = np.sqrt(np.mean((self.acf - acf_recon) ** 2))
@@ -764,6 +755,16 @@ class SpectralRegimeAnalyzer:
 
         return float(rmse), float(max(0, pct_explained))
 
+    @staticmethod
+    def _reconstruct_acf(poles: np.ndarray, residues: np.ndarray, n_lags: int) -> np.ndarray:
+        """γ_recon(h) = Re Σ(k) R_k * λ_k^h для h = 0..n_lags-1 (матрица Вандермонда).
+
+        Fallback-полюсов prony_method может быть меньше, чем остатков:
+        лишние остатки не участвуют.
+        """
+        vandermonde = np.vander(poles, n_lags, increasing=True).T
+        return np.real(vandermonde @ residues[:len(poles)])
+
     def get_regime_at_time(self, t: int) -> dict:
         """
         Получить информацию о режиме в момент t.
@@ -858,7 +859,8 @@ class SpectralRegimeAnalyzer:
         acf: np.ndarray,
         min_poles: int = 3,
         max_poles: int = 12,
-        criterion: str = 'bic'
+        criterion: str = 'bic',
+        progress: ProgressCallback | None = None
     ) -> int:
         """
         Найти оптимальное количество полюсов через информационные критерии.
@@ -881,6 +883,8 @@ class SpectralRegimeAnalyzer:
             Максимальное количество полюсов (по умолчанию 12)
         criterion : str
             Критерий выбора: 'aic', 'bic', или 'aicc' (скорректированный AIC)
+        progress : callable, optional
+            Колбэк прогресса progress(fraction, message), вызывается после каждого M
         
         Returns
         -------
@@ -896,8 +900,11 @@ class SpectralRegimeAnalyzer:
 
         criteria_values = []
         n_poles_range = range(min_poles, max_poles + 1)
+        n = len(acf)
+        var_acf = np.var(acf)
 
-        for M in n_poles_range:
+        for i, M in enumerate(n_poles_range):
+            report(progress, i / len(n_poles_range), f"n_poles={M}")
             try:
                 # Создаём временный анализатор для тестирования
                 temp_analyzer = SpectralRegimeAnalyzer(
@@ -910,22 +917,16 @@ class SpectralRegimeAnalyzer:
                 poles, residues = temp_analyzer.prony_method(acf)
 
                 # Восстанавливаем ACF
-                acf_recon = np.zeros(len(acf), dtype=complex)
-                for h in range(len(acf)):
-                    for k in range(len(poles)):
-                        acf_recon[h] += residues[k] * (poles[k] ** h)
-                acf_recon = np.real(acf_recon)
+                acf_recon = SpectralRegimeAnalyzer._reconstruct_acf(poles, residues, n)
 
                 # Вычисляем ошибку восстановления
                 rmse = np.sqrt(np.mean((acf - acf_recon) ** 2))
 
                 # Количество параметров: 2*M (комплексные полюсы) + 2*M (комплексные остатки) = 4*M
                 k = 4 * M
-                n = len(acf)
 
                 # Log-likelihood (приблизительно через RMSE)
                 # L ∝ exp(-n*RMSE^2 / (2*σ^2)), где σ^2 - дисперсия ACF
-                var_acf = np.var(acf)
                 if var_acf > 0 and rmse > 0:
                     # Приближение: ln(L) ≈ -n*RMSE^2 / (2*var_acf)
                     log_likelihood = -n * (rmse ** 2) / (2 * var_acf + 1e-10)
@@ -1129,10 +1130,10 @@ class SpectralRegimeAnalyzer:
             # Нормализованные энергии режимов
             energies_normalized = []
             if self.regime_energies is not None:
-                for t in range(len(self.regime_energies)):
-                    row = self.regime_energies[t, :]
-                    total = np.sum(row)
-                    energies_normalized.append((row / total).tolist() if total > 0 else [1.0/self.K] * self.K)
+                totals = self.regime_energies.sum(axis=1, keepdims=True)
+                energies_normalized = np.where(
+                    totals > 0, self.regime_energies / np.where(totals > 0, totals, 1.0), 1.0 / self.K
+                ).tolist()
 
             dynamics_data = {
                 'time_series': time_series,
@@ -1155,13 +1156,15 @@ class SpectralRegimeAnalyzer:
         }
 
 
+@cpu_bound
 def run_spectral_regime_analysis(
     returns: list[float],
     n_poles: int | None = None,
     window_size: int | None = None,
     max_lag: int | None = None,
     auto_optimize: bool = False,
-    criterion: str = 'bic'
+    criterion: str = 'bic',
+    progress: ProgressCallback | None = None
 ) -> dict[str, Any]:
     """
     Запустить комплексный анализ скрытых рыночных режимов.
@@ -1183,6 +1186,8 @@ def run_spectral_regime_analysis(
     criterion : str
         Критерий для выбора количества полюсов: 'aic', 'bic', или 'aicc'
         (используется только если auto_optimize=True)
+    progress : callable, optional
+        Колбэк прогресса progress(fraction, message), см. src.utils.progress
     
     Returns
     -------
@@ -1204,9 +1209,10 @@ def run_spectral_regime_analysis(
 
     # Используем fit_auto если auto_optimize=True или параметры не заданы
     if auto_optimize or (n_poles is None and window_size is None):
-        analyzer.fit_auto(returns_arr, criterion=criterion)
+        analyzer.fit_auto(returns_arr, criterion=criterion, progress=progress)
     else:
         analyzer.fit(returns_arr)
+        report(progress, 1.0)
 
     summary = analyzer.get_summary()
 
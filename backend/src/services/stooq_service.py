@@ -26,7 +26,7 @@ from typing import Any
 
 import pandas as pd
 
-from src.services.cache_service import cache_get, cache_set, make_cache_key
+from src.services.cache_service import cached
 from src.utils.http_client import get_session
 
 logger = logging.getLogger(__name__)
@@ -53,6 +53,8 @@ def _validate_ticker(ticker: str) -> str:
     return ticker
 
 
+# Cache for 1 hour — historical data doesn't change often
+@cached("stooq", ttl_seconds=3600)
 async def stooq_history(
     ticker: str,
     date_from: str | None = None,
@@ -74,11 +76,6 @@ async def stooq_history(
     ticker = _validate_ticker(ticker)
     interval_code = INTERVAL_MAP.get(interval, "d")
 
-    cache_key = make_cache_key("stooq", "hist", ticker, date_from, date_to, interval)
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     params: dict[str, str] = {
         "s": ticker.lower(),
         "i": interval_code,
@@ -138,8 +135,6 @@ async def stooq_history(
         "metadata": metadata,
     }
 
-    # Cache for 1 hour — historical data doesn't change often
-    cache_set(cache_key, result, ttl_seconds=3600)
     return result
 
 
@@ -7,7 +7,9 @@ import warnings
 import numpy as np
 
 from src.services.historical_scenarios import get_scenario, map_historical_to_stress_params
-from src.services.hjb_service import HJBStrategy, simulate_monte_carlo
+from src.services.hjb_service import HJBStrategy
+from src.services.monte_carlo_engine import simulate_portfolio_paths, summarize_simulation, tail_risk
+from src.utils.compute_pool import cpu_bound
 
 warnings.filterwarnings('ignore', category=DeprecationWarning)
 
@@ -137,7 +139,7 @@ class StressTestSimulator:
             n_steps = len(t_grid) - 1
 
         # Монте-Карло симуляция
-        monte_carlo_result = simulate_monte_carlo(
+        sim = simulate_portfolio_paths(
             mu=mu,
             cov_matrix=np.dot(sigma, sigma.T),
             weights=optimal_weights,
@@ -145,26 +147,17 @@ class StressTestSimulator:
             horizon_years=horizon_years,
             n_paths=n_paths,
             n_steps=n_steps,
-            random_seed=seed
+            seed=seed
         )
+        monte_carlo_result = summarize_simulation(sim)
 
         # Статистика портфеля
         portfolio_stats = scenario_strategy.get_portfolio_stats()
 
-        # Вычисляем дополнительные метрики
-        # Извлекаем финальные капиталы из траекторий
-        paths = monte_carlo_result.get('paths', [])
-        if len(paths) > 0:
-            final_capitals = np.array([path[-1] if len(path) > 0 else self.X_0 for path in paths])
-        else:
-            final_capitals = np.array([self.X_0])
-
-        # VaR и CVaR в абсолютных значениях
-        var_95 = float(np.quantile(final_capitals, 0.05)) if len(final_capitals) > 0 else 0.0
-        var_99 = float(np.quantile(final_capitals, 0.01)) if len(final_capitals) > 0 else 0.0
-
-        cvar_95 = float(np.mean(final_capitals[final_capitals <= var_95])) if len(final_capitals[final_capitals <= var_95]) > 0 else var_95
-        cvar_99 = float(np.mean(final_capitals[final_capitals <= var_99])) if len(final_capitals[final_capitals <= var_99]) > 0 else var_99
+        # VaR и CVaR в абсолютных значениях по всем траекториям
+        final_capitals = sim.final_capitals
+        var_95, cvar_95 = tail_risk(final_capitals, 0.05)
+        var_99, cvar_99 = tail_risk(final_capitals, 0.01)
 
         # Потери (относительно начального капитала)
         loss_var_95 = self.X_0 - var_95
@@ -197,7 +190,7 @@ class StressTestSimulator:
                 'loss_cvar_95': loss_cvar_95,
                 'loss_cvar_99': loss_cvar_99,
                 'mean_max_dd': stats.get('mean_max_drawdown', 0.0),
-                'worst_dd': stats.get('mean_max_drawdown', 0.0),  # Упрощение
+                'worst_dd': float(np.max(sim.max_drawdowns)),
                 'prob_loss': prob_loss_10,
                 'prob_loss_50': prob_loss_50
             },
@@ -209,6 +202,7 @@ class StressTestSimulator:
         }
 
 
+@cpu_bound
 def run_stress_test(
     mu: list[float],
     cov_matrix: list[list[float]],
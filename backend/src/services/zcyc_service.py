@@ -8,22 +8,64 @@
 - Если прямой endpoint недоступен, кривая строится из данных государственных облигаций (ОФЗ),
   и для промежуточных значений можно использовать линейную интерполяцию.
 
+HTTP-доступ идёт через общий асинхронный клиент moex_iss_client (keep-alive,
+кэш ответов, параллельная загрузка). Каждая функция загрузки имеет async-версию
+(*_async) для API и синхронную обёртку с исходным именем для скриптов.
+
 Автор: QuantPro Platform
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 
+import aiohttp
 import numpy as np
 import pandas as pd
-import requests
+
+from src.services.moex_iss_client import ISS_BASE, history_ttl, iss_get, run_sync
 
 logger = logging.getLogger(__name__)
 
-BASE_ISS = "https://iss.moex.com/iss"
+BASE_ISS = ISS_BASE
+
+
+def _error_result(date: str | None, error: str) -> dict:
+    return {
+        'status': 'error',
+        'error': error,
+        'date': date or datetime.now().strftime("%Y-%m-%d"),
+        'data': [],
+        'count': 0,
+        'min_term': 0.0,
+        'max_term': 0.0,
+        'min_rate': 0.0,
+        'max_rate': 0.0,
+        'mean_rate': 0.0
+    }
+
+
+def _table_frame(data: dict, table_name: str) -> pd.DataFrame:
+    """DataFrame из таблицы ISS ({'columns': [...], 'data': [...]})."""
+    if table_name not in data:
+        raise ValueError(f"Таблица '{table_name}' не найдена в ответе API")
+
+    table_data = data[table_name]
+    columns = table_data.get("columns", [])
+    rows = table_data.get("data", [])
+
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    return pd.DataFrame(rows, columns=columns)
 
 
 def fetch_zcyc_from_moex(date: str | None = None) -> dict:
+    """Синхронная обёртка над fetch_zcyc_from_moex_async (для скриптов)."""
+    return run_sync(fetch_zcyc_from_moex_async(date=date))
+
+
+async def fetch_zcyc_from_moex_async(date: str | None = None) -> dict:
     """
     Получить кривую бескупонных доходностей из MOEX ISS API.
     
@@ -60,20 +102,21 @@ def fetch_zcyc_from_moex(date: str | None = None) -> dict:
         # Для фондового рынка: /iss/engines/stock/zcyc.json
         # MOEX предоставляет кривую, интерполированную методом Нельсона-Сигеля
 
-        url = f"{BASE_ISS}/engines/stock/zcyc.json"
-
-        params = {
-            "iss.meta": "off"
-        }
+        params = {}
 
         # Если указана дата, добавляем параметр
         if date:
             # MOEX принимает дату в формате YYYY-MM-DD
             params["date"] = date
 
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+        try:
+            data = await iss_get("engines/stock/zcyc.json", params, ttl_seconds=history_ttl(date))
+        except aiohttp.ClientResponseError as e:
+            if e.status != 404:
+                raise
+            # Endpoint недоступен, строим кривую из данных облигаций
+            logger.info("ZCYC endpoint недоступен, строим кривую из данных облигаций")
+            return await build_zcyc_from_bonds_async(date=date)
 
         # MOEX возвращает данные в структуре:
         # {
@@ -83,12 +126,6 @@ def fetch_zcyc_from_moex(date: str | None = None) -> dict:
         #   }
         # }
 
-        # Проверяем статус ответа
-        if response.status_code == 404:
-            # Endpoint недоступен, строим кривую из данных облигаций
-            logger.info("ZCYC endpoint недоступен, строим кривую из данных облигаций")
-            return build_zcyc_from_bonds(date=date)
-
         # MOEX возвращает данные в структуре:
         # {
         #   "yearyields": {
@@ -106,17 +143,17 @@ def fetch_zcyc_from_moex(date: str | None = None) -> dict:
         if "yearyields" not in data:
             # Если данных нет, строим из облигаций
             logger.info("ZCYC данные недоступны в yearyields, строим кривую из данных облигаций")
-            return build_zcyc_from_bonds(date=date)
+            return await build_zcyc_from_bonds_async(date=date)
 
         zcyc_section = data["yearyields"]
         if not zcyc_section.get("data"):
             # Пробуем получить за последнюю доступную дату
             if date:
-                return fetch_zcyc_from_moex(date=None)
+                return await fetch_zcyc_from_moex_async(date=None)
             else:
                 # Строим из облигаций
                 logger.info("ZCYC данные yearyields пусты, строим кривую из данных облигаций")
-                return build_zcyc_from_bonds(date=date)
+                return await build_zcyc_from_bonds_async(date=date)
 
         zcyc_data = zcyc_section["data"]
         zcyc_columns = zcyc_section.get("columns", ["tradedate", "tradetime", "period", "value"])
@@ -220,37 +257,62 @@ def fetch_zcyc_from_moex(date: str | None = None) -> dict:
 
         return result
 
-    except requests.exceptions.RequestException as e:
+    except (aiohttp.ClientError, TimeoutError) as e:
         logger.error(f"Ошибка запроса к MOEX ISS API: {e}")
-        return {
-            'status': 'error',
-            'error': f'Ошибка подключения к MOEX API: {e!s}',
-            'date': date or datetime.now().strftime("%Y-%m-%d"),
-            'data': [],
-            'count': 0,
-            'min_term': 0.0,
-            'max_term': 0.0,
-            'min_rate': 0.0,
-            'max_rate': 0.0,
-            'mean_rate': 0.0
-        }
+        return _error_result(date, f'Ошибка подключения к MOEX API: {e!s}')
     except Exception as e:
         logger.error(f"Ошибка обработки данных ZCYC: {e}")
-        return {
-            'status': 'error',
-            'error': f'Ошибка обработки данных: {e!s}',
-            'date': date or datetime.now().strftime("%Y-%m-%d"),
-            'data': [],
-            'count': 0,
-            'min_term': 0.0,
-            'max_term': 0.0,
-            'min_rate': 0.0,
-            'max_rate': 0.0,
-            'mean_rate': 0.0
-        }
+        return _error_result(date, f'Ошибка обработки данных: {e!s}')
 
 
 def build_zcyc_from_bonds(date: str | None = None) -> dict:
+    """Синхронная обёртка над build_zcyc_from_bonds_async (для скриптов)."""
+    return run_sync(build_zcyc_from_bonds_async(date=date))
+
+
+async def _bond_curve_point(secid: str, val_date: datetime) -> dict | None:
+    """Точка кривой (срок, доходность) по последней сделке облигации около даты."""
+    try:
+        # Получаем исторические данные по облигации
+        date_from = (val_date - timedelta(days=5)).strftime("%Y-%m-%d")
+        date_to = (val_date + timedelta(days=5)).strftime("%Y-%m-%d")
+
+        hist_data = await iss_get(
+            f"history/engines/stock/markets/bonds/securities/{secid}.json",
+            {"from": date_from, "till": date_to, "history.columns": "TRADEDATE,CLOSE,YIELD,MATDATE"},
+            ttl_seconds=history_ttl(date_to),
+        )
+        if "history" not in hist_data or not hist_data["history"]["data"]:
+            return None
+
+        # Берем последнюю доступную запись
+        last_record = hist_data["history"]["data"][-1]
+        hist_columns = hist_data["history"]["columns"]
+
+        yield_idx = hist_columns.index("YIELD") if "YIELD" in hist_columns else None
+        matdate_idx = hist_columns.index("MATDATE") if "MATDATE" in hist_columns else None
+
+        if yield_idx is None or matdate_idx is None:
+            return None
+
+        yield_value = float(last_record[yield_idx])
+        matdate_str = last_record[matdate_idx]
+
+        # Вычисляем срок до погашения в годах
+        matdate = datetime.strptime(matdate_str[:10], "%Y-%m-%d")
+        term_years = (matdate - val_date).days / 365.25
+
+        if term_years > 0 and term_years < 30:  # Ограничиваем диапазон
+            return {
+                'term': float(term_years),
+                'value': float(yield_value)
+            }
+    except Exception as e:
+        logger.debug(f"Ошибка получения данных по облигации {secid}: {e}")
+    return None
+
+
+async def build_zcyc_from_bonds_async(date: str | None = None) -> dict:
     """
     Построить кривую бескупонных доходностей из данных государственных облигаций (ОФЗ).
     
@@ -275,15 +337,10 @@ def build_zcyc_from_bonds(date: str | None = None) -> dict:
         date_str = val_date.strftime("%Y-%m-%d")
 
         # Получаем список государственных облигаций
-        url = f"{BASE_ISS}/engines/stock/markets/bonds/boards/TQOB/securities.json"
-        params = {
-            "iss.meta": "off",
-            "iss.only": "securities"
-        }
-
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+        data = await iss_get(
+            "engines/stock/markets/bonds/boards/TQOB/securities.json",
+            {"iss.only": "securities"},
+        )
 
         if "securities" not in data or not data["securities"].get("data"):
             raise ValueError("Не удалось получить список облигаций")
@@ -295,55 +352,11 @@ def build_zcyc_from_bonds(date: str | None = None) -> dict:
         secid_idx = securities_columns.index("SECID") if "SECID" in securities_columns else 0
 
         # Получаем данные по нескольким облигациям для построения кривой
-        points = []
         ofz_secids = [row[secid_idx] for row in securities if "ОФЗ" in str(row) or "SU" in str(row)][:20]  # Берем первые 20 ОФЗ
 
-        for secid in ofz_secids:
-            try:
-                # Получаем исторические данные по облигации
-                date_from = (val_date - timedelta(days=5)).strftime("%Y-%m-%d")
-                date_to = (val_date + timedelta(days=5)).strftime("%Y-%m-%d")
-
-                hist_url = (
-                    f"{BASE_ISS}/history/engines/stock/markets/bonds/securities/{secid}.json"
-                    f"?from={date_from}&till={date_to}"
-                    "&iss.meta=off"
-                    "&history.columns=TRADEDATE,CLOSE,YIELD,MATDATE"
-                )
-
-                hist_response = requests.get(hist_url, timeout=10)
-                if hist_response.status_code != 200:
-                    continue
-
-                hist_data = hist_response.json()
-                if "history" not in hist_data or not hist_data["history"]["data"]:
-                    continue
-
-                # Берем последнюю доступную запись
-                last_record = hist_data["history"]["data"][-1]
-                hist_columns = hist_data["history"]["columns"]
-
-                yield_idx = hist_columns.index("YIELD") if "YIELD" in hist_columns else None
-                matdate_idx = hist_columns.index("MATDATE") if "MATDATE" in hist_columns else None
-
-                if yield_idx is None or matdate_idx is None:
-                    continue
-
-                yield_value = float(last_record[yield_idx])
-                matdate_str = last_record[matdate_idx]
-
-                # Вычисляем срок до погашения в годах
-                matdate = datetime.strptime(matdate_str[:10], "%Y-%m-%d")
-                term_years = (matdate - val_date).days / 365.25
-
-                if term_years > 0 and term_years < 30:  # Ограничиваем диапазон
-                    points.append({
-                        'term': float(term_years),
-                        'value': float(yield_value)
-                    })
-            except Exception as e:
-                logger.debug(f"Ошибка получения данных по облигации {secid}: {e}")
-                continue
+        # История по всем облигациям запрашиваем параллельно
+        results = await asyncio.gather(*(_bond_curve_point(secid, val_date) for secid in ofz_secids))
+        points = [p for p in results if p is not None]
 
         if not points:
             raise ValueError("Не удалось получить данные для построения кривой")
@@ -371,18 +384,7 @@ def build_zcyc_from_bonds(date: str | None = None) -> dict:
 
     except Exception as e:
         logger.error(f"Ошибка построения кривой из облигаций: {e}")
-        return {
-            'status': 'error',
-            'error': f'Ошибка построения кривой: {e!s}',
-            'date': date or datetime.now().strftime("%Y-%m-%d"),
-            'data': [],
-            'count': 0,
-            'min_term': 0.0,
-            'max_term': 0.0,
-            'min_rate': 0.0,
-            'max_rate': 0.0,
-            'mean_rate': 0.0
-        }
+        return _error_result(date, f'Ошибка построения кривой: {e!s}')
 
 
 def interpolate_zcyc_rate(
@@ -456,6 +458,11 @@ def interpolate_zcyc_rate(
 
 
 def get_available_zcyc_dates() -> list[str]:
+    """Синхронная обёртка над get_available_zcyc_dates_async (для скриптов)."""
+    return run_sync(get_available_zcyc_dates_async())
+
+
+async def get_available_zcyc_dates_async() -> list[str]:
     """
     Получить список доступных дат для кривой бескупонных доходностей.
     
@@ -467,15 +474,10 @@ def get_available_zcyc_dates() -> list[str]:
     try:
         # MOEX может предоставлять исторические данные
         # Пробуем получить список дат через metadata
-        url = f"{BASE_ISS}/statistics/engines/stock/markets/bonds/zcyc.json"
-        params = {
-            "iss.meta": "on",
-            "iss.only": "zcyc"
-        }
-
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        response.json()
+        await iss_get(
+            "statistics/engines/stock/markets/bonds/zcyc.json",
+            {"iss.meta": "on", "iss.only": "zcyc"},
+        )
 
         # Извлекаем доступные даты из metadata или данных
         dates = []
@@ -501,7 +503,7 @@ def get_available_zcyc_dates() -> list[str]:
 # Модуль для работы с кривой ZCYC по спецификации MOEX ISS API
 # Спецификация: https://iss.moex.com/iss/reference/417
 #
-# Базовые функции HTTP-доступа:
+# Базовые функции HTTP-доступа (async-версии: *_async):
 # - get_maxdates(engine): Получить максимальные даты
 # - get_yearyields(date, engine): Получить кривую годовых доходностей
 # - get_yearyields_dates(date, engine): Получить диапазон доступных дат
@@ -512,6 +514,11 @@ def get_available_zcyc_dates() -> list[str]:
 # ============================================================================
 
 def get_maxdates(engine: str = "stock") -> pd.DataFrame:
+    """Синхронная обёртка над get_maxdates_async (для скриптов)."""
+    return run_sync(get_maxdates_async(engine=engine))
+
+
+async def get_maxdates_async(engine: str = "stock") -> pd.DataFrame:
     """
     Получить максимальные даты для кривой ZCYC.
     
@@ -525,33 +532,21 @@ def get_maxdates(engine: str = "stock") -> pd.DataFrame:
     pd.DataFrame
         DataFrame с колонками: tradedate, maxdate, months
     """
-    url = f"{BASE_ISS}/engines/{engine}/zcyc/maxdates.json"
-    params = {
-        "iss.meta": "off"
-    }
-
-    response = requests.get(url, params=params, timeout=15)
-    response.raise_for_status()
-    data = response.json()
-
-    if "maxdates" not in data:
-        raise ValueError("Таблица 'maxdates' не найдена в ответе API")
+    data = await iss_get(f"engines/{engine}/zcyc/maxdates.json")
+    return _table_frame(data, "maxdates")
 
-    table_data = data["maxdates"]
-    columns = table_data.get("columns", [])
-    rows = table_data.get("data", [])
-
-    if not rows:
-        return pd.DataFrame(columns=columns)
 
-    df = pd.DataFrame(rows, columns=columns)
-    return df
+def get_yearyields(date: str | None = None, engine: str = "stock") -> pd.DataFrame:
+    """Синхронная обёртка над get_yearyields_async (для скриптов)."""
+    return run_sync(get_yearyields_async(date=date, engine=engine))
 
 
-def get_yearyields(date: str | None = None, engine: str = "stock") -> pd.DataFrame:
+async def get_yearyields_async(date: str | None = None, engine: str = "stock") -> pd.DataFrame:
     """
     Получить кривую годовых доходностей (yearyields) для указанной даты.
     
+    Кривая за прошедшую дату кэшируется надолго (см. moex_iss_client.history_ttl).
+    
     Parameters
     ----------
     date : str, optional
@@ -566,33 +561,17 @@ def get_yearyields(date: str | None = None, engine: str = "stock") -> pd.DataFra
         - period: срок в годах
         - value: доходность в процентах (годовая)
     """
-    url = f"{BASE_ISS}/engines/{engine}/zcyc/yearyields.json"
-    params = {
-        "iss.meta": "off"
-    }
-
-    if date:
-        params["date"] = date
-
-    response = requests.get(url, params=params, timeout=15)
-    response.raise_for_status()
-    data = response.json()
+    params = {"date": date} if date else {}
+    data = await iss_get(f"engines/{engine}/zcyc/yearyields.json", params, ttl_seconds=history_ttl(date))
+    return _table_frame(data, "yearyields")
 
-    if "yearyields" not in data:
-        raise ValueError("Таблица 'yearyields' не найдена в ответе API")
 
-    table_data = data["yearyields"]
-    columns = table_data.get("columns", [])
-    rows = table_data.get("data", [])
-
-    if not rows:
-        return pd.DataFrame(columns=columns)
-
-    df = pd.DataFrame(rows, columns=columns)
-    return df
+def get_yearyields_dates(date: str | None = None, engine: str = "stock") -> pd.DataFrame:
+    """Синхронная обёртка над get_yearyields_dates_async (для скриптов)."""
+    return run_sync(get_yearyields_dates_async(date=date, engine=engine))
 
 
-def get_yearyields_dates(date: str | None = None, engine: str = "stock") -> pd.DataFrame:
+async def get_yearyields_dates_async(date: str | None = None, engine: str = "stock") -> pd.DataFrame:
     """
     Получить диапазон доступных дат для yearyields.
     
@@ -608,40 +587,23 @@ def get_yearyields_dates(date: str | None = None, engine: str = "stock") -> pd.D
     pd.DataFrame
         DataFrame с колонками: from, till
     """
-    url = f"{BASE_ISS}/engines/{engine}/zcyc/yearyields.dates.json"
-    params = {
-        "iss.meta": "off"
-    }
-
-    if date:
-        params["date"] = date
-
-    response = requests.get(url, params=params, timeout=15)
-    response.raise_for_status()
-    data = response.json()
+    params = {"date": date} if date else {}
+    data = await iss_get(f"engines/{engine}/zcyc/yearyields.dates.json", params)
+    return _table_frame(data, "yearyields.dates")
 
-    table_name = "yearyields.dates"
-    if table_name not in data:
-        raise ValueError(f"Таблица '{table_name}' не найдена в ответе API")
-
-    table_data = data[table_name]
-    columns = table_data.get("columns", [])
-    rows = table_data.get("data", [])
 
-    if not rows:
-        return pd.DataFrame(columns=columns)
-
-    df = pd.DataFrame(rows, columns=columns)
-    return df
+def get_latest_curve(engine: str = "stock") -> pd.DataFrame:
+    """Синхронная обёртка над get_latest_curve_async (для скриптов)."""
+    return run_sync(get_latest_curve_async(engine=engine))
 
 
-def get_latest_curve(engine: str = "stock") -> pd.DataFrame:
+async def get_latest_curve_async(engine: str = "stock") -> pd.DataFrame:
     """
     Получить последнюю доступную кривую доходностей.
     
     Функция:
     1. Берёт последнюю доступную дату из maxdates
-    2. Вызывает get_yearyields(date=...) для этой даты
+    2. Вызывает get_yearyields_async(date=...) для этой даты
     
     Parameters
     ----------
@@ -654,7 +616,7 @@ def get_latest_curve(engine: str = "stock") -> pd.DataFrame:
         DataFrame с кривой доходностей для последней доступной даты
     """
     # Получаем максимальные даты
-    maxdates_df = get_maxdates(engine=engine)
+    maxdates_df = await get_maxdates_async(engine=engine)
 
     if maxdates_df.empty:
         raise ValueError("Не удалось получить максимальные даты")
@@ -663,7 +625,7 @@ def get_latest_curve(engine: str = "stock") -> pd.DataFrame:
     latest_date = maxdates_df.iloc[0]["tradedate"]
 
     # Получаем кривую для этой даты
-    curve_df = get_yearyields(date=latest_date, engine=engine)
+    curve_df = await get_yearyields_async(date=latest_date, engine=engine)
 
     return curve_df
 
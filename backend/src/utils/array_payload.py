@@ -0,0 +1,164 @@
+"""
+Binary request bodies for endpoints with one large numeric array.
+
+Alongside JSON, such endpoints accept the array itself as the body, with the
+remaining request fields passed as query parameters:
+
+- application/x-npy                    — NumPy .npy (np.save), no pickles
+- application/vnd.apache.arrow.stream  — Arrow IPC stream: one float64 column
+  per array column, or a single fixed_size_list<float64> column (row-major)
+- application/octet-stream             — raw little-endian float64, shape in
+  the X-Array-Shape header ("T,N")
+
+.npy and raw bodies are wrapped with np.frombuffer (read-only, no copy); an
+Arrow fixed_size_list column is also zero-copy, while separate Arrow columns
+are stacked once into a row-major matrix.
+
+Usage:
+    @router.post("/historical", openapi_extra=array_body_openapi(HistoricalBacktestRequest, "historical_prices"))
+    async def endpoint(
+        request: Request,
+        body: HistoricalBacktestRequest = Depends(array_body(HistoricalBacktestRequest, "historical_prices")),
+    ): ...
+"""
+import io
+import typing
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import numpy as np
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+NPY_CONTENT_TYPE = "application/x-npy"
+ARROW_STREAM_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+RAW_FLOAT64_CONTENT_TYPE = "application/octet-stream"
+SHAPE_HEADER = "X-Array-Shape"
+
+BINARY_CONTENT_TYPES = (NPY_CONTENT_TYPE, ARROW_STREAM_CONTENT_TYPE, RAW_FLOAT64_CONTENT_TYPE)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _decode_npy(body: bytes) -> np.ndarray:
+    fp = io.BytesIO(body)
+    version = np.lib.format.read_magic(fp)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+    elif version in ((2, 0), (3, 0)):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+    else:
+        raise ValueError(f"unsupported .npy version {version}")
+    if dtype.hasobject:
+        raise ValueError(".npy payloads with object dtype are not accepted")
+    count = int(np.prod(shape))
+    arr = np.frombuffer(body, dtype=dtype, count=count, offset=fp.tell())
+    return arr.reshape(shape, order="F" if fortran_order else "C")
+
+
+def _decode_arrow_stream(body: bytes) -> np.ndarray:
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    if table.num_columns == 0:
+        raise ValueError("Arrow payload has no columns")
+    if any(column.null_count for column in table.columns):
+        raise ValueError("Arrow payload contains nulls")
+
+    if table.num_columns == 1 and pa.types.is_fixed_size_list(table.schema.field(0).type):
+        column = table.column(0).combine_chunks()
+        width = column.type.list_size
+        values = column.flatten().to_numpy(zero_copy_only=False)
+        return values.reshape(len(column), width)
+
+    columns = [table.column(i).combine_chunks().to_numpy(zero_copy_only=False) for i in range(table.num_columns)]
+    if table.num_columns == 1:
+        return columns[0]
+    return np.column_stack(columns)
+
+
+def _decode_raw_float64(body: bytes, shape_header: str | None) -> np.ndarray:
+    if not shape_header:
+        raise ValueError(f"{SHAPE_HEADER} header is required for {RAW_FLOAT64_CONTENT_TYPE} bodies")
+    try:
+        shape = tuple(int(dim) for dim in shape_header.split(","))
+    except ValueError as e:
+        raise ValueError(f"invalid {SHAPE_HEADER} header: {shape_header!r}") from e
+    if any(dim < 0 for dim in shape) or int(np.prod(shape)) * 8 != len(body):
+        raise ValueError(f"{SHAPE_HEADER} {shape} does not match a body of {len(body)} bytes")
+    return np.frombuffer(body, dtype="<f8").reshape(shape)
+
+
+def decode_array(body: bytes, content_type: str, shape_header: str | None = None) -> np.ndarray:
+    """Decode a binary array body; raises ValueError on malformed payloads."""
+    if content_type == NPY_CONTENT_TYPE:
+        return _decode_npy(body)
+    if content_type == ARROW_STREAM_CONTENT_TYPE:
+        return _decode_arrow_stream(body)
+    if content_type == RAW_FLOAT64_CONTENT_TYPE:
+        return _decode_raw_float64(body, shape_header)
+    raise ValueError(f"unsupported content type {content_type!r}")
+
+
+def _is_list_field(annotation: Any) -> bool:
+    if typing.get_origin(annotation) in (list, tuple, set):
+        return True
+    return any(_is_list_field(arg) for arg in typing.get_args(annotation))
+
+
+def _query_fields(request: Request, model: type[BaseModel]) -> dict[str, Any]:
+    """Query parameters as model input; list fields take repeated or comma-separated values."""
+    data: dict[str, Any] = {}
+    for key in request.query_params:
+        info = model.model_fields.get(key)
+        values = request.query_params.getlist(key)
+        if info is not None and _is_list_field(info.annotation):
+            data[key] = [item for value in values for item in value.split(",") if item]
+        else:
+            data[key] = values[-1]
+    return data
+
+
+def array_body(model: type[M], array_field: str) -> Callable[[Request], Awaitable[M]]:
+    """
+    FastAPI dependency parsing `model` from a JSON body, or from a binary
+    array body (stored in `array_field`) plus query parameters.
+    """
+
+    async def dependency(request: Request) -> M:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        body = await request.body()
+        try:
+            if content_type in BINARY_CONTENT_TYPES:
+                try:
+                    array = decode_array(body, content_type, request.headers.get(SHAPE_HEADER))
+                except (ValueError, TypeError) as e:
+                    raise RequestValidationError([{
+                        "type": "value_error", "loc": ("body",), "msg": str(e),
+                    }]) from e
+                return model.model_validate({**_query_fields(request, model), array_field: array})
+            return model.model_validate_json(body)
+        except ValidationError as e:
+            # Inputs are not echoed back: they may be the whole (binary) array
+            errors = e.errors(include_url=False, include_context=False, include_input=False)
+            raise RequestValidationError(errors) from e
+
+    return dependency
+
+
+def array_body_openapi(model: type[BaseModel], array_field: str) -> dict[str, Any]:
+    """openapi_extra documenting the JSON and binary request bodies of an array_body endpoint."""
+    binary = {
+        "schema": {"type": "string", "format": "binary"},
+        "description": f"`{array_field}` as the body; other fields as query parameters",
+    }
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": model.model_json_schema()},
+                **{content_type: binary for content_type in BINARY_CONTENT_TYPES},
+            },
+        }
+    }
@@ -0,0 +1,186 @@
+"""
+Responses for endpoints returning large numeric arrays.
+
+Services return NumPy arrays as they are (no .tolist()); array_response()
+encodes the payload in the format the client asks for in Accept:
+
+- application/json (default)            — orjson with native NumPy
+  serialization; without orjson (it is in requirements.txt) stdlib json
+  with a NumPy hook, which goes through tolist()
+- application/vnd.apache.arrow.stream   — Arrow IPC stream: one row, one
+  column per top-level key; a (T, N) array becomes a
+  list<fixed_size_list<float64, N>> value backed by the array buffer
+- application/msgpack                   — MessagePack (msgpack; JSON without it);
+  arrays are {"nd": true, "type": dtype, "shape": [...], "data": raw bytes}
+  as in msgpack-numpy
+
+Routes keep their response_model for the OpenAPI schema; returning a
+Response bypasses FastAPI's jsonable_encoder pass over the payload.
+
+Usage:
+    @router.post("/historical", response_model=dict[str, Any])
+    async def endpoint(request: Request, body: ...):
+        result = await asyncio.to_thread(run_historical_backtest, ...)
+        return array_response(request, result)
+"""
+import json
+import math
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+JSON_CONTENT_TYPE = "application/json"
+ARROW_STREAM_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+MSGPACK_CONTENT_TYPES = (MSGPACK_CONTENT_TYPE, "application/x-msgpack")
+
+
+def _default(obj: Any) -> Any:
+    """Encoder hook for values json/orjson cannot serialize natively."""
+    if isinstance(obj, np.ndarray):
+        # orjson serializes C-contiguous numeric arrays itself; everything else
+        # (views, object/bool arrays under stdlib json) goes through tolist
+        return obj.tolist()
+    if isinstance(obj, (complex, np.complexfloating)):
+        return {"real": float(obj.real), "imag": float(obj.imag)}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _replace_non_finite(obj: Any) -> Any:
+    """NaN/Inf → None (JSON has no representation for them)."""
+    if isinstance(obj, (float, np.floating)):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f" and not np.isfinite(obj).all():
+            return [_replace_non_finite(v) for v in obj.tolist()]
+        return obj
+    if isinstance(obj, dict):
+        return {k: _replace_non_finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(v) for v in obj]
+    return obj
+
+
+def dumps_json(payload: Any) -> bytes:
+    """Serialize a payload that may contain NumPy arrays and scalars to JSON bytes."""
+    if orjson is not None:
+        # orjson writes NaN/Inf as null itself
+        return orjson.dumps(
+            payload, default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    try:
+        text = json.dumps(payload, default=_default, allow_nan=False, separators=(",", ":"))
+    except ValueError:
+        text = json.dumps(_replace_non_finite(payload), default=_default, allow_nan=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+class ArrayJSONResponse(Response):
+    """JSONResponse that serializes NumPy arrays without building Python lists first."""
+
+    media_type = JSON_CONTENT_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+# ── MessagePack ──────────────────────────────────────────────────────────────
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in "biuf":
+        arr = np.ascontiguousarray(obj)
+        return {"nd": True, "type": arr.dtype.str, "shape": list(arr.shape), "data": arr.tobytes()}
+    return _default(obj)
+
+
+def dumps_msgpack(payload: Any) -> bytes:
+    if msgpack is None:
+        raise RuntimeError("msgpack is not installed")
+    return msgpack.packb(payload, default=_msgpack_default, use_bin_type=True)
+
+
+# ── Arrow IPC ────────────────────────────────────────────────────────────────
+
+def _arrow_array(value: Any):
+    """A length-1 Arrow array holding `value`."""
+    import pyarrow as pa
+
+    if isinstance(value, np.ndarray) and value.dtype.kind in "biuf" and value.ndim >= 1 and all(value.shape[1:]):
+        arr = np.ascontiguousarray(value)
+        values = pa.array(arr.ravel())
+        for size in reversed(arr.shape[1:]):
+            values = pa.FixedSizeListArray.from_arrays(values, size)
+        return pa.ListArray.from_arrays(pa.array([0, arr.shape[0]], pa.int32()), values)
+    if isinstance(value, dict) and value:
+        children = [_arrow_array(v) for v in value.values()]
+        return pa.StructArray.from_arrays(children, names=[str(k) for k in value])
+    try:
+        return pa.array([value.item() if isinstance(value, np.generic) else value])
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Ragged or mixed-type values: embed as JSON text
+        return pa.array([dumps_json(value).decode("utf-8")])
+
+
+def dumps_arrow(payload: dict[str, Any]) -> bytes:
+    """One-row Arrow IPC stream with a column per top-level key."""
+    import pyarrow as pa
+
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump()
+    table = pa.table({str(k): _arrow_array(v) for k, v in payload.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# ── Negotiation ──────────────────────────────────────────────────────────────
+
+def _accepted(accept: str) -> list[str]:
+    """Media types from an Accept header, highest q first (stable for ties)."""
+    ranked = []
+    for i, part in enumerate(accept.split(",")):
+        media_type, *params = (p.strip() for p in part.split(";"))
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type and q > 0:
+            ranked.append((-q, i, media_type.lower()))
+    return [media_type for _, _, media_type in sorted(ranked)]
+
+
+def array_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    """Encode `payload` as Arrow, MessagePack or JSON according to the Accept header."""
+    for media_type in _accepted(request.headers.get("accept", "")):
+        if media_type == ARROW_STREAM_CONTENT_TYPE and isinstance(payload, (dict, BaseModel)):
+            return Response(dumps_arrow(payload), status_code=status_code, media_type=ARROW_STREAM_CONTENT_TYPE)
+        if media_type in MSGPACK_CONTENT_TYPES and msgpack is not None:
+            return Response(dumps_msgpack(payload), status_code=status_code, media_type=MSGPACK_CONTENT_TYPE)
+        if media_type in (JSON_CONTENT_TYPE, "application/*", "*/*"):
+            break
+    return ArrayJSONResponse(payload, status_code=status_code)
@@ -0,0 +1,511 @@
+"""
+Process pool for CPU-bound service functions.
+
+asyncio.to_thread runs services on the default thread pool, where pure-Python
+loops (HMM EM, GARCH MLE, spectral and CSCV loops) hold the GIL: concurrent
+heavy requests serialize and slow down the event loop as well. Functions
+marked with @cpu_bound are run by offload() on a shared ProcessPoolExecutor
+instead; anything else (and everything when COMPUTE_POOL_WORKERS=0) still
+goes to a thread.
+
+NumPy arrays of at least COMPUTE_SHM_MIN_BYTES in the arguments (top level
+or inside dicts/lists/tuples) are copied once into multiprocessing
+shared_memory blocks and passed by name; the worker maps them as arrays
+without unpickling. The blocks are unlinked when the call returns. Results
+travel back pickled.
+
+Services that run in a thread and split into independent tasks (walk-forward
+windows, per-asset GARCH fits) fan out with run_tasks() on the same pool, so
+they share its worker limit, queue and statistics; inside a pool worker they
+run their tasks inline instead of nesting pools.
+
+A ProgressChannel passed as the `progress` argument of an offloaded call
+carries (fraction, message) from the worker back to the caller and a cancel
+flag the other way, through a small shared-memory block; background jobs
+use it to report progress and stop runners that execute in the pool.
+
+service_endpoint() names the operation for offload() statistics and turns
+a saturated pool (more than COMPUTE_POOL_MAX_QUEUE calls waiting) or a
+crashed worker into 503. pool_stats() reports queue depth, utilization and
+per-operation timings for the admin API.
+
+Usage:
+    # service
+    @cpu_bound
+    def compute_pbo(strategy_returns, n_splits=16, ...): ...
+
+    # endpoint
+    result = await offload(compute_pbo, strategy_returns=body.strategy_returns, n_splits=body.n_splits)
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, TypeVar
+
+import numpy as np
+
+from src.utils import loop_monitor
+from src.utils.progress import JobCancelled
+
+logger = logging.getLogger(__name__)
+
+COMPUTE_POOL_WORKERS = int(os.getenv("COMPUTE_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Calls allowed to wait for a worker before offload() refuses new ones
+COMPUTE_POOL_MAX_QUEUE = int(os.getenv("COMPUTE_POOL_MAX_QUEUE", "32"))
+COMPUTE_SHM_MIN_BYTES = int(os.getenv("COMPUTE_SHM_MIN_BYTES", str(1024 * 1024)))
+COMPUTE_POOL_START_METHOD = os.getenv("COMPUTE_POOL_START_METHOD", "forkserver")
+# Imported once by the fork server, so workers start with them loaded
+COMPUTE_POOL_PRELOAD = ["numpy", "scipy.optimize", "scipy.stats"]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Set by service_endpoint(); offload() books timings under this name
+current_operation: ContextVar[str | None] = ContextVar("compute_operation", default=None)
+
+
+class ComputePoolBusyError(Exception):
+    """Raised by offload() and run_tasks() when the pool queue is full."""
+
+
+class BlockingCallError(Exception):
+    """A @cpu_bound function was called on the event loop (LOOP_GUARD_STRICT)."""
+
+
+def cpu_bound(fn: F) -> F:
+    """Mark a module-level service function to run in the process pool.
+
+    Calling it directly on the event-loop thread is reported to the loop
+    monitor (or raises BlockingCallError with LOOP_GUARD_STRICT): endpoints
+    must go through offload().
+    """
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        _guard_loop(fn, "must be run through offload()")
+        return fn(*args, **kwargs)
+
+    wrapper.__cpu_bound__ = True
+    return wrapper  # type: ignore[return-value]
+
+
+def _guard_loop(fn: Callable[..., Any], hint: str) -> None:
+    """Report (or refuse with LOOP_GUARD_STRICT) a blocking call on the event-loop thread."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    name = f"{fn.__module__}.{fn.__qualname__}"
+    if loop_monitor.LOOP_GUARD_STRICT:
+        raise BlockingCallError(f"{name} {hint}")
+    loop_monitor.note_blocking_call(name, current_operation.get())
+
+
+def is_cpu_bound(fn: Callable[..., Any]) -> bool:
+    return getattr(fn, "__cpu_bound__", False)
+
+
+# ── Shared-memory argument transfer ──────────────────────────────────────────
+
+@dataclass(frozen=True)
+class _SharedArray:
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+def _export(value: Any, blocks: list[shared_memory.SharedMemory]) -> Any:
+    """Replace large arrays in `value` by shared-memory descriptors."""
+    if isinstance(value, np.ndarray):
+        if value.nbytes < max(COMPUTE_SHM_MIN_BYTES, 1) or value.dtype.hasobject:
+            return value
+        shm = shared_memory.SharedMemory(create=True, size=value.nbytes)
+        blocks.append(shm)
+        np.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)[...] = value
+        return _SharedArray(shm.name, value.shape, value.dtype.str)
+    if isinstance(value, dict):
+        exported = {k: _export(v, blocks) for k, v in value.items()}
+        return exported if any(exported[k] is not v for k, v in value.items()) else value
+    if isinstance(value, (list, tuple)) and value and any(isinstance(v, (np.ndarray, dict, list, tuple)) for v in value):
+        exported = [_export(v, blocks) for v in value]
+        return type(value)(exported) if isinstance(value, tuple) else exported
+    return value
+
+
+def _open_shared(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        # The parent owns (and unlinks) the block
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _attach(value: Any, attached: list[shared_memory.SharedMemory]) -> Any:
+    """Worker side of _export: map descriptors back to (writable) arrays."""
+    if isinstance(value, _SharedArray):
+        shm = _open_shared(value.name)
+        attached.append(shm)
+        return np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=shm.buf)
+    if isinstance(value, dict):
+        return {k: _attach(v, attached) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        attached_items = [_attach(v, attached) for v in value]
+        return type(value)(attached_items) if isinstance(value, tuple) else attached_items
+    return value
+
+
+# Blocks a result still references; closed on a later call
+_deferred_close: list[shared_memory.SharedMemory] = []
+
+
+def _close_blocks(blocks: list[shared_memory.SharedMemory]) -> None:
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            _deferred_close.append(shm)
+
+
+def _invoke(fn: Callable[..., Any], args: tuple, kwargs: dict[str, Any]) -> tuple[Any, float]:
+    """Worker entry point: returns (result, run seconds)."""
+    pending, _deferred_close[:] = list(_deferred_close), []
+    _close_blocks(pending)
+    attached: list[shared_memory.SharedMemory] = []
+    start = time.perf_counter()
+    try:
+        result = fn(*_attach(args, attached), **_attach(kwargs, attached))
+        return result, time.perf_counter() - start
+    finally:
+        _close_blocks(attached)
+
+
+# ── Progress across the process boundary ─────────────────────────────────────
+
+class ProgressChannel:
+    """Progress callback for offloaded calls, backed by shared memory.
+
+    The caller creates the channel and passes it as the service's `progress`
+    argument; the copy pickled to the worker attaches to the same block.
+    Worker-side calls store the latest (fraction, message), read() returns
+    them to the caller, and after cancel() the next call in the worker raises
+    JobCancelled. The caller release()s the block when the call is over.
+    """
+    MESSAGE_BYTES = 256
+    # cancel flag at 0, fraction at 8, message length at 16, message from 18
+    _FRACTION = struct.Struct("<d")
+    _LENGTH = struct.Struct("<H")
+
+    def __init__(self, name: str | None = None) -> None:
+        self._owner = name is None
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=18 + self.MESSAGE_BYTES)
+            self._shm.buf[:18] = bytes(18)
+        else:
+            self._shm = _open_shared(name)
+
+    def __reduce__(self) -> tuple[type, tuple[str]]:
+        return ProgressChannel, (self._shm.name,)
+
+    def __call__(self, fraction: float, message: str = "") -> None:
+        buf = self._shm.buf
+        if buf[0]:
+            raise JobCancelled(self._shm.name)
+        encoded = message.encode()[:self.MESSAGE_BYTES]
+        buf[18:18 + len(encoded)] = encoded
+        self._LENGTH.pack_into(buf, 16, len(encoded))
+        self._FRACTION.pack_into(buf, 8, float(fraction))
+
+    def read(self) -> tuple[float, str]:
+        buf = self._shm.buf
+        (length,) = self._LENGTH.unpack_from(buf, 16)
+        message = bytes(buf[18:18 + min(length, self.MESSAGE_BYTES)]).decode(errors="ignore")
+        return self._FRACTION.unpack_from(buf, 8)[0], message
+
+    def cancel(self) -> None:
+        self._shm.buf[0] = 1
+
+    def release(self) -> None:
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+# ── Pool ─────────────────────────────────────────────────────────────────────
+
+@dataclass
+class _OperationStats:
+    calls: int = 0
+    errors: int = 0
+    run_seconds: float = 0.0
+    wait_seconds: float = 0.0
+
+
+@dataclass
+class _PoolStats:
+    started_at: float = field(default_factory=time.time)
+    in_flight: int = 0
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    restarts: int = 0
+    busy_seconds: float = 0.0
+    shm_bytes: int = 0
+    operations: dict[str, _OperationStats] = field(default_factory=dict)
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_stats = _PoolStats()
+# offload() runs on the event loop, run_tasks() on request threads
+_stats_lock = threading.Lock()
+# True inside pool worker processes: no nested fan-out from there
+_in_worker = False
+
+
+def _mark_worker() -> None:
+    global _in_worker
+    _in_worker = True
+
+
+def _get_pool() -> ProcessPoolExecutor | None:
+    global _pool
+    if COMPUTE_POOL_WORKERS <= 0 or _in_worker:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            method = COMPUTE_POOL_START_METHOD
+            if method not in multiprocessing.get_all_start_methods():
+                method = "spawn"
+            ctx = multiprocessing.get_context(method)
+            if method == "forkserver":
+                ctx.set_forkserver_preload(COMPUTE_POOL_PRELOAD)
+            _pool = ProcessPoolExecutor(max_workers=COMPUTE_POOL_WORKERS, mp_context=ctx, initializer=_mark_worker)
+        return _pool
+
+
+def runs_in_pool(fn: Callable[..., Any]) -> bool:
+    """Whether offload(fn, ...) would run fn in a pool worker rather than a thread."""
+    return is_cpu_bound(fn) and COMPUTE_POOL_WORKERS > 0 and not _in_worker
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+            _stats.restarts += 1
+
+
+def shutdown_compute_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _admit(fn: Callable[..., Any], n_calls: int) -> _OperationStats:
+    """Reserve pool slots for n_calls calls or raise ComputePoolBusyError."""
+    with _stats_lock:
+        if _stats.in_flight + n_calls > COMPUTE_POOL_WORKERS + COMPUTE_POOL_MAX_QUEUE:
+            _stats.rejected += 1
+            raise ComputePoolBusyError(f"{_stats.in_flight} compute tasks in flight, {n_calls} more requested")
+        op = _stats.operations.setdefault(current_operation.get() or fn.__qualname__, _OperationStats())
+        _stats.in_flight += n_calls
+        _stats.submitted += n_calls
+        op.calls += n_calls
+        return op
+
+
+def _submit(
+    pool: ProcessPoolExecutor, fn: Callable[..., Any], args: tuple, kwargs: dict[str, Any],
+) -> tuple[Future, list[shared_memory.SharedMemory]]:
+    blocks: list[shared_memory.SharedMemory] = []
+    try:
+        shared_args, shared_kwargs = _export(args, blocks), _export(kwargs, blocks)
+        future = pool.submit(_invoke, fn, shared_args, shared_kwargs)
+    except BaseException:
+        _unlink(blocks)
+        raise
+    with _stats_lock:
+        _stats.shm_bytes += sum(shm.size for shm in blocks)
+    return future, blocks
+
+
+def _unlink(blocks: list[shared_memory.SharedMemory]) -> None:
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+def _settle(
+    pool: ProcessPoolExecutor,
+    fn: Callable[..., Any],
+    op: _OperationStats,
+    submitted: float,
+    blocks: list[shared_memory.SharedMemory],
+    outcome: tuple[Any, float] | BaseException,
+) -> Any:
+    """Release one admitted call and book its outcome; returns the result or raises the error."""
+    _unlink(blocks)
+    if isinstance(outcome, BaseException):
+        with _stats_lock:
+            _stats.in_flight -= 1
+            _stats.failed += 1
+            op.errors += 1
+        if isinstance(outcome, BrokenProcessPool):
+            logger.error("Compute pool broke while running %s; restarting it", fn.__qualname__)
+            _reset_pool(pool)
+        raise outcome
+
+    result, run_seconds = outcome
+    with _stats_lock:
+        _stats.in_flight -= 1
+        _stats.completed += 1
+        _stats.busy_seconds += run_seconds
+        op.run_seconds += run_seconds
+        op.wait_seconds += max(time.perf_counter() - submitted - run_seconds, 0.0)
+    return result
+
+
+def _outcome(future: Future) -> tuple[Any, float] | BaseException:
+    if future.cancelled():
+        return CancelledError()
+    return future.exception() or future.result()
+
+
+async def offload(fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+    """Run `fn` in the process pool if it is @cpu_bound, otherwise in a thread."""
+    pool = _get_pool() if is_cpu_bound(fn) else None
+    if pool is None:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    op = _admit(fn, 1)
+    submitted = time.perf_counter()
+    try:
+        future, blocks = _submit(pool, fn, args, kwargs)
+    except BaseException as e:
+        return _settle(pool, fn, op, submitted, [], e)
+    try:
+        outcome = await asyncio.wrap_future(future)
+    except BaseException as e:
+        outcome = e
+    return _settle(pool, fn, op, submitted, blocks, outcome)
+
+
+def fan_out_width(n_tasks: int) -> int:
+    """How many pool workers run_tasks() can use for n_tasks tasks; 0 = run them inline.
+
+    0 when the pool is disabled and inside pool workers (a service offloaded
+    as a whole, or run as a background job, does not fan out again).
+    """
+    if COMPUTE_POOL_WORKERS <= 0 or _in_worker:
+        return 0
+    return max(min(COMPUTE_POOL_WORKERS, n_tasks), 0)
+
+
+def run_tasks(
+    fn: Callable[..., Any],
+    arg_list: list[tuple],
+    on_done: Callable[[int, int], None] | None = None,
+) -> list[Any]:
+    """Run fn(*args) for every tuple of arg_list in the shared pool; results in order.
+
+    For services that run in a request or job thread and split their work
+    into independent module-level tasks. All tasks are admitted together
+    (ComputePoolBusyError when they do not fit the queue) and share the
+    pool's statistics; the calling thread blocks until they finish.
+    on_done(completed, total) is called as tasks complete; the first
+    failed task (or an exception from on_done) cancels the ones not yet
+    started and is re-raised. Without a pool the tasks run inline.
+    """
+    n_tasks = len(arg_list)
+    pool = _get_pool()
+    if pool is None:
+        results = []
+        for args in arg_list:
+            results.append(fn(*args))
+            if on_done is not None:
+                on_done(len(results), n_tasks)
+        return results
+
+    _guard_loop(fn, "run_tasks() must not be called on the event loop")
+    op = _admit(fn, n_tasks)
+    submitted = time.perf_counter()
+    calls: list[tuple[Future | None, list[shared_memory.SharedMemory]]] = []
+    error: BaseException | None = None
+    for args in arg_list:
+        if error is None:
+            try:
+                calls.append(_submit(pool, fn, args, {}))
+                continue
+            except BaseException as e:
+                error = e
+        calls.append((None, []))
+
+    futures = [future for future, _ in calls if future is not None]
+    if error is None:
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                if future.cancelled() or future.exception() is not None:
+                    break
+                if on_done is not None:
+                    on_done(done, n_tasks)
+        except BaseException as e:
+            error = e
+    for future in futures:
+        future.cancel()
+    wait(futures)
+
+    results = []
+    for future, blocks in calls:
+        outcome = _outcome(future) if future is not None else error
+        try:
+            results.append(_settle(pool, fn, op, submitted, blocks, outcome))
+        except BaseException as e:
+            error = error or e
+    if error is not None:
+        raise error
+    return results
+
+
+def pool_stats() -> dict[str, Any]:
+    """Queue depth, utilization and per-operation timings."""
+    workers = max(COMPUTE_POOL_WORKERS, 0)
+    running = min(_stats.in_flight, workers)
+    uptime = max(time.time() - _stats.started_at, 1e-9)
+    return {
+        "enabled": workers > 0,
+        "workers": workers,
+        "running": running,
+        "queue_depth": _stats.in_flight - running,
+        "max_queue": COMPUTE_POOL_MAX_QUEUE,
+        "utilization": round(running / workers, 3) if workers else 0.0,
+        "utilization_since_start": round(_stats.busy_seconds / (workers * uptime), 4) if workers else 0.0,
+        "submitted": _stats.submitted,
+        "completed": _stats.completed,
+        "failed": _stats.failed,
+        "rejected": _stats.rejected,
+        "restarts": _stats.restarts,
+        "shared_memory_bytes": _stats.shm_bytes,
+        "operations": {
+            name: {
+                "calls": s.calls,
+                "errors": s.errors,
+                "avg_run_ms": round(1000 * s.run_seconds / max(s.calls - s.errors, 1), 2),
+                "avg_wait_ms": round(1000 * s.wait_seconds / max(s.calls - s.errors, 1), 2),
+            }
+            for name, s in _stats.operations.items()
+        },
+    }
@@ -8,12 +8,18 @@ Usage:
     @service_endpoint("CCMV optimization")
     async def optimize(request: CCMVRequest):
         return optimize_ccmv(...)  # just the happy path
+
+The operation name also labels compute-pool statistics for services the
+endpoint runs through src.utils.compute_pool.offload().
 """
 import functools
 import logging
+from concurrent.futures import BrokenExecutor
 
 from fastapi import HTTPException
 
+from src.utils.compute_pool import ComputePoolBusyError, current_operation
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,16 +27,24 @@ def service_endpoint(operation_name: str):
     """Decorator that wraps endpoint with standardized error handling.
 
     Catches ValueError/RuntimeError → 400, numpy LinAlgError → 400,
-    everything else → 500. Logs with exc_info for debugging.
+    a full or crashed compute pool → 503, everything else → 500.
+    Logs with exc_info for debugging.
     """
 
     def decorator(func):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
+            token = current_operation.set(operation_name)
             try:
                 return await func(*args, **kwargs)
             except HTTPException:
                 raise
+            except (ComputePoolBusyError, BrokenExecutor) as e:
+                logger.warning("%s: compute pool unavailable: %s", operation_name, e)
+                raise HTTPException(
+                    status_code=503, detail="Compute capacity exhausted, retry later",
+                    headers={"Retry-After": "5"},
+                ) from e
             except ValueError as e:
                 logger.error("%s validation error: %s", operation_name, e, exc_info=True)
                 raise HTTPException(status_code=400, detail="Invalid input parameters") from e
@@ -46,6 +60,8 @@ def service_endpoint(operation_name: str):
                     ) from e
                 logger.error("%s failed: %s", operation_name, e, exc_info=True)
                 raise HTTPException(status_code=500, detail="Internal server error") from e
+            finally:
+                current_operation.reset(token)
 
         return wrapper
 
@@ -4,13 +4,26 @@ Shared validation utilities for financial API request models.
 Provides FinancialBaseModel that rejects NaN/Infinity values in all float fields,
 preventing silent corruption in NumPy/SciPy computations.
 
+Large numeric inputs should be declared as arrays:
+
+    historical_prices: Annotated[np.ndarray, FloatArray(2, max_shape=(MAX_DATA_POINTS, MAX_ASSETS))]
+
+The field is converted once to a float64 np.ndarray and checked with a single
+vectorized finiteness test instead of per-element Python validation; an
+ndarray (e.g. decoded from a binary body, see src.utils.array_payload) is
+accepted without copying.
+
 Also provides MeanVarianceBase — shared schema for portfolio optimization models
 that operate on (mu, cov_matrix) inputs (CCMV, HJB).
 """
+import functools
 import math
-from typing import Any
+import typing
+from typing import Annotated, Any
 
-from pydantic import BaseModel, Field, model_validator
+import numpy as np
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, GetJsonSchemaHandler, model_validator
+from pydantic_core import core_schema
 
 # Shared bounds constants (must precede model definitions that reference them)
 MAX_ASSETS = 200
@@ -24,19 +37,125 @@ MAX_RATE_PCT = 1000.0
 MAX_DATA_POINTS = 50_000
 
 
+def _non_finite_error(path: str) -> ValueError:
+    return ValueError(f"NaN and Infinity values are not allowed{f' at {path}' if path else ''}")
+
+
+def _first_non_finite(arr: np.ndarray, path: str = "") -> str | None:
+    """Path of the first NaN/Infinity element of a float array, or None if all are finite."""
+    # One reduction: the sum is finite only if every element is (it can also
+    # overflow, so a non-finite sum falls through to the exact elementwise test).
+    with np.errstate(over="ignore", invalid="ignore"):
+        if np.isfinite(np.sum(arr)):
+            return None
+    bad = np.flatnonzero(~np.isfinite(arr))
+    if bad.size == 0:
+        return None
+    index = np.unravel_index(bad[0], arr.shape)
+    return path + "".join(f"[{i}]" for i in index)
+
+
 def _check_finite(obj: Any, path: str = "") -> None:
     """Recursively check that all float values are finite (not NaN or Infinity)."""
     if isinstance(obj, float):
         if not math.isfinite(obj):
-            raise ValueError(
-                f"NaN and Infinity values are not allowed{f' at {path}' if path else ''}"
-            )
+            raise _non_finite_error(path)
     elif isinstance(obj, dict):
         for k, v in obj.items():
             _check_finite(v, f"{path}.{k}" if path else k)
     elif isinstance(obj, (list, tuple)):
+        # Rectangular numeric lists are checked in one vectorized pass;
+        # strings, dicts, None and ragged lists take the elementwise path.
+        try:
+            arr = np.asarray(obj)
+        except (ValueError, TypeError, OverflowError):
+            arr = None
+        if arr is not None and arr.dtype.kind in "biuf":
+            if arr.dtype.kind == "f":
+                bad = _first_non_finite(arr, path)
+                if bad is not None:
+                    raise _non_finite_error(bad)
+            return
         for i, v in enumerate(obj):
             _check_finite(v, f"{path}[{i}]")
+    elif isinstance(obj, np.ndarray) and obj.dtype.kind == "f":
+        bad = _first_non_finite(obj, path)
+        if bad is not None:
+            raise _non_finite_error(bad)
+
+
+class FloatArray:
+    """
+    Annotated marker validating a field as a finite float64 np.ndarray.
+
+    Accepts nested lists (converted once with np.asarray) or ndarrays (cast
+    without copying when already float64). Rejects wrong rank, shapes outside
+    [min_shape, max_shape] (None = unbounded axis) and NaN/Infinity.
+    Serializes back to nested lists.
+    """
+
+    def __init__(
+        self,
+        ndim: int,
+        max_shape: tuple[int | None, ...] | None = None,
+        min_shape: tuple[int | None, ...] | None = None,
+    ):
+        self.ndim = ndim
+        self.max_shape = max_shape or (None,) * ndim
+        self.min_shape = min_shape or (None,) * ndim
+
+    def validate(self, value: Any) -> np.ndarray:
+        try:
+            arr = np.asarray(value, dtype=np.float64)
+        except (ValueError, TypeError, OverflowError) as e:
+            raise ValueError(f"expected a numeric {self.ndim}-D array") from e
+        if arr.ndim != self.ndim:
+            raise ValueError(f"expected a {self.ndim}-D array, got {arr.ndim}-D")
+        for axis, (size, lo, hi) in enumerate(zip(arr.shape, self.min_shape, self.max_shape, strict=True)):
+            if lo is not None and size < lo:
+                raise ValueError(f"axis {axis} has {size} elements, at least {lo} required")
+            if hi is not None and size > hi:
+                raise ValueError(f"axis {axis} has {size} elements, at most {hi} allowed")
+        bad = _first_non_finite(arr)
+        if bad is not None:
+            raise _non_finite_error(bad)
+        return arr
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            self.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(lambda a: a.tolist()),
+        )
+
+    def __get_pydantic_json_schema__(self, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler) -> dict:
+        json_schema: dict[str, Any] = {"type": "number"}
+        for lo, hi in reversed(list(zip(self.min_shape, self.max_shape, strict=True))):
+            json_schema = {"type": "array", "items": json_schema}
+            if lo is not None:
+                json_schema["minItems"] = lo
+            if hi is not None:
+                json_schema["maxItems"] = hi
+        return json_schema
+
+
+def _has_float_array(annotation: Any, metadata: list[Any]) -> bool:
+    if any(isinstance(m, FloatArray) for m in metadata):
+        return True
+    if typing.get_origin(annotation) is Annotated:
+        return any(isinstance(m, FloatArray) for m in annotation.__metadata__)
+    return any(_has_float_array(arg, []) for arg in typing.get_args(annotation))
+
+
+@functools.cache
+def _array_field_keys(model: type[BaseModel]) -> frozenset[str]:
+    """Names and aliases of FloatArray fields (validated by the marker itself)."""
+    keys = set()
+    for name, info in model.model_fields.items():
+        if _has_float_array(info.annotation, info.metadata):
+            keys.add(name)
+            if info.alias:
+                keys.add(info.alias)
+    return frozenset(keys)
 
 
 class FinancialBaseModel(BaseModel):
@@ -46,7 +165,8 @@ class FinancialBaseModel(BaseModel):
     @classmethod
     def reject_nan_inf(cls, data: Any) -> Any:
         if isinstance(data, dict):
-            _check_finite(data)
+            skip = _array_field_keys(cls)
+            _check_finite({k: v for k, v in data.items() if k not in skip} if skip else data)
         return data
 
 
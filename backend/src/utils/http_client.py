@@ -4,6 +4,10 @@ Shared aiohttp ClientSession singleton.
 Instead of creating a new session per request, reuse a single session
 with connection pooling. Call close_session() on app shutdown.
 
+A session is bound to the event loop that created it, so there is one
+session per running loop (the app loop, plus e.g. the background loop of
+a sync facade).
+
 Usage:
     from src.utils.http_client import get_session
 
@@ -16,36 +20,38 @@ import asyncio
 
 import aiohttp
 
-_session: aiohttp.ClientSession | None = None
-_session_lock = asyncio.Lock()
+_sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+def _new_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=100,
+        limit_per_host=10,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True,
+    )
+    timeout = aiohttp.ClientTimeout(total=30, connect=10, sock_read=15)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+    )
 
 
 async def get_session() -> aiohttp.ClientSession:
-    """Return the shared aiohttp session, creating it if needed."""
-    global _session
-    if _session is not None and not _session.closed:
-        return _session
-    async with _session_lock:
-        # Re-check after acquiring lock
-        if _session is not None and not _session.closed:
-            return _session
-        connector = aiohttp.TCPConnector(
-            limit=100,
-            limit_per_host=10,
-            ttl_dns_cache=300,
-            enable_cleanup_closed=True,
-        )
-        timeout = aiohttp.ClientTimeout(total=30, connect=10, sock_read=15)
-        _session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-        )
-    return _session
+    """Return the shared aiohttp session of the running loop, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        # No await between the check and the assignment, so concurrent
+        # callers on this loop cannot create two sessions.
+        for stale in [lp for lp in list(_sessions) if lp.is_closed()]:
+            _sessions.pop(stale, None)
+        session = _sessions[loop] = _new_session()
+    return session
 
 
 async def close_session() -> None:
-    """Close the shared session. Call on app shutdown."""
-    global _session
-    if _session is not None and not _session.closed:
-        await _session.close()
-        _session = None
+    """Close the running loop's shared session. Call on app shutdown."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
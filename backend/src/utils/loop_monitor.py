@@ -0,0 +1,232 @@
+"""
+Event-loop lag monitor.
+
+A coroutine sleeps LOOP_MONITOR_INTERVAL_MS at a time and records how late
+it wakes up: the overshoot is the time the loop spent running other code
+without yielding. Overshoots of at least LOOP_BLOCK_THRESHOLD_MS are
+recorded as blocks.
+
+A watchdog thread samples the loop thread's stack while a block is still
+going on (sys._current_frames), so each block is attributed to the route
+whose endpoint was on the stack and to the innermost src/ function that
+was running (e.g. "POST /api/stress/test" in stress_service.run_stress_test).
+
+@cpu_bound services called on the loop thread instead of through offload()
+are reported here as well (src.utils.compute_pool); with LOOP_GUARD_STRICT
+such calls fail instead, so a route that forgets offload() breaks in tests
+rather than stalling the worker in production.
+
+loop_stats() returns lag percentiles, per-route block totals and the most
+recent blocks for the admin API.
+
+Usage:
+    # lifespan
+    start_loop_monitor(app)
+    ...
+    await stop_loop_monitor()
+"""
+import asyncio
+import contextlib
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+LOOP_GUARD_STRICT = os.getenv("LOOP_GUARD_STRICT", "").lower() in ("1", "true", "yes")
+# About a minute of samples at the default interval
+MAX_LAG_SAMPLES = 1200
+MAX_BLOCKS = 100
+
+_SRC_DIR = str(Path(__file__).resolve().parent.parent)
+_THIS_FILE = str(Path(__file__).resolve())
+
+
+@dataclass
+class BlockRecord:
+    route: str
+    culprit: str
+    duration_ms: float
+    timestamp: float
+
+
+@dataclass
+class _RouteBlocks:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_culprit: str = ""
+
+
+_route_codes: dict[CodeType, str] = {}
+_lags_ms: deque[float] = deque(maxlen=MAX_LAG_SAMPLES)
+_blocks: deque[BlockRecord] = deque(maxlen=MAX_BLOCKS)
+_route_blocks: dict[str, _RouteBlocks] = {}
+_blocking_calls: dict[tuple[str, str], int] = {}
+
+_loop_thread_id: int | None = None
+_tick_seq = 0
+_last_tick = 0.0
+# (tick seq, route, culprit) taken by the watchdog during the current stall
+_sample: tuple[int, str, str] | None = None
+_task: asyncio.Task[None] | None = None
+_watchdog: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def register_routes(routes: list[Any]) -> None:
+    """Map endpoint code objects to "METHOD /path" labels."""
+    for route in routes:
+        endpoint = getattr(route, "endpoint", None)
+        path = getattr(route, "path", None)
+        if endpoint is None or path is None:
+            continue
+        code = getattr(inspect.unwrap(endpoint), "__code__", None)
+        if code is not None:
+            methods = ",".join(sorted(getattr(route, "methods", None) or ()))
+            _route_codes[code] = f"{methods} {path}".strip()
+
+
+def _describe(frame: FrameType | None) -> tuple[str, str]:
+    """(route, culprit) for a stack of the loop thread."""
+    culprit = route = None
+    innermost = None
+    while frame is not None:
+        code = frame.f_code
+        if innermost is None:
+            innermost = frame
+        if culprit is None and code.co_filename.startswith(_SRC_DIR) and code.co_filename != _THIS_FILE:
+            culprit = frame
+        if code in _route_codes:
+            route = _route_codes[code]
+            break
+        frame = frame.f_back
+    target = culprit or innermost
+    if target is None:
+        return route or "unknown", "unknown"
+    module = target.f_globals.get("__name__", "?")
+    return route or "unknown", f"{module}.{target.f_code.co_qualname}:{target.f_lineno}"
+
+
+def _record_block(route: str, culprit: str, duration_ms: float) -> None:
+    _blocks.appendleft(BlockRecord(route, culprit, round(duration_ms, 1), time.time()))
+    stats = _route_blocks.setdefault(route, _RouteBlocks())
+    stats.count += 1
+    stats.total_ms += duration_ms
+    stats.max_ms = max(stats.max_ms, duration_ms)
+    stats.last_culprit = culprit
+    logger.warning("Event loop blocked for %.0f ms by %s (%s)", duration_ms, route, culprit)
+
+
+async def _monitor(interval: float) -> None:
+    global _last_tick, _tick_seq
+    while True:
+        start = time.perf_counter()
+        _last_tick = start
+        await asyncio.sleep(interval)
+        lag_ms = max(time.perf_counter() - start - interval, 0.0) * 1000
+        _lags_ms.append(lag_ms)
+        if lag_ms >= LOOP_BLOCK_THRESHOLD_MS:
+            sample = _sample
+            if sample is not None and sample[0] == _tick_seq:
+                _record_block(sample[1], sample[2], lag_ms)
+            else:
+                _record_block("unknown", "unknown", lag_ms)
+        _tick_seq += 1
+
+
+def _watch(poll: float) -> None:
+    """Watchdog thread: sample the loop thread's stack while it is stalled."""
+    global _sample
+    while not _stop.wait(poll):
+        seq, last = _tick_seq, _last_tick
+        if not last or (_sample is not None and _sample[0] == seq):
+            continue
+        if (time.perf_counter() - last) * 1000 < LOOP_BLOCK_THRESHOLD_MS:
+            continue
+        frame = sys._current_frames().get(_loop_thread_id)
+        _sample = (seq, *_describe(frame))
+        del frame
+
+
+def start_loop_monitor(app: Any | None = None) -> None:
+    """Start the monitor on the running loop; LOOP_MONITOR_INTERVAL_MS=0 disables it."""
+    global _task, _watchdog, _loop_thread_id
+    if app is not None:
+        register_routes(app.routes)
+    if LOOP_MONITOR_INTERVAL_MS <= 0 or _task is not None:
+        return
+    interval = LOOP_MONITOR_INTERVAL_MS / 1000
+    _loop_thread_id = threading.get_ident()
+    _stop.clear()
+    _task = asyncio.get_running_loop().create_task(_monitor(interval), name="loop-monitor")
+    _watchdog = threading.Thread(target=_watch, args=(interval / 2,), name="loop-watchdog", daemon=True)
+    _watchdog.start()
+
+
+async def stop_loop_monitor() -> None:
+    global _task, _watchdog, _last_tick
+    _stop.set()
+    if _task is not None:
+        _task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _task
+        _task = None
+    if _watchdog is not None:
+        _watchdog.join(timeout=1.0)
+        _watchdog = None
+    _last_tick = 0.0
+
+
+def note_blocking_call(function: str, operation: str | None) -> None:
+    """Record a @cpu_bound call made on the event-loop thread."""
+    key = (operation or "unknown", function)
+    _blocking_calls[key] = _blocking_calls.get(key, 0) + 1
+    if _blocking_calls[key] == 1:
+        logger.warning("%s called %s on the event loop; use offload()", key[0], function)
+
+
+def loop_stats() -> dict[str, Any]:
+    """Lag percentiles, per-route block totals and recent blocks."""
+    lags = np.fromiter(_lags_ms, dtype=float, count=len(_lags_ms))
+    if lags.size:
+        p50, p90, p99 = np.percentile(lags, [50, 90, 99])
+        lag = {"p50": round(p50, 2), "p90": round(p90, 2), "p99": round(p99, 2), "max": round(lags.max(), 2)}
+    else:
+        lag = {"p50": None, "p90": None, "p99": None, "max": None}
+    return {
+        "running": _task is not None,
+        "interval_ms": LOOP_MONITOR_INTERVAL_MS,
+        "block_threshold_ms": LOOP_BLOCK_THRESHOLD_MS,
+        "samples": int(lags.size),
+        "lag_ms": lag,
+        "blocks_by_route": {
+            route: {
+                "count": s.count,
+                "total_ms": round(s.total_ms, 1),
+                "max_ms": round(s.max_ms, 1),
+                "last_culprit": s.last_culprit,
+            }
+            for route, s in sorted(_route_blocks.items(), key=lambda item: -item[1].total_ms)
+        },
+        "recent_blocks": [
+            {"route": b.route, "culprit": b.culprit, "duration_ms": b.duration_ms, "timestamp": b.timestamp}
+            for b in _blocks
+        ],
+        "blocking_calls": [
+            {"operation": op, "function": fn, "count": n}
+            for (op, fn), n in _blocking_calls.items()
+        ],
+    }
@@ -0,0 +1,39 @@
+"""
+Cooperative progress reporting for long-running services.
+
+Long computations accept an optional `progress(fraction, message)` callback
+and call it between units of work. The callback may raise JobCancelled to
+stop the computation at that point; it derives from BaseException so the
+broad `except Exception` blocks inside services (skipping a failed candidate
+model, etc.) do not swallow it.
+
+Usage:
+    def long_service(data, progress: ProgressCallback | None = None):
+        for i, item in enumerate(items):
+            ...
+            report(progress, (i + 1) / len(items), f"item {i + 1}/{len(items)}")
+"""
+from collections.abc import Callable
+
+ProgressCallback = Callable[[float, str], None]
+
+
+class JobCancelled(BaseException):
+    """Raised from a progress callback when the job has been cancelled."""
+
+
+def report(progress: ProgressCallback | None, fraction: float, message: str = "") -> None:
+    """Call `progress` if one was given."""
+    if progress is not None:
+        progress(fraction, message)
+
+
+def scaled(progress: ProgressCallback | None, start: float, end: float) -> ProgressCallback | None:
+    """Callback mapping a stage's own [0, 1] progress into [start, end] of the parent."""
+    if progress is None:
+        return None
+
+    def stage(fraction: float, message: str = "") -> None:
+        progress(start + (end - start) * min(max(fraction, 0.0), 1.0), message)
+
+    return stage
@@ -0,0 +1,92 @@
+"""
+Tests for the batched rank-IC engine and panel orthogonalization in alpha stacking.
+"""
+import warnings
+
+import numpy as np
+import pytest
+import scipy.stats
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.alpha_stacking_service import (
+    MIN_IC_ASSETS,
+    RankICEngine,
+    _cross_rank_corr,
+    _cross_sectional_ranks,
+    _orthogonalize_panel,
+    compute_alpha_stacking,
+    orthogonalize_signals,
+)
+
+
+def _panel(T=40, n_assets=12, n_signals=3, seed=0):
+    rng = np.random.default_rng(seed)
+    fwd = rng.normal(size=(T, n_assets))
+    signals = rng.normal(size=(T, n_assets, n_signals)) + 0.2 * fwd[:, :, None]
+    signals[..., 1] += 0.5 * signals[..., 0]
+    return signals, fwd
+
+
+def _spearman_ic(signal, fwd_returns):
+    """Эталон: spearmanr по парам без NaN/inf; мало пар или константа → 0."""
+    mask = np.isfinite(signal) & np.isfinite(fwd_returns)
+    if mask.sum() < MIN_IC_ASSETS:
+        return 0.0
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", scipy.stats.ConstantInputWarning)
+        rho = scipy.stats.spearmanr(signal[mask], fwd_returns[mask]).statistic
+    return float(rho) if np.isfinite(rho) else 0.0
+
+
+class TestRankICEngine:
+
+    def test_ranks_match_rankdata_with_ties_and_nan(self):
+        x = np.round(np.random.default_rng(1).normal(size=(50, 30)), 1)
+        x[x > 1.5] = np.nan
+        ranks = _cross_sectional_ranks(x)
+        for row, expected in zip(ranks, x):
+            np.testing.assert_array_equal(row, scipy.stats.rankdata(expected, nan_policy="omit"))
+
+    @pytest.mark.parametrize("horizon", [1, 4])
+    def test_ic_matches_spearman_per_date(self, horizon):
+        signals, fwd = _panel()
+        rng = np.random.default_rng(2)
+        signals[rng.random(signals.shape) < 0.1] = np.nan
+        fwd[rng.random(fwd.shape) < 0.05] = np.nan
+        fwd[3, 0] = np.inf
+        signals[5, :, 2] = 1.0     # константный срез → 0
+        signals[6, :8, 1] = np.nan  # меньше 5 пар → 0
+
+        engine = RankICEngine(fwd)
+        engine.add_panel("signals", signals)
+        ic = engine.ic("signals", horizon)
+        T, _, K = signals.shape
+        expected = [[_spearman_ic(signals[t, :, k], fwd[t + horizon - 1]) for k in range(K)] for t in range(T - horizon)]
+        np.testing.assert_allclose(ic, expected, atol=1e-12)
+
+    def test_cross_rank_corr(self):
+        flat = _panel()[0].reshape(-1, 3)
+        np.testing.assert_allclose(_cross_rank_corr(flat), scipy.stats.spearmanr(flat).statistic, atol=1e-12)
+        flat[0, 2] = np.nan
+        corr = _cross_rank_corr(flat)
+        assert corr[2, 0] == corr[1, 2] == 0.0 and corr[2, 2] == 1.0
+
+
+class TestOrthogonalization:
+
+    @pytest.mark.parametrize("method", ["sequential", "pairwise"])
+    def test_batched_qr_matches_lstsq_loop(self, method):
+        signals, _ = _panel(T=25, n_assets=10, n_signals=4)
+        signals[3, :, 3] = signals[3, :, 0] + signals[3, :, 1]  # вырожденный период — через lstsq
+        expected = np.array([orthogonalize_signals(s, method=method) for s in signals])
+        np.testing.assert_allclose(_orthogonalize_panel(signals, method), expected, atol=1e-9)
+
+    def test_pipeline_reuses_ic_for_time_series(self):
+        signals, fwd = _panel(T=60)
+        result = compute_alpha_stacking(signals, fwd, signal_names=["a", "b", "c"], ic_horizons=[1, 5, 100])
+        assert result["ic_horizons"] == ["1", "5"]
+        assert result["ic_decay"]["1"]["a"] == pytest.approx(np.mean(result["ic_time_series"]["a"]))
+        assert result["ic_decay"]["1"]["Stacked"] == pytest.approx(result["stack_ic"])
+        assert set(result["ic_decay"]["5"]) == {"a", "b", "c", "Stacked"}
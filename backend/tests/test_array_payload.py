@@ -0,0 +1,175 @@
+"""
+Tests for array-aware request validation and binary array bodies.
+"""
+import io
+from typing import Annotated, Literal
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import Field, ValidationError
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.array_payload import (
+    ARROW_STREAM_CONTENT_TYPE,
+    NPY_CONTENT_TYPE,
+    RAW_FLOAT64_CONTENT_TYPE,
+    SHAPE_HEADER,
+    array_body,
+    decode_array,
+)
+from src.utils.financial_validation import FinancialBaseModel, FloatArray, _check_finite
+
+
+class _Request(FinancialBaseModel):
+    prices: Annotated[np.ndarray, FloatArray(2, min_shape=(2, 1), max_shape=(1000, 5))] = Field(...)
+    weights: list[float] | None = None
+    windows: list[int] = [60]
+    mode: Literal["a", "b"] = "a"
+    scale: float = 1.0
+
+
+def _matrix(t=50, n=3):
+    return np.random.default_rng(0).normal(100, 1, (t, n))
+
+
+def _npy(arr):
+    buf = io.BytesIO()
+    np.save(buf, arr)
+    return buf.getvalue()
+
+
+def _arrow(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class TestFloatArray:
+
+    def test_list_and_ndarray_inputs(self):
+        m = _Request(prices=_matrix().tolist())
+        assert m.prices.dtype == np.float64 and m.prices.shape == (50, 3)
+        arr = _matrix()
+        assert _Request(prices=arr).prices is arr  # float64 input is not copied
+
+    @pytest.mark.parametrize("prices, message", [
+        ([[1.0, 2.0], [3.0, float("nan")]], r"at \[1\]\[1\]"),
+        ([[1.0, 2.0], [3.0]], "numeric 2-D array"),
+        ([1.0, 2.0], "2-D array, got 1-D"),
+        ([[1.0] * 6, [1.0] * 6], "at most 5"),
+        ([[1.0]], "at least 2"),
+    ])
+    def test_rejects_invalid(self, prices, message):
+        with pytest.raises(ValidationError, match=message):
+            _Request(prices=prices)
+
+    def test_other_fields_still_checked(self):
+        with pytest.raises(ValidationError, match=r"weights\[1\]"):
+            _Request(prices=_matrix().tolist(), weights=[0.5, float("inf")])
+
+    def test_serializes_to_lists(self):
+        dumped = _Request(prices=[[1.0], [2.0]]).model_dump(mode="json")
+        assert dumped["prices"] == [[1.0], [2.0]]
+
+
+class TestCheckFinite:
+
+    def test_vectorized_path_reports_position(self):
+        data = {"m": [[1.0, 2.0], [3.0, float("-inf")]]}
+        with pytest.raises(ValueError, match=r"m\[1\]\[1\]"):
+            _check_finite(data)
+
+    def test_strings_are_not_parsed_as_floats(self):
+        _check_finite({"names": ["INF", "NaN"], "mixed": [1.0, "x", None], "ragged": [[1.0], [2.0, 3.0]]})
+
+    def test_overflowing_sum_of_finite_values(self):
+        _check_finite({"big": [1e308, 1e308]})
+
+
+class TestDecodeArray:
+
+    def test_npy_is_zero_copy(self):
+        arr = _matrix()
+        body = _npy(arr)
+        decoded = decode_array(body, NPY_CONTENT_TYPE)
+        np.testing.assert_array_equal(decoded, arr)
+        assert np.shares_memory(decoded, np.frombuffer(body, dtype=np.uint8))
+
+    def test_npy_fortran_order(self):
+        arr = np.asfortranarray(_matrix())
+        np.testing.assert_array_equal(decode_array(_npy(arr), NPY_CONTENT_TYPE), arr)
+
+    def test_npy_rejects_object_dtype(self):
+        buf = io.BytesIO()
+        np.save(buf, np.array([{"a": 1}], dtype=object), allow_pickle=True)
+        with pytest.raises(ValueError, match="object dtype"):
+            decode_array(buf.getvalue(), NPY_CONTENT_TYPE)
+
+    def test_raw_float64_with_shape_header(self):
+        arr = _matrix()
+        body = arr.astype("<f8").tobytes()
+        np.testing.assert_array_equal(decode_array(body, RAW_FLOAT64_CONTENT_TYPE, "50,3"), arr)
+        with pytest.raises(ValueError, match="does not match"):
+            decode_array(body, RAW_FLOAT64_CONTENT_TYPE, "50,4")
+        with pytest.raises(ValueError, match="required"):
+            decode_array(body, RAW_FLOAT64_CONTENT_TYPE, None)
+
+    def test_arrow_columns_and_fixed_size_list(self):
+        arr = _matrix()
+        columns = pa.table({f"a{i}": arr[:, i] for i in range(3)})
+        np.testing.assert_array_equal(decode_array(_arrow(columns), ARROW_STREAM_CONTENT_TYPE), arr)
+        rows = pa.FixedSizeListArray.from_arrays(pa.array(arr.ravel()), 3)
+        np.testing.assert_array_equal(
+            decode_array(_arrow(pa.table({"rows": rows})), ARROW_STREAM_CONTENT_TYPE), arr
+        )
+
+    def test_arrow_rejects_nulls(self):
+        with pytest.raises(ValueError, match="nulls"):
+            decode_array(_arrow(pa.table({"a": [1.0, None]})), ARROW_STREAM_CONTENT_TYPE)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(body: _Request = Depends(array_body(_Request, "prices"))):
+        return {
+            "shape": list(body.prices.shape), "sum": float(body.prices.sum()),
+            "windows": body.windows, "mode": body.mode, "scale": body.scale,
+        }
+
+    return TestClient(app)
+
+
+class TestArrayBodyEndpoint:
+
+    def test_json_and_binary_bodies_agree(self, client):
+        arr = _matrix()
+        expected = {"shape": [50, 3], "sum": pytest.approx(arr.sum()), "windows": [20, 40], "mode": "b", "scale": 2.0}
+        json_resp = client.post("/echo", json={"prices": arr.tolist(), "windows": [20, 40], "mode": "b", "scale": 2})
+        assert json_resp.json() == expected
+        query = "?windows=20,40&mode=b&scale=2"
+        for content_type, body, headers in [
+            (NPY_CONTENT_TYPE, _npy(arr), {}),
+            (RAW_FLOAT64_CONTENT_TYPE, arr.tobytes(), {SHAPE_HEADER: "50,3"}),
+            (ARROW_STREAM_CONTENT_TYPE, _arrow(pa.table({f"a{i}": arr[:, i] for i in range(3)})), {}),
+        ]:
+            resp = client.post("/echo" + query, content=body, headers={"Content-Type": content_type, **headers})
+            assert resp.status_code == 200, resp.text
+            assert resp.json() == expected
+
+    def test_invalid_payloads_are_422(self, client):
+        bad = np.array([[1.0, np.nan], [2.0, 3.0]])
+        resp = client.post("/echo", content=_npy(bad), headers={"Content-Type": NPY_CONTENT_TYPE})
+        assert resp.status_code == 422 and "NaN" in resp.text
+        resp = client.post("/echo", content=b"\x00" * 7, headers={"Content-Type": RAW_FLOAT64_CONTENT_TYPE, SHAPE_HEADER: "1"})
+        assert resp.status_code == 422
+        resp = client.post("/echo", json={"prices": [[1.0], [2.0]], "mode": "c"})
+        assert resp.status_code == 422
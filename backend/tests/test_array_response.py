@@ -0,0 +1,146 @@
+"""
+Tests for NumPy-aware response encoding and Accept negotiation.
+"""
+import json
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.backtest_service import run_historical_backtest
+from src.services.garch.forecasting import forecast_dcc
+from src.services.garch.multivariate import dcc_garch
+from src.utils.array_response import (
+    ARROW_STREAM_CONTENT_TYPE,
+    MSGPACK_CONTENT_TYPE,
+    _accepted,
+    array_response,
+    dumps_arrow,
+    dumps_json,
+)
+
+
+def _payload():
+    return {
+        "curve": np.linspace(1.0, 2.0, 5),
+        "matrix": np.arange(6.0).reshape(2, 3),
+        "n": np.int64(3),
+        "flag": np.bool_(True),
+        "meta": {"name": "x", "weights": np.array([0.25, 0.75])},
+        "rows": [{"a": 1.0}, {"a": 2.0}],
+    }
+
+
+def _read_arrow(body):
+    return pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+
+
+class TestDumpsJson:
+
+    def test_arrays_and_scalars(self):
+        decoded = json.loads(dumps_json(_payload()))
+        assert decoded["curve"] == [1.0, 1.25, 1.5, 1.75, 2.0]
+        assert decoded["matrix"] == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+        assert decoded["n"] == 3 and decoded["flag"] is True
+        assert decoded["meta"]["weights"] == [0.25, 0.75]
+
+    def test_non_contiguous_views(self):
+        arr = np.arange(12.0).reshape(3, 4)
+        decoded = json.loads(dumps_json({"t": arr.T, "s": arr[:, ::2]}))
+        assert decoded["t"] == arr.T.tolist() and decoded["s"] == arr[:, ::2].tolist()
+
+    def test_non_finite_become_null(self):
+        decoded = json.loads(dumps_json({"a": np.array([1.0, np.nan, np.inf]), "b": float("nan")}))
+        assert decoded == {"a": [1.0, None, None], "b": None}
+
+    def test_complex_values(self):
+        decoded = json.loads(dumps_json({"pole": complex(0.5, -0.25), "z": np.complex128(1j)}))
+        assert decoded == {"pole": {"real": 0.5, "imag": -0.25}, "z": {"real": 0.0, "imag": 1.0}}
+
+
+class TestDumpsArrow:
+
+    def test_matrix_column_round_trip(self):
+        table = _read_arrow(dumps_arrow(_payload()))
+        assert table.num_rows == 1
+        assert pa.types.is_fixed_size_list(table.schema.field("matrix").type.value_type)
+        matrix = table.column("matrix").combine_chunks().flatten()
+        np.testing.assert_array_equal(
+            matrix.flatten().to_numpy().reshape(len(matrix), -1), np.arange(6.0).reshape(2, 3)
+        )
+        row = table.to_pylist()[0]
+        assert row["n"] == 3 and row["meta"]["weights"] == [0.25, 0.75]
+        assert row["rows"] == [{"a": 1.0}, {"a": 2.0}]
+
+    def test_ragged_values_fall_back_to_json_text(self):
+        row = _read_arrow(dumps_arrow({"ragged": [[1.0], [1.0, "x"]]})).to_pylist()[0]
+        assert json.loads(row["ragged"]) == [[1.0], [1.0, "x"]]
+
+
+class TestNegotiation:
+
+    def test_accept_ordering(self):
+        assert _accepted("application/json;q=0.5, application/vnd.apache.arrow.stream") == [
+            ARROW_STREAM_CONTENT_TYPE, "application/json",
+        ]
+        assert _accepted("application/msgpack;q=0") == []
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+
+        @app.get("/result")
+        async def result(request: Request):
+            return array_response(request, _payload())
+
+        return TestClient(app)
+
+    def test_json_by_default(self, client):
+        for headers in ({}, {"Accept": "*/*"}, {"Accept": "text/html, application/json"}):
+            resp = client.get("/result", headers=headers)
+            assert resp.headers["content-type"] == "application/json"
+            assert resp.json()["matrix"] == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+
+    def test_arrow_on_request(self, client):
+        resp = client.get("/result", headers={"Accept": ARROW_STREAM_CONTENT_TYPE})
+        assert resp.headers["content-type"] == ARROW_STREAM_CONTENT_TYPE
+        assert _read_arrow(resp.content).to_pylist()[0]["curve"] == [1.0, 1.25, 1.5, 1.75, 2.0]
+
+    def test_json_preferred_over_arrow_by_q(self, client):
+        resp = client.get("/result", headers={"Accept": f"{ARROW_STREAM_CONTENT_TYPE};q=0.1, application/json"})
+        assert resp.headers["content-type"] == "application/json"
+
+    def test_msgpack_on_request(self, client):
+        msgpack = pytest.importorskip("msgpack")
+        resp = client.get("/result", headers={"Accept": MSGPACK_CONTENT_TYPE})
+        decoded = msgpack.unpackb(resp.content, raw=False)
+        matrix = decoded["matrix"]
+        restored = np.frombuffer(matrix["data"], dtype=matrix["type"]).reshape(matrix["shape"])
+        np.testing.assert_array_equal(restored, np.arange(6.0).reshape(2, 3))
+
+
+class TestServicePayloads:
+    """Services return arrays; the JSON layer reproduces the former list output."""
+
+    def test_historical_backtest(self):
+        prices = 100 * np.cumprod(1 + np.random.default_rng(1).normal(0.0005, 0.01, (120, 3)), axis=0)
+        result = run_historical_backtest(prices, strategy_type="equal_weight", lookback_window=20)
+        assert isinstance(result["equity_curve"], np.ndarray)
+        assert result["weights_history"].shape[1] == 3
+        decoded = json.loads(dumps_json(result))
+        np.testing.assert_allclose(decoded["equity_curve"], result["equity_curve"])
+        assert _read_arrow(dumps_arrow(result)).num_rows == 1
+
+    def test_dcc_forecast_covariance_stack(self):
+        rng = np.random.default_rng(9)
+        returns = 0.01 * (rng.standard_normal((250, 3)) + 0.5 * rng.standard_normal((250, 1)))
+        fc = forecast_dcc(dcc_garch(returns, dcc_method="composite", n_workers=1), n_steps=5)
+        cov = fc["covariance_matrices"]
+        assert cov.shape == (5, 3, 3)
+        vols = fc["volatility_forecasts"][:, 2]
+        np.testing.assert_allclose(cov[2], np.diag(vols) @ fc["correlation_matrix"] @ np.diag(vols))
@@ -0,0 +1,145 @@
+"""
+Tests for the segment-based historical backtest engine and parameter sweep.
+
+The reference is a day-by-day replay: apply the return, drift the weights,
+rebalance on schedule with proportional turnover costs.
+"""
+import numpy as np
+import pytest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.backtest_service import (
+    _REBALANCE_PERIOD,
+    run_backtest_sweep,
+    run_historical_backtest,
+    walk_forward_optimization,
+)
+
+
+def _prices(seed=0, t=400, n=5):
+    rng = np.random.default_rng(seed)
+    return 100 * np.cumprod(1 + rng.normal(0.0004, 0.012, (t, n)), axis=0)
+
+
+def _daily_replay(prices, weights, frequency, cost_bps, target=None):
+    """Reference loop; `target` maps (t, drifted weights) to new weights (default: equal weight)."""
+    returns = np.diff(prices, axis=0) / prices[:-1]
+    n_assets = returns.shape[1]
+    step = _REBALANCE_PERIOD[frequency]
+    w = np.asarray(weights, dtype=float) / np.sum(weights)
+    value, curve, total_cost = 1.0, [1.0], 0.0
+    for t in range(len(returns)):
+        value *= 1.0 + w @ returns[t]
+        w = w * (1.0 + returns[t])
+        w /= w.sum()
+        if t > 0 and t % step == 0:
+            new_w = np.ones(n_assets) / n_assets if target is None else target(t, w)
+            cost = np.sum(np.abs(new_w - w)) * value * cost_bps / 1e4
+            value -= cost
+            total_cost += cost
+            w = new_w
+        curve.append(value)
+    return np.array(curve), total_cost
+
+
+class TestHistoricalBacktest:
+
+    @pytest.mark.parametrize("frequency", ["daily", "weekly", "monthly", "quarterly"])
+    def test_equal_weight_matches_daily_replay(self, frequency):
+        prices = _prices()
+        weights = [0.4, 0.3, 0.1, 0.1, 0.1]
+        result = run_historical_backtest(
+            prices.tolist(), rebalance_frequency=frequency, initial_weights=weights,
+            transaction_cost_bps=30.0, initial_capital=1.0,
+        )
+        expected, total_cost = _daily_replay(prices, weights, frequency, 30.0)
+        np.testing.assert_allclose(result["equity_curve"], expected, rtol=1e-12)
+        np.testing.assert_allclose(result["total_transaction_cost"], total_cost, rtol=1e-10)
+
+    def test_custom_keeps_drifted_weights_after_warmup(self):
+        """'custom' returns equal weights while the window has < 30 rows, then holds the drift."""
+        prices = _prices(seed=1)
+        weights = [0.5, 0.2, 0.1, 0.1, 0.1]
+        result = run_historical_backtest(
+            prices.tolist(), rebalance_frequency="weekly", strategy_type="custom",
+            initial_weights=weights, transaction_cost_bps=20.0, initial_capital=1.0,
+        )
+        n_assets = len(weights)
+        expected, _ = _daily_replay(
+            prices, weights, "weekly", 20.0,
+            target=lambda t, w: w if t >= 30 else np.ones(n_assets) / n_assets,
+        )
+        np.testing.assert_allclose(result["equity_curve"], expected, rtol=1e-12)
+
+    def test_weights_history_rows_sum_to_one(self):
+        result = run_historical_backtest(_prices().tolist(), rebalance_frequency="monthly")
+        np.testing.assert_allclose(np.sum(result["weights_history"], axis=1), 1.0)
+        assert result["n_rebalances"] == len(range(21, 399, 21))
+
+    def test_zero_cost_has_no_cost(self):
+        result = run_historical_backtest(_prices().tolist(), transaction_cost_bps=0.0)
+        assert result["total_transaction_cost"] == 0.0
+
+    def test_rejects_non_positive_prices(self):
+        prices = _prices()
+        prices[100, 2] = 0.0
+        with pytest.raises(ValueError):
+            run_historical_backtest(prices.tolist())
+        with pytest.raises(ValueError):
+            run_backtest_sweep(prices.tolist(), ["equal_weight"], ["monthly"], [60], [10.0])
+
+
+class TestBacktestSweep:
+
+    def test_sweep_matches_single_runs(self):
+        prices = _prices(seed=2).tolist()
+        sweep = run_backtest_sweep(
+            prices, strategies=["equal_weight", "custom"], rebalance_frequencies=["weekly", "monthly"],
+            lookback_windows=[40], transaction_costs_bps=[0.0, 25.0], include_equity_curves=True,
+        )
+        assert sweep["n_combinations"] == 8
+        for combo in sweep["results"]:
+            single = run_historical_backtest(
+                prices, rebalance_frequency=combo["rebalance_frequency"],
+                strategy_type=combo["strategy_type"], lookback_window=combo["lookback_window"],
+                transaction_cost_bps=combo["transaction_cost_bps"],
+            )
+            np.testing.assert_allclose(combo["equity_curve"], single["equity_curve"], rtol=1e-12)
+            np.testing.assert_allclose(combo["metrics"]["sharpe_ratio"], single["metrics"]["sharpe_ratio"])
+            np.testing.assert_allclose(combo["metrics"]["max_drawdown"], single["metrics"]["max_drawdown"])
+            np.testing.assert_allclose(combo["metrics"]["calmar_ratio"], single["metrics"]["calmar_ratio"])
+
+    def test_costs_reduce_terminal_value(self):
+        sweep = run_backtest_sweep(
+            _prices(seed=3).tolist(), strategies=["equal_weight"], rebalance_frequencies=["daily"],
+            lookback_windows=[60], transaction_costs_bps=[0.0, 10.0, 50.0],
+        )
+        total_returns = [r["metrics"]["total_return"] for r in sweep["results"]]
+        assert total_returns[0] > total_returns[1] > total_returns[2]
+
+
+class TestWalkForward:
+
+    def test_parallel_matches_sequential(self):
+        prices = _prices(seed=4, t=700, n=4).tolist()
+        kwargs = dict(in_sample_window=120, out_of_sample_window=40, optimization_method="min_variance")
+        seq = walk_forward_optimization(prices, n_workers=1, **kwargs)
+        par = walk_forward_optimization(prices, n_workers=2, **kwargs)
+        assert seq["aggregated_stats"]["n_windows"] == len(range(0, 699 - 160 + 1, 40))
+        np.testing.assert_allclose(par["oos_equity_curve"], seq["oos_equity_curve"], rtol=1e-6)
+
+    def test_oos_curve_compounds_window_returns(self):
+        prices = _prices(seed=5, t=500, n=3)
+        result = walk_forward_optimization(
+            prices.tolist(), in_sample_window=100, out_of_sample_window=50,
+            optimization_method="risk_parity", transaction_cost_bps=0.0, n_workers=1,
+        )
+        returns = np.diff(prices, axis=0) / prices[:-1]
+        growth = np.concatenate([
+            returns[w["oos_start"]:w["oos_end"]] @ np.array(w["weights"])
+            for w in result["per_window_metrics"]
+        ])
+        expected = 1e6 * np.cumprod(np.concatenate([[1.0], 1.0 + growth]))
+        np.testing.assert_allclose(result["oos_equity_curve"], expected, rtol=1e-12)
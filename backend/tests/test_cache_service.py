@@ -0,0 +1,212 @@
+"""
+Tests for the namespaced LRU cache with single-flight and stale-while-revalidate.
+"""
+import asyncio
+import time
+
+import pytest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services import cache_service
+from src.services.cache_service import (
+    cache_get,
+    cache_get_or_fetch,
+    cache_set,
+    cache_stats,
+    cached,
+    configure_namespace,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    cache_service._namespaces.clear()
+    cache_service._inflight.clear()
+    yield
+    cache_service._namespaces.clear()
+
+
+class TestLRU:
+
+    def test_get_set_and_expiry(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(cache_service.time, "time", lambda: now[0])
+        cache_set("ns:a", 1, ttl_seconds=10)
+        assert cache_get("ns:a") == 1
+        now[0] += 11
+        assert cache_get("ns:a") is None
+        stats = cache_stats()["namespaces"]["ns"]
+        assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+
+    def test_evicts_least_recently_used_per_namespace(self):
+        configure_namespace("small", max_size=2)
+        cache_set("small:a", 1)
+        cache_set("small:b", 2)
+        cache_get("small:a")          # a is now most recent
+        cache_set("small:c", 3)       # evicts b
+        cache_set("other:x", 9)       # other namespaces are unaffected
+        assert cache_get("small:b") is None
+        assert cache_get("small:a") == 1 and cache_get("small:c") == 3
+        assert cache_stats()["namespaces"]["small"]["evictions"] == 1
+
+    def test_total_limit_evicts_from_largest_namespace(self, monkeypatch):
+        monkeypatch.setattr(cache_service, "MAX_CACHE_SIZE", 4)
+        for k in range(3):
+            cache_set(f"big:{k}", k)
+        cache_set("small:a", "a")
+        cache_set("small:b", "b")     # 5 entries: big drops its oldest
+        assert cache_get("big:0") is None and cache_get("big:1") == 1
+        assert cache_get("small:a") == "a"
+        stats = cache_stats()
+        assert stats["total"]["size"] == 4 and stats["namespaces"]["big"]["evictions"] == 1
+
+    def test_namespace_ttl_cap(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(cache_service.time, "time", lambda: now[0])
+        configure_namespace("capped", max_ttl_seconds=5)
+        cache_set("capped:k", "v", ttl_seconds=3600)
+        now[0] = 6.0
+        assert cache_get("capped:k") is None
+
+
+class TestSingleFlight:
+
+    def test_concurrent_misses_share_one_fetch(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"price": 1.0}
+
+        async def main():
+            return await asyncio.gather(*[cache_get_or_fetch("q:AAPL", fetch, 60) for _ in range(20)])
+
+        results = asyncio.run(main())
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        stats = cache_stats()["namespaces"]["q"]
+        assert stats["coalesced"] == 19
+        assert cache_get("q:AAPL") == {"price": 1.0}
+
+    def test_errors_propagate_and_are_not_cached(self):
+        async def fail():
+            await asyncio.sleep(0)
+            raise RuntimeError("upstream down")
+
+        async def main():
+            return await asyncio.gather(
+                *[cache_get_or_fetch("q:X", fail) for _ in range(3)], return_exceptions=True,
+            )
+
+        results = asyncio.run(main())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert cache_get("q:X") is None
+        assert not cache_service._inflight
+
+    def test_cancelled_caller_does_not_cancel_fetch(self):
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return 42
+
+        async def main():
+            first = asyncio.ensure_future(cache_get_or_fetch("q:c", fetch))
+            second = asyncio.ensure_future(cache_get_or_fetch("q:c", fetch))
+            await asyncio.sleep(0.005)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(main()) == 42
+
+
+class TestStaleWhileRevalidate:
+
+    def test_serves_stale_and_refreshes_once(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(cache_service.time, "time", lambda: now[0])
+        version = [0]
+
+        async def fetch():
+            version[0] += 1
+            return version[0]
+
+        async def main():
+            first = await cache_get_or_fetch("swr:k", fetch, ttl_seconds=10, stale_ttl_seconds=60)
+            now[0] = 20.0  # expired, inside stale window
+            stale = await asyncio.gather(*[
+                cache_get_or_fetch("swr:k", fetch, ttl_seconds=10, stale_ttl_seconds=60) for _ in range(5)
+            ])
+            await asyncio.sleep(0)  # let the background refresh finish
+            await asyncio.sleep(0)
+            refreshed = await cache_get_or_fetch("swr:k", fetch, ttl_seconds=10, stale_ttl_seconds=60)
+            return first, stale, refreshed
+
+        first, stale, refreshed = asyncio.run(main())
+        assert first == 1 and stale == [1] * 5 and refreshed == 2
+        stats = cache_stats()["namespaces"]["swr"]
+        assert stats["refreshes"] == 1 and stats["stale_hits"] == 5
+
+    def test_beyond_stale_window_is_a_miss(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(cache_service.time, "time", lambda: now[0])
+        cache_set("swr:k", "old", ttl_seconds=10, stale_ttl_seconds=5)
+        now[0] = 16.0
+
+        async def fetch():
+            return "new"
+
+        assert asyncio.run(cache_get_or_fetch("swr:k", fetch)) == "new"
+
+
+class TestDecorator:
+
+    def test_positional_and_keyword_calls_share_key(self):
+        calls = []
+
+        @cached("deco", ttl_seconds=60)
+        async def quote(symbol: str, venue: str = "XNAS"):
+            calls.append(symbol)
+            return {"symbol": symbol, "venue": venue}
+
+        async def main():
+            a = await quote("AAPL")
+            b = await quote(symbol="AAPL", venue="XNAS")
+            c = await quote("MSFT")
+            return a, b, c
+
+        a, b, c = asyncio.run(main())
+        assert a is b and c["symbol"] == "MSFT"
+        assert calls == ["AAPL", "MSFT"]
+
+    def test_ttl_from_result(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(cache_service.time, "time", lambda: now[0])
+
+        @cached("deco", ttl_seconds=lambda r: r["ttl"])
+        async def fetch(ttl):
+            return {"ttl": ttl, "at": time.monotonic()}
+
+        async def main():
+            first = await fetch(5)
+            now[0] = 6.0
+            return first, await fetch(5)
+
+        first, second = asyncio.run(main())
+        assert first is not second
+
+    def test_zero_ttl_result_is_not_cached(self):
+        calls = []
+
+        @cached("scan", ttl_seconds=lambda r: 3600 if r["status"] == "completed" else 0)
+        async def scan(scan_id):
+            calls.append(scan_id)
+            return {"status": "completed" if len(calls) > 1 else "pending"}
+
+        async def main():
+            return [(await scan("a"))["status"] for _ in range(3)]
+
+        assert asyncio.run(main()) == ["pending", "completed", "completed"]
+        assert len(calls) == 2
+        assert cache_stats()["namespaces"]["scan"]["size"] == 1
@@ -0,0 +1,81 @@
+"""
+Tests for CCMV clustering: cached Ward linkage and the largest-gap cut.
+"""
+import numpy as np
+import pytest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services import ccmv_service
+from src.services.ccmv_service import hierarchical_clustering, hierarchical_clustering_to_clusters
+
+
+def _returns(T=80, N=15, seed=0):
+    rng = np.random.default_rng(seed)
+    groups = rng.integers(0, 3, N)
+    return rng.normal(size=(T, 3))[:, groups] + rng.normal(0, 0.8, (T, N))
+
+
+def _greedy_ward_labels(R):
+    """Reference: exhaustive pair search with recomputed centroids and set-based cut."""
+    D = 1 - np.corrcoef(R, rowvar=False)
+    C = [[i] for i in range(R.shape[1])]
+    log = []
+    while len(C) > 1:
+        best = (np.inf, 0, 1)
+        for i in range(len(C)):
+            for j in range(i + 1, len(C)):
+                ci, cj = D[C[i]].mean(axis=0), D[C[j]].mean(axis=0)
+                dist = len(C[i]) * len(C[j]) / (len(C[i]) + len(C[j])) * np.sum((ci - cj) ** 2)
+                if dist < best[0]:
+                    best = (dist, i, j)
+        dist, i, j = best
+        log.append((C[i], C[j], dist))
+        C = [c for k, c in enumerate(C) if k not in (i, j)] + [C[i] + C[j]]
+
+    heights = [entry[2] for entry in log]
+    threshold = heights[int(np.argmax(np.diff(heights))) + 1] if len(heights) > 1 else heights[0]
+    clusters = [{i} for i in range(R.shape[1])]
+    for Ci, Cj, dist in log:
+        if dist <= threshold:
+            touched = [c for c in clusters if c & set(Ci + Cj)]
+            if len(touched) == 2:
+                clusters = [c for c in clusters if c not in touched] + [touched[0] | touched[1]]
+    labels = np.empty(R.shape[1], dtype=int)
+    for cluster_id, members in enumerate(clusters):
+        labels[list(members)] = cluster_id
+    return labels
+
+
+class TestHierarchicalClustering:
+
+    @pytest.mark.parametrize("seed,N", [(0, 2), (1, 7), (2, 15), (3, 30)])
+    def test_matches_greedy_ward(self, seed, N):
+        R = _returns(N=N, seed=seed)
+        if N > 2:
+            R[:, 2] = R[:, 1]  # дубликат актива — нулевое расстояние
+        np.testing.assert_array_equal(hierarchical_clustering(R), _greedy_ward_labels(R))
+
+    def test_linkage_is_cached_by_returns(self, monkeypatch):
+        monkeypatch.setattr(ccmv_service, "_linkage_cache", ccmv_service.OrderedDict())
+        calls = []
+        original = ccmv_service.linkage
+        monkeypatch.setattr(ccmv_service, "linkage", lambda *a, **kw: calls.append(1) or original(*a, **kw))
+
+        R = _returns()
+        labels = hierarchical_clustering(R)
+        clusters = hierarchical_clustering_to_clusters(R.copy())
+        assert len(calls) == 1
+        assert sorted(sum(clusters, [])) == list(range(R.shape[1]))
+        assert all(len(set(labels[c])) == 1 for c in clusters)
+
+        hierarchical_clustering(R[:-1])
+        assert len(calls) == 2
+
+    def test_single_asset_and_constant_returns(self):
+        np.testing.assert_array_equal(hierarchical_clustering(np.ones((10, 1))), [0])
+        R = _returns(N=4)
+        R[:, 0] = 0.0
+        with pytest.raises(ValueError):
+            hierarchical_clustering(R)
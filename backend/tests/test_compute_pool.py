@@ -0,0 +1,145 @@
+"""
+Tests for the CPU-bound process pool and shared-memory argument transfer.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.pbo_service import compute_pbo
+from src.utils import compute_pool
+from src.utils.compute_pool import ComputePoolBusyError, _export, _invoke, _SharedArray, is_cpu_bound, offload
+from src.utils.error_handler import service_endpoint
+from src.utils.progress import JobCancelled
+
+
+@pytest.fixture
+def pool_state(monkeypatch):
+    monkeypatch.setattr(compute_pool, "_stats", compute_pool._PoolStats())
+    monkeypatch.setattr(compute_pool, "COMPUTE_POOL_WORKERS", 2)
+    yield compute_pool._stats
+    compute_pool.shutdown_compute_pool()
+
+
+class TestSharedMemoryTransfer:
+
+    def test_large_arrays_are_exported_small_ones_kept(self, monkeypatch):
+        monkeypatch.setattr(compute_pool, "COMPUTE_SHM_MIN_BYTES", 1024)
+        big, small = np.arange(512.0).reshape(64, 8), np.ones(4)
+        blocks = []
+        exported = _export(({"m": big, "v": small, "n": 3}, [big.T]), blocks)
+        try:
+            assert isinstance(exported[0]["m"], _SharedArray) and exported[0]["v"] is small
+            assert isinstance(exported[1][0], _SharedArray) and len(blocks) == 2
+
+            def check(payload, views):
+                np.testing.assert_array_equal(payload["m"], big)
+                np.testing.assert_array_equal(views[0], big.T)
+                payload["m"][0, 0] = -1.0  # writable; the caller's array is untouched
+                return float(payload["m"].sum())
+
+            result, run_seconds = _invoke(check, exported, {})
+            assert result == big.sum() - 1.0 and run_seconds >= 0.0
+            assert big[0, 0] == 0.0
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    def test_plain_values_pass_through(self):
+        payload = {"returns": [0.1, 0.2], "seed": 1}
+        assert _export(payload, []) is payload
+
+
+class TestOffload:
+
+    def test_marked_service_runs_in_pool(self, pool_state, monkeypatch):
+        monkeypatch.setattr(compute_pool, "COMPUTE_SHM_MIN_BYTES", 1024)
+        returns = np.random.default_rng(5).normal(0, 0.01, (400, 6))
+        assert is_cpu_bound(compute_pbo)
+
+        @service_endpoint("PBO analysis")
+        async def endpoint():
+            return await offload(compute_pbo, strategy_returns=returns, n_splits=8)
+
+        result = asyncio.run(endpoint())
+        assert result == compute_pbo(returns, n_splits=8)
+        stats = compute_pool.pool_stats()
+        assert stats["completed"] == 1 and stats["shared_memory_bytes"] == returns.nbytes
+        assert stats["operations"]["PBO analysis"]["calls"] == 1
+        assert stats["queue_depth"] == 0
+
+    def test_unmarked_functions_use_threads(self, pool_state):
+        assert asyncio.run(offload(np.add, 1, 2)) == 3
+        assert compute_pool.pool_stats()["submitted"] == 0
+
+    def test_service_errors_propagate(self, pool_state):
+        with pytest.raises(ValueError):
+            asyncio.run(offload(compute_pbo, strategy_returns=np.zeros((5, 2))))
+        assert compute_pool.pool_stats()["failed"] == 1
+
+    def test_saturated_pool_returns_503(self, pool_state, monkeypatch):
+        monkeypatch.setattr(compute_pool, "COMPUTE_POOL_MAX_QUEUE", 0)
+        pool_state.in_flight = 2
+
+        @service_endpoint("PBO analysis")
+        async def endpoint():
+            return await offload(compute_pbo, strategy_returns=np.zeros((50, 2)))
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(endpoint())
+        assert exc.value.status_code == 503 and pool_state.rejected == 1
+        with pytest.raises(ComputePoolBusyError):
+            asyncio.run(offload(compute_pbo, strategy_returns=np.zeros((50, 2))))
+
+
+class TestRunTasks:
+
+    def test_results_in_order_with_progress(self, pool_state):
+        seen = []
+        result = compute_pool.run_tasks(np.add, [(k, 10) for k in range(5)], on_done=lambda d, n: seen.append((d, n)))
+        assert result == [10, 11, 12, 13, 14]
+        assert seen == [(d, 5) for d in range(1, 6)]
+        stats = compute_pool.pool_stats()
+        assert stats["completed"] == 5 and stats["running"] == 0 and stats["operations"]["add"]["calls"] == 5
+
+    def test_failed_task_is_raised(self, pool_state):
+        with pytest.raises(ValueError):
+            compute_pool.run_tasks(compute_pbo, [(np.zeros((5, 2)),), (np.zeros((6, 2)),)])
+        assert pool_state.in_flight == 0 and pool_state.failed >= 1
+
+    def test_admission_is_all_or_nothing(self, pool_state, monkeypatch):
+        monkeypatch.setattr(compute_pool, "COMPUTE_POOL_MAX_QUEUE", 1)
+        with pytest.raises(ComputePoolBusyError):
+            compute_pool.run_tasks(np.add, [(k, 1) for k in range(4)])
+        assert pool_state.submitted == 0 and pool_state.rejected == 1
+
+    def test_runs_inline_without_pool(self, pool_state, monkeypatch):
+        monkeypatch.setattr(compute_pool, "COMPUTE_POOL_WORKERS", 0)
+        assert compute_pool.fan_out_width(10) == 0
+        assert compute_pool.run_tasks(np.add, [(1, 2)]) == [3]
+        assert pool_state.submitted == 0
+
+
+class TestProgressChannel:
+
+    def test_pickled_copy_shares_state(self):
+        channel = compute_pool.ProgressChannel()
+        try:
+            assert channel.read() == (0.0, "")
+            cls, args = channel.__reduce__()  # what the worker unpickles
+            worker_side = cls(*args)
+            worker_side(0.25, "окно 1/4")
+            assert channel.read() == (0.25, "окно 1/4")
+            worker_side(0.5, "x" * 1000)
+            assert channel.read() == (0.5, "x" * compute_pool.ProgressChannel.MESSAGE_BYTES)
+            channel.cancel()
+            with pytest.raises(JobCancelled):
+                worker_side(0.75)
+            worker_side.release()
+        finally:
+            channel.release()
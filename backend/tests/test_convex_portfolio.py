@@ -0,0 +1,126 @@
+"""
+Tests for convex portfolio construction and the compiled parametric solvers.
+"""
+import cvxpy as cp
+import numpy as np
+import pytest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services import convex_portfolio_service
+from src.services.convex_portfolio_service import (
+    ProblemCache,
+    _sample_moments,
+    compute_convex_portfolio,
+    optimize_weights,
+    problem_cache_stats,
+)
+
+
+def _returns(seed=0, t=252, n=6):
+    rng = np.random.default_rng(seed)
+    mixing = np.eye(n) + 0.3 * rng.normal(size=(n, n))
+    return rng.normal(0.0004, 0.01, (t, n)) @ mixing
+
+
+class TestOptimizeWeights:
+
+    @pytest.mark.parametrize("objective", ["min_variance", "max_sharpe", "risk_parity"])
+    def test_matches_compute_convex_portfolio(self, objective):
+        R = _returns()
+        expected = compute_convex_portfolio(R.tolist(), objectives=[objective], n_frontier=2)
+        weights = optimize_weights(R, objective)
+        np.testing.assert_allclose(weights.sum(), 1.0)
+        assert np.all(weights >= 0)
+        _, Sigma = _sample_moments(R)
+        reference = np.array(expected["results"][objective]["weights_list"])
+        # Same optimum up to solver tolerance: compare the portfolio variance
+        np.testing.assert_allclose(weights @ Sigma @ weights, reference @ Sigma @ reference, rtol=1e-3)
+
+    def test_warm_start_reaches_same_solution(self):
+        R = _returns(seed=1)
+        cold = optimize_weights(R[:200], "min_variance")
+        warm = optimize_weights(R[50:], "min_variance", warm_start=cold)
+        again = optimize_weights(R[50:], "min_variance")
+        np.testing.assert_allclose(warm, again, atol=1e-5)
+
+    def test_max_sharpe_falls_back_to_min_variance(self):
+        R = _returns(seed=2) - 0.01  # no positive excess return
+        np.testing.assert_allclose(
+            optimize_weights(R, "max_sharpe"), optimize_weights(R, "min_variance"), atol=1e-8,
+        )
+
+    def test_unknown_objective(self):
+        with pytest.raises(ValueError):
+            optimize_weights(_returns(), "cvar")
+
+
+class TestProblemCache:
+
+    def test_frontier_compiles_once(self):
+        R = _returns(seed=3, n=5)
+        cache = convex_portfolio_service._problem_cache
+        cache.clear()
+        compute_convex_portfolio(R.tolist(), objectives=["mean_variance", "kelly"], n_frontier=20)
+        stats = problem_cache_stats()
+        # mean_variance, kelly and all 20 frontier points share one quadratic problem
+        assert stats["misses"] == 1
+        assert stats["hits"] == 21
+
+    def test_constraint_set_is_part_of_key(self):
+        R = _returns(seed=4, n=5).tolist()
+        convex_portfolio_service._problem_cache.clear()
+        compute_convex_portfolio(R, objectives=["min_variance"], n_frontier=5)
+        compute_convex_portfolio(R, objectives=["min_variance"], n_frontier=5, max_weight=0.3)
+        assert problem_cache_stats()["size"] == 2
+
+    def test_cached_problem_honours_new_parameter_values(self):
+        R = _returns(seed=5, n=5).tolist()
+        loose = compute_convex_portfolio(R, objectives=["min_variance"], max_weight=0.9, n_frontier=5)
+        tight = compute_convex_portfolio(R, objectives=["min_variance"], max_weight=0.25, n_frontier=5)
+        assert max(loose["results"]["min_variance"]["weights_list"]) > 0.25
+        assert max(tight["results"]["min_variance"]["weights_list"]) <= 0.25 + 1e-5
+
+    def test_mean_variance_matches_direct_problem(self):
+        """Normalizing Σ does not change the mean-variance optimum."""
+        R = _returns(seed=6, n=5)
+        mu, Sigma = _sample_moments(R)
+        w = cp.Variable(5)
+        cp.Problem(
+            cp.Minimize(cp.quad_form(w, Sigma) - 1.0 / 3.0 * mu @ w),
+            [cp.sum(w) == 1.0, w >= 0, w <= 1.0],
+        ).solve(solver=cp.CLARABEL)
+        cached = convex_portfolio_service._mean_variance(
+            mu, Sigma, 5, gamma=3.0, long_only=True, lb=0.0, ub=1.0,
+            max_weight=None, target_return=None, leverage=1.0,
+        )
+        np.testing.assert_allclose(cached, w.value, atol=1e-4)
+
+    def test_lru_eviction(self):
+        cache = ProblemCache(maxsize=2)
+        for n in (2, 3, 4):
+            cache.get(("quadratic", n), lambda n=n: convex_portfolio_service._max_sharpe_problem(n))
+        cache.get(("quadratic", 4), lambda: None)
+        assert cache.stats() == {"hits": 1, "misses": 3, "hit_rate": 0.25, "size": 2, "maxsize": 2}
+
+
+class TestCacheStatsEndpoint:
+
+    def test_requires_auth(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from src.api import convex_portfolio
+        from src.middleware.auth import require_auth
+        from src.utils.jwt_utils import TokenPayload
+
+        app = FastAPI()
+        app.include_router(convex_portfolio.router, prefix="/api/convex-portfolio")
+        client = TestClient(app)
+        assert client.get("/api/convex-portfolio/cache-stats").status_code in (401, 403)
+
+        app.dependency_overrides[require_auth] = lambda: TokenPayload(
+            sub=1, username="u", role="user", exp=0, iat=0, type="access",
+        )
+        assert client.get("/api/convex-portfolio/cache-stats").json()["maxsize"] > 0
@@ -0,0 +1,128 @@
+"""
+Tests for eigenportfolios: closed-form Ledoit-Wolf and the incremental covariance stream.
+"""
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.middleware.auth import require_auth
+from src.services.eigenportfolio_service import (
+    CovarianceStream,
+    _ledoit_wolf_shrinkage,
+    compute_eigenportfolios,
+)
+from src.utils.jwt_utils import TokenPayload
+
+
+def _returns(T=300, N=20, seed=0, level=0.0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, (T, 3))
+    return factors @ rng.normal(size=(3, N)) + rng.normal(0, 0.01, (T, N)) + level
+
+
+def _weighted_shrinkage(R, w):
+    """Прямая формула: β̄² = (Σw²/(Σw)²) · Σ pₜ ||cₜcₜᵀ − S||², S несмещённая."""
+    p = w / w.sum()
+    ratio = (w @ w) / w.sum() ** 2
+    C = R - p @ R
+    S = (C.T * p) @ C / (1 - ratio)
+    beta2 = ratio * sum(pt * np.sum((np.outer(c, c) - S) ** 2) for pt, c in zip(p, C))
+    mu = np.trace(S) / len(S)
+    alpha = min(beta2 / np.sum((S - mu * np.eye(len(S))) ** 2), 1.0)
+    return (1 - alpha) * S + alpha * mu * np.eye(len(S)), alpha
+
+
+class TestLedoitWolf:
+
+    def test_closed_form_matches_outer_product_loop(self):
+        R = _returns(level=3.0)
+        Sigma, alpha = _ledoit_wolf_shrinkage(R)
+        expected, expected_alpha = _weighted_shrinkage(R, np.ones(len(R)))
+        assert alpha == pytest.approx(expected_alpha, rel=1e-9)
+        np.testing.assert_allclose(Sigma, expected, rtol=1e-9)
+
+
+class TestCovarianceStream:
+
+    @pytest.mark.parametrize("use_shrinkage", [True, False])
+    def test_chunks_match_batch(self, use_shrinkage):
+        R = _returns(level=5.0)
+        stream = CovarianceStream(R.shape[1])
+        for chunk in np.array_split(R, [1, 2, 40, 250]):
+            stream.update(chunk)
+        batch = compute_eigenportfolios(R.tolist(), use_shrinkage=use_shrinkage)
+        result = stream.estimates(use_shrinkage=use_shrinkage)
+        assert result["n_obs"] == len(R) and result["effective_obs"] == pytest.approx(len(R))
+        np.testing.assert_allclose(result["eigenvalues"], batch["eigenvalues"], rtol=1e-9)
+        np.testing.assert_allclose(result["eigenvectors"], batch["eigenvectors"], atol=1e-8)
+        assert result["shrinkage"]["alpha"] == pytest.approx(batch["shrinkage"]["alpha"], rel=1e-9)
+        assert result["rmt"]["n_signal"] == batch["rmt"]["n_signal"]
+
+    def test_exponential_weights(self):
+        R = _returns(T=120, N=6, seed=1)
+        halflife = 15.0
+        stream = CovarianceStream(6, halflife=halflife)
+        for chunk in np.array_split(R, 5):
+            stream.update(chunk)
+        expected, alpha = _weighted_shrinkage(R, 0.5 ** (np.arange(len(R))[::-1] / halflife))
+        np.testing.assert_allclose(stream.covariance(), expected, rtol=1e-9)
+        assert stream.estimates()["shrinkage"]["alpha"] == pytest.approx(alpha, rel=1e-8)
+
+    def test_rmt_filter_preserves_trace_and_signal(self):
+        stream = CovarianceStream(20)
+        stream.update(_returns(T=200))
+        raw, filtered = stream.covariance(), stream.covariance(rmt_filter=True)
+        result = stream.estimates()
+        assert np.trace(filtered) == pytest.approx(np.trace(raw), rel=1e-10)
+        n_signal = result["rmt"]["n_signal"]
+        np.testing.assert_allclose(result["filtered_eigenvalues"][:n_signal], result["eigenvalues"][:n_signal])
+        assert len(set(np.round(result["filtered_eigenvalues"][n_signal:], 14))) == 1
+
+    def test_validation(self):
+        stream = CovarianceStream(3)
+        with pytest.raises(ValueError):
+            stream.update(np.ones((2, 4)))
+        with pytest.raises(ValueError):
+            stream.update([[0.1, np.nan, 0.2]])
+        stream.update([0.1, 0.2, 0.3])
+        with pytest.raises(ValueError):
+            stream.estimates()
+
+
+class TestStreamAPI:
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from src.api import eigenportfolio
+        from src.middleware.rate_limit import limiter
+
+        monkeypatch.setattr(eigenportfolio, "_streams", eigenportfolio.OrderedDict())
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.include_router(eigenportfolio.router, prefix="/api/eigenportfolio")
+        user = TokenPayload(sub=4, username="u", role="user", exp=0, iat=0, type="access")
+        app.dependency_overrides[require_auth] = lambda: user
+        with TestClient(app) as client:
+            yield client
+
+    def test_post_chunks_get_and_delete(self, client):
+        R = _returns(T=90, N=8)
+        url = "/api/eigenportfolio/stream/moex"
+        for chunk in np.array_split(R, 3):
+            resp = client.post(url, json={"returns": chunk.tolist()})
+            assert resp.status_code == 200
+        assert resp.json()["result"]["n_obs"] == 90
+
+        batch = compute_eigenportfolios(R.tolist())
+        got = client.get(url).json()["result"]
+        np.testing.assert_allclose(got["eigenvalues"], batch["eigenvalues"], rtol=1e-9)
+
+        assert client.post(url, json={"returns": R[:2, :5].tolist()}).status_code == 400
+        reset = client.post(url, json={"returns": R[:2, :5].tolist(), "reset": True, "halflife": 10}).json()["result"]
+        assert reset["n_obs"] == 2 and reset["halflife"] == 10
+        assert client.delete(url).json()["deleted"] is True
+        assert client.get(url).status_code == 404
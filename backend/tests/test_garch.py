@@ -16,8 +16,10 @@ import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from src.services.garch.univariate import garch_11, gjr_garch, egarch, ewma
+from src.services.garch.univariate import garch_11, gjr_garch, egarch, ewma, fit_many
 from src.services.garch.forecasting import forecast_volatility
+from src.services.garch.kernels import egarch_nll, garch_11_nll, gjr_nll
+from src.services.garch import multivariate
 
 
 # ---------------------------------------------------------------------------
@@ -282,3 +284,163 @@ class TestForecastStructure:
         }
         missing = required_keys - set(fc.keys())
         assert not missing, f"Missing forecast keys: {missing}"
+
+
+# ---------------------------------------------------------------------------
+# Likelihood kernels
+# ---------------------------------------------------------------------------
+
+
+def _simulate_gjr(n, seed):
+    rng = np.random.default_rng(seed)
+    returns = np.empty(n)
+    h = 1e-4
+    for t in range(n):
+        returns[t] = np.sqrt(h) * rng.standard_normal()
+        h = 2e-6 + 0.05 * returns[t] ** 2 + 0.06 * (returns[t] < 0) * returns[t] ** 2 + 0.88 * h
+    return returns
+
+
+def _finite_difference(fn, params, returns, sample_var):
+    grad = np.zeros_like(params)
+    for i in range(len(params)):
+        step = 1e-6 * abs(params[i])
+        up, down = params.copy(), params.copy()
+        up[i] += step
+        down[i] -= step
+        grad[i] = (fn(up, returns, sample_var)[0] - fn(down, returns, sample_var)[0]) / (2 * step)
+    return grad
+
+
+class TestAnalyticGradients:
+    """Analytic scores must match central finite differences."""
+
+    @pytest.mark.parametrize("fn, params", [
+        (garch_11_nll, np.array([2e-6, 0.08, 0.90])),
+        (gjr_nll, np.array([2e-6, 0.05, 0.88, 0.06])),
+        (egarch_nll, np.array([-0.3, 0.15, 0.97, -0.05])),
+    ])
+    def test_gradient_matches_finite_difference(self, fn, params):
+        returns = _simulate_gjr(800, seed=3)
+        sample_var = float(np.var(returns))
+        _, grad = fn(params, returns, sample_var)
+        numeric = _finite_difference(fn, params, returns, sample_var)
+        np.testing.assert_allclose(grad[1:], numeric[1:], rtol=1e-4)
+        np.testing.assert_allclose(grad[0], numeric[0], rtol=1e-2)
+
+    def test_kernel_matches_forward_pass(self):
+        """NLL from the kernel equals -log_likelihood of the forward pass at the same params."""
+        returns = _simulate_gjr(500, seed=4)
+        params = {"omega": 2e-6, "alpha": 0.05, "beta": 0.88, "gamma": 0.06}
+        forward = gjr_garch(returns, params=params)
+        nll, _ = gjr_nll(np.array([2e-6, 0.05, 0.88, 0.06]), returns, float(np.var(returns)))
+        np.testing.assert_allclose(nll, -forward["log_likelihood"], rtol=1e-10)
+
+
+class TestFitMany:
+    """Batch fitting is equivalent to per-column fitting."""
+
+    def test_fit_many_matches_single_fits(self):
+        panel = np.column_stack([_simulate_gjr(400, seed=s) for s in range(3)])
+        batch = fit_many(panel, "garch_11")
+        assert len(batch) == 3
+        for i, result in enumerate(batch):
+            single = garch_11(panel[:, i])
+            assert result["params"] == single["params"]
+
+    def test_fit_many_on_compute_pool_matches_sequential(self):
+        panel = np.column_stack([_simulate_gjr(300, seed=s) for s in range(5)])
+        for model in ("garch_11", "ewma"):
+            pooled = fit_many(panel, model, n_workers=2)
+            assert [r["params"] for r in pooled] == [r["params"] for r in fit_many(panel, model)]
+
+    @pytest.mark.parametrize("n_workers", [1, 2])
+    def test_fit_many_reports_progress_per_asset(self, n_workers):
+        panel = np.column_stack([_simulate_gjr(300, seed=s) for s in range(4)])
+        seen = []
+        fit_many(panel, "ewma", n_workers=n_workers, progress=lambda f, m: seen.append((f, m)))
+        assert [f for f, _ in seen] == sorted(f for f, _ in seen)
+        assert seen[-1] == (1.0, "4/4 assets fitted")
+
+    def test_fit_many_unknown_model(self):
+        with pytest.raises(ValueError):
+            fit_many(np.zeros((50, 2)), "figarch")
+
+
+# ---------------------------------------------------------------------------
+# DCC-GARCH
+# ---------------------------------------------------------------------------
+
+
+def _naive_dcc_neg_ll(params, z, Q_bar):
+    a, b = params
+    Q = Q_bar.copy()
+    ll = 0.0
+    for t in range(1, len(z)):
+        Q = (1 - a - b) * Q_bar + a * np.outer(z[t - 1], z[t - 1]) + b * Q
+        d = 1.0 / np.sqrt(np.diag(Q))
+        R = Q * np.outer(d, d)
+        _, logdet = np.linalg.slogdet(R)
+        ll += -0.5 * (logdet + z[t] @ np.linalg.solve(R, z[t]) - z[t] @ z[t])
+    return -ll
+
+
+class TestDCCLikelihood:
+    """Engle (2002) correlation likelihood; Engle, Shephard & Sheppard (2008) composite likelihood."""
+
+    @pytest.fixture
+    def residuals(self):
+        rng = np.random.default_rng(8)
+        common = rng.standard_normal((300, 1))
+        z = 0.6 * common + 0.8 * rng.standard_normal((300, 4))
+        return z / z.std(axis=0)
+
+    def test_batched_full_likelihood_matches_loop(self, residuals, monkeypatch):
+        # Small blocks exercise the carried Q_t state between blocks
+        monkeypatch.setattr(multivariate, "DCC_BLOCK_BYTES", 8 * 4 * 4 * 37)
+        Q_bar = np.corrcoef(residuals.T)
+        params = np.array([0.04, 0.9])
+        np.testing.assert_allclose(
+            multivariate._dcc_neg_ll_full(params, residuals, Q_bar),
+            _naive_dcc_neg_ll(params, residuals, Q_bar),
+            rtol=1e-10,
+        )
+
+    def test_composite_equals_full_for_two_assets(self, residuals):
+        """With N = 2 there is a single pair, so both likelihoods coincide."""
+        z = residuals[:, :2]
+        Q_bar = np.corrcoef(z.T)
+        params = np.array([0.05, 0.88])
+        np.testing.assert_allclose(
+            multivariate._dcc_neg_ll_composite(params, z, Q_bar),
+            multivariate._dcc_neg_ll_full(params, z, Q_bar),
+            rtol=1e-10,
+        )
+
+    def test_closed_form_q_matches_recursion(self, residuals):
+        Q_bar = np.corrcoef(residuals.T)
+        a, b = 0.03, 0.95
+        Q = Q_bar.copy()
+        for t in range(1, 120):
+            Q = (1 - a - b) * Q_bar + a * np.outer(residuals[t - 1], residuals[t - 1]) + b * Q
+        np.testing.assert_allclose(multivariate._q_at(residuals, Q_bar, a, b, 119), Q, rtol=1e-10)
+
+    def test_dcc_garch_output(self):
+        rng = np.random.default_rng(9)
+        returns = 0.01 * (rng.standard_normal((250, 3)) + 0.5 * rng.standard_normal((250, 1)))
+        result = multivariate.dcc_garch(returns, dcc_method="composite", n_workers=1)
+        assert result["dcc_method"] == "composite"
+        last_R = np.array(result["last_R"])
+        np.testing.assert_allclose(np.diag(last_R), 1.0)
+        assert np.all(np.linalg.eigvalsh(last_R) > 0)
+        assert len(result["correlations_last_10"]) == 10
+
+    def test_dcc_garch_reports_assets_and_iterations(self):
+        rng = np.random.default_rng(9)
+        returns = 0.01 * (rng.standard_normal((250, 3)) + 0.5 * rng.standard_normal((250, 1)))
+        seen = []
+        multivariate.dcc_garch(returns, n_workers=1, progress=lambda f, m: seen.append((f, m)))
+        messages = [m for _, m in seen]
+        assert messages[:3] == ["1/3 assets fitted", "2/3 assets fitted", "3/3 assets fitted"]
+        assert any(m.startswith("DCC iteration") for m in messages)
+        assert [f for f, _ in seen] == sorted(f for f, _ in seen)
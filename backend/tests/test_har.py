@@ -0,0 +1,122 @@
+"""
+Tests for HAR-RV: cumulative-sum regressors, HAC covariance, recursive re-estimation and the panel fit.
+"""
+import numpy as np
+import pytest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.har_service import (
+    _build_har_cj_features,
+    _build_har_features,
+    _log_features,
+    _ols_newey_west,
+    fit_har_model,
+    fit_har_panel,
+    fit_har_recursive,
+)
+
+
+def _simulate_rv(T, seed=0):
+    rng = np.random.default_rng(seed)
+    rv = np.full(T, 1e-4)
+    for t in range(22, T):
+        rv[t] = (1e-5 + 0.4 * rv[t - 1] + 0.3 * rv[t - 5:t].mean() + 0.2 * rv[t - 22:t].mean()) * rng.lognormal(0, 0.3)
+    return rv
+
+
+class TestFeaturesAndOLS:
+
+    def test_features_match_window_means(self):
+        rv = _simulate_rv(120)
+        bv = rv * 0.8
+        X, start = _build_har_features(rv)
+        X_cj, _ = _build_har_cj_features(rv, bv)
+        for i in (0, 37, len(X) - 1):
+            t = i + start
+            np.testing.assert_allclose(X[i], [1.0, rv[t - 1], rv[t - 5:t].mean(), rv[t - 22:t].mean()], rtol=1e-12)
+            np.testing.assert_allclose(
+                X_cj[i], [1.0, bv[t - 1], rv[t - 1] - bv[t - 1], bv[t - 5:t].mean(), bv[t - 22:t].mean()], rtol=1e-12,
+            )
+        panel = np.stack([rv, bv])
+        np.testing.assert_array_equal(_build_har_features(panel)[0][1], _build_har_features(bv)[0])
+
+    def test_newey_west_matches_lag_loop(self):
+        rv = _simulate_rv(300)
+        X, start = _build_har_features(rv)
+        y = rv[start:]
+        ols = _ols_newey_west(X, y, lags=5)
+
+        beta = np.linalg.solve(X.T @ X, X.T @ y)
+        scores = (y - X @ beta)[:, None] * X
+        S = scores.T @ scores
+        for h in range(1, 6):
+            gamma = scores[h:].T @ scores[:-h]
+            S += (1 - h / 6) * (gamma + gamma.T)
+        inv = np.linalg.inv(X.T @ X)
+        np.testing.assert_allclose(ols["beta"], beta, rtol=1e-8)
+        np.testing.assert_allclose(ols["se"], np.sqrt(np.diag(inv @ S @ inv)), rtol=1e-8)
+
+
+class TestRecursiveHAR:
+
+    @pytest.mark.parametrize("window,log_transform", [(None, False), (60, False), (None, True)])
+    def test_matches_refit_each_day(self, window, log_transform):
+        rv = _simulate_rv(260, seed=1)
+        result = fit_har_recursive(list(rv), log_transform=log_transform, window=window)
+        X, start = _build_har_features(rv)
+        y = rv[start:]
+        if log_transform:
+            X, y = _log_features(X), np.log(y)
+
+        split = result["first_forecast_index"]
+        expected = []
+        for t in range(split, len(rv)):
+            i = t - start
+            lo = 0 if window is None else max(0, i - window)
+            beta = np.linalg.lstsq(X[lo:i], y[lo:i], rcond=None)[0]
+            z = X[i] @ beta
+            expected.append(np.exp(z) if log_transform else max(z, 0.0))
+        np.testing.assert_allclose(result["forecast"], expected, rtol=1e-6)
+        assert result["n_forecasts"] == len(rv) - split == len(result["beta_path"])
+
+    def test_rejects_short_window(self):
+        with pytest.raises(ValueError):
+            fit_har_recursive(list(_simulate_rv(100)), window=10)
+
+
+class TestHARPanel:
+
+    @pytest.mark.parametrize("kwargs", [{}, {"log_transform": True, "train_ratio": 0.7}])
+    def test_panel_matches_single_fits(self, kwargs):
+        panel = np.column_stack([_simulate_rv(400, seed=s) for s in range(4)])
+        result = fit_har_panel(panel, tickers=["A", "B", "C", "D"], **kwargs)
+        assert result["n_tickers"] == 4
+        for j, ticker in enumerate("ABCD"):
+            single = fit_har_model(list(panel[:, j]), **kwargs)
+            row = result["results"][ticker]
+            for key in ("r2", "r2_adj"):
+                assert row[key] == pytest.approx(single[key], rel=1e-8)
+            for got, want in zip(row["coefficients"], single["coefficients"]):
+                assert got["beta"] == pytest.approx(want["beta"], rel=1e-7)
+                assert got["se"] == pytest.approx(want["se"], rel=1e-7)
+            for name in ("rmse", "mae", "qlike"):
+                assert row["oos_metrics"][name] == pytest.approx(single["oos_metrics"][name], rel=1e-7)
+            for h, forecast in single["forecasts"].items():
+                assert row["forecasts"][h]["rv"] == pytest.approx(forecast["rv"], rel=1e-7)
+
+    def test_recursive_metrics_match_single_recursive(self):
+        panel = np.column_stack([_simulate_rv(300, seed=s) for s in (5, 6)])
+        result = fit_har_panel(panel, window=100)
+        for j in range(2):
+            single = fit_har_recursive(list(panel[:, j]), window=100)
+            assert result["results"][str(j)]["recursive_oos_metrics"]["rmse"] == pytest.approx(
+                single["oos_metrics"]["rmse"], rel=1e-8
+            )
+
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            fit_har_panel(np.full((40, 2), 1e-4))
+        with pytest.raises(ValueError):
+            fit_har_panel(np.full((60, 2), 1e-4), tickers=["only-one"])
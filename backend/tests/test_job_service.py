@@ -0,0 +1,313 @@
+"""
+Tests for background jobs and cooperative progress reporting.
+"""
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.middleware import request_tracker
+from src.middleware.auth import require_auth
+from src.services import job_service
+from src.services.pbo_service import compute_pbo
+from src.services.spectral_regime_service import SpectralRegimeAnalyzer
+from src.utils import compute_pool
+from src.utils.compute_pool import cpu_bound
+from src.utils.jwt_utils import TokenPayload
+from src.utils.progress import JobCancelled, scaled
+
+
+class _Body(BaseModel):
+    steps: int = 3
+
+
+def _slow_runner(body, progress):
+    for i in range(body.steps):
+        time.sleep(0.02)
+        progress((i + 1) / body.steps, f"step {i + 1}")
+    return {"values": np.arange(body.steps, dtype=float)}
+
+
+def _failing_runner(body, progress):
+    raise ValueError("bad input")
+
+
+@cpu_bound
+def _pool_runner(body, progress):
+    for i in range(body.steps):
+        time.sleep(0.05)
+        progress((i + 1) / body.steps, f"step {i + 1}")
+    return {"pid": os.getpid()}
+
+
+@cpu_bound
+def _endless_pool_runner(body, progress):
+    while True:
+        progress(0.5, "spinning")
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(job_service, "_jobs", job_service.OrderedDict())
+    monkeypatch.setattr(job_service, "_kinds", {})
+    job_service.register_job_kind("slow", _Body, _slow_runner)
+    job_service.register_job_kind("failing", _Body, _failing_runner)
+
+
+async def _wait(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not job.done or job.finished_at is None:
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+
+class TestProgress:
+
+    def test_scaled_maps_stage_into_parent_range(self):
+        calls = []
+        stage = scaled(lambda f, m: calls.append((f, m)), 0.5, 0.9)
+        stage(0.5, "half")
+        stage(2.0)
+        assert calls == [(pytest.approx(0.7), "half"), (pytest.approx(0.9), "")]
+        assert scaled(None, 0.0, 1.0) is None
+
+    def test_cancel_is_not_swallowed_by_service_fallbacks(self):
+        acf = np.exp(-0.3 * np.arange(40))
+
+        def cancel(fraction, message):
+            raise JobCancelled("x")
+
+        # find_optimal_n_poles skips failing candidates with `except Exception`
+        with pytest.raises(JobCancelled):
+            SpectralRegimeAnalyzer.find_optimal_n_poles(acf, progress=cancel)
+
+    def test_pbo_reports_monotone_progress(self):
+        returns = np.random.default_rng(0).normal(0, 0.01, (200, 4))
+        seen = []
+        result = compute_pbo(returns, n_splits=8, progress=lambda f, m: seen.append(f))
+        assert result == compute_pbo(returns, n_splits=8)
+        assert seen == sorted(seen) and seen[-1] == 1.0
+
+
+class TestJobService:
+
+    def test_success_and_progress(self):
+        async def scenario():
+            job = await job_service.submit_job("slow", _Body(steps=4), user_id=1)
+            assert request_tracker._active_requests[job.job_id].method == "JOB"
+            await _wait(job)
+            assert job.job_id not in request_tracker._active_requests
+            return job
+
+        job = asyncio.run(scenario())
+        assert job.status == job_service.SUCCEEDED
+        assert job.to_dict()["progress_percent"] == 100.0 and job.message == "step 4"
+        np.testing.assert_array_equal(job.result["values"], [0.0, 1.0, 2.0, 3.0])
+
+    def test_failure_is_recorded(self):
+        async def scenario():
+            job = await job_service.submit_job("failing", _Body(), user_id=1)
+            await _wait(job)
+            return job
+
+        job = asyncio.run(scenario())
+        assert job.status == job_service.FAILED and job.error == "ValueError: bad input"
+
+    def test_cancel_via_request_tracker_stops_worker(self):
+        stopped = threading.Event()
+
+        def endless(body, progress):
+            try:
+                while True:
+                    progress(0.1)
+                    time.sleep(0.01)
+            finally:
+                stopped.set()
+
+        job_service.register_job_kind("endless", _Body, endless)
+
+        async def scenario():
+            job = await job_service.submit_job("endless", _Body(), user_id=1)
+            while job.status != job_service.RUNNING:
+                await asyncio.sleep(0.01)
+            assert request_tracker.cancel_request(job.job_id)
+            await _wait(job)
+            return job
+
+        job = asyncio.run(scenario())
+        assert job.status == job_service.CANCELLED
+        assert stopped.wait(2.0)
+
+    def test_cancelled_job_keeps_its_slot_until_runner_stops(self, monkeypatch):
+        monkeypatch.setattr(job_service, "JOB_MAX_WORKERS", 1)
+        monkeypatch.setattr(compute_pool, "COMPUTE_POOL_WORKERS", 0)
+        lock = threading.Lock()
+        live = {"now": 0, "peak": 0}
+
+        def tracked(body, progress):
+            with lock:
+                live["now"] += 1
+                live["peak"] = max(live["peak"], live["now"])
+            try:
+                for _ in range(body.steps):
+                    time.sleep(0.05)
+                    progress(0.5, "working")
+            finally:
+                with lock:
+                    live["now"] -= 1
+            return {}
+
+        job_service.register_job_kind("tracked", _Body, tracked)
+
+        async def scenario():
+            first = await job_service.submit_job("tracked", _Body(steps=20), user_id=1)
+            while first.status != job_service.RUNNING:
+                await asyncio.sleep(0.01)
+            assert job_service.cancel_job(first)
+            assert first.status == job_service.CANCELLING and not first.done
+            second = await job_service.submit_job("tracked", _Body(steps=2), user_id=1)
+            await _wait(first)
+            await _wait(second)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first.status == job_service.CANCELLED and first.result is None
+        assert second.status == job_service.SUCCEEDED
+        assert live["peak"] == 1
+
+    def test_per_user_limit(self, monkeypatch):
+        monkeypatch.setattr(job_service, "JOB_MAX_ACTIVE_PER_USER", 1)
+
+        async def scenario():
+            job = await job_service.submit_job("slow", _Body(), user_id=1)
+            with pytest.raises(job_service.JobLimitExceededError):
+                await job_service.submit_job("slow", _Body(), user_id=1)
+            other = await job_service.submit_job("slow", _Body(), user_id=2)
+            await _wait(job)
+            await _wait(other)
+
+        asyncio.run(scenario())
+
+    def test_finished_jobs_expire(self, monkeypatch):
+        async def scenario():
+            job = await job_service.submit_job("slow", _Body(steps=1), user_id=1)
+            await _wait(job)
+            return job
+
+        job = asyncio.run(scenario())
+        monkeypatch.setattr(job_service, "JOB_RESULT_TTL_SECONDS", 0)
+        job.finished_at -= 1
+        assert job_service.list_jobs() == []
+
+
+class TestPoolJobs:
+
+    @pytest.fixture(autouse=True)
+    def single_worker_pool(self, monkeypatch):
+        compute_pool.shutdown_compute_pool()
+        monkeypatch.setattr(compute_pool, "COMPUTE_POOL_WORKERS", 1)
+        monkeypatch.setattr(job_service, "JOB_PROGRESS_POLL_SECONDS", 0.01)
+        job_service.register_job_kind("pool", _Body, _pool_runner)
+        job_service.register_job_kind("pool-endless", _Body, _endless_pool_runner)
+        yield
+        compute_pool.shutdown_compute_pool()
+
+    def test_runner_executes_in_pool_with_progress(self):
+        async def scenario():
+            job = await job_service.submit_job("pool", _Body(steps=4), user_id=1)
+            seen = set()
+            while not job.done:
+                seen.add(job.message)
+                await asyncio.sleep(0.01)
+            await _wait(job)
+            return job, seen
+
+        job, seen = asyncio.run(scenario())
+        assert job.status == job_service.SUCCEEDED and job.result["pid"] != os.getpid()
+        assert job.message == "step 4" and len(seen & {"step 1", "step 2", "step 3"}) >= 1
+
+    def test_cancel_stops_pool_worker(self):
+        async def scenario():
+            job = await job_service.submit_job("pool-endless", _Body(), user_id=1)
+            for _ in range(500):
+                if job.message == "spinning":
+                    break
+                await asyncio.sleep(0.01)
+            assert job.progress == 0.5
+            assert job_service.cancel_job(job)
+            await _wait(job)
+            # The only pool worker is free again once the runner has stopped
+            follow_up = await job_service.submit_job("pool", _Body(steps=1), user_id=1)
+            await _wait(follow_up)
+            return job, follow_up
+
+        job, follow_up = asyncio.run(scenario())
+        assert job.status == job_service.CANCELLED
+        assert follow_up.status == job_service.SUCCEEDED
+
+
+class TestJobsAPI:
+
+    @pytest.fixture
+    def client(self):
+        from src.api import jobs
+        from src.middleware.rate_limit import limiter
+
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.include_router(jobs.router, prefix="/api/jobs")
+        user = TokenPayload(sub=7, username="u", role="user", exp=0, iat=0, type="access")
+        app.dependency_overrides[require_auth] = lambda: user
+        job_service.register_job_kind("slow", _Body, _slow_runner)
+        with TestClient(app) as client:
+            yield client
+
+    def _poll(self, client, job_id):
+        for _ in range(500):
+            status = client.get(f"/api/jobs/{job_id}").json()
+            if status["status"] not in job_service.PENDING_STATUSES:
+                return status
+            time.sleep(0.01)
+        raise AssertionError("job did not finish")
+
+    def test_submit_poll_fetch(self, client):
+        resp = client.post("/api/jobs/slow", json={"steps": 2})
+        assert resp.status_code == 202
+        job_id = resp.json()["job_id"]
+        assert self._poll(client, job_id)["progress_percent"] == 100.0
+        assert client.get(f"/api/jobs/{job_id}/result").json() == {"values": [0.0, 1.0]}
+        assert [j["job_id"] for j in client.get("/api/jobs").json()] == [job_id]
+        assert client.delete(f"/api/jobs/{job_id}").json()["deleted"] is True
+        assert client.get(f"/api/jobs/{job_id}").status_code == 404
+
+    def test_validation_and_unknown_kind(self, client):
+        assert client.post("/api/jobs/slow", json={"steps": "x"}).status_code == 422
+        assert client.post("/api/jobs/nope", json={}).status_code == 404
+
+    def test_real_kind_with_binary_body(self, client):
+        from src.api import jobs
+
+        # the registry fixture starts from an empty table of kinds
+        job_service.register_job_kind(
+            "pbo", jobs.PBORequest, jobs._run_pbo, array_field="strategy_returns",
+        )
+        returns = np.random.default_rng(3).normal(0, 0.01, (120, 3))
+        resp = client.post(
+            "/api/jobs/pbo?n_splits=8",
+            content=returns.astype("<f8").tobytes(),
+            headers={"Content-Type": "application/octet-stream", "X-Array-Shape": "120,3"},
+        )
+        assert resp.status_code == 202
+        status = self._poll(client, resp.json()["job_id"])
+        assert status["status"] == job_service.SUCCEEDED
+        result = client.get(f"/api/jobs/{status['job_id']}/result").json()["result"]
+        assert result["n_splits"] == 8 and 0.0 <= result["pbo"] <= 1.0
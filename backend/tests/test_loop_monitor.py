@@ -0,0 +1,110 @@
+"""
+Tests for the event-loop lag monitor and the on-loop guard for CPU-bound services.
+"""
+import asyncio
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.pbo_service import compute_pbo
+from src.utils import compute_pool, loop_monitor
+from src.utils.compute_pool import BlockingCallError, offload
+from src.utils.error_handler import service_endpoint
+
+
+@pytest.fixture(autouse=True)
+def monitor_state(monkeypatch):
+    monkeypatch.setattr(loop_monitor, "_route_codes", {})
+    monkeypatch.setattr(loop_monitor, "_lags_ms", deque(maxlen=loop_monitor.MAX_LAG_SAMPLES))
+    monkeypatch.setattr(loop_monitor, "_blocks", deque(maxlen=loop_monitor.MAX_BLOCKS))
+    monkeypatch.setattr(loop_monitor, "_route_blocks", {})
+    monkeypatch.setattr(loop_monitor, "_blocking_calls", {})
+    monkeypatch.setattr(loop_monitor, "LOOP_MONITOR_INTERVAL_MS", 20.0)
+    monkeypatch.setattr(loop_monitor, "LOOP_BLOCK_THRESHOLD_MS", 100.0)
+    monkeypatch.setattr(loop_monitor, "LOOP_GUARD_STRICT", False)
+    monkeypatch.setattr(compute_pool, "COMPUTE_POOL_WORKERS", 0)
+
+
+def _blocking_handler():
+    time.sleep(0.3)
+
+
+async def _slow_endpoint():
+    _blocking_handler()
+
+
+class TestLoopMonitor:
+
+    def test_block_is_attributed_to_route(self):
+        loop_monitor.register_routes([SimpleNamespace(endpoint=_slow_endpoint, path="/api/slow", methods={"POST"})])
+
+        async def scenario():
+            loop_monitor.start_loop_monitor()
+            await asyncio.sleep(0.1)
+            await _slow_endpoint()
+            await asyncio.sleep(0.1)
+            await loop_monitor.stop_loop_monitor()
+
+        asyncio.run(scenario())
+        stats = loop_monitor.loop_stats()
+        assert not stats["running"] and stats["samples"] > 5
+        assert stats["lag_ms"]["max"] >= 250
+        assert stats["lag_ms"]["p50"] < stats["lag_ms"]["max"]
+        route = stats["blocks_by_route"]["POST /api/slow"]
+        assert route["count"] == 1 and route["max_ms"] >= 250
+        assert "_blocking_handler" in route["last_culprit"]
+        assert stats["recent_blocks"][0]["route"] == "POST /api/slow"
+
+    def test_short_yields_are_not_blocks(self):
+        async def scenario():
+            loop_monitor.start_loop_monitor()
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+            await loop_monitor.stop_loop_monitor()
+
+        asyncio.run(scenario())
+        stats = loop_monitor.loop_stats()
+        assert stats["blocks_by_route"] == {} and stats["samples"] > 0
+
+    def test_empty_stats(self):
+        assert loop_monitor.loop_stats()["lag_ms"]["p99"] is None
+
+
+class TestLoopGuard:
+    returns = np.random.default_rng(1).normal(0, 0.01, (60, 3))
+
+    def test_on_loop_call_is_reported(self):
+        @service_endpoint("PBO analysis")
+        async def endpoint():
+            return compute_pbo(self.returns, n_splits=4)
+
+        assert asyncio.run(endpoint()) == compute_pbo(self.returns, n_splits=4)
+        assert loop_monitor.loop_stats()["blocking_calls"] == [
+            {"operation": "PBO analysis", "function": "src.services.pbo_service.compute_pbo", "count": 1}
+        ]
+
+    def test_strict_mode_rejects_on_loop_call(self, monkeypatch):
+        monkeypatch.setattr(loop_monitor, "LOOP_GUARD_STRICT", True)
+
+        @service_endpoint("PBO analysis")
+        async def endpoint():
+            return compute_pbo(self.returns, n_splits=4)
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(endpoint())
+        assert exc.value.status_code == 500
+        with pytest.raises(BlockingCallError):
+            asyncio.run(endpoint.__wrapped__())
+
+    def test_offloaded_call_passes_strict_guard(self, monkeypatch):
+        monkeypatch.setattr(loop_monitor, "LOOP_GUARD_STRICT", True)
+        result = asyncio.run(offload(compute_pbo, self.returns, n_splits=4))
+        assert result["n_splits"] == 4
+        assert loop_monitor.loop_stats()["blocking_calls"] == []
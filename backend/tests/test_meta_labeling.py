@@ -0,0 +1,80 @@
+"""
+Tests for meta-labeling: windowed features and batched triple-barrier labels.
+"""
+import numpy as np
+import pytest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services import meta_labeling_service
+from src.services.meta_labeling_service import (
+    _build_features,
+    _triple_barrier,
+    _triple_barrier_batch,
+    compute_meta_labeling,
+)
+
+
+def _prices(T, seed=0):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, T)))
+
+
+def _scan_barrier(prices, t0, pt, sl, tmax, vol, side):
+    """Bar-by-bar reference scan."""
+    up = prices[t0] * (1 + side * pt * vol)
+    down = prices[t0] * (1 - side * sl * vol)
+    for t in range(t0 + 1, min(t0 + tmax, len(prices) - 1) + 1):
+        p = prices[t]
+        if (p >= up) if side == 1 else (p <= up):
+            return 1, np.log(p / prices[t0])
+        if (p <= down) if side == 1 else (p >= down):
+            return -1, np.log(p / prices[t0])
+    return 0, side * np.log(prices[min(t0 + tmax, len(prices) - 1)] / prices[t0])
+
+
+class TestFeatures:
+
+    def test_matches_per_bar_windows(self):
+        P = _prices(200)
+        window = 12
+        feats, vol = _build_features(P, window)
+        rets = np.diff(np.log(P), prepend=np.nan)
+        assert np.isnan(feats[:window]).all() and np.isnan(vol[:window]).all()
+        for t in (window, 19, 20, 57, 199):
+            r_w = rets[t - window + 1:t + 1]
+            sd = np.std(r_w, ddof=1)
+            mom20 = np.nan if t == 19 else rets[t - 19:t + 1].sum()
+            expected = [rets[t], rets[t - 4:t + 1].sum(), mom20, rets[t] / (sd + 1e-15),
+                        r_w[r_w > 0].sum() / (np.abs(r_w).sum() + 1e-15)]
+            np.testing.assert_allclose(feats[t], expected, rtol=1e-10, atol=1e-15)
+            assert vol[t] == pytest.approx(sd, rel=1e-12)
+
+    def test_chunked_rolling_std(self, monkeypatch):
+        P = _prices(300)
+        full = _build_features(P, 20)[1]
+        monkeypatch.setattr(meta_labeling_service, "ROLLING_CHUNK_ROWS", 7)
+        np.testing.assert_array_equal(_build_features(P, 20)[1], full)
+
+
+class TestTripleBarrier:
+
+    @pytest.mark.parametrize("side", [1, -1])
+    def test_batch_matches_scan(self, side, monkeypatch):
+        P = _prices(400, seed=3)
+        P[100:140] = P[100]  # flat stretch: only the time barrier fires
+        t0 = np.arange(0, 400)
+        vol = np.full(len(t0), 0.01)
+        monkeypatch.setattr(meta_labeling_service, "BARRIER_CHUNK_ELEMENTS", 100)
+        labels, rets = _triple_barrier_batch(P, t0, 1.2, 0.8, 15, vol, np.full(len(t0), side))
+        for t in t0:
+            label, ret = _scan_barrier(P, t, 1.2, 0.8, 15, 0.01, side)
+            assert labels[t] == label and rets[t] == pytest.approx(ret, rel=1e-12, abs=1e-15)
+        assert set(labels) == {-1, 0, 1}
+        assert _triple_barrier(P, 399, 1.2, 0.8, 15, 0.01, side) == (0, 0.0)
+
+    def test_pipeline_on_long_series(self):
+        result = compute_meta_labeling(_prices(20_000, seed=5), max_holding=10)
+        assert result["n_samples"] == result["n_train"] + result["n_test"]
+        assert sum(result["label_distribution"].values()) == result["n_test"]
+        assert len(result["test_probs"]) == result["n_test"]
@@ -0,0 +1,194 @@
+"""
+Tests for the async MOEX ISS client: concurrent pagination, caching, sync facade.
+
+The aiohttp session is replaced by a fake that routes on the URL path and
+records every request, so no network access is needed.
+"""
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services import cache_service, moex_iss_client
+from src.services.bond_pricing import BondPricer
+from src.services.bond_service import get_market_yield_from_moex_async
+from src.services.moex_iss_client import (
+    HISTORICAL_TTL_SECONDS,
+    LIVE_TTL_SECONDS,
+    history_ttl,
+    iss_get,
+    iss_get_paginated,
+    run_sync,
+)
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self, content_type=None):
+        return self.payload
+
+
+class _FakeSession:
+    """Routes GET requests to handler(path, params) -> payload after a short delay."""
+
+    def __init__(self, handler, delay=0.01):
+        self.handler = handler
+        self.delay = delay
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    def get(self, url, params=None):
+        path = url.removeprefix(moex_iss_client.ISS_BASE + "/")
+        self.requests.append((path, dict(params or {})))
+        session = self
+
+        class _Request:
+            async def __aenter__(self):
+                session.active += 1
+                session.max_active = max(session.max_active, session.active)
+                await asyncio.sleep(session.delay)
+                session.active -= 1
+                return _FakeResponse(session.handler(path, params or {}))
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Request()
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    cache_service._namespaces.clear()
+    cache_service._inflight.clear()
+    yield
+    cache_service._namespaces.clear()
+
+
+def _install(monkeypatch, handler, delay=0.01):
+    session = _FakeSession(handler, delay)
+
+    async def get_session():
+        return session
+
+    monkeypatch.setattr(moex_iss_client, "get_session", get_session)
+    return session
+
+
+def _history_pages(total, page_size=100):
+    def handler(path, params):
+        start = int(params["start"])
+        rows = [[i] for i in range(start, min(start + page_size, total))]
+        return {
+            "history": {"columns": ["N"], "data": rows},
+            "history.cursor": {"columns": ["INDEX", "TOTAL", "PAGESIZE"], "data": [[start, total, page_size]]},
+        }
+    return handler
+
+
+class TestPagination:
+
+    def test_remaining_pages_fetched_concurrently_in_order(self, monkeypatch):
+        session = _install(monkeypatch, _history_pages(total=450))
+        table = asyncio.run(iss_get_paginated("history/x.json", "history", {"from": "2020-01-01"}))
+        assert table["columns"] == ["N"]
+        assert [r[0] for r in table["data"]] == list(range(450))
+        assert sorted(int(p["start"]) for _, p in session.requests) == [0, 100, 200, 300, 400]
+        assert session.max_active == 4  # pages 2..5 in flight together
+
+    def test_cursor_added_to_iss_only(self, monkeypatch):
+        session = _install(monkeypatch, _history_pages(total=50))
+        asyncio.run(iss_get_paginated("history/x.json", "history", {"iss.only": "history"}))
+        assert session.requests[0][1]["iss.only"] == "history,history.cursor"
+        assert session.requests[0][1]["iss.meta"] == "off"
+
+    def test_table_without_cursor_is_single_request(self, monkeypatch):
+        session = _install(monkeypatch, lambda path, params: {"coupons": {"columns": ["a"], "data": [[1], [2]]}})
+        table = asyncio.run(iss_get_paginated("bondization/x.json", "coupons"))
+        assert table["data"] == [[1], [2]]
+        assert len(session.requests) == 1
+
+
+class TestCaching:
+
+    def test_concurrent_and_repeated_calls_share_one_request(self, monkeypatch):
+        session = _install(monkeypatch, lambda path, params: {"ok": params["date"]})
+
+        async def scenario():
+            first = await asyncio.gather(*(iss_get("zcyc.json", {"date": "2020-01-10"}) for _ in range(5)))
+            again = await iss_get("zcyc.json", {"date": "2020-01-10"})
+            other = await iss_get("zcyc.json", {"date": "2020-01-11"})
+            return first, again, other
+
+        first, again, other = asyncio.run(scenario())
+        assert first == [{"ok": "2020-01-10"}] * 5 and again == {"ok": "2020-01-10"}
+        assert other == {"ok": "2020-01-11"}
+        assert len(session.requests) == 2
+
+    def test_history_ttl(self):
+        assert history_ttl("2020-01-10") == HISTORICAL_TTL_SECONDS
+        assert history_ttl(date.today()) == LIVE_TTL_SECONDS
+        assert history_ttl((date.today() + timedelta(days=5)).isoformat()) == LIVE_TTL_SECONDS
+        assert history_ttl(None) == LIVE_TTL_SECONDS
+
+
+class TestSyncFacade:
+
+    def test_run_sync_reuses_background_loop(self, monkeypatch):
+        _install(monkeypatch, lambda path, params: {"path": path})
+        assert run_sync(iss_get("a.json")) == {"path": "a.json"}
+        loop = moex_iss_client._sync_loop
+        assert run_sync(iss_get("b.json")) == {"path": "b.json"}
+        assert moex_iss_client._sync_loop is loop
+
+    def test_run_sync_rejects_running_loop(self):
+        async def inside_loop():
+            with pytest.raises(RuntimeError):
+                run_sync(asyncio.sleep(0))
+
+        asyncio.run(inside_loop())
+
+
+class TestBondFetch:
+
+    @staticmethod
+    def _bond_handler(path, params):
+        if path.startswith("securities/"):
+            return {"description": {"columns": ["name", "title", "value"], "data": [
+                ["FACEVALUE", "", "1000"], ["COUPONPERCENT", "", "8.5"],
+                ["ISSUEDATE", "", "2020-01-15"], ["MATDATE", "", "2022-01-12"],
+            ]}}
+        if "bondization" in path:
+            return {"coupons": {"columns": ["coupondate", "value"], "data": [
+                ["2020-07-15", 42.38], ["2021-01-13", 42.38],
+            ]}}
+        if path.startswith("history/"):
+            return {"history": {"columns": ["TRADEDATE", "CLOSE", "YIELD"], "data": [
+                ["2021-03-01", 101.2, 7.1], ["2021-03-02", 101.3, 7.05], ["2021-03-04", 101.1, 7.2],
+            ]}}
+        raise AssertionError(path)
+
+    def test_description_and_coupons_fetched_concurrently(self, monkeypatch):
+        session = _install(monkeypatch, self._bond_handler)
+        data = asyncio.run(BondPricer.fetch_bond_data_async("RU000TEST"))
+        assert session.max_active == 2
+        assert data["face_value"] == 1000.0 and data["payments_per_year"] == 2
+        assert data["coupon_dates_full"][-1] == data["mat_date"]
+
+    def test_market_yield_uses_last_trade_not_after_date(self, monkeypatch):
+        _install(monkeypatch, self._bond_handler)
+        assert asyncio.run(get_market_yield_from_moex_async("RU000TEST", "2021-03-03")) == 7.05
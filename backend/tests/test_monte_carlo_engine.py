@@ -0,0 +1,107 @@
+"""
+Tests for the vectorized Monte Carlo engine.
+
+References:
+- Glasserman, "Monte Carlo Methods in Financial Engineering", Ch. 3 (GBM)
+- Merton (1971), constant-mix portfolio dynamics
+"""
+import numpy as np
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.hjb_service import simulate_monte_carlo
+from src.services.monte_carlo_engine import (
+    simulate_portfolio_paths,
+    summarize_simulation,
+    tail_risk,
+)
+
+
+MU = np.array([0.08, 0.05, 0.11])
+COV = np.array([
+    [0.040, 0.006, 0.010],
+    [0.006, 0.010, 0.002],
+    [0.010, 0.002, 0.090],
+])
+W = np.array([0.5, 0.3, 0.2])
+
+
+def _naive_max_drawdown(path):
+    peak, max_dd = path[0], 0.0
+    for value in path:
+        peak = max(peak, value)
+        max_dd = max(max_dd, (peak - value) / peak)
+    return max_dd
+
+
+class TestPortfolioPaths:
+
+    def test_shapes_and_initial_capital(self):
+        sim = simulate_portfolio_paths(MU, COV, W, 1e6, 1.0, n_paths=200, n_steps=50, seed=1)
+        assert sim.paths.shape == (200, 51)
+        assert sim.max_drawdowns.shape == (200,)
+        np.testing.assert_allclose(sim.paths[:, 0], 1e6)
+        assert sim.t_grid[-1] == 1.0
+
+    def test_chunking_does_not_change_paths(self):
+        """Chunk size bounds memory only — the random stream is consumed in the same order."""
+        full = simulate_portfolio_paths(MU, COV, W, 1.0, 1.0, n_paths=300, n_steps=40, seed=7)
+        chunked = simulate_portfolio_paths(
+            MU, COV, W, 1.0, 1.0, n_paths=300, n_steps=40, seed=7, max_chunk_bytes=40 * 8 * 17,
+        )
+        np.testing.assert_allclose(full.paths, chunked.paths)
+        np.testing.assert_allclose(full.max_drawdowns, chunked.max_drawdowns)
+
+    def test_gbm_terminal_mean(self):
+        """E[X_T] = X_0 · exp(wᵀμ · T) for a constant-mix portfolio."""
+        sim = simulate_portfolio_paths(MU, COV, W, 1.0, 2.0, n_paths=20_000, n_steps=24, seed=3)
+        expected = np.exp(W @ MU * 2.0)
+        np.testing.assert_allclose(sim.final_capitals.mean(), expected, rtol=0.01)
+
+    def test_terminal_log_variance(self):
+        """Var[log X_T] = wᵀΣw · T."""
+        sim = simulate_portfolio_paths(MU, COV, W, 1.0, 1.0, n_paths=20_000, n_steps=12, seed=5)
+        np.testing.assert_allclose(np.var(np.log(sim.final_capitals)), W @ COV @ W, rtol=0.05)
+
+    def test_max_drawdown_matches_loop(self):
+        sim = simulate_portfolio_paths(MU, COV, W, 100.0, 1.0, n_paths=30, n_steps=60, seed=11)
+        expected = [_naive_max_drawdown(p) for p in sim.paths]
+        np.testing.assert_allclose(sim.max_drawdowns, expected)
+
+    def test_buy_and_hold_single_asset_equals_constant_mix(self):
+        """With one asset there is no weight drift, so both modes coincide."""
+        kwargs = dict(mu=[0.07], cov_matrix=[[0.04]], weights=[1.0], initial_capital=1.0,
+                      horizon_years=1.0, n_paths=100, n_steps=30, seed=9)
+        mix = simulate_portfolio_paths(rebalance=True, **kwargs)
+        bnh = simulate_portfolio_paths(rebalance=False, **kwargs)
+        np.testing.assert_allclose(mix.paths, bnh.paths, rtol=1e-12)
+
+    def test_buy_and_hold_asset_variance(self):
+        """Correlated asset-level shocks preserve each asset's marginal variance."""
+        sim = simulate_portfolio_paths(
+            MU[:2], COV[:2, :2], [1.0, 0.0], 1.0, 1.0, n_paths=20_000, n_steps=1, seed=2, rebalance=False,
+        )
+        np.testing.assert_allclose(np.var(np.log(sim.final_capitals)), COV[0, 0], rtol=0.05)
+
+
+class TestSummary:
+
+    def test_tail_risk_ordering(self):
+        values = np.random.default_rng(0).normal(size=10_000)
+        var, cvar = tail_risk(values, 0.05)
+        assert cvar <= var
+        np.testing.assert_allclose(var, -1.645, atol=0.05)
+
+    def test_simulate_monte_carlo_schema(self):
+        result = simulate_monte_carlo(MU, COV, W, 1e6, 1.0, n_paths=500, n_steps=20, random_seed=42)
+        assert len(result['paths']) == 50
+        assert len(result['median_path']) == 21
+        stats = result['stats']
+        assert stats['cvar_99'] <= stats['var_99'] <= stats['var_95']
+        assert np.all(np.array(result['q05_path']) <= np.array(result['q95_path']))
+
+    def test_seed_reproducible(self):
+        a = summarize_simulation(simulate_portfolio_paths(MU, COV, W, 1.0, 1.0, 100, 10, seed=4))
+        b = summarize_simulation(simulate_portfolio_paths(MU, COV, W, 1.0, 1.0, 100, 10, seed=4))
+        assert a['stats'] == b['stats']
@@ -0,0 +1,80 @@
+"""
+Tests for the multivariate Gaussian HMM (Baum–Welch).
+
+References:
+- Rabiner (1989), "A Tutorial on Hidden Markov Models", scaled forward-backward
+- Dempster, Laird & Rubin (1977), EM monotonicity
+"""
+import numpy as np
+from scipy.stats import multivariate_normal
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.multivariate_hmm_service import MultivariateHMMRegimeAnalyzer
+
+
+def _two_regime_panel(seed=0, n=200, k=3):
+    rng = np.random.default_rng(seed)
+    calm = rng.normal(0.0, 1.0, (n, k))
+    stress = rng.normal(-0.5, 3.0, (n, k))
+    return np.vstack([calm, stress, calm[: n // 2]])
+
+
+def _brute_force_log_likelihood(model, y):
+    """Scaled forward pass with scipy densities."""
+    K = y.shape[1]
+    B = np.column_stack([
+        multivariate_normal(model.mu[k], model.sigma[k] + 1e-6 * np.eye(K)).pdf(y)
+        for k in range(model.n_regimes)
+    ])
+    a = model.pi * B[0]
+    ll = np.log(a.sum())
+    a /= a.sum()
+    for t in range(1, len(y)):
+        a = (a @ model.transition_matrix) * B[t]
+        ll += np.log(a.sum())
+        a /= a.sum()
+    return ll
+
+
+class TestForwardBackward:
+
+    def test_log_likelihood_matches_scipy(self):
+        y = _two_regime_panel()
+        model = MultivariateHMMRegimeAnalyzer(n_regimes=2).fit(y, max_iterations=3)
+        expected = _brute_force_log_likelihood(model, model.y_normalized)
+        np.testing.assert_allclose(model.compute_log_likelihood(model.y_normalized), expected, rtol=1e-10)
+
+    def test_posteriors_are_distributions(self):
+        y = _two_regime_panel()
+        model = MultivariateHMMRegimeAnalyzer(n_regimes=3).fit(y, max_iterations=5)
+        alpha, beta = model.forward_backward(model.y_normalized)
+        gamma, xi = model.forward_backward_posterior(model.y_normalized, alpha, beta)
+        np.testing.assert_allclose(gamma.sum(axis=1), 1.0)
+        np.testing.assert_allclose(xi.sum(axis=(1, 2)), 1.0)
+        # Σ_j ξ_t(i, j) = γ_t(i)
+        np.testing.assert_allclose(xi.sum(axis=2), gamma[:-1], atol=1e-10)
+
+
+class TestBaumWelch:
+
+    def test_em_log_likelihood_non_decreasing(self):
+        y = _two_regime_panel(seed=1)
+        model = MultivariateHMMRegimeAnalyzer(n_regimes=2).fit(y, max_iterations=20, tol=0.0)
+        history = np.array(model.log_likelihood_history)
+        assert len(history) == 20
+        assert np.all(np.diff(history) >= -1e-6)
+
+    def test_recovers_stress_regime(self):
+        y = _two_regime_panel(seed=2)
+        model = MultivariateHMMRegimeAnalyzer(n_regimes=2).fit(y, max_iterations=50)
+        states = model.predict_states()
+        stress_state = states[250]
+        assert np.mean(states[200:400] == stress_state) > 0.9
+        assert np.mean(states[:200] != stress_state) > 0.9
+
+    def test_transition_matrix_rows_sum_to_one(self):
+        model = MultivariateHMMRegimeAnalyzer(n_regimes=3).fit(_two_regime_panel(), max_iterations=10)
+        np.testing.assert_allclose(model.transition_matrix.sum(axis=1), 1.0)
+        assert np.all(np.linalg.eigvalsh(model.sigma) > 0)
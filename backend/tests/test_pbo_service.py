@@ -0,0 +1,75 @@
+"""
+Tests for CSCV on per-chunk sufficient statistics and the vectorized DSR.
+"""
+import itertools
+
+import numpy as np
+import pytest
+import scipy.stats
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services import pbo_service
+from src.services.pbo_service import _compute_dsr_and_minbtl, _cscv, _psr, _sharpe_ratio, compute_pbo
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(11)
+    # общий фактор + сдвиг среднего, чтобы SR стратегий различались
+    return rng.normal(0.0004, 0.01, (480, 6)) + rng.normal(0, 0.003, (480, 1)) + np.linspace(0, 4e-4, 6)
+
+
+class TestCSCV:
+
+    def test_matches_per_combination_loop(self, returns):
+        S = 12
+        result = _cscv(returns, n_splits=S)
+        chunks = np.split(returns, S)
+        combos = list(itertools.combinations(range(S), S // 2))
+        assert result["exact"] and result["n_combinations"] == len(combos)
+
+        for k in (0, 1, 300, len(combos) - 1):
+            is_data = np.vstack([chunks[i] for i in combos[k]])
+            oos_data = np.vstack([chunks[i] for i in range(S) if i not in combos[k]])
+            is_sr = np.array([_sharpe_ratio(is_data[:, n]) for n in range(returns.shape[1])])
+            oos_sr = np.array([_sharpe_ratio(oos_data[:, n]) for n in range(returns.shape[1])])
+            best = int(np.argmax(is_sr))
+            assert result["is_sr_best"][k] == pytest.approx(is_sr[best], rel=1e-9)
+            assert result["oos_sr_best"][k] == pytest.approx(oos_sr[best], rel=1e-9)
+            assert result["oos_ranks"][k] == 1 + int(np.sum(oos_sr > oos_sr[best]))
+            assert result["oos_sr_all_mean"][k] == pytest.approx(oos_sr.mean(), rel=1e-9)
+
+    def test_all_combinations_for_sixteen_splits(self, returns):
+        result = compute_pbo(returns, n_splits=16)
+        assert result["n_combinations"] == 12_870 and result["cscv_exact"]
+        # CSCV симметрична: дополнение каждой комбинации тоже перебрано
+        assert 0.0 <= result["pbo"] <= 1.0 and len(result["scatter"]["is_sr"]) <= pbo_service.MAX_SCATTER_POINTS
+
+    def test_large_split_counts_are_sampled(self, returns, monkeypatch):
+        monkeypatch.setattr(pbo_service, "MAX_EXACT_COMBINATIONS", 100)
+        monkeypatch.setattr(pbo_service, "SAMPLED_COMBINATIONS", 500)
+        result = _cscv(returns, n_splits=12)
+        assert not result["exact"] and result["n_combinations"] == 500
+
+    def test_blocks_do_not_change_result(self, returns, monkeypatch):
+        full = _cscv(returns, n_splits=10)
+        monkeypatch.setattr(pbo_service, "BLOCK_ELEMENTS", 7)
+        blocked = _cscv(returns, n_splits=10)
+        assert blocked["oos_ranks"] == full["oos_ranks"] and blocked["pbo"] == full["pbo"]
+        np.testing.assert_allclose(blocked["is_sr_best"], full["is_sr_best"], rtol=1e-12)
+
+
+class TestDSR:
+
+    def test_matches_per_strategy_loop(self, returns):
+        result = _compute_dsr_and_minbtl(returns, annualize=252)
+        sr_star = result["sr_star_annual"] / np.sqrt(252)
+        for n, stats in enumerate(result["strategy_stats"]):
+            r = returns[:, n]
+            sr = r.mean() / r.std(ddof=1)
+            skew, kurt = scipy.stats.skew(r), scipy.stats.kurtosis(r)
+            assert stats["sr_freq"] == pytest.approx(sr, rel=1e-12)
+            assert stats["psr"] == pytest.approx(_psr(float(sr), sr_star, len(r), float(skew), float(kurt)), rel=1e-12)
+        assert isinstance(_psr(0.1, 0.0, 100, 0.0, 0.0), float)
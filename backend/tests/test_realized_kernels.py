@@ -0,0 +1,130 @@
+"""
+Tests for realized volatility estimators: log-price based TSRV/MSRV/RK and the streaming mode.
+"""
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.middleware.auth import require_auth
+from src.services.realized_kernels_service import (
+    RealizedStream,
+    _KERNELS,
+    _log_prices,
+    _msrv,
+    _realized_kernel,
+    _tsrv,
+    compute_realized_kernels,
+)
+from src.utils.jwt_utils import TokenPayload
+
+
+def _noisy_prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    efficient = np.cumsum(rng.normal(0, 3e-4, n))
+    return 100.0 * np.exp(efficient + rng.normal(0, 2e-4, n))
+
+
+def _subsampled_rv(prices, k, s):
+    return float(np.sum(np.diff(np.log(prices[s::k])) ** 2))
+
+
+class TestEstimators:
+
+    def test_tsrv_and_msrv_match_offset_loops(self):
+        p = _noisy_prices(997)
+        lp = _log_prices(p)
+        n = len(p) - 1
+        rv_fast = _subsampled_rv(p, 1, 0)
+
+        K = 5
+        slow = np.mean([_subsampled_rv(p, K, s) for s in range(K)])
+        n_bar = (n - K + 1.0) / K
+        expected_tsrv = (slow - n_bar / n * rv_fast) / (1 - n_bar / n)
+        assert _tsrv(lp, K)[0] == pytest.approx(max(expected_tsrv, 0.0), rel=1e-9)
+
+        K_max = 20
+        weights = np.array([k * (K_max - k) for k in range(1, K_max)], dtype=float)
+        weights /= weights.sum()
+        tsrv_k = [np.mean([_subsampled_rv(p, k, s) for s in range(k)]) - rv_fast / k for k in range(1, K_max)]
+        assert _msrv(lp, K_max) == pytest.approx(max(float(np.dot(weights, tsrv_k)), 0.0), rel=1e-9)
+
+    @pytest.mark.parametrize("kernel", sorted(_KERNELS))
+    def test_fft_kernel_matches_lag_loop(self, kernel):
+        r = np.diff(np.log(_noisy_prices(3000, seed=1)))
+        H = 40
+        weights = _KERNELS[kernel](np.arange(1, H + 1) / (H + 1))
+        expected = r @ r + 2 * sum(w * (r[h:] @ r[:-h]) for h, w in zip(range(1, H + 1), weights))
+        assert _realized_kernel(r, H, kernel) == pytest.approx(max(expected, 0.0), rel=1e-9)
+
+    def test_signature_plot_is_rescaled_rv(self):
+        p = _noisy_prices(400)
+        result = compute_realized_kernels(list(p))
+        sig = result["signature_plot"]
+        for step, rv in zip(sig["steps"], sig["rv"]):
+            assert rv == pytest.approx(_subsampled_rv(p, step, 0) * step, rel=1e-9)
+
+
+class TestRealizedStream:
+
+    @pytest.mark.parametrize("kernel,bandwidth", [("parzen", None), ("bartlett", 15)])
+    def test_chunks_match_batch(self, kernel, bandwidth):
+        p = _noisy_prices(20_000, seed=2)
+        stream = RealizedStream()
+        for chunk in np.array_split(p, [1, 2, 50, 7000, 7001, 15000]):
+            stream.update(chunk)
+        batch = compute_realized_kernels(list(p), kernel=kernel, bandwidth=bandwidth)
+        result = stream.estimates(kernel=kernel, bandwidth=bandwidth)
+        for key in ("rv_raw", "bv_raw", "rk_raw", "rv_vol", "rk_vol"):
+            assert result[key] == pytest.approx(batch[key], rel=1e-9)
+        assert result["bandwidth_used"] == batch["bandwidth_used"]
+        assert result["jump_test"]["z_stat"] == pytest.approx(batch["jump_test"]["z_stat"], rel=1e-6)
+
+    def test_bandwidth_is_capped_by_kept_lags(self):
+        stream = RealizedStream(max_lag=10)
+        stream.update(_noisy_prices(2_000))
+        assert stream.estimates()["bandwidth_used"] == 10
+        assert len(stream._tail) == 10
+
+    def test_rejects_non_positive_prices(self):
+        stream = RealizedStream()
+        with pytest.raises(ValueError):
+            stream.update([100.0, 0.0])
+        assert stream.n_prices == 0
+
+
+class TestStreamAPI:
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from src.api import realized_kernels
+        from src.middleware.rate_limit import limiter
+
+        monkeypatch.setattr(realized_kernels, "_streams", realized_kernels.OrderedDict())
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.include_router(realized_kernels.router, prefix="/api/realized-kernels")
+        user = TokenPayload(sub=3, username="u", role="user", exp=0, iat=0, type="access")
+        app.dependency_overrides[require_auth] = lambda: user
+        with TestClient(app) as client:
+            yield client
+
+    def test_post_chunks_get_and_delete(self, client):
+        p = _noisy_prices(3_000)
+        url = "/api/realized-kernels/stream/SBER"
+        for chunk in np.array_split(p, 3):
+            resp = client.post(url, json={"prices": chunk.tolist()})
+            assert resp.status_code == 200
+        assert resp.json()["result"]["n_prices"] == 3_000
+
+        batch = compute_realized_kernels(list(p), kernel="tukey-hanning")
+        got = client.get(url, params={"kernel": "tukey-hanning"}).json()["result"]
+        assert got["rk_raw"] == pytest.approx(batch["rk_raw"], rel=1e-9)
+
+        reset = client.post(url, json={"prices": p[:5].tolist(), "reset": True}).json()["result"]
+        assert reset["n_prices"] == 5
+        assert client.delete(url).json()["deleted"] is True
+        assert client.get(url).status_code == 404
@@ -0,0 +1,113 @@
+"""
+Tests for per-route request metrics and the Prometheus exposition.
+"""
+import numpy as np
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.middleware import request_metrics
+from src.middleware.request_metrics import LogHistogram, prometheus_text, route_metrics
+from src.middleware.request_tracker import RequestTrackerMiddleware
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    request_metrics.reset_metrics()
+    yield
+    request_metrics.reset_metrics()
+
+
+class TestLogHistogram:
+
+    def test_quantiles_within_bucket_error(self):
+        values = np.random.default_rng(0).lognormal(np.log(0.05), 1.0, 20_000)
+        hist = LogHistogram(1e-4, 120.0)
+        for v in values:
+            hist.record(float(v))
+        for q in (0.5, 0.95, 0.99):
+            exact = np.quantile(values, q)
+            assert exact <= hist.quantile(q) <= exact * 2 ** (1 / 8) * 1.001
+        assert hist.count == values.size and hist.total == pytest.approx(values.sum())
+
+    def test_memory_is_fixed_and_extremes_are_clamped(self):
+        hist = LogHistogram(1e-4, 120.0)
+        n_buckets = len(hist.counts)
+        for v in (0.0, 1e-9, 5e3):
+            hist.record(v)
+        assert len(hist.counts) == n_buckets
+        assert hist.counts[0] == 2 and hist.counts[-1] == 1
+        assert hist.quantile(1.0) == 5e3
+        assert LogHistogram(1.0, 2.0).quantile(0.5) is None
+
+    def test_prometheus_buckets_are_cumulative(self):
+        hist = LogHistogram(1.0, 1024.0)
+        for v in (1, 3, 3, 100, 5000):
+            hist.record(v)
+        buckets = list(hist.cumulative_buckets())
+        assert buckets[0] == (1.0, 1) and buckets[-1] == (float("inf"), 5)
+        assert dict(buckets)[4.0] == 3 and dict(buckets)[128.0] == 4
+        counts = [c for _, c in buckets]
+        assert counts == sorted(counts)
+
+
+class TestMiddlewareMetrics:
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(RequestTrackerMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"item_id": item_id, "payload": "x" * 200}
+
+        @app.post("/items")
+        async def create_item(body: dict):
+            return body
+
+        @app.get("/boom")
+        async def boom():
+            raise HTTPException(status_code=503, detail="down")
+
+        return TestClient(app)
+
+    def test_routes_are_grouped_by_template(self, client):
+        for i in range(5):
+            assert client.get(f"/items/{i}").status_code == 200
+        client.post("/items", json={"a": "b" * 500})
+        client.get("/boom")
+        client.get("/no/such/path")
+        client.delete("/items/1")
+
+        rows = {(r["method"], r["route"]): r for r in route_metrics()}
+        items = rows[("GET", "/items/{item_id}")]
+        assert items["count"] == 5 and items["in_flight"] == 0 and items["statuses"] == {"2xx": 5}
+        assert items["latency_ms"]["p50"] <= items["latency_ms"]["p99"] <= items["latency_ms"]["max"]
+        assert items["response_bytes"]["total"] > 5 * 200
+        assert rows[("POST", "/items")]["request_bytes"]["total"] > 500
+        assert rows[("GET", "/boom")]["errors"] == 1
+        assert rows[("GET", "unmatched")]["statuses"] == {"4xx": 1}
+        assert rows[("DELETE", "/items/{item_id}")]["statuses"] == {"4xx": 1}
+
+    def test_unknown_methods_share_one_series(self, client):
+        for verb in ("FOO", "BAR", "PROPFIND"):
+            client.request(verb, f"/random/{verb}")
+        client.request("FOO", "/items/1")
+        rows = {(r["method"], r["route"]): r for r in route_metrics()}
+        assert rows[("OTHER", "unmatched")]["count"] == 3
+        assert rows[("OTHER", "/items/{item_id}")]["count"] == 1
+        assert len(rows) == 2
+
+    def test_prometheus_text(self, client):
+        client.get("/items/1")
+        client.get("/boom")
+        text = prometheus_text()
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert 'http_requests_total{method="GET",route="/items/{item_id}",status="2xx"} 1' in text
+        assert 'http_request_errors_total{method="GET",route="/boom"} 1' in text
+        assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 1' in text
+        assert 'le="+Inf"' in text and text.endswith("\n")
@@ -0,0 +1,92 @@
+"""
+Tests for the pure-ASGI request tracker (IP ban, tracking, response headers).
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.middleware import ip_ban, request_metrics, request_tracker
+from src.middleware.request_tracker import RequestTrackerMiddleware
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(request_tracker, "_recent_requests", request_tracker.deque(maxlen=10))
+    monkeypatch.setattr(request_tracker, "_recent_errors", request_tracker.deque(maxlen=10))
+    monkeypatch.setattr(ip_ban, "_banned_ips", set())
+    request_metrics.reset_metrics()
+    seen_active = []
+
+    app = FastAPI()
+    app.add_middleware(RequestTrackerMiddleware, response_headers={"X-Frame-Options": "DENY"})
+
+    @app.get("/quotes/{ticker}")
+    async def quote(ticker: str):
+        seen_active.extend(request_tracker.get_active_requests())
+        return {"ticker": ticker}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield b"x" * 100
+        return StreamingResponse(chunks())
+
+    @app.get("/framed")
+    async def framed():
+        return Response("ok", headers={"X-Frame-Options": "SAMEORIGIN", "X-Custom": "1"})
+
+    @app.get("/crash")
+    async def crash():
+        raise KeyError("boom")
+
+    with TestClient(app, raise_server_exceptions=False) as c:
+        c.seen_active = seen_active
+        yield c
+    request_metrics.reset_metrics()
+
+
+class TestRequestTracker:
+
+    def test_tracks_request_and_adds_headers(self, client):
+        resp = client.get("/quotes/SBER", headers={"X-Forwarded-For": "1.2.3.4, 10.0.0.1"})
+        assert resp.status_code == 200 and resp.headers["x-frame-options"] == "DENY"
+        [active] = client.seen_active
+        assert active["path"] == "/quotes/SBER" and active["client_ip"] == "10.0.0.1"
+        [record] = request_tracker.get_recent_requests()
+        assert record["request_id"] == active["request_id"]
+        assert record["route"] == "/quotes/{ticker}" and record["status_code"] == 200
+        assert request_tracker.get_active_requests() == []
+
+    def test_route_header_is_replaced_not_duplicated(self, client):
+        resp = client.get("/framed")
+        assert resp.headers.get_list("x-frame-options") == ["DENY"]
+        assert resp.headers["x-custom"] == "1"
+
+    def test_request_ids_are_unique(self, client):
+        for _ in range(3):
+            client.get("/quotes/GAZP")
+        ids = [r["request_id"] for r in request_tracker.get_recent_requests()]
+        assert len(set(ids)) == 3
+
+    def test_streaming_response_is_sized(self, client):
+        assert client.get("/stream").content == b"x" * 300
+        [row] = [r for r in request_metrics.route_metrics() if r["route"] == "/stream"]
+        assert row["response_bytes"]["total"] == 300
+
+    def test_banned_ip_is_rejected_untracked(self, client):
+        ip_ban.add_banned_ip("6.6.6.6")
+        resp = client.get("/quotes/SBER", headers={"X-Forwarded-For": "6.6.6.6"})
+        assert resp.status_code == 403 and resp.json() == {"detail": "Access denied"}
+        assert request_tracker.get_recent_requests() == []
+        assert client.get("/quotes/SBER").status_code == 200
+
+    def test_unhandled_error_is_recorded(self, client):
+        assert client.get("/crash").status_code == 500
+        [error] = request_tracker.get_recent_errors()
+        assert error["status_code"] == 500 and error["error"].startswith("KeyError")
+        assert request_tracker.get_active_requests() == []
@@ -0,0 +1,164 @@
+"""
+Tests for the persistent content-addressed result cache.
+"""
+import json
+import sqlite3
+import subprocess
+
+import numpy as np
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services import result_cache
+from src.services.result_cache import CACHE_HEADER, ResultStore, result_cache as cache_decorator, result_key
+from src.utils.array_response import ARROW_STREAM_CONTENT_TYPE, array_response
+
+
+class _Body(BaseModel):
+    values: list[float]
+    scale: float = 1.0
+    seed: int | None = None
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    s = ResultStore(tmp_path / "results.sqlite3", max_bytes=10_000)
+    result_cache.set_store(s)
+    recorded = []
+    monkeypatch.setattr(result_cache, "_record_provenance", lambda *args: recorded.append(args))
+    s.recorded = recorded
+    yield s
+    result_cache.set_store(None)
+
+
+class TestResultKey:
+
+    def test_canonical_over_order_and_numeric_type(self):
+        a = result_key("e", {"x": [1, 2.5], "y": {"b": 1, "a": None}})
+        b = result_key("e", {"y": {"a": None, "b": 1.0}, "x": [1.0, 2.5]})
+        assert a == b
+        assert result_key("e", {"x": [1, 2.6]}) != result_key("e", {"x": [1, 2.5]})
+        assert result_key("other", {"x": [1, 2.5]}) != result_key("e", {"x": [1, 2.5]})
+
+    def test_arrays_and_models(self):
+        arr = np.arange(6.0).reshape(2, 3)
+        assert result_key("e", {"m": arr}) == result_key("e", {"m": np.asfortranarray(arr)})
+        assert result_key("e", {"m": arr}) != result_key("e", {"m": arr.reshape(3, 2)})
+        assert result_key("e", _Body(values=[1.0])) == result_key("e", _Body(values=[1], scale=1))
+
+    def test_strings_are_not_confused_with_numbers(self):
+        assert result_key("e", {"x": "1"}) != result_key("e", {"x": 1})
+        assert result_key("e", {"x": True}) != result_key("e", {"x": 1})
+
+
+class TestResultStore:
+
+    def test_round_trip_and_persistence(self, tmp_path):
+        path = tmp_path / "r.sqlite3"
+        ResultStore(path).put("k", "e", b"payload")
+        assert ResultStore(path).get("k") == b"payload"  # new instance = another worker / restart
+
+    def test_lru_eviction_by_size(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(result_cache, "TOUCH_INTERVAL_SECONDS", -1.0)
+        s = ResultStore(tmp_path / "r.sqlite3", max_bytes=3000)
+        for key in ("a", "b", "c"):
+            s.put(key, "e", b"x" * 250)
+        assert s.get("a") is not None  # a becomes most recently used
+        for key in "defghijklm":
+            s.put(key, "e", b"x" * 250)
+        assert s.stats()["bytes"] <= 3000
+        assert s.get("b") is None and s.get("m") is not None
+
+    def test_oversized_entries_are_skipped(self, tmp_path):
+        s = ResultStore(tmp_path / "r.sqlite3", max_bytes=1000)
+        assert s.put("big", "e", b"x" * 200) is False
+        assert s.get("big") is None
+
+
+def _app(calls):
+    app = FastAPI()
+
+    @app.post("/seeded")
+    @cache_decorator("test.seeded", seed_field="seed")
+    async def seeded(request: Request, body: _Body):
+        calls.append(body)
+        rng = np.random.default_rng(body.seed)
+        return array_response(request, {"draws": rng.normal(size=3) * body.scale, "values": np.array(body.values)})
+
+    @app.post("/plain")
+    @cache_decorator("test.plain")
+    async def plain(request: Request, body: _Body):
+        calls.append(body)
+        return {"total": sum(body.values) * body.scale}
+
+    return TestClient(app)
+
+
+class TestResultCacheEndpoint:
+
+    def test_hit_returns_stored_body(self, store):
+        calls = []
+        client = _app(calls)
+        payload = {"values": [1.0, 2.0], "seed": 7}
+        first = client.post("/seeded", json=payload)
+        second = client.post("/seeded", json={"seed": 7, "values": [1, 2]})
+        assert first.headers[CACHE_HEADER] == "miss" and second.headers[CACHE_HEADER] == "hit"
+        assert first.json() == second.json()
+        assert len(calls) == 1
+        assert len(store.recorded) == 1 and store.recorded[0][0] == "test.seeded"
+
+    def test_unseeded_requests_bypass(self, store):
+        calls = []
+        client = _app(calls)
+        for _ in range(2):
+            resp = client.post("/seeded", json={"values": [1.0]})
+            assert resp.headers[CACHE_HEADER] == "bypass"
+        assert len(calls) == 2
+        assert store.stats()["entries"] == 0
+
+    def test_cache_control_directives(self, store):
+        calls = []
+        client = _app(calls)
+        payload = {"values": [1.0], "seed": 1}
+        client.post("/seeded", json=payload)
+        resp = client.post("/seeded", json=payload, headers={"Cache-Control": "no-cache"})
+        assert resp.headers[CACHE_HEADER] == "miss" and len(calls) == 2
+        assert client.post("/seeded", json=payload).headers[CACHE_HEADER] == "hit"
+        client.post("/seeded", json={"values": [2.0], "seed": 1}, headers={"Cache-Control": "no-store"})
+        assert store.stats()["entries"] == 1
+
+    def test_plain_results_and_arrow_hits(self, store):
+        calls = []
+        client = _app(calls)
+        first = client.post("/plain", json={"values": [1.0, 2.0], "scale": 2})
+        assert first.json() == {"total": 6.0} and first.headers[CACHE_HEADER] == "miss"
+        hit = client.post("/plain", json={"values": [1.0, 2.0], "scale": 2}, headers={"Accept": ARROW_STREAM_CONTENT_TYPE})
+        assert hit.headers[CACHE_HEADER] == "hit"
+        assert hit.headers["content-type"] == ARROW_STREAM_CONTENT_TYPE
+        assert len(calls) == 1
+
+    def test_shared_across_processes(self, store):
+        client = _app([])
+        client.post("/plain", json={"values": [3.0]})
+        key = client.post("/plain", json={"values": [3.0]}).headers[result_cache.CACHE_KEY_HEADER]
+        code = (
+            "import sqlite3, sys; "
+            "row = sqlite3.connect(sys.argv[1]).execute('SELECT body FROM results WHERE key = ?', (sys.argv[2],)).fetchone(); "
+            "print(row[0].decode())"
+        )
+        out = subprocess.run([sys.executable, "-c", code, store.path, key], capture_output=True, text=True, check=True)
+        assert json.loads(out.stdout) == {"total": 3.0}
+
+    def test_store_errors_do_not_fail_requests(self, store, monkeypatch):
+        def broken(*args):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(store, "get", broken)
+        monkeypatch.setattr(store, "put", broken)
+        resp = _app([]).post("/plain", json={"values": [1.0]})
+        assert resp.status_code == 200 and resp.json() == {"total": 1.0}
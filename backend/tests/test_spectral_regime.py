@@ -0,0 +1,60 @@
+"""
+Tests for SpectralRegimeAnalyzer: FFT autocovariance and vectorized regime energies.
+"""
+import numpy as np
+import pytest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.spectral_regime_service import SpectralRegimeAnalyzer, run_spectral_regime_analysis
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    t = np.arange(1500)
+    return rng.standard_t(4, t.size) * 0.01 + 0.003 * np.sin(t / 7)
+
+
+class TestSpectralRegimeAnalyzer:
+
+    def test_fft_acf_matches_direct_sums(self, series):
+        acf = SpectralRegimeAnalyzer(max_lag=200).compute_acf(series)
+        yc = series - series.mean()
+        T = len(series)
+        direct = np.array([np.mean(yc[:T - h] * yc[h:]) for h in range(201)])
+        np.testing.assert_allclose(acf, direct / direct[0], rtol=1e-9, atol=1e-12)
+
+    def test_energies_match_geometric_sum_per_point(self, series):
+        analyzer = SpectralRegimeAnalyzer(n_poles=5, window_size=20).fit(series)
+        W = analyzer.window_size
+        residues = [np.mean(analyzer.residues[analyzer.pole_clusters[k]]) for k in range(analyzer.K)]
+        for t_idx in (0, 17, len(series) - W - 1):
+            t = t_idx + W
+            for k, pole in enumerate(analyzer.regime_poles):
+                # closed form used by the service: |R|²·|λ|^{2t}·(1 - |λ|^{2W}) / (1 - |λ|²)
+                direct = sum(abs(residues[k] * pole ** (t + j)) ** 2 for j in range(W))
+                assert analyzer.regime_energies[t_idx, k] == pytest.approx(max(direct, 1e-10), rel=1e-6)
+        probs = analyzer.regime_energies / analyzer.regime_energies.sum(axis=1, keepdims=True)
+        np.testing.assert_array_equal(analyzer.regime_signal, probs.argmax(axis=1))
+        assert analyzer.entropy.shape == (len(series) - W,) and np.all(analyzer.entropy >= 0)
+
+    def test_spectrum_and_reconstruction(self, series):
+        analyzer = SpectralRegimeAnalyzer(n_poles=5, window_size=20).fit(series)
+        poles, residues = analyzer.poles, analyzer.residues[:len(analyzer.poles)]
+        z = np.exp(-1j * analyzer.omega)
+        direct = sum(r / (1 - p * z) for p, r in zip(poles, residues))
+        np.testing.assert_allclose(analyzer.H_spectrum, direct, rtol=1e-12)
+        recon = np.real([sum(r * p ** h for p, r in zip(poles, residues)) for h in range(len(analyzer.acf))])
+        rmse, _ = analyzer.reconstruction_error()
+        assert rmse == pytest.approx(np.sqrt(np.mean((analyzer.acf - recon) ** 2)))
+
+    def test_auto_fit_long_series(self):
+        returns = np.random.default_rng(1).normal(0, 0.01, 10_000)
+        result = run_spectral_regime_analysis(returns, auto_optimize=True)
+        optimization = result["summary"]["optimization"]
+        assert optimization["n_poles_used"] >= 3 and 10 <= optimization["window_size_used"] <= 50
+        dynamics = result["visualization"]["dynamics"]
+        assert len(dynamics["regime_energies"]) == 10_000 - optimization["window_size_used"]
+        assert np.allclose(np.sum(dynamics["regime_energies"], axis=1), 1.0)